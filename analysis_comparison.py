@@ -0,0 +1,279 @@
+"""
+Vergleich der Keyword- und der semantischen Analyse.
+
+Beide Ergebnismengen liegen im Ergebnisspeicher (result_store.py) bereits über denselben
+Kurs-Index verknüpft vor. Pro Methode wird daraus eine boolesche Matrix Kurs x SDG gebildet;
+Übereinstimmung und Abweichungen ergeben sich in einem Durchlauf aus elementweisen
+Verknüpfungen und np.bincount über (Semester, SDG). Der Aufwand wächst linear mit der
+Anzahl der Kurse und Treffer.
+
+Die semantische Analyse dient als Referenz: Präzision ist der Anteil der Keyword-Treffer,
+die auch semantisch gefunden wurden, Recall der Anteil der semantischen Treffer, die auch
+die Keywords finden. Verglichen werden nur Semester, die beide Methoden analysiert haben.
+
+    python analysis_comparison.py
+
+Ausgaben:
+    plots/analysis_comparison_metrics.png    Präzision, Recall und Jaccard pro SDG
+    plots/analysis_comparison_jaccard.png    Jaccard pro Semester und SDG
+    plots/analysis_comparison_confusion.png  Konfusionsmatrizen pro SDG
+    plots/methodenvergleich.csv              Konfusionsmatrix und Kennzahlen pro Semester und SDG
+    plots/methodenvergleich_abweichungen.csv Kurse, bei denen die Methoden sich unterscheiden
+"""
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import seaborn as sns
+
+from instrumentation import run_instrumented, timer
+from plot_rendering import PlotJob, new_figure, render_plots
+from result_store import SDG_IDS, ResultStore, ensure_result_store
+
+METRICS_FILE = 'plots/methodenvergleich.csv'
+DISAGREEMENTS_FILE = 'plots/methodenvergleich_abweichungen.csv'
+ALL_SEMESTERS = 'Alle Semester'
+
+def membership_matrix(course: np.ndarray, sdg: np.ndarray, num_courses: int) -> np.ndarray:
+    """Boolesche Matrix Kurs x SDG aus Treffer-Arrays (Kurs-Index, SDG-Position)."""
+    matrix = np.zeros((num_courses, len(SDG_IDS)), dtype=bool)
+    matrix[np.asarray(course, dtype=np.int64), np.asarray(sdg, dtype=np.int64)] = True
+    return matrix
+
+def overlap_counts(keyword_course: np.ndarray, keyword_sdg: np.ndarray,
+                   semantic_course: np.ndarray, semantic_sdg: np.ndarray,
+                   course_group: np.ndarray, num_groups: int,
+                   course_mask: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Konfusionsmatrix pro Gruppe (z. B. Semester) und SDG.
+
+    Args:
+        course_group: Gruppe jedes Kurses (Länge = Anzahl Kurse)
+        course_mask: Nur diese Kurse zählen (Standard: alle)
+
+    Returns:
+        'both', 'keyword_only', 'semantic_only', 'neither': Arrays [num_groups, 17]
+    """
+    num_courses = len(course_group)
+    num_sdgs = len(SDG_IDS)
+    course_group = np.asarray(course_group, dtype=np.int64)
+    if course_mask is None:
+        course_mask = np.ones(num_courses, dtype=bool)
+
+    keyword = membership_matrix(keyword_course, keyword_sdg, num_courses)
+    semantic = membership_matrix(semantic_course, semantic_sdg, num_courses)
+    keyword &= course_mask[:, None]
+    semantic &= course_mask[:, None]
+
+    def grouped(matrix):
+        rows, sdgs = np.nonzero(matrix)
+        return np.bincount(course_group[rows] * num_sdgs + sdgs,
+                           minlength=num_groups * num_sdgs).reshape(num_groups, num_sdgs)
+
+    counts = {
+        'both': grouped(keyword & semantic),
+        'keyword_only': grouped(keyword & ~semantic),
+        'semantic_only': grouped(semantic & ~keyword)
+    }
+    courses_per_group = np.bincount(course_group[course_mask], minlength=num_groups)
+    counts['neither'] = (courses_per_group[:, None]
+                         - counts['both'] - counts['keyword_only'] - counts['semantic_only'])
+    return counts
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    # Kein Treffer in Zähler und Nenner: Kennzahl undefiniert (NaN) statt Division durch 0
+    result = np.full(numerator.shape, np.nan)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return result
+
+def agreement_metrics(counts: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Präzision, Recall und Jaccard der Keyword-Analyse gegenüber der semantischen Analyse."""
+    both, keyword_only, semantic_only = counts['both'], counts['keyword_only'], counts['semantic_only']
+    return {
+        'precision': _ratio(both, both + keyword_only),
+        'recall': _ratio(both, both + semantic_only),
+        'jaccard': _ratio(both, both + keyword_only + semantic_only)
+    }
+
+def compared_semesters(store: ResultStore) -> List[str]:
+    """
+    Semester, die beide Methoden analysiert haben. Ältere Speicher ohne diese Angabe
+    werden vollständig verglichen.
+    """
+    analyzed = store.meta.get('analyzed_semesters')
+    if not analyzed:
+        return list(store.semesters)
+    keyword, semantic = set(analyzed.get('keyword', [])), set(analyzed.get('semantic', []))
+    return [semester for semester in store.semesters if semester in keyword and semester in semantic]
+
+def compare_methods(store: ResultStore, semesters: Optional[List[str]] = None) -> Dict:
+    """
+    Vergleicht beide Methoden pro Semester und SDG; die letzte Zeile fasst alle Semester zusammen.
+
+    Returns:
+        Dictionary mit 'semesters' und den Zählungen/Kennzahlen als Arrays [Semester + 1, 17]
+    """
+    if semesters is None:
+        semesters = compared_semesters(store)
+    course_mask = store.course_mask(semesters)
+    counts = overlap_counts(store.keyword_course, store.keyword_sdg,
+                            store.semantic_course, store.semantic_sdg,
+                            store.course_semester, len(store.semesters), course_mask)
+    positions = [store.semesters.index(semester) for semester in semesters]
+    counts = {name: np.vstack([values[positions], values[positions].sum(axis=0, keepdims=True)])
+              for name, values in counts.items()}
+    return {
+        'semesters': list(semesters) + [ALL_SEMESTERS],
+        'course_mask': course_mask,
+        **counts,
+        **agreement_metrics(counts)
+    }
+
+def metrics_frame(comparison: Dict) -> pd.DataFrame:
+    """Eine Zeile pro Semester und SDG (plus 'Alle Semester') mit Konfusionsmatrix und Kennzahlen."""
+    num_semesters, num_sdgs = comparison['both'].shape
+    return pd.DataFrame({
+        'Semester': np.repeat(comparison['semesters'], num_sdgs),
+        'SDG': np.tile(SDG_IDS, num_semesters),
+        'Beide': comparison['both'].ravel(),
+        'Nur Keyword': comparison['keyword_only'].ravel(),
+        'Nur semantisch': comparison['semantic_only'].ravel(),
+        'Keine': comparison['neither'].ravel(),
+        'Präzision': comparison['precision'].ravel().round(4),
+        'Recall': comparison['recall'].ravel().round(4),
+        'Jaccard': comparison['jaccard'].ravel().round(4)
+    })
+
+def disagreement_frame(store: ResultStore, course_mask: np.ndarray) -> pd.DataFrame:
+    """
+    Kurs-SDG-Paare, die nur eine der beiden Methoden gefunden hat, mit den gefundenen
+    Keywords bzw. der semantischen Ähnlichkeit.
+    """
+    num_courses, num_sdgs = store.num_courses, len(SDG_IDS)
+    keyword = membership_matrix(store.keyword_course, store.keyword_sdg, num_courses)
+    semantic = membership_matrix(store.semantic_course, store.semantic_sdg, num_courses)
+    courses, sdgs = np.nonzero((keyword ^ semantic) & course_mask[:, None])
+    keyword_side = keyword[courses, sdgs]
+
+    # Treffer sind nach (Kurs, SDG) sortiert: Position über den kombinierten Schlüssel suchen
+    pair_keys = courses.astype(np.int64) * num_sdgs + sdgs
+    keyword_keys = np.asarray(store.keyword_course, dtype=np.int64) * num_sdgs + store.keyword_sdg
+    semantic_keys = np.asarray(store.semantic_course, dtype=np.int64) * num_sdgs + store.semantic_sdg
+    keyword_rows = np.searchsorted(keyword_keys, pair_keys[keyword_side])
+    semantic_rows = np.searchsorted(semantic_keys, pair_keys[~keyword_side])
+
+    found = np.full(len(courses), '', dtype=object)
+    found[keyword_side] = store.keyword_found.take(keyword_rows)
+    similarity = np.full(len(courses), np.nan, dtype=np.float32)
+    similarity[~keyword_side] = store.semantic_similarity[semantic_rows]
+
+    frame = store.courses_frame(courses).reset_index(drop=True)
+    frame.insert(1, 'SDG', np.array(SDG_IDS)[sdgs])
+    frame.insert(2, 'Methode', np.where(keyword_side, 'Nur Keyword', 'Nur semantisch'))
+    frame['Gefundene Schlagwörter'] = found
+    frame['Ähnlichkeit'] = similarity
+    return frame
+
+def render_metrics_plot(aggregate):
+    """Präzision, Recall und Jaccard pro SDG über alle verglichenen Semester"""
+    fig = new_figure(figsize=(15, 7))
+    ax = fig.subplots()
+    positions = np.arange(len(SDG_IDS))
+    width = 0.27
+    for offset, (name, label) in zip((-width, 0, width), (('precision', 'Präzision'), ('recall', 'Recall'),
+                                                         ('jaccard', 'Jaccard'))):
+        ax.bar(positions + offset, np.nan_to_num(np.asarray(aggregate[name], dtype=float)), width, label=label)
+    ax.set_xticks(positions)
+    ax.set_xticklabels(SDG_IDS, rotation=45)
+    ax.set_ylim(0, 1)
+    ax.set_ylabel('Anteil')
+    ax.set_title('Übereinstimmung der Keyword-Analyse mit der semantischen Analyse (Referenz)')
+    ax.legend()
+    ax.grid(True, axis='y', alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+def render_jaccard_heatmap(aggregate):
+    """Jaccard-Koeffizient pro Semester und SDG"""
+    if not aggregate['semesters']:
+        return None
+    fig = new_figure(figsize=(15, 1.5 + 0.6 * len(aggregate['semesters'])))
+    ax = fig.subplots()
+    sns.heatmap(pd.DataFrame(np.asarray(aggregate['jaccard'], dtype=float),
+                             index=aggregate['semesters'], columns=SDG_IDS),
+                vmin=0, vmax=1, cmap='YlGnBu', annot=True, fmt='.2f', ax=ax)
+    ax.set_title('Jaccard-Koeffizient zwischen Keyword- und semantischer Analyse')
+    ax.set_xlabel('SDG')
+    ax.set_ylabel('Semester')
+    fig.tight_layout()
+    return fig
+
+def render_confusion_plot(aggregate):
+    """Konfusionsmatrizen (Keyword gegen semantisch) pro SDG über alle verglichenen Semester"""
+    fig = new_figure(figsize=(18, 10))
+    axes = fig.subplots(3, 6).ravel()
+    for i, ax in enumerate(axes):
+        if i >= len(SDG_IDS):
+            ax.axis('off')
+            continue
+        matrix = np.array([[aggregate['both'][i], aggregate['keyword_only'][i]],
+                           [aggregate['semantic_only'][i], aggregate['neither'][i]]])
+        ax.imshow(matrix, cmap='Blues')
+        for row in range(2):
+            for col in range(2):
+                ax.text(col, row, str(matrix[row, col]), ha='center', va='center',
+                        color='white' if matrix[row, col] > matrix.max() / 2 else 'black')
+        ax.set_title(SDG_IDS[i])
+        ax.set_xticks([0, 1])
+        ax.set_yticks([0, 1])
+        ax.set_xticklabels(['sem. ja', 'sem. nein'])
+        ax.set_yticklabels(['KW ja', 'KW nein'])
+    fig.suptitle('Konfusionsmatrizen: Keyword-Analyse (Zeilen) gegen semantische Analyse (Spalten)')
+    fig.tight_layout()
+    return fig
+
+def build_plot_jobs(comparison: Dict) -> List[PlotJob]:
+    """Eine PlotJob-Beschreibung pro Vergleichsgrafik (Gesamtwerte stehen in der letzten Zeile)."""
+    total = {name: comparison[name][-1] for name in
+             ('both', 'keyword_only', 'semantic_only', 'neither', 'precision', 'recall', 'jaccard')}
+    return [
+        PlotJob('analysis_comparison_metrics', render_metrics_plot, total),
+        PlotJob('analysis_comparison_confusion', render_confusion_plot, total),
+        PlotJob('analysis_comparison_jaccard', render_jaccard_heatmap,
+                {'semesters': comparison['semesters'][:-1], 'jaccard': comparison['jaccard'][:-1]})
+    ]
+
+def main():
+    store = ensure_result_store()
+    semesters = compared_semesters(store)
+    if not semesters:
+        print("⚠️ Kein Semester wurde von beiden Methoden analysiert.")
+        return
+    print(f"Vergleiche Keyword- und semantische Analyse für: {', '.join(semesters)}")
+
+    with timer('comparison'):
+        comparison = compare_methods(store, semesters)
+        metrics_df = metrics_frame(comparison)
+        disagreements_df = disagreement_frame(store, comparison['course_mask'])
+    os.makedirs(os.path.dirname(METRICS_FILE), exist_ok=True)
+    metrics_df.to_csv(METRICS_FILE, index=False, encoding='utf-8')
+    disagreements_df.to_csv(DISAGREEMENTS_FILE, index=False, encoding='utf-8')
+
+    with timer('plot_render'):
+        render_status = render_plots(build_plot_jobs(comparison))
+    rendered = sum(1 for status in render_status.values() if status == 'gerendert')
+    print(f"Grafiken: {rendered} neu gerendert, {len(render_status) - rendered} unverändert")
+
+    print("\nÜbereinstimmung über alle verglichenen Semester:")
+    print(metrics_df[metrics_df['Semester'] == ALL_SEMESTERS].drop(columns='Semester').to_string(index=False))
+    print(f"\n{len(disagreements_df)} abweichende Kurs-SDG-Paare "
+          f"({int((disagreements_df['Methode'] == 'Nur Keyword').sum())} nur Keyword, "
+          f"{int((disagreements_df['Methode'] == 'Nur semantisch').sum())} nur semantisch)")
+    print("\nDie Ergebnisse wurden gespeichert als:")
+    print(f"- {METRICS_FILE}")
+    print(f"- {DISAGREEMENTS_FILE}")
+    print("- plots/analysis_comparison_*.png")
+
+if __name__ == "__main__":
+    run_instrumented('analysis_comparison', main)
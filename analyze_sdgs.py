@@ -1,91 +1,151 @@
+import argparse
 import json
 from sdg_keywords import SDG_KEYWORDS
-import re
 from collections import defaultdict
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 import os
 from datetime import datetime
+from course_dedup import CanonicalCourseStore, course_text
+from course_preprocessing import PreprocessedCourses, normalize_text, tokenize_words
+from course_record import CourseRecord, KeywordHit, json_default, load_course_records
+from instrumentation import count, run_instrumented, timer
+from keyword_index import KeywordIndexBuilder
+from keyword_lexicon import KeywordLexicon, corpus_vocabulary, default_lexicon, matcher_config
+from semester_registry import SemesterRegistry, latest_course_file
 
-def normalize_text(text: str) -> str:
-    """Text für besseres Matching normalisieren."""
-    if not text:
-        return ""
-    # Konvertiere Text zu Kleinbuchstaben
-    text = text.lower()
-    # Ersetze Umlaute
-    text = text.replace('ä', 'ae').replace('ö', 'oe').replace('ü', 'ue').replace('ß', 'ss')
-    return text
+COUNT_FUZZY = True  # Unscharfe Treffer (Tippfehler, abweichende Flexion) zählen als SDG-Treffer
 
-def find_sdgs_in_text(text: str) -> Dict[str, Set[str]]:
+def merge_findings(exact: Dict[str, Set[str]], fuzzy: Dict[str, Set[str]]) -> Dict[str, Set[str]]:
+    """Exakt und unscharf gefundene Keywords pro SDG zusammengeführt (Reihenfolge wie in SDG_KEYWORDS)."""
+    return {sdg: exact.get(sdg, set()) | fuzzy.get(sdg, set()) for sdg in SDG_KEYWORDS
+            if sdg in exact or sdg in fuzzy}
+
+def find_sdgs_in_text(text: str, lexicon: Optional[KeywordLexicon] = None,
+                      include_fuzzy: bool = COUNT_FUZZY) -> Dict[str, Set[str]]:
     """
     SDGs in einem Text basierend auf Keywords finden.
     Gibt ein Dictionary zurück mit SDGs als Schlüssel und gefundenen Keywords als Werte.
-    Verwendet Wortgrenzen für exakte Übereinstimmungen.
+    Keywords werden als ganze Wörter oder als Bestandteil deutscher Komposita gefunden
+    (siehe keyword_lexicon.py), mehrwortige Keywords als Phrase, mit include_fuzzy auch bei
+    Tippfehlern und abweichender Flexion (welche: find_sdgs_in_text_flagged).
+    """
+    exact, fuzzy = find_sdgs_in_text_flagged(text, lexicon)
+    return merge_findings(exact, fuzzy) if include_fuzzy else exact
+
+def find_sdgs_in_text_flagged(text: str, lexicon: Optional[KeywordLexicon] = None) -> Tuple[Dict[str, Set[str]], Dict[str, Set[str]]]:
+    """
+    Wie find_sdgs_in_text, zusätzlich die nur unscharf gefundenen Keywords.
+
+    Returns:
+        (SDG -> exakt gefundene Keywords, SDG -> nur unscharf gefundene Keywords)
     """
-    text = normalize_text(text)
-    # Teile Text in Wörter auf
-    words = set(re.findall(r'\b\w+\b', text))
-    sdg_findings = {}
-    
-    for sdg, info in SDG_KEYWORDS.items():
-        found_keywords = set()
-        for keyword in info['keywords']:
-            # Normalisiere auch das Keyword
-            normalized_keyword = normalize_text(keyword)
-            # Prüfe auf exakte Wortübereinstimmung
-            if normalized_keyword in words:
-                found_keywords.add(keyword)
-            # Prüfe auch auf Phrasen (für Keywords mit mehreren Wörtern)
-            elif len(normalized_keyword.split()) > 1:
-                if normalized_keyword in text:
-                    found_keywords.add(keyword)
-        if found_keywords:
-            sdg_findings[sdg] = found_keywords
-    
-    return sdg_findings
+    with timer('normalize'):
+        text = normalize_text(text)
+        # Teile Text in Wörter auf
+        words = set(tokenize_words(text))
+    
+    with timer('keyword_match'):
+        return _match_keywords(text, words, lexicon)
+
+def _match_keywords(text: str, words: Set[str],
+                    lexicon: Optional[KeywordLexicon] = None) -> Tuple[Dict[str, Set[str]], Dict[str, Set[str]]]:
+    """Gleicht die normalisierten Wörter und den Text über das Keyword-Lexikon ab."""
+    if lexicon is None:
+        lexicon = default_lexicon()
+    return lexicon.match_flagged(text, words)
 
-def analyze_course(course: Dict) -> Dict[str, Set[str]]:
+def _find_sdgs_preprocessed(preprocessed: PreprocessedCourses, row: int,
+                            lexicon: Optional[KeywordLexicon] = None) -> Tuple[Dict[str, Set[str]], Dict[str, Set[str]]]:
+    """Wie find_sdgs_in_text_flagged, aber mit den vorverarbeiteten Wort-Tokens des Kurses."""
+    with timer('keyword_match'):
+        return _match_keywords(preprocessed.normalized_text(row), set(preprocessed.word_tokens(row)), lexicon)
+
+def analyze_course(course: CourseRecord, store: Optional[CanonicalCourseStore] = None,
+                   semester: Optional[str] = None,
+                   preprocessed: Optional[PreprocessedCourses] = None,
+                   lexicon: Optional[KeywordLexicon] = None) -> Tuple[Dict[str, Set[str]], Dict[str, Set[str]]]:
     """
     Analysiert einen einzelnen Kurs auf SDG-Relevanz basierend auf Keywords.
+    Mit einem kanonischen Speicher wird jeder eindeutige Kurstext nur einmal analysiert,
+    mit vorverarbeiteten Kurstexten entfallen Normalisierung und Tokenisierung.
+    Ohne lexicon wird das gespeicherte Keyword-Lexikon verwendet.
     
     Returns:
-        Dict mit SDGs als Schlüssel und gefundenen Keywords als Werte
+        (Dict mit SDGs als Schlüssel und exakt gefundenen Keywords als Werte,
+         nur unscharf gefundene Keywords pro SDG; diese zählen nicht als SDG-Treffer)
     """
-    return find_sdgs_in_text(' '.join([
-        course.get('title', ''),
-        course.get('subtitle', ''),
-        course.get('objectives_and_content', '')
-    ]))
+    row = preprocessed.row(course) if preprocessed is not None else None
+    if store is None:
+        count('keyword_analyses')
+        if row is not None:
+            return _find_sdgs_preprocessed(preprocessed, row, lexicon)
+        return find_sdgs_in_text_flagged(course_text(course), lexicon)
+    
+    key = store.register(course, semester, preprocessed.text_hash(row) if row is not None else None)
+    cached_hits = store.keyword_hits(key)
+    if cached_hits is not None:
+        return ({sdg: set(keywords) for sdg, keywords in cached_hits.items()},
+                {sdg: set(keywords) for sdg, keywords in store.keyword_fuzzy(key).items()})
+    
+    count('keyword_analyses')
+    if row is not None:
+        sdg_findings, fuzzy = _find_sdgs_preprocessed(preprocessed, row, lexicon)
+    else:
+        sdg_findings, fuzzy = find_sdgs_in_text_flagged(course_text(course), lexicon)
+    if fuzzy:
+        count('fuzzy_keyword_courses')
+    store.set_keyword_hits(key, {sdg: sorted(keywords) for sdg, keywords in sdg_findings.items()},
+                           {sdg: sorted(keywords) for sdg, keywords in fuzzy.items()})
+    return sdg_findings, fuzzy
 
-def analyze_semester_data(semester_path: str) -> Dict:
+def analyze_semester_data(semester_path: str, store: Optional[CanonicalCourseStore] = None,
+                          index: Optional[KeywordIndexBuilder] = None,
+                          preprocessed: Optional[PreprocessedCourses] = None,
+                          pool: Optional[Dict] = None,
+                          lexicon: Optional[KeywordLexicon] = None,
+                          count_fuzzy: bool = COUNT_FUZZY) -> Dict:
     """
     Analysiert die Daten eines Semesters und gibt strukturierte Analyseergebnisse zurück.
+    Optional werden die Treffer im selben Durchlauf in den invertierten Keyword-Index eingetragen.
+    Kurse sind CourseRecords; ein über die Semester geteilter pool teilt wiederkehrende Texte.
+    Unscharf gefundene Keywords stehen zusätzlich in fuzzy_keywords der Treffer. Mit
+    count_fuzzy zählen sie als SDG-Treffer (auch in found_keywords), sonst nicht: Kurse, die
+    ein SDG nur unscharf treffen, stehen dann unter fuzzy_only_courses.
     """
     # Lade Semester-Info
     with open(os.path.join(semester_path, 'semester_info.json'), 'r', encoding='utf-8') as f:
         semester_info = json.load(f)
     
     # Finde neueste Kursdatei
-    course_files = [f for f in os.listdir(semester_path) 
-                   if f.startswith('courses_') and f.endswith('.json')]
-    if not course_files:
+    course_file = latest_course_file(semester_path)
+    if course_file is None:
         return None
-        
-    latest_course_file = max(course_files)
     
     # Lade Kursdaten
-    with open(os.path.join(semester_path, latest_course_file), 'r', encoding='utf-8') as f:
-        data = json.load(f)
-        courses = data['courses']
+    with timer('load'):
+        courses = load_course_records(course_file, pool)
     
     # Analysiere Kurse
     sdg_analysis = defaultdict(list)
+    fuzzy_only = defaultdict(list)
+    courses_without_sdgs = []
     for course in courses:
-        sdg_findings = analyze_course(course)
+        sdg_findings, fuzzy = analyze_course(course, store, semester_info.get('semester_name'), preprocessed, lexicon)
+        if count_fuzzy:
+            sdg_findings = merge_findings(sdg_findings, fuzzy)
+        if not sdg_findings:
+            courses_without_sdgs.append(course)
+        elif index is not None:
+            doc_id = index.add_document(course, semester_info.get('semester_name'))
+            row = preprocessed.row(course) if preprocessed is not None else None
+            normalized = preprocessed.normalized_text(row) if row is not None else normalize_text(course_text(course))
+            index.add_hits(doc_id, normalized, sdg_findings, lexicon or default_lexicon(), count_fuzzy)
         for sdg, found_keywords in sdg_findings.items():
-            course_with_keywords = course.copy()
-            course_with_keywords['found_keywords'] = list(found_keywords)
-            sdg_analysis[sdg].append(course_with_keywords)
+            # Verweis auf den Kurs statt einer Kopie pro SDG
+            sdg_analysis[sdg].append(KeywordHit(course, list(found_keywords), sorted(fuzzy.get(sdg, ()))))
+        for sdg, fuzzy_keywords in fuzzy.items():
+            if sdg not in sdg_findings:
+                fuzzy_only[sdg].append(KeywordHit(course, [], sorted(fuzzy_keywords)))
     
     # Erstelle Analysezusammenfassung
     analysis_summary = {
@@ -98,37 +158,52 @@ def analyze_semester_data(semester_path: str) -> Dict:
                 'courses': courses_list,
                 'all_found_keywords': sorted(set(
                     keyword
-                    for course in courses_list
-                    for keyword in course['found_keywords']
+                    for hit in courses_list
+                    for keyword in hit.found_keywords
                 ))
             }
             for sdg, courses_list in sdg_analysis.items()
         },
-        'courses_without_sdgs': [
-            course for course in courses
-            if not analyze_course(course)
-        ],
+        'courses_without_sdgs': courses_without_sdgs,
+        # Nicht gezählt: Kurse, die Keywords eines SDGs nur unscharf enthalten
+        'fuzzy_only_courses': dict(fuzzy_only),
         'analysis_timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     }
     
     return analysis_summary
 
-def analyze_all_semesters() -> Dict:
+def analyze_all_semesters(count_fuzzy: bool = COUNT_FUZZY) -> Dict:
     """
     Analysiert alle Semester und erstellt eine Gesamtanalyse.
+    Ohne count_fuzzy zählen nur exakt gefundene Keywords.
     """
     data_dir = 'data'
     
-    # Finde alle Semester-Verzeichnisse
-    semester_dirs = [d for d in os.listdir(data_dir) 
-                    if os.path.isdir(os.path.join(data_dir, d)) 
-                    and d.startswith('semester_')]
+    # Alle bekannten Semester, chronologisch
+    registry = SemesterRegistry.load(data_dir)
+    
+    # Normalisierte Texte und Wort-Tokens aus der Vorverarbeitung (falls aktuell)
+    preprocessed = PreprocessedCourses.load(data_dir=data_dir)
+    pool = {}
+    
+    # Keyword-Lexikon auf das Vokabular des Korpus setzen (Komposita einmal pro Token auflösen)
+    lexicon = KeywordLexicon.load()
+    with timer('lexicon'):
+        changes = lexicon.update_vocabulary(corpus_vocabulary(preprocessed, data_dir))
+    print(f"Keyword-Lexikon: {len(lexicon.vocabulary)} Tokens, {changes['new']} neu, "
+          f"{changes['removed']} entfernt, {changes['changed']} anders zugeordnet")
+    
+    # Kanonische Kurstexte: wiederkehrende Kurse werden nur einmal analysiert; gecachte
+    # Treffer gelten nur, solange sich die Zuordnung der Tokens im Lexikon nicht ändert
+    store = CanonicalCourseStore.load('keyword')
+    store.check_signature({'keywords': SDG_KEYWORDS, 'matcher': matcher_config(), 'lexicon': lexicon.revision})
+    index = KeywordIndexBuilder()
     
     # Analysiere jedes Semester
     all_analyses = {}
-    for semester_dir in sorted(semester_dirs, reverse=True):  # Neueste zuerst
-        semester_path = os.path.join(data_dir, semester_dir)
-        analysis = analyze_semester_data(semester_path)
+    for semester in registry.semesters(newest_first=True):
+        semester_path = registry.semester_dir(semester)
+        analysis = analyze_semester_data(semester_path, store, index, preprocessed, pool, lexicon, count_fuzzy)
         
         if analysis:
             semester_name = analysis['semester_info']['semester_name']
@@ -137,6 +212,7 @@ def analyze_all_semesters() -> Dict:
     # Erstelle Gesamtanalyse
     total_analysis = {
         'semester_analyses': all_analyses,
+        'fuzzy_counted': count_fuzzy,
         'overall_statistics': {
             'total_courses': sum(analysis['total_courses'] for analysis in all_analyses.values()),
             'sdg_coverage': {
@@ -154,20 +230,35 @@ def analyze_all_semesters() -> Dict:
     
     # Speichere Analyseergebnisse
     output_file = os.path.join(data_dir, 'keyword_analysis.json')  # Geändert von sdg_analysis.json
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(total_analysis, f, ensure_ascii=False, indent=2)
+    with timer('serialize'), open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(total_analysis, f, ensure_ascii=False, indent=2, default=json_default)
+    
+    with timer('serialize'):
+        store.save()
+        index.save()
+        lexicon.save()
+    dedup_summary = store.summary()
+    print(f"Kanonische Kurstexte: {dedup_summary['unique_texts']} eindeutig bei "
+          f"{dedup_summary['course_copies']} Kurskopien, {dedup_summary['keyword_reused']} Ergebnisse wiederverwendet")
     
     return total_analysis
 
-if __name__ == "__main__":
+def main(count_fuzzy: bool = COUNT_FUZZY):
+    """Führt die Keyword-basierte SDG-Analyse für alle Semester durch"""
     print("="*80)
     print("Starte Keyword-basierte SDG-Analyse")
     print("="*80)
     
-    analysis_results = analyze_all_semesters()
+    analysis_results = analyze_all_semesters(count_fuzzy)
     
     print("\nAnalyse abgeschlossen!")
     print(f"Analysierte Semester: {list(analysis_results['semester_analyses'].keys())}")
     print(f"Gesamtanzahl der Kurse: {analysis_results['overall_statistics']['total_courses']}")
     print("\nDie Ergebnisse wurden in data/keyword_analysis.json gespeichert.")
-    print("="*80) 
\ No newline at end of file
+    print("="*80)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keyword-basierte SDG-Analyse aller Semester")
+    parser.add_argument('--exact-only', action='store_true',
+                        help="Unscharfe Treffer (Tippfehler) nur ausweisen, nicht als SDG-Treffer zählen")
+    run_instrumented('analyze_sdgs', lambda args: main(not args.exact_only), parser=parser)
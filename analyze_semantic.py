@@ -1,95 +1,342 @@
+import argparse
 import json
+import subprocess
+import sys
+import time
+import numpy as np
 from semantic_analysis import SemanticSDGAnalyzer
+from semantic_cascade import SemanticCascade
+from analyze_sdgs import analyze_course
+from course_dedup import CanonicalCourseStore, config_signature, course_text
+from course_record import load_course_records
+from semester_registry import SemesterRegistry
+from course_search import build_course_index, index_codec
+from course_preprocessing import PreprocessedCourses, normalize_text, tokenize_words
 from pathlib import Path
 from datetime import datetime
-import os
+from instrumentation import run_instrumented, timer
+from work_queue import DEFAULT_LEASE_SECONDS, WorkQueue, run_worker
 
-def analyze_courses_semantic():
+QUEUE_FILE = 'data/work_queue/semantic.sqlite'
+QUEUE_BATCH_SIZE = 32  # Eindeutige Kurstexte pro Aufgabe
+
+def load_semesters(data_dir: Path):
+    """Lädt Semester-Info und die neueste Kursdatei aller Semester (neueste zuerst)."""
+    registry = SemesterRegistry.load(str(data_dir))
+
+    semesters = []
+    pool = {}
+    for semester, course_file in registry.course_files(newest_first=True):
+        # Lade Semester-Info
+        with open(data_dir / semester.dir_name / 'semester_info.json', 'r', encoding='utf-8') as f:
+            semester_info = json.load(f)
+
+        # Lade Kursdaten
+        with timer('load'):
+            courses = load_course_records(course_file, pool)
+        semesters.append((semester.dir_name, semester_info, courses))
+    return semesters
+
+def screening_inputs(course, preprocessed=None):
+    """Wort-Tokens und Keyword-Treffer eines Kurses für die günstigen Stufen der Kaskade."""
+    row = preprocessed.row(course) if preprocessed is not None else None
+    if row is not None:
+        words = preprocessed.word_tokens(row)
+    else:
+        words = tokenize_words(normalize_text(course_text(course)))
+    return words, bool(analyze_course(course, preprocessed=preprocessed)[0])
+
+def semantic_config(analyzer: SemanticSDGAnalyzer):
+    """Konfiguration der semantischen Analyse (Signatur des Kursspeichers und der Warteschlange)."""
+    return {'model': analyzer.model_name, 'threshold': analyzer.threshold_config,
+            'sdg_descriptions': analyzer.sdg_descriptions, 'prototypes': analyzer.prototype_config()}
+
+def merge_queue_results(store: CanonicalCourseStore, queue: WorkQueue, texts, after: int = 0):
+    """
+    Übernimmt die Ergebnisse der Worker in den Kursspeicher. Bereits vorhandene Treffer
+    bleiben unverändert, daher kann beliebig oft (auch nach einem Neustart) zusammengeführt werden.
+
+    Returns:
+        (letzte gelesene rowid, Anzahl übernommener Texte)
+    """
+    merged = 0
+    for rowid, key, matches, data in queue.results(after):
+        after = rowid
+        entry = store.texts.get(key)
+        if entry is None or 'semantic_matches' in entry:
+            continue
+        embedding = np.frombuffer(data, dtype=np.float32) if data is not None else None
+        store.set_semantic_matches(key, matches, embedding, texts.get(key))
+        merged += 1
+    return after, merged
+
+def distribute_semantic(store: CanonicalCourseStore, semesters, signature: str, queue_file: str = QUEUE_FILE,
+                        spawn_workers: int = 0, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+                        batch_size: int = QUEUE_BATCH_SIZE, metrics_dir: str = 'data/metrics',
+                        poll_seconds: float = 5.0):
+    """
+    Koordinator: verteilt alle noch nicht bewerteten eindeutigen Kurstexte als Aufgaben über
+    die Warteschlange und führt die Ergebnisse der Worker zusammen, bis keine Aufgabe mehr
+    offen ist. Mit spawn_workers werden lokale Worker-Prozesse gestartet; weitere Worker auf
+    anderen Rechnern verbinden sich über dieselbe Datei (`--worker --queue ...`).
+    Fehlgeschlagene Aufgaben bleiben offen und werden anschließend lokal bewertet.
+    """
+    queue = WorkQueue(queue_file, lease_seconds)
+    if queue.reset(signature):
+        print("Warteschlange für die aktuelle Konfiguration neu angelegt")
+
+    pending = {}
+    for _, semester_info, courses in semesters:
+        for course in courses:
+            key = store.register(course, semester_info['semester_name'])
+            if key in pending or 'semantic_matches' in store.texts[key]:
+                continue
+            text = course_text(course)
+            # Beinahe-Duplikate übernehmen die Treffer eines bereits bewerteten Texts
+            if store.semantic_matches(key, course.number, text) is None:
+                pending[key] = text
+
+    # Ergebnisse eines früheren Laufs zuerst übernehmen
+    cursor, merged = merge_queue_results(store, queue, pending)
+    keys = sorted(key for key in pending if 'semantic_matches' not in store.texts[key])
+    tasks = []
+    for start in range(0, len(keys), batch_size):
+        batch = keys[start:start + batch_size]
+        tasks.append((config_signature(batch), [{'key': key, 'text': pending[key]} for key in batch]))
+    added = queue.enqueue(tasks)
+    queue.set_meta('state', 'ready')
+    print(f"Warteschlange: {len(keys)} Kurstexte in {len(tasks)} Aufgaben ({added} neu), "
+          f"{merged} Ergebnisse aus früheren Läufen übernommen")
+
+    workers = []
+    for i in range(spawn_workers):
+        workers.append(subprocess.Popen([
+            sys.executable, __file__, '--worker', '--queue', queue_file, '--lease-seconds', str(lease_seconds),
+            '--metrics-dir', str(Path(metrics_dir) / f"worker_{i + 1}")
+        ]))
+
+    while True:
+        with timer('queue_merge'):
+            cursor, new = merge_queue_results(store, queue, pending, cursor)
+        merged += new
+        queue.requeue_expired()
+        counts = queue.counts()
+        if counts['pending'] == 0 and counts['leased'] == 0:
+            break
+        if workers and all(worker.poll() is not None for worker in workers) and not queue.active_workers():
+            print("⚠️ Alle lokalen Worker beendet, offene Aufgaben werden lokal bewertet")
+            break
+        print(f"  {counts['done']}/{len(tasks)} Aufgaben erledigt, {counts['leased']} in Arbeit, "
+              f"{len(queue.active_workers())} Worker aktiv")
+        time.sleep(poll_seconds)
+
+    for worker in workers:
+        worker.wait()
+    for task_id, error in queue.failures():
+        print(f"⚠️ Aufgabe {task_id[:12]} fehlgeschlagen ({error}), wird lokal bewertet")
+    print(f"✓ {merged} Kurstexte von Workern bewertet")
+    queue.close()
+
+def print_batching(analyzer: SemanticSDGAnalyzer):
+    """Gibt den Arbeitspunkt der adaptiven Batch-Steuerung aus."""
+    batching = analyzer.batch_controller.summary()
+    if batching['batches']:
+        print(f"Batch-Steuerung: {batching['token_budget']} Tokens pro Batch, "
+              f"{batching['texts_per_batch']:.1f} Texte/Batch, {batching['tokens_per_second']:.0f} Tokens/s, "
+              f"{batching['padding_ratio']:.0%} Padding, RSS max. {batching['peak_rss_gb']:.1f} "
+              f"von {batching['memory_limit_gb']:.1f} GB, {batching['shrinks']}x verkleinert")
+
+def run_semantic_worker(queue_file: str = QUEUE_FILE, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> int:
+    """Zustandsloser Worker: bewertet Kurstexte aus der Warteschlange, bis alle Aufgaben erledigt sind."""
+    analyzer = SemanticSDGAnalyzer()
+    queue = WorkQueue(queue_file, lease_seconds)
+
+    def process(payload):
+        results = analyzer.analyze_texts_with_embeddings([item['text'] for item in payload])
+        for item, (matches, embedding) in zip(payload, results):
+            data = embedding.astype(np.float32).tobytes() if embedding is not None else None
+            yield item['key'], matches, data
+
+    done = run_worker(queue, process, signature=config_signature(semantic_config(analyzer)))
+    queue.close()
+    print(f"Worker beendet: {done} Aufgaben bearbeitet")
+    print_batching(analyzer)
+    return done
+
+def analyze_courses_semantic(cascade: bool = False, recall_target: float = 0.95, calibration_size: int = 500,
+                             coordinator: bool = False, queue_file: str = QUEUE_FILE, spawn_workers: int = 0,
+                             lease_seconds: float = DEFAULT_LEASE_SECONDS, metrics_dir: str = 'data/metrics'):
     """
     Führt eine rein semantische Analyse der Kurse durch.
     Speichert die Ergebnisse in einer separaten JSON-Datei.
+
+    Mit cascade=True werden nur Kurse, deren Screening-Score (Keyword-Treffer und
+    lexikalisches Profil) den kalibrierten Schwellenwert erreicht, satzweise mit
+    gbert-large bewertet (siehe semantic_cascade.py).
+
+    Mit coordinator=True bewerten Worker-Prozesse (auch auf anderen Rechnern) die Kurstexte
+    über eine gemeinsame Warteschlange (siehe distribute_semantic und work_queue.py).
     """
+    if cascade and coordinator:
+        raise ValueError("Die Kaskade wird lokal kalibriert und lässt sich nicht verteilen")
     print("="*80)
-    print("Starte semantische Analyse der Kurse")
+    print("Starte semantische Analyse der Kurse" + (" (Kaskade)" if cascade else "")
+          + (" (Koordinator)" if coordinator else ""))
     print("="*80)
-    
+
     # Initialisiere semantischen Analyzer
     analyzer = SemanticSDGAnalyzer()
     data_dir = Path("data")
-    
-    # Finde alle Semester-Verzeichnisse
-    semester_dirs = [d for d in os.listdir(data_dir) 
-                    if os.path.isdir(data_dir / d) 
-                    and d.startswith('semester_')]
-    
+    config = semantic_config(analyzer)
+
+    # Kanonische Kurstexte: wiederkehrende Kurse werden nur einmal eingebettet
+    cascade_runner = None
+    if cascade:
+        cascade_runner = SemanticCascade(analyzer, recall_target, calibration_size)
+        store = CanonicalCourseStore.load('semantic_cascade')
+        store.check_signature({**config, 'cascade': cascade_runner.config()})
+    else:
+        store = CanonicalCourseStore.load('semantic')
+        store.check_signature(config)
+
+    # Wort-Tokens, Wortanzahl und BERT-Token-IDs aus der Vorverarbeitung (falls aktuell)
+    preprocessed = PreprocessedCourses.load(data_dir=str(data_dir))
+    token_source = preprocessed if preprocessed is not None and preprocessed.has_token_ids else None
+
+    semesters = load_semesters(data_dir)
+
+    if coordinator:
+        distribute_semantic(store, semesters, config_signature(config), queue_file, spawn_workers,
+                            lease_seconds, metrics_dir=metrics_dir)
+
+    if cascade_runner is not None:
+        # Kalibrierung auf den noch nicht bewerteten eindeutigen Kurstexten
+        pending = {}
+        for _, semester_info, courses in semesters:
+            for course in courses:
+                key = store.register(course, semester_info['semester_name'])
+                if key not in pending and store.texts[key].get('semantic_matches') is None:
+                    pending[key] = course
+        keys = list(pending)
+        samples = [(course_text(pending[key]), *screening_inputs(pending[key], preprocessed)) for key in keys]
+        for i, (semantic_matches, embedding) in cascade_runner.calibrate(samples).items():
+            store.set_semantic_matches(keys[i], semantic_matches, embedding, samples[i][0])
+
     semantic_results = {}
-    
-    for semester_dir in sorted(semester_dirs, reverse=True):
+
+    for semester_dir, semester_info, courses in semesters:
         print(f"\nAnalysiere {semester_dir}...")
-        
-        # Lade Semester-Info
-        with open(data_dir / semester_dir / 'semester_info.json', 'r', encoding='utf-8') as f:
-            semester_info = json.load(f)
-        
-        # Finde neueste Kursdatei
-        course_files = [f for f in os.listdir(data_dir / semester_dir) 
-                       if f.startswith('courses_') and f.endswith('.json')]
-        if not course_files:
-            continue
-            
-        latest_course_file = max(course_files)
-        
-        # Lade Kursdaten
-        with open(data_dir / semester_dir / latest_course_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            courses = data['courses']
-        
-        # Analysiere jeden Kurs semantisch
-        semester_results = []
+
+        # Kurse zuordnen; fehlende eindeutige Texte werden danach gemeinsam bewertet
+        course_keys = []
+        pending = {}
         for course in courses:
-            course_text = ' '.join([
-                course.get('title', ''),
-                course.get('subtitle', ''),
-                course.get('objectives_and_content', '')
-            ])
-            
-            semantic_matches = analyzer.analyze_text(course_text)
+            text = course_text(course)
+            row = token_source.row(course) if token_source is not None else None
+            key = store.register(course, semester_info['semester_name'],
+                                 token_source.text_hash(row) if row is not None else None)
+            course_keys.append(key)
+            if key not in pending and store.semantic_matches(key, course.number, text) is None:
+                pending[key] = (course, text, row)
+
+        if cascade_runner is not None:
+            for key, (course, text, _) in pending.items():
+                words, keyword_hit = screening_inputs(course, preprocessed)
+                semantic_matches, embedding = cascade_runner.analyze(text, words, keyword_hit)
+                store.set_semantic_matches(key, semantic_matches, embedding, text)
+        elif pending:
+            # Adaptive Batches über alle fehlenden Texte des Semesters
+            keys = list(pending)
+            rows = [pending[key][2] for key in keys]
+            texts = [pending[key][1] for key in keys]
+            results = analyzer.analyze_texts_with_embeddings(
+                texts,
+                word_counts=[token_source.word_count(row) if row is not None else None for row in rows],
+                token_ids=[token_source.bert_token_ids(row) if row is not None else None for row in rows])
+            for key, text, (semantic_matches, embedding) in zip(keys, texts, results):
+                store.set_semantic_matches(key, semantic_matches, embedding, text)
+
+        semester_results = []
+        for course, key in zip(courses, course_keys):
+            semantic_matches = store.texts[key]['semantic_matches']
             if semantic_matches:
                 course_result = {
                     'course_info': {
                         'title': course.get('title', ''),
                         'type': course.get('type', ''),
-                        'ects': course.get('ects', None),
+                        'ects': course.ects,
                         'url': course.get('url', '')
                     },
                     'semantic_matches': semantic_matches
                 }
                 semester_results.append(course_result)
-        
+
         semantic_results[semester_info['semester_name']] = {
             'semester_info': semester_info,
             'courses': semester_results
         }
-        
+
         print(f"  ✓ {len(semester_results)} Kurse analysiert")
-    
+
     # Speichere Gesamtergebnisse
     output = {
         'semantic_analysis': semantic_results,
         'analysis_timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
         'model_info': {
             'name': analyzer.model_name,
-            'threshold': analyzer.threshold_config
+            'threshold': analyzer.threshold_config,
+            'prototypes': analyzer.prototype_reduction,
+            'mode': 'cascade' if cascade else ('distributed' if coordinator else 'full'),
+            'batching': analyzer.batch_controller.summary()
         }
     }
-    
+
     output_file = data_dir / 'semantic_analysis.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
+    with timer('serialize'), open(output_file, 'w', encoding='utf-8') as f:
         json.dump(output, f, ensure_ascii=False, indent=2)
-    
+
+    with timer('serialize'):
+        store.save()
+    # Ähnlichkeitssuche über die Kurs-Embeddings, im Speicherformat des bisherigen Index
+    with timer('index_build'):
+        build_course_index(store, codec=index_codec())
+    print_batching(analyzer)
+    dedup_summary = store.summary()
+    print(f"\nKanonische Kurstexte: {dedup_summary['unique_texts']} eindeutig bei {dedup_summary['course_copies']} Kurskopien")
+    print(f"Wiederverwendet: {dedup_summary['semantic_reused']} identisch, {dedup_summary['near_duplicates']} Beinahe-Duplikate")
+    if cascade_runner is not None:
+        cascade_runner.save_report()
+
     print("\nAnalyse abgeschlossen!")
     print(f"Ergebnisse wurden in {output_file} gespeichert.")
     print("="*80)
 
+def main(args):
+    if args.worker:
+        run_semantic_worker(args.queue, args.lease_seconds)
+        return
+    analyze_courses_semantic(cascade=args.cascade, recall_target=args.recall_target,
+                             calibration_size=args.calibration_size, coordinator=args.coordinator,
+                             queue_file=args.queue, spawn_workers=args.spawn_workers,
+                             lease_seconds=args.lease_seconds, metrics_dir=args.metrics_dir)
+
 if __name__ == "__main__":
-    analyze_courses_semantic() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Semantische SDG-Analyse der Kurse")
+    parser.add_argument('--cascade', action='store_true',
+                        help="Nur Kandidaten aus Keyword- und lexikalischer Vorauswahl satzweise bewerten")
+    parser.add_argument('--recall-target', type=float, default=0.95,
+                        help="Ziel-Recall der Vorauswahl gegenüber der vollen Analyse")
+    parser.add_argument('--calibration-size', type=int, default=500,
+                        help="Anzahl vollständig bewerteter Kurstexte zur Kalibrierung")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--coordinator', action='store_true',
+                      help="Kurstexte über die Warteschlange an Worker verteilen und Ergebnisse zusammenführen")
+    mode.add_argument('--worker', action='store_true',
+                      help="Als zustandsloser Worker Aufgaben aus der Warteschlange bearbeiten")
+    parser.add_argument('--queue', default=QUEUE_FILE,
+                        help="SQLite-Datei der Warteschlange (auf gemeinsamem Speicher für mehrere Rechner)")
+    parser.add_argument('--spawn-workers', type=int, default=0,
+                        help="Anzahl lokal gestarteter Worker-Prozesse (nur mit --coordinator)")
+    parser.add_argument('--lease-seconds', type=float, default=DEFAULT_LEASE_SECONDS,
+                        help="Lease-Dauer einer Aufgabe; danach wird sie neu vergeben")
+    run_instrumented('analyze_semantic', main, parser=parser)
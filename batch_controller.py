@@ -0,0 +1,202 @@
+"""
+Adaptive Batch-Steuerung für den Encoder.
+
+Batches werden nicht nach Anzahl Texten, sondern nach einem Token-Budget gebildet: ein Batch
+kostet Speicher und Rechenzeit proportional zu (Anzahl Texte x längster Text), also zu den
+Tokens nach dem Padding. Texte werden nach Länge sortiert gepackt, damit kurze Titel nicht auf
+die Länge langer Beschreibungen aufgefüllt werden.
+
+Speicher zählt relativ zu einem Basis-RSS, der nach dem Laden des Modells gemessen wird: die
+Gewichte belegen ihn unabhängig vom Budget, verfügbar für Batches ist nur der Rest bis zum
+Speicherlimit. Aus dem RSS-Zuwachs über der Basis schätzt die Steuerung die Bytes pro
+aufgefülltem Token und begrenzt damit das Budget schon vor dem Bilden jedes Batches, sodass ein
+Batch MEMORY_HIGH_WATER des verfügbaren Speichers voraussichtlich nicht überschreitet.
+
+Nach jedem Batch misst die Steuerung RSS des Prozesses und Laufzeit:
+- Zuwachs über MEMORY_HIGH_WATER des verfügbaren Speichers: Budget halbieren und höchstens
+  wieder bis zum letzten Budget unterhalb dieses Werts wachsen
+- sonst, solange der Durchsatz (echte Tokens pro Sekunde) beim größeren Budget um mindestens
+  MIN_GAIN steigt und der Zuwachs unter MEMORY_LOW_WATER liegt: Budget um GROWTH_FACTOR erhöhen
+- bringt Wachstum PATIENCE-mal in Folge keinen Gewinn, bleibt das Budget beim besten
+  gemessenen Wert (Arbeitspunkt)
+
+Das Speicherlimit ist das cgroup-Limit (Container, Slurm) oder der physische Speicher.
+"""
+import os
+import resource
+from typing import Dict, Iterator, List, Optional, Sequence
+
+MIN_TOKEN_BUDGET = 512
+MAX_TOKEN_BUDGET = 65536
+INITIAL_TOKEN_BUDGET = 4096
+GROWTH_FACTOR = 1.25
+MIN_GAIN = 0.05            # Mindestens 5 % mehr Durchsatz, damit Wachstum sich lohnt
+PATIENCE = 2
+MEMORY_HIGH_WATER = 0.85   # Anteil des verfügbaren Speichers, ab dem verkleinert wird
+MEMORY_LOW_WATER = 0.70    # Anteil des verfügbaren Speichers, bis zu dem noch vergrößert wird
+SMOOTHING = 0.5            # Gewicht der neuesten Messung im gleitenden Durchsatz
+
+def current_rss() -> int:
+    """Aktueller RSS des Prozesses in Bytes (Linux: /proc, sonst Spitzenwert aus getrusage)."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss ist unter Linux in KB, unter macOS in Bytes
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+def memory_limit() -> int:
+    """Speicherlimit in Bytes: cgroup-Limit, falls gesetzt, sonst physischer Speicher."""
+    physical = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path, 'r') as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        if value.isdigit() and int(value) < physical:
+            return int(value)
+    return physical
+
+class AdaptiveBatchController:
+    """
+    Wählt das Token-Budget pro Batch anhand von RSS und Durchsatz.
+    Nach dem Laden des Modells anlegen: der RSS zu diesem Zeitpunkt ist die Basis, gegen
+    die der Speicherbedarf der Batches gemessen wird.
+    """
+
+    def __init__(self, token_budget: int = INITIAL_TOKEN_BUDGET, memory_limit_bytes: Optional[int] = None,
+                 min_budget: int = MIN_TOKEN_BUDGET, max_budget: int = MAX_TOKEN_BUDGET, verbose: bool = True,
+                 baseline_rss: Optional[int] = None):
+        self.min_budget = min_budget
+        self.max_budget = max_budget
+        self.token_budget = max(min_budget, min(token_budget, max_budget))
+        self.memory_limit = memory_limit_bytes or memory_limit()
+        self.baseline_rss = current_rss() if baseline_rss is None else baseline_rss
+        self.bytes_per_token: Optional[float] = None  # Geschätzter RSS-Zuwachs pro aufgefülltem Token
+        self.estimate_tokens = 0                      # Aufgefüllte Tokens des Batches der Schätzung
+        self.verbose = verbose
+        self.throughput: Dict[int, float] = {}  # Budget -> geglätteter Durchsatz (Tokens/s)
+        self.ceiling = max_budget                # Höchstes Budget ohne Speicherdruck
+        self.stalls = 0
+        self.settled = False
+        self.stats = {'batches': 0, 'texts': 0, 'tokens': 0, 'padded_tokens': 0, 'seconds': 0.0,
+                      'shrinks': 0, 'peak_rss': 0}
+
+    def batches(self, lengths: Sequence[int]) -> Iterator[List[int]]:
+        """
+        Packt Texte nach Länge sortiert in Batches innerhalb des aktuellen Token-Budgets.
+        Das Budget wird vor jedem Batch neu gelesen, Anpassungen wirken also sofort.
+
+        Yields:
+            Indizes der Texte eines Batches
+        """
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+        start = 0
+        while start < len(order):
+            # Aufsteigend: die ersten (kurzen) Batches liefern schnell Messungen, bevor
+            # lange Texte mit großem Speicherbedarf an der Reihe sind
+            budget = min(self.token_budget, self.memory_budget())
+            end = start + 1
+            longest = max(lengths[order[start]], 1)
+            while end < len(order):
+                longest_next = max(longest, lengths[order[end]])
+                if (end - start + 1) * longest_next > budget:
+                    break
+                longest = longest_next
+                end += 1
+            yield order[start:end]
+            start = end
+
+    def available_memory(self) -> int:
+        """Speicher, der neben dem Basis-RSS für Batches bleibt."""
+        return max(self.memory_limit - self.baseline_rss, 0)
+
+    def memory_budget(self) -> int:
+        """
+        Größtes Budget, dessen geschätzter Speicherbedarf unter MEMORY_HIGH_WATER des
+        verfügbaren Speichers bleibt (ohne Schätzung: max_budget).
+        """
+        if not self.bytes_per_token:
+            return self.max_budget
+        budget = int(MEMORY_HIGH_WATER * self.available_memory() / self.bytes_per_token)
+        return max(self.min_budget, min(budget, self.max_budget))
+
+    def record(self, num_texts: int, tokens: int, padded_tokens: int, seconds: float,
+               rss: Optional[int] = None):
+        """Misst einen Batch (RSS danach, ohne Angabe gemessen) und passt das Budget an."""
+        if rss is None:
+            rss = current_rss()
+        growth = max(rss - self.baseline_rss, 0)
+        self.stats['batches'] += 1
+        self.stats['texts'] += num_texts
+        self.stats['tokens'] += tokens
+        self.stats['padded_tokens'] += padded_tokens
+        self.stats['seconds'] += seconds
+        self.stats['peak_rss'] = max(self.stats['peak_rss'], rss)
+
+        # Schätzung aus dem größten bisherigen Batch: bei kleineren Batches enthält der Zuwachs
+        # vor allem vom Allokator behaltenen Speicher früherer Batches
+        if padded_tokens >= self.estimate_tokens and padded_tokens > 0:
+            self.estimate_tokens = padded_tokens
+            self.bytes_per_token = growth / padded_tokens
+
+        if growth > MEMORY_HIGH_WATER * self.available_memory():
+            self.ceiling = max(self.min_budget, int(min(self.ceiling, self.token_budget) / GROWTH_FACTOR))
+            self._set_budget(self.token_budget // 2, f"Speicherdruck (RSS {rss / 2**30:.1f} GB, "
+                                                     f"Basis {self.baseline_rss / 2**30:.1f} GB)")
+            self.stats['shrinks'] += 1
+            self.settled = False
+            self.stalls = 0
+            return
+
+        # Der Durchsatz eines Batches hängt von der Auslastung (Padding) ab; nur volle Batches vergleichen
+        if seconds <= 0 or padded_tokens < 0.5 * self.token_budget:
+            return
+        measured = tokens / seconds
+        previous = self.throughput.get(self.token_budget)
+        self.throughput[self.token_budget] = measured if previous is None \
+            else SMOOTHING * measured + (1 - SMOOTHING) * previous
+        if self.settled:
+            return
+
+        smaller = [budget for budget in self.throughput if budget < self.token_budget]
+        if smaller and self.throughput[self.token_budget] < (1 + MIN_GAIN) * self.throughput[max(smaller)]:
+            self.stalls += 1
+        else:
+            self.stalls = 0
+        if self.stalls >= PATIENCE or self.token_budget >= min(self.ceiling, self.max_budget, self.memory_budget()):
+            safe = [budget for budget in self.throughput if budget <= self.ceiling] or [self.min_budget]
+            best = max(safe, key=lambda budget: self.throughput.get(budget, 0.0))
+            self.settled = True
+            self._set_budget(best, "Arbeitspunkt erreicht")
+        elif growth < MEMORY_LOW_WATER * self.available_memory():
+            self._set_budget(int(self.token_budget * GROWTH_FACTOR), "Durchsatz steigt")
+
+    def _set_budget(self, budget: int, reason: str):
+        budget = max(self.min_budget, min(budget, self.ceiling, self.max_budget, self.memory_budget()))
+        changed = budget != self.token_budget
+        self.token_budget = budget
+        if self.verbose and (changed or self.settled):
+            throughput = self.throughput.get(budget)
+            print(f"Batch-Steuerung: {budget} Tokens pro Batch ({reason}"
+                  + (f", {throughput:.0f} Tokens/s" if throughput else "") + ")")
+
+    def summary(self) -> Dict:
+        """Arbeitspunkt und Kennzahlen für Log und Metriken."""
+        stats = self.stats
+        return {
+            'token_budget': self.token_budget,
+            'settled': self.settled,
+            'batches': stats['batches'],
+            'texts_per_batch': stats['texts'] / stats['batches'] if stats['batches'] else 0.0,
+            'tokens_per_second': stats['tokens'] / stats['seconds'] if stats['seconds'] else 0.0,
+            'padding_ratio': 1 - stats['tokens'] / stats['padded_tokens'] if stats['padded_tokens'] else 0.0,
+            'shrinks': stats['shrinks'],
+            'peak_rss_gb': stats['peak_rss'] / 2**30,
+            'baseline_rss_gb': self.baseline_rss / 2**30,
+            'bytes_per_token': self.bytes_per_token or 0.0,
+            'memory_budget': self.memory_budget(),
+            'memory_limit_gb': self.memory_limit / 2**30
+        }
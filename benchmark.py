@@ -0,0 +1,315 @@
+"""
+Reproduzierbare Benchmarks der Pipeline auf einem synthetischen Korpus.
+
+    python benchmark.py --scale 10000
+    python benchmark.py --scale 10000 --baseline benchmark_results/<datei>.json
+
+Die Ergebnisse werden als JSON in benchmark_results/ gespeichert. Mit --baseline
+werden sie gegen einen früheren Lauf verglichen; ist ein Benchmark langsamer als
+die Schwelle erlaubt, endet das Skript mit Exit-Code 1.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import synthetic_corpus
+
+RESULTS_DIR = 'benchmark_results'
+DEFAULT_THRESHOLD = 0.15  # 15% langsamer als die Baseline gilt als Regression
+
+# Registrierte Benchmarks: Name -> (Setup-Funktion, Wiederholungen, Schwelle)
+BENCHMARKS = {}
+
+def benchmark(name: str, repeats: int = 5, threshold: float = DEFAULT_THRESHOLD):
+    """
+    Registriert einen Benchmark. Die Setup-Funktion erhält den Kontext und gibt
+    (zu messende Funktion, Anzahl verarbeiteter Einheiten) zurück.
+    """
+    def decorator(setup):
+        BENCHMARKS[name] = (setup, repeats, threshold)
+        return setup
+    return decorator
+
+def _latest_course_file(semester_dir: str) -> str:
+    course_files = [f for f in os.listdir(semester_dir) if f.startswith('courses_') and f.endswith('.json')]
+    return os.path.join(semester_dir, max(course_files))
+
+def _load_courses(ctx: Dict) -> List:
+    if 'courses' not in ctx:
+        from course_record import load_course_records
+        courses, pool = [], {}
+        for semester_dir in ctx['semester_dirs']:
+            courses.extend(load_course_records(_latest_course_file(semester_dir), pool))
+        ctx['courses'] = courses
+    return ctx['courses']
+
+def _course_text(course) -> str:
+    from course_dedup import course_text
+    return course_text(course)
+
+@benchmark('link_extraction')
+def bench_link_extraction(ctx):
+    from extract_course_links import parse_course_links
+    with open(os.path.join(ctx['semester_dirs'][0], 'course_links.json'), 'r', encoding='utf-8') as f:
+        urls = json.load(f)
+    page = synthetic_corpus.render_listing_page(urls)
+    return lambda: parse_course_links(page, verbose=False), len(urls)
+
+@benchmark('course_page_parsing', repeats=3)
+def bench_course_page_parsing(ctx):
+    from extract_course_info import parse_course_page
+    sample = _load_courses(ctx)[:ctx['page_sample']]
+    pages = [(synthetic_corpus.render_course_page(course), course['url']) for course in sample]
+    return lambda: [parse_course_page(page, url) for page, url in pages], len(pages)
+
+@benchmark('find_sdgs_in_text')
+def bench_find_sdgs_in_text(ctx):
+    from analyze_sdgs import find_sdgs_in_text
+    texts = [_course_text(course) for course in _load_courses(ctx)]
+    return lambda: [find_sdgs_in_text(text) for text in texts], len(texts)
+
+@benchmark('keyword_fuzzy_resolve', repeats=3)
+def bench_keyword_fuzzy_resolve(ctx):
+    """Unscharfe Auflösung (SymSpell-Index) aller verschiedenen Tokens des Korpus, ohne Cache."""
+    from course_preprocessing import normalize_text, tokenize_words
+    from keyword_lexicon import KeywordLexicon
+    lexicon = KeywordLexicon()
+    tokens = sorted({token for course in _load_courses(ctx)
+                     for token in tokenize_words(normalize_text(_course_text(course)))})
+    return lambda: [lexicon.resolve_fuzzy(token) for token in tokens], len(tokens)
+
+@benchmark('analyze_semester_data', repeats=3)
+def bench_analyze_semester_data(ctx):
+    from analyze_sdgs import analyze_semester_data
+    semester_dir = ctx['semester_dirs'][0]
+    with open(_latest_course_file(semester_dir), 'r', encoding='utf-8') as f:
+        num_courses = len(json.load(f)['courses'])
+    return lambda: analyze_semester_data(semester_dir), num_courses
+
+@benchmark('analyze_semester_data_preprocessed', repeats=3)
+def bench_analyze_semester_data_preprocessed(ctx):
+    """Keyword-Analyse eines Semesters mit vorverarbeiteten Texten (ohne BERT-Token-IDs)."""
+    from analyze_sdgs import analyze_semester_data
+    from course_preprocessing import preprocess_courses
+    preprocessed = preprocess_courses(tokenize=False)
+    semester_dir = ctx['semester_dirs'][0]
+    with open(_latest_course_file(semester_dir), 'r', encoding='utf-8') as f:
+        num_courses = len(json.load(f)['courses'])
+    return lambda: analyze_semester_data(semester_dir, preprocessed=preprocessed), num_courses
+
+@benchmark('semantic_similarity', repeats=3)
+def bench_semantic_similarity(ctx):
+    """Ähnlichkeitsberechnung und Schwellenlogik von analyze_text mit vorberechneten Embeddings."""
+    import numpy as np
+    from sdg_targets import SDGPrototypes, prototype_texts
+    from semantic_analysis import SemanticSDGAnalyzer
+
+    texts = [_course_text(course) for course in _load_courses(ctx)]
+    rng = np.random.default_rng(ctx['seed'])
+    text_embeddings = rng.standard_normal((len(texts), 1024)).astype(np.float32)
+    embedding_by_text = {text: text_embeddings[i] for i, text in enumerate(texts)}
+
+    # Analyzer ohne Modell: _get_embedding liefert die vorberechneten Vektoren
+    analyzer = object.__new__(SemanticSDGAnalyzer)
+    analyzer.threshold_config = {'base_threshold': 0.7, 'high_confidence': 0.85, 'min_word_count': 50}
+    # Prototyp-Matrix wie im Analyzer: Zielbeschreibung und Unterziele pro SDG
+    prototypes = prototype_texts({f"SDG {i}": f"SDG {i}" for i in range(1, 18)})
+    analyzer.prototypes = SDGPrototypes([sdg for sdg, _, _ in prototypes], [target for _, target, _ in prototypes],
+                                        rng.standard_normal((len(prototypes), 1024)).astype(np.float32))
+    analyzer._get_embedding = lambda text, token_ids=None: embedding_by_text[text]
+    return lambda: [analyzer.analyze_text(text) for text in texts], len(texts)
+
+@benchmark('semantic_embedding', repeats=1)
+def bench_semantic_embedding(ctx):
+    """Vollständige semantische Analyse mit gbert-large (nur mit --with-model)."""
+    if not ctx['with_model']:
+        return None
+    from semantic_analysis import SemanticSDGAnalyzer
+    analyzer = SemanticSDGAnalyzer()
+    texts = [_course_text(course) for course in _load_courses(ctx)[:ctx['model_sample']]]
+    return lambda: [analyzer.analyze_text(text) for text in texts], len(texts)
+
+def _keyword_data(ctx):
+    if 'keyword_data' not in ctx:
+        from analyze_sdgs import analyze_all_semesters
+        ctx['keyword_data'] = analyze_all_semesters()
+    return ctx['keyword_data']
+
+@benchmark('analyze_all_semesters', repeats=1)
+def bench_analyze_all_semesters(ctx):
+    from analyze_sdgs import analyze_all_semesters
+    return analyze_all_semesters, len(_load_courses(ctx))
+
+@benchmark('sdg_tables', repeats=3)
+def bench_sdg_tables(ctx):
+    from sdg_analysis import create_course_keyword_table, create_metrics_table
+    keyword_data = _keyword_data(ctx)
+
+    def run():
+        create_metrics_table(keyword_data)
+        create_course_keyword_table(keyword_data)
+    return run, len(_load_courses(ctx))
+
+@benchmark('sdg_plots', repeats=1)
+def bench_sdg_plots(ctx):
+    """Aggregation und Rendering aller Grafiken (ohne Cache, seriell)."""
+    from sdg_analysis import build_plot_jobs
+    keyword_data = _keyword_data(ctx)
+
+    def run():
+        for job in build_plot_jobs(keyword_data):
+            fig = job.renderer(job.data, **job.params)
+            if fig is not None:
+                fig.savefig(io.BytesIO(), format='png', dpi=300, bbox_inches='tight')
+    return run, len(keyword_data['semester_analyses']) + 1
+
+def run_benchmark(name: str, ctx: Dict, repeats: Optional[int] = None) -> Dict:
+    setup, default_repeats, threshold = BENCHMARKS[name]
+    try:
+        # Ausgaben der Pipeline-Funktionen unterdrücken
+        with contextlib.redirect_stdout(io.StringIO()):
+            prepared = setup(ctx)
+    except ImportError as e:
+        return {'status': 'übersprungen', 'reason': f"Abhängigkeit fehlt: {str(e)}"}
+    if prepared is None:
+        return {'status': 'übersprungen', 'reason': 'nicht aktiviert'}
+
+    func, items = prepared
+    times = []
+    for _ in range(repeats or default_repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start_time = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start_time)
+
+    median = statistics.median(times)
+    return {
+        'status': 'ok',
+        'items': items,
+        'repeats': len(times),
+        'min_seconds': min(times),
+        'median_seconds': median,
+        'items_per_second': items / median if median > 0 else None,
+        'threshold': threshold
+    }
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def compare_with_baseline(results: Dict, baseline: Dict, threshold: Optional[float] = None) -> List[Dict]:
+    """
+    Vergleicht die Mediane mit einem früheren Lauf gleicher Größe.
+
+    Returns:
+        Liste der Regressionen (Benchmark, Baseline, aktuell, relative Änderung)
+    """
+    regressions = []
+    for name, result in results['benchmarks'].items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if result.get('status') != 'ok' or not base or base.get('status') != 'ok':
+            continue
+        # Laufzeit pro Einheit vergleichen, falls sich die Korpusgröße unterscheidet
+        current = result['median_seconds'] / result['items']
+        previous = base['median_seconds'] / base['items']
+        change = (current - previous) / previous if previous > 0 else 0.0
+        result['change_vs_baseline'] = change
+        allowed = threshold if threshold is not None else result['threshold']
+        if change > allowed:
+            regressions.append({'benchmark': name, 'baseline': previous, 'current': current, 'change': change})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks der SDG-Analyse-Pipeline")
+    parser.add_argument('--scale', type=int, default=1000, help="Anzahl Kurse im synthetischen Korpus")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--english-share', type=float, default=0.3)
+    parser.add_argument('--cases', nargs='+', choices=sorted(BENCHMARKS), help="Nur diese Benchmarks ausführen")
+    parser.add_argument('--repeats', type=int, help="Wiederholungen pro Benchmark überschreiben")
+    parser.add_argument('--page-sample', type=int, default=2000, help="Anzahl Kursseiten für den Parser-Benchmark")
+    parser.add_argument('--with-model', action='store_true', help="Auch gbert-large-Embeddings messen")
+    parser.add_argument('--model-sample', type=int, default=50)
+    parser.add_argument('--baseline', help="Ergebnisdatei eines früheren Laufs zum Vergleich")
+    parser.add_argument('--threshold', type=float, help="Erlaubte Verlangsamung (z.B. 0.1 = 10%%)")
+    parser.add_argument('--output', help="Pfad der Ergebnisdatei")
+    args = parser.parse_args()
+
+    original_dir = os.getcwd()
+    commit = _git_commit()
+
+    with tempfile.TemporaryDirectory(prefix='sdg_bench_') as work_dir:
+        print(f"Erzeuge synthetisches Korpus mit {args.scale} Kursen...")
+        data_dir = os.path.join(work_dir, 'data')
+        synthetic_corpus.generate_corpus(data_dir, args.scale, english_share=args.english_share, seed=args.seed)
+
+        ctx = {
+            'seed': args.seed,
+            'semester_dirs': sorted(os.path.join(data_dir, d) for d in os.listdir(data_dir) if d.startswith('semester_')),
+            'page_sample': args.page_sample,
+            'with_model': args.with_model,
+            'model_sample': args.model_sample
+        }
+
+        # Die Pipeline-Funktionen arbeiten relativ zu data/ und plots/
+        os.chdir(work_dir)
+        try:
+            results = {}
+            for name in (args.cases or list(BENCHMARKS)):
+                print(f"Benchmark: {name}...", end=' ', flush=True)
+                results[name] = run_benchmark(name, ctx, args.repeats)
+                if results[name]['status'] == 'ok':
+                    print(f"{results[name]['median_seconds']:.3f}s ({results[name]['items_per_second']:.0f}/s)")
+                else:
+                    print(f"{results[name]['status']} ({results[name]['reason']})")
+        finally:
+            os.chdir(original_dir)
+
+    output = {
+        'commit': commit,
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'scale': args.scale,
+        'seed': args.seed,
+        'english_share': args.english_share,
+        'environment': {
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'benchmarks': results
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(output, baseline, args.threshold)
+        output['baseline'] = {'file': args.baseline, 'commit': baseline.get('commit'), 'regressions': regressions}
+
+    output_file = args.output or os.path.join(
+        RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit}_{args.scale}.json")
+    os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"\nErgebnisse gespeichert in: {output_file}")
+
+    if regressions:
+        print("\n❌ Regressionen gegenüber der Baseline:")
+        for regression in regressions:
+            print(f"   {regression['benchmark']}: {regression['change']*100:+.1f}%")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
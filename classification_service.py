@@ -0,0 +1,325 @@
+"""
+Lokaler Klassifikationsdienst für einzelne Texte (z. B. Entwürfe von Modulbeschreibungen).
+
+Der Dienst lädt SemanticSDGAnalyzer (Modell und SDG-Prototypen) einmal beim Start und hält
+ihn warm. Gleichzeitige Anfragen werden zu Micro-Batches gesammelt: ab der ersten wartenden
+Anfrage höchstens window_ms Millisekunden bzw. bis max_batch_size Texte zusammenkommen.
+Jeder Batch wird in einem eigenen Thread in einem Durchlauf durch den Encoder bewertet;
+Anfragen, die währenddessen eintreffen, bilden den nächsten Batch.
+
+HTTP-Schnittstelle (nur stdlib/asyncio, ohne Web-Framework):
+    POST /classify   {"text": "..."} -> Keyword- (davon unscharfe) und semantische SDG-Treffer
+    GET  /metrics    Latenz (p50/p99), Durchsatz und Batch-Größen im Prometheus-Textformat
+    GET  /stats      dieselben Kennzahlen als JSON (inkl. adaptiver Batch-Steuerung)
+    GET  /health     Lebenszeichen
+
+    python classification_service.py --port 8765 --window-ms 10
+    curl -s -X POST localhost:8765/classify -d '{"text": "Klimawandel und erneuerbare Energien"}'
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from analyze_sdgs import COUNT_FUZZY, find_sdgs_in_text_flagged, merge_findings
+from instrumentation import count, run_instrumented, timer
+from keyword_lexicon import default_lexicon
+from sdg_targets import target_text
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_WINDOW_MS = 10.0
+MAX_BATCH_SIZE = 64
+MAX_BODY_BYTES = 1 << 20      # 1 MB pro Anfrage
+LATENCY_SAMPLES = 10000       # Anzahl letzter Anfragen für die Perzentile
+THROUGHPUT_WINDOW = 60.0      # Sekunden für den gleitenden Durchsatz
+
+HTTP_STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+class ServiceMetrics:
+    """Latenz, Durchsatz und Batch-Größen des Dienstes."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.completed = deque()  # Zeitpunkte der Antworten im Durchsatz-Fenster
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_texts = 0
+        self.max_batch = 0
+        self.batch_seconds = 0.0
+
+    def record_request(self, seconds: float, error: bool = False):
+        now = time.time()
+        self.requests += 1
+        self.errors += int(error)
+        self.latencies.append(seconds)
+        self.completed.append(now)
+        while self.completed and self.completed[0] < now - THROUGHPUT_WINDOW:
+            self.completed.popleft()
+
+    def record_batch(self, size: int, seconds: float):
+        self.batches += 1
+        self.batched_texts += size
+        self.max_batch = max(self.max_batch, size)
+        self.batch_seconds += seconds
+
+    def summary(self) -> Dict:
+        now = time.time()
+        while self.completed and self.completed[0] < now - THROUGHPUT_WINDOW:
+            self.completed.popleft()
+        window = min(THROUGHPUT_WINDOW, max(now - self.started, 1e-9))
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        p50, p99 = np.percentile(latencies, [50, 99])
+        return {
+            'uptime_seconds': now - self.started,
+            'requests': self.requests,
+            'errors': self.errors,
+            'latency_p50_ms': float(p50) * 1000,
+            'latency_p99_ms': float(p99) * 1000,
+            'latency_max_ms': float(latencies.max()) * 1000,
+            'throughput_per_second': len(self.completed) / window,
+            'batches': self.batches,
+            'mean_batch_size': self.batched_texts / self.batches if self.batches else 0.0,
+            'max_batch_size': self.max_batch,
+            'batch_seconds': self.batch_seconds
+        }
+
+    def prometheus(self) -> str:
+        """Kennzahlen im Prometheus-Textformat (wie instrumentation.export_prometheus)."""
+        stats = self.summary()
+        lines = [
+            '# HELP sdg_service_latency_seconds Antwortzeit pro Anfrage (letzte Anfragen)',
+            '# TYPE sdg_service_latency_seconds summary',
+            f'sdg_service_latency_seconds{{quantile="0.5"}} {stats["latency_p50_ms"] / 1000:.6f}',
+            f'sdg_service_latency_seconds{{quantile="0.99"}} {stats["latency_p99_ms"] / 1000:.6f}',
+            f'sdg_service_latency_seconds_count {stats["requests"]}',
+            '# HELP sdg_service_requests_per_second Beantwortete Anfragen pro Sekunde (gleitendes Fenster)',
+            '# TYPE sdg_service_requests_per_second gauge',
+            f'sdg_service_requests_per_second {stats["throughput_per_second"]:.3f}',
+            '# HELP sdg_service_errors_total Fehlgeschlagene Anfragen',
+            '# TYPE sdg_service_errors_total counter',
+            f'sdg_service_errors_total {stats["errors"]}',
+            '# HELP sdg_service_batches_total Bewertete Micro-Batches',
+            '# TYPE sdg_service_batches_total counter',
+            f'sdg_service_batches_total {stats["batches"]}',
+            '# HELP sdg_service_batch_size_mean Mittlere Anzahl Texte pro Micro-Batch',
+            '# TYPE sdg_service_batch_size_mean gauge',
+            f'sdg_service_batch_size_mean {stats["mean_batch_size"]:.3f}',
+            '# HELP sdg_service_batch_seconds_total Rechenzeit aller Micro-Batches',
+            '# TYPE sdg_service_batch_seconds_total counter',
+            f'sdg_service_batch_seconds_total {stats["batch_seconds"]:.6f}'
+        ]
+        return '\n'.join(lines) + '\n'
+
+class MicroBatcher:
+    """Sammelt Texte gleichzeitiger Anfragen und bewertet sie gemeinsam in einem Thread."""
+
+    def __init__(self, classify_batch: Callable[[List[str]], List[Dict]], metrics: ServiceMetrics,
+                 window_ms: float = DEFAULT_WINDOW_MS, max_batch_size: int = MAX_BATCH_SIZE):
+        self.classify_batch = classify_batch
+        self.metrics = metrics
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.queue: Optional[asyncio.Queue] = None
+        # Ein Thread: das Modell rechnet immer nur einen Batch, die Event-Loop bleibt frei
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='classify')
+
+    async def classify(self, text: str) -> Dict:
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future))
+        return await future
+
+    async def run(self):
+        self.queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            started = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self.executor, self.classify_batch,
+                                                     [text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.metrics.record_batch(len(batch), time.perf_counter() - started)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+class ClassificationService:
+    """Hält den Analyzer warm und beantwortet HTTP-Anfragen."""
+
+    def __init__(self, analyzer, window_ms: float = DEFAULT_WINDOW_MS, max_batch_size: int = MAX_BATCH_SIZE):
+        self.analyzer = analyzer
+        self.lexicon = default_lexicon()
+        self.metrics = ServiceMetrics()
+        self.batcher = MicroBatcher(self.classify_batch, self.metrics, window_ms, max_batch_size)
+
+    def classify_batch(self, texts: List[str]) -> List[Dict]:
+        """Keyword- und semantische Treffer für einen Micro-Batch (läuft im Batch-Thread)."""
+        with timer('service_semantic'):
+            semantic = self.analyzer.analyze_texts_with_embeddings(texts)
+        count('service_texts', len(texts))
+        results = []
+        for text, (matches, _) in zip(texts, semantic):
+            with timer('service_keywords'):
+                keywords, fuzzy = find_sdgs_in_text_flagged(text, self.lexicon)
+                if COUNT_FUZZY:
+                    keywords = merge_findings(keywords, fuzzy)
+            results.append({
+                'keyword': {sdg: sorted(found) for sdg, found in keywords.items()},
+                'keyword_fuzzy': {sdg: sorted(found) for sdg, found in fuzzy.items()},
+                'semantic': {sdg: dict(match, target_text=target_text(match['target']) if match.get('target') else None)
+                             for sdg, match in sorted(matches.items(), key=lambda item: -item[1]['similarity'])}
+            })
+        return results
+
+    def stats(self) -> Dict:
+        stats = self.metrics.summary()
+        stats['window_ms'] = self.batcher.window * 1000
+        stats['batching'] = self.analyzer.batch_controller.summary()
+        return stats
+
+    async def handle(self, method: str, path: str, body: bytes) -> Tuple[int, str, bytes]:
+        """Beantwortet eine Anfrage: (Status, Content-Type, Inhalt)."""
+        path = path.split('?', 1)[0]
+        if path == '/classify':
+            if method != 'POST':
+                return _json_response(405, {'error': 'POST erwartet'})
+            try:
+                text = json.loads(body.decode('utf-8'))['text']
+                if not isinstance(text, str):
+                    raise TypeError('text muss eine Zeichenkette sein')
+            except (ValueError, KeyError, TypeError) as e:
+                return _json_response(400, {'error': f'Ungültige Anfrage: {str(e)}'})
+            return _json_response(200, await self.batcher.classify(text))
+        if method != 'GET':
+            return _json_response(405, {'error': 'GET erwartet'})
+        if path == '/metrics':
+            return 200, 'text/plain; version=0.0.4', self.metrics.prometheus().encode('utf-8')
+        if path == '/stats':
+            return _json_response(200, self.stats())
+        if path == '/health':
+            return _json_response(200, {'status': 'ok', 'model': self.analyzer.model_name})
+        return _json_response(404, {'error': f'Unbekannter Pfad: {path}'})
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """HTTP/1.1 mit Keep-Alive: mehrere Anfragen pro Verbindung, nacheinander."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                started = time.perf_counter()
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    status, content_type, payload = _json_response(400, {'error': 'Ungültige Anfragezeile'})
+                    await _write_response(writer, status, content_type, payload, keep_alive=False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    status, content_type, payload = _json_response(413, {'error': 'Text zu lang'})
+                    await _write_response(writer, status, content_type, payload, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                try:
+                    status, content_type, payload = await self.handle(method, path, body)
+                except Exception as e:
+                    print(f"⚠️ Fehler bei {method} {path}: {str(e)}")
+                    status, content_type, payload = _json_response(500, {'error': str(e)})
+                if path.startswith('/classify'):
+                    self.metrics.record_request(time.perf_counter() - started, error=status != 200)
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                await _write_response(writer, status, content_type, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        batcher = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"🚀 Klassifikationsdienst läuft auf http://{host}:{port} "
+              f"(Batch-Fenster {self.batcher.window * 1000:.0f} ms, max. {self.batcher.max_batch_size} Texte)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self.batcher.executor.shutdown(wait=False)
+
+def _json_response(status: int, data: Dict) -> Tuple[int, str, bytes]:
+    return status, 'application/json; charset=utf-8', json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+async def _write_response(writer: asyncio.StreamWriter, status: int, content_type: str, payload: bytes,
+                          keep_alive: bool = True):
+    head = (f"HTTP/1.1 {status} {HTTP_STATUS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    writer.write(head.encode('latin-1') + payload)
+    await writer.drain()
+
+def print_stats(service: ClassificationService):
+    stats = service.metrics.summary()
+    print(f"\nAnfragen: {stats['requests']} ({stats['errors']} Fehler), "
+          f"p50 {stats['latency_p50_ms']:.1f} ms, p99 {stats['latency_p99_ms']:.1f} ms")
+    print(f"Micro-Batches: {stats['batches']}, im Mittel {stats['mean_batch_size']:.1f} Texte "
+          f"(max. {stats['max_batch_size']})")
+
+def main(args):
+    # Import erst hier: das Laden von torch/transformers soll nur der Dienst selbst bezahlen
+    from semantic_analysis import SemanticSDGAnalyzer
+
+    print("Lade Modell und SDG-Prototypen...")
+    service = ClassificationService(SemanticSDGAnalyzer(), args.window_ms, args.max_batch_size)
+    # Erster Aufruf lädt Lexikon und initialisiert den Encoder, bevor Anfragen warten müssen
+    service.classify_batch(["Aufwärmen"])
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nDienst beendet")
+    finally:
+        print_stats(service)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lokaler HTTP-Dienst zur SDG-Klassifikation einzelner Texte")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--window-ms', type=float, default=DEFAULT_WINDOW_MS,
+                        help="Wartezeit ab der ersten Anfrage, in der weitere Anfragen gesammelt werden")
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE)
+    run_instrumented('classification_service', main, parser=parser)
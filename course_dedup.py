@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Optional
+
+from course_record import CourseRecord
+
+CANONICAL_DIR = 'data/canonical'
+SIMHASH_BITS = 64
+NEAR_DUPLICATE_DISTANCE = 3  # maximale Hamming-Distanz der SimHashes für Beinahe-Duplikate
+EMBEDDING_STORAGE_DTYPE = 'float16'
+
+def course_text(course: CourseRecord) -> str:
+    """Kombiniert die analysierten Textfelder eines Kurses."""
+    return ' '.join([
+        course.title or '',
+        course.subtitle or '',
+        course.objectives_and_content or ''
+    ])
+
+def text_hash(text: str) -> str:
+    """Hash des Kurstexts mit normalisiertem Whitespace."""
+    return hashlib.sha1(' '.join(text.split()).encode('utf-8')).hexdigest()
+
+def simhash(text: str, bits: int = SIMHASH_BITS) -> int:
+    """SimHash über Wort-Trigramme: ähnliche Texte ergeben Hashes mit kleiner Hamming-Distanz."""
+    words = re.findall(r'\w+', text.lower())
+    shingles = [' '.join(words[i:i + 3]) for i in range(max(1, len(words) - 2))]
+    weights = [0] * bits
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=bits // 8).digest(), 'big')
+        for bit in range(bits):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit in range(bits) if weights[bit] > 0)
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+def config_signature(config) -> str:
+    """Signatur einer Analysekonfiguration; ändert sie sich, werden gecachte Ergebnisse verworfen."""
+    return hashlib.sha1(json.dumps(config, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+class CanonicalCourseStore:
+    """
+    Kanonische Kursebene über alle Semester.
+
+    Jeder eindeutige Kurstext wird einmal gespeichert (Schlüssel: text_hash) und trägt
+    Keyword-Treffer bzw. semantische Treffer und Embedding. Die Kurskopien der einzelnen
+    Semester verweisen über ihre URL auf den Text (Kursnummer + text_hash).
+
+    Jede Analyse besitzt ihren eigenen Speicher (data/canonical/<name>.json), damit
+    parallel laufende Stages sich nicht gegenseitig überschreiben.
+    """
+
+    def __init__(self, name: str, canonical_dir: str = CANONICAL_DIR):
+        self.path = os.path.join(canonical_dir, f"{name}.json")
+        self.embeddings_path = os.path.join(canonical_dir, f"{name}_embeddings.npy")
+        self.texts = {}        # text_hash -> {'numbers', 'simhash', 'keyword_hits', 'keyword_fuzzy', 'semantic_matches', 'embedding_row'}
+        self.courses = {}      # url -> {'number', 'semester', 'title', 'text_hash'}
+        self.signatures = {}   # 'config' -> Signatur der Analysekonfiguration
+        self.embeddings = []   # Zeilen der Embedding-Matrix (NumPy-Arrays)
+        self.by_number = {}    # Kursnummer -> text_hashes
+        self.stats = {'keyword_reused': 0, 'semantic_reused': 0, 'near_duplicates': 0}
+
+    @classmethod
+    def load(cls, name: str, canonical_dir: str = CANONICAL_DIR) -> 'CanonicalCourseStore':
+        store = cls(name, canonical_dir)
+        if os.path.exists(store.path):
+            with open(store.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            store.texts = data.get('texts', {})
+            store.courses = data.get('courses', {})
+            store.signatures = data.get('signatures', {})
+            for key, entry in store.texts.items():
+                for number in entry['numbers']:
+                    store.by_number.setdefault(number, []).append(key)
+        if os.path.exists(store.embeddings_path):
+            import numpy as np
+            # Per mmap: die Zeilen werden erst beim Zugriff gelesen
+            store.embeddings = list(np.load(store.embeddings_path, mmap_mode='r'))
+        return store
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'texts': self.texts,
+                'courses': self.courses,
+                'signatures': self.signatures
+            }, f, ensure_ascii=False)
+        if self.embeddings:
+            import numpy as np
+            # float16 halbiert die Dateigröße; für Kosinus-Ähnlichkeiten praktisch verlustfrei
+            # Neue Datei daneben schreiben und ersetzen: geladene Zeilen verweisen per mmap auf die alte
+            tmp_path = self.embeddings_path + '.tmp.npy'
+            np.save(tmp_path, np.vstack(self.embeddings).astype(EMBEDDING_STORAGE_DTYPE))
+            os.replace(tmp_path, self.embeddings_path)
+
+    def check_signature(self, config):
+        """Verwirft alle gecachten Ergebnisse, wenn sich die Analysekonfiguration geändert hat."""
+        signature = config_signature(config)
+        if self.signatures.get('config') == signature:
+            return
+        for entry in self.texts.values():
+            for field in ('keyword_hits', 'keyword_fuzzy', 'semantic_matches', 'embedding_row'):
+                entry.pop(field, None)
+        self.embeddings = []
+        self.signatures['config'] = signature
+
+    def register(self, course: CourseRecord, semester: Optional[str] = None, key: Optional[str] = None) -> str:
+        """
+        Ordnet eine Kurskopie ihrem kanonischen Text zu und gibt den text_hash zurück.
+        Ein bereits bekannter text_hash (z.B. aus der Vorverarbeitung) kann übergeben werden.
+        """
+        if key is None:
+            key = text_hash(course_text(course))
+        entry = self.texts.setdefault(key, {'numbers': []})
+        number = course.number
+        if number and number not in entry['numbers']:
+            entry['numbers'].append(number)
+            self.by_number.setdefault(number, []).append(key)
+        url = course.url
+        if url:
+            self.courses[url] = {'number': number, 'semester': semester, 'title': course.title,
+                                 'text_hash': key}
+        return key
+
+    def keyword_hits(self, key: str) -> Optional[Dict[str, List[str]]]:
+        hits = self.texts.get(key, {}).get('keyword_hits')
+        if hits is not None:
+            self.stats['keyword_reused'] += 1
+        return hits
+
+    def keyword_fuzzy(self, key: str) -> Dict[str, List[str]]:
+        """Nur unscharf gefundene Keywords eines Texts (nicht in keyword_hits enthalten)."""
+        return self.texts.get(key, {}).get('keyword_fuzzy', {})
+
+    def set_keyword_hits(self, key: str, hits: Dict[str, List[str]], fuzzy: Optional[Dict[str, List[str]]] = None):
+        self.texts[key]['keyword_hits'] = hits
+        if fuzzy:
+            self.texts[key]['keyword_fuzzy'] = fuzzy
+        else:
+            self.texts[key].pop('keyword_fuzzy', None)
+
+    def _near_duplicate(self, key: str, number: Optional[str], text: str) -> Optional[Dict]:
+        """
+        Sucht einen analysierten Text derselben Kursnummer mit fast gleichem SimHash.
+        SimHashes werden erst berechnet, wenn es für die Kursnummer Vergleichstexte gibt.
+        """
+        candidates = [
+            self.texts[other_key] for other_key in self.by_number.get(number, [])
+            if other_key != key and 'semantic_matches' in self.texts[other_key]
+        ]
+        if not candidates:
+            return None
+        entry = self.texts[key]
+        if 'simhash' not in entry:
+            entry['simhash'] = simhash(text)
+        for other in candidates:
+            if 'simhash' not in other:
+                # Ohne gespeicherten Text lässt sich der SimHash nicht nachträglich bilden
+                continue
+            if hamming_distance(entry['simhash'], other['simhash']) <= NEAR_DUPLICATE_DISTANCE:
+                return other
+        return None
+
+    def semantic_matches(self, key: str, number: Optional[str] = None, text: Optional[str] = None,
+                         reuse_near_duplicates: bool = True) -> Optional[Dict]:
+        """
+        Gecachte semantische Treffer für einen Text. Optional werden auch die Treffer eines
+        Beinahe-Duplikats derselben Kursnummer übernommen (z.B. nur geänderte Termine).
+        """
+        entry = self.texts.get(key, {})
+        if 'semantic_matches' in entry:
+            self.stats['semantic_reused'] += 1
+            return entry['semantic_matches']
+        if reuse_near_duplicates and number and text is not None:
+            other = self._near_duplicate(key, number, text)
+            if other is not None:
+                self.stats['near_duplicates'] += 1
+                entry['semantic_matches'] = other['semantic_matches']
+                if 'embedding_row' in other:
+                    entry['embedding_row'] = other['embedding_row']
+                return entry['semantic_matches']
+        return None
+
+    def set_semantic_matches(self, key: str, matches: Dict, embedding=None, text: Optional[str] = None):
+        entry = self.texts[key]
+        entry['semantic_matches'] = matches
+        if text is not None and 'simhash' not in entry:
+            # Für spätere Beinahe-Duplikat-Vergleiche derselben Kursnummer
+            entry['simhash'] = simhash(text)
+        if embedding is not None:
+            entry['embedding_row'] = len(self.embeddings)
+            self.embeddings.append(embedding)
+
+    def embedding(self, key: str):
+        row = self.texts.get(key, {}).get('embedding_row')
+        return self.embeddings[row] if row is not None else None
+
+    def summary(self) -> Dict:
+        return {
+            'course_copies': len(self.courses),
+            'unique_texts': len(self.texts),
+            **self.stats
+        }
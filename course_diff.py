@@ -0,0 +1,320 @@
+"""
+Änderungsbericht zwischen zwei Kurs-Snapshots (zwei Semestern oder zwei Crawls eines Semesters).
+
+Pro Kursdatei wird einmal ein kompakter Index angelegt (data/diff_index/): Kurs-ID
+(Kursnummer, sonst URL), Titel und je ein kurzer Hash pro Kursfeld, sortiert nach Kurs-ID.
+Kursdateien sind mit Zeitstempel benannt und ändern sich nicht, der Index wird also nur neu
+gebaut, wenn Größe oder Änderungszeit der Datei nicht mehr passen. Der Vergleich selbst ist
+ein Merge zweier sortierter Listen und braucht die Kurstexte nicht:
+- Kurs-ID nur alt/nur neu: entfernter bzw. neuer Kurs
+- Feld-Hashes verschieden: Syllabus (Inhalt, Prüfung, Voraussetzungen, Literatur) oder
+  nur Metadaten (Titel, Typ, ECTS, Lehrende, ...) geändert
+
+SDG-Zuordnungen beider Methoden kommen aus dem Ergebnisspeicher (result_store.py; Treffer
+sind dort nach Kurs sortiert) und werden ebenso per Merge verglichen: gewonnene und verlorene
+SDGs pro Kurs, der in beiden Snapshots analysiert wurde. Für den Vergleich zweier
+Analyse-Läufe desselben Semesters wird der Ergebnisspeicher des alten Laufs mit --old-store
+angegeben (z. B. eine Kopie von data/result_store/ vor dem neuen Lauf).
+
+    python course_diff.py                                  # die beiden neuesten Semester
+    python course_diff.py --semesters WS2023 WS2024
+    python course_diff.py --crawls WS2024 --old-store data/result_store_alt
+    python course_diff.py --old data/.../courses_A.json --new data/.../courses_B.json
+
+Ausgaben:
+    data/course_diff.json       Kennzahlen und IDs der geänderten Kurse
+    plots/kursaenderungen.csv   Eine Zeile pro Änderung (Kurs, Methode, SDG, Felder)
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from instrumentation import run_instrumented, timer
+from result_store import SDG_IDS, STORE_DIR, ResultStore, ensure_result_store
+from semester_registry import SemesterRegistry, parse_semester
+
+DIFF_INDEX_DIR = 'data/diff_index'
+REPORT_FILE = 'data/course_diff.json'
+CSV_FILE = 'plots/kursaenderungen.csv'
+INDEX_VERSION = 1
+METADATA_FIELDS = ('title', 'subtitle', 'type', 'ects', 'sws', 'lecturers')
+SYLLABUS_FIELDS = ('objectives_and_content', 'examination_info', 'minimum_requirements', 'literature')
+DIFF_FIELDS = METADATA_FIELDS + SYLLABUS_FIELDS
+METHODS = ('keyword', 'semantic')
+
+def course_id(number: Optional[str], url: Optional[str]) -> str:
+    """Kennung eines Kurses über Semester hinweg: Kursnummer, ohne Nummer die URL."""
+    return number or url or ''
+
+def field_hash(value) -> str:
+    if value in (None, '', []):
+        return ''
+    return hashlib.sha1(json.dumps(value, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+class SnapshotIndex:
+    """Nach Kurs-ID sortierte (ID, Titel, Feld-Hashes) einer Kursdatei."""
+
+    def __init__(self, course_file: str, semester: str, entries: List[Tuple[str, str, List[str]]]):
+        self.course_file = course_file
+        self.semester = semester
+        self.entries = entries
+
+    @staticmethod
+    def index_path(course_file: str, index_dir: str = DIFF_INDEX_DIR) -> str:
+        semester_dir = os.path.basename(os.path.dirname(os.path.abspath(course_file)))
+        return os.path.join(index_dir, semester_dir, os.path.basename(course_file))
+
+    @classmethod
+    def load(cls, course_file: str, index_dir: str = DIFF_INDEX_DIR) -> 'SnapshotIndex':
+        """Lädt den Index einer Kursdatei; fehlt er oder passt er nicht zur Datei, wird er gebaut."""
+        stat = os.stat(course_file)
+        source = {'size': stat.st_size, 'mtime': stat.st_mtime, 'version': INDEX_VERSION, 'fields': list(DIFF_FIELDS)}
+        path = cls.index_path(course_file, index_dir)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('source') == source:
+                return cls(course_file, cached['semester'], [tuple(entry) for entry in cached['entries']])
+
+        with timer('diff_index'):
+            index = cls.build(course_file)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'source': source, 'semester': index.semester, 'entries': index.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return index
+
+    @classmethod
+    def build(cls, course_file: str) -> 'SnapshotIndex':
+        with open(course_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        entries = {}
+        for course in data.get('courses', []):
+            key = course_id(course.get('number'), course.get('url'))
+            if key and key not in entries:
+                entries[key] = (key, course.get('title') or '', [field_hash(course.get(name)) for name in DIFF_FIELDS])
+        semester = data.get('semester_info', {}).get('semester_name') or ''
+        return cls(course_file, semester, [entries[key] for key in sorted(entries)])
+
+def merge_sorted(old: Sequence[Tuple], new: Sequence[Tuple]) -> Iterator[Tuple[str, Optional[Tuple], Optional[Tuple]]]:
+    """Merge zweier nach dem ersten Element sortierter Listen: (ID, alter Eintrag|None, neuer Eintrag|None)."""
+    i = j = 0
+    while i < len(old) or j < len(new):
+        if j >= len(new) or (i < len(old) and old[i][0] < new[j][0]):
+            yield old[i][0], old[i], None
+            i += 1
+        elif i >= len(old) or new[j][0] < old[i][0]:
+            yield new[j][0], None, new[j]
+            j += 1
+        else:
+            yield old[i][0], old[i], new[j]
+            i += 1
+            j += 1
+
+def diff_snapshots(old: SnapshotIndex, new: SnapshotIndex) -> Tuple[Dict, List[Dict]]:
+    """
+    Vergleicht zwei Snapshot-Indizes.
+
+    Returns:
+        (Kennzahlen, Änderungszeilen für die CSV)
+    """
+    counts = {'added': 0, 'removed': 0, 'syllabus_changed': 0, 'metadata_changed': 0, 'unchanged': 0}
+    fields_changed = {name: 0 for name in DIFF_FIELDS}
+    rows = []
+    for key, old_entry, new_entry in merge_sorted(old.entries, new.entries):
+        if old_entry is None:
+            counts['added'] += 1
+            rows.append({'change': 'neu', 'course_id': key, 'title': new_entry[1]})
+            continue
+        if new_entry is None:
+            counts['removed'] += 1
+            rows.append({'change': 'entfernt', 'course_id': key, 'title': old_entry[1]})
+            continue
+        changed = [name for name, before, after in zip(DIFF_FIELDS, old_entry[2], new_entry[2]) if before != after]
+        if not changed:
+            counts['unchanged'] += 1
+            continue
+        for name in changed:
+            fields_changed[name] += 1
+        kind = 'syllabus_changed' if any(name in SYLLABUS_FIELDS for name in changed) else 'metadata_changed'
+        counts[kind] += 1
+        rows.append({'change': 'Syllabus geändert' if kind == 'syllabus_changed' else 'Metadaten geändert',
+                     'course_id': key, 'title': new_entry[1], 'fields': ', '.join(changed)})
+    return {'courses': counts, 'fields_changed': {name: n for name, n in fields_changed.items() if n}}, rows
+
+def sdg_assignments(store: ResultStore, semester: str, method: str) -> Optional[List[Tuple[str, str, Tuple[int, ...]]]]:
+    """
+    Nach Kurs-ID sortierte (ID, Titel, SDG-Positionen) einer Methode für ein Semester,
+    None, wenn die Methode das Semester nicht analysiert hat.
+    """
+    target = parse_semester(semester)
+    analyzed = [name for name in store.meta['analyzed_semesters'][method] if parse_semester(name) == target]
+    positions = [i for i, name in enumerate(store.semesters) if parse_semester(name) == target]
+    if not analyzed or not positions:
+        return None
+    courses = np.flatnonzero(store.course_semester == positions[0])
+    hit_course = store.keyword_course if method == 'keyword' else store.semantic_course
+    hit_sdg = store.keyword_sdg if method == 'keyword' else store.semantic_sdg
+    # Treffer sind nach Kurs sortiert: die Treffer des Semesters sind Teilbereiche der Arrays
+    selected = np.flatnonzero(store.course_semester[np.asarray(hit_course, dtype=np.int64)] == positions[0])
+    sdgs = {int(course): [] for course in courses}
+    for course, sdg in zip(np.asarray(hit_course)[selected], np.asarray(hit_sdg)[selected]):
+        sdgs[int(course)].append(int(sdg))
+
+    assignments = {}
+    for course, found in sdgs.items():
+        key = course_id(store.course_number[course], store.course_url[course])
+        if key and key not in assignments:
+            assignments[key] = (key, store.course_title[course], tuple(sorted(set(found))))
+    return [assignments[key] for key in sorted(assignments)]
+
+def diff_sdgs(old: List[Tuple], new: List[Tuple], method: str) -> Tuple[Dict, List[Dict]]:
+    """Gewonnene und verlorene SDGs der Kurse, die in beiden Snapshots analysiert wurden."""
+    gained = np.zeros(len(SDG_IDS), dtype=np.int64)
+    lost = np.zeros(len(SDG_IDS), dtype=np.int64)
+    compared = changed = 0
+    rows = []
+    for key, old_entry, new_entry in merge_sorted(old, new):
+        if old_entry is None or new_entry is None:
+            continue
+        compared += 1
+        before, after = set(old_entry[2]), set(new_entry[2])
+        if before == after:
+            continue
+        changed += 1
+        for sdg in sorted(after - before):
+            gained[sdg] += 1
+            rows.append({'change': 'SDG hinzugekommen', 'course_id': key, 'title': new_entry[1],
+                         'method': method, 'sdg': SDG_IDS[sdg]})
+        for sdg in sorted(before - after):
+            lost[sdg] += 1
+            rows.append({'change': 'SDG weggefallen', 'course_id': key, 'title': new_entry[1],
+                         'method': method, 'sdg': SDG_IDS[sdg]})
+    summary = {
+        'compared_courses': compared,
+        'courses_changed': changed,
+        'gained': {SDG_IDS[i]: int(n) for i, n in enumerate(gained) if n},
+        'lost': {SDG_IDS[i]: int(n) for i, n in enumerate(lost) if n}
+    }
+    return summary, rows
+
+def build_course_diff(old_file: str, new_file: str, old_store: Optional[ResultStore] = None,
+                      new_store: Optional[ResultStore] = None) -> Tuple[Dict, List[Dict]]:
+    """
+    Änderungsbericht zwischen zwei Kursdateien. Ohne eigenen alten Ergebnisspeicher werden die
+    SDG-Zuordnungen nur verglichen, wenn die Snapshots aus verschiedenen Semestern stammen.
+    """
+    old, new = SnapshotIndex.load(old_file), SnapshotIndex.load(new_file)
+    with timer('diff_courses'):
+        report, rows = diff_snapshots(old, new)
+    report = {
+        'old': {'file': old_file, 'semester': old.semester, 'courses': len(old.entries)},
+        'new': {'file': new_file, 'semester': new.semester, 'courses': len(new.entries)},
+        **report,
+        'sdgs': {},
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+    new_store = new_store or ensure_result_store()
+    if old_store is None:
+        if parse_semester(old.semester) == parse_semester(new.semester):
+            print("ℹ️  Beide Snapshots aus demselben Semester: SDG-Vergleich braucht --old-store")
+            return report, rows
+        old_store = new_store
+    with timer('diff_sdgs'):
+        for method in METHODS:
+            old_assignments = sdg_assignments(old_store, old.semester, method)
+            new_assignments = sdg_assignments(new_store, new.semester, method)
+            if old_assignments is None or new_assignments is None:
+                report['sdgs'][method] = None
+                continue
+            report['sdgs'][method], sdg_rows = diff_sdgs(old_assignments, new_assignments, method)
+            rows.extend(sdg_rows)
+    return report, rows
+
+def save_course_diff(report: Dict, rows: List[Dict], report_file: str = REPORT_FILE, csv_file: str = CSV_FILE):
+    os.makedirs(os.path.dirname(report_file), exist_ok=True)
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.makedirs(os.path.dirname(csv_file), exist_ok=True)
+    columns = [('change', 'Änderung'), ('course_id', 'Kurs-ID'), ('title', 'Kurstitel'),
+               ('method', 'Methode'), ('sdg', 'SDG'), ('fields', 'Felder')]
+    with open(csv_file, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow([header for _, header in columns])
+        for row in rows:
+            writer.writerow([row.get(name, '') for name, _ in columns])
+
+def print_course_diff(report: Dict):
+    courses = report['courses']
+    print(f"\nÄnderungen {report['old']['semester']} ({report['old']['courses']} Kurse) -> "
+          f"{report['new']['semester']} ({report['new']['courses']} Kurse):")
+    print(f"  Neu: {courses['added']}, entfernt: {courses['removed']}, Syllabus geändert: "
+          f"{courses['syllabus_changed']}, nur Metadaten: {courses['metadata_changed']}, "
+          f"unverändert: {courses['unchanged']}")
+    for method, summary in report['sdgs'].items():
+        if summary is None:
+            print(f"  {method}: nicht für beide Semester analysiert")
+            continue
+        print(f"  {method}: {summary['courses_changed']} von {summary['compared_courses']} Kursen mit geänderten SDGs "
+              f"(+{sum(summary['gained'].values())} / -{sum(summary['lost'].values())})")
+
+def select_snapshots(semesters: Optional[List[str]] = None, crawls: Optional[str] = None,
+                     data_dir: str = 'data') -> Tuple[str, str]:
+    """Alte und neue Kursdatei: zwei Semester (Standard: die beiden neuesten) oder die letzten zwei Crawls eines Semesters."""
+    registry = SemesterRegistry.load(data_dir)
+    if crawls is not None:
+        semester = parse_semester(crawls)
+        semester_dir = registry.semester_dir(semester) if semester is not None else ''
+        files = sorted(f for f in os.listdir(semester_dir) if f.startswith('courses_') and f.endswith('.json')) \
+            if os.path.isdir(semester_dir) else []
+        if len(files) < 2:
+            raise ValueError(f"Weniger als zwei Kursdateien für {crawls}")
+        return os.path.join(semester_dir, files[-2]), os.path.join(semester_dir, files[-1])
+
+    course_files = dict(registry.course_files())
+    if semesters:
+        selected = [parse_semester(name) for name in semesters]
+        missing = [name for name, semester in zip(semesters, selected) if semester not in course_files]
+        if missing:
+            raise ValueError(f"Keine Kursdaten für: {', '.join(missing)}")
+        return course_files[selected[0]], course_files[selected[1]]
+    if len(course_files) < 2:
+        raise ValueError("Weniger als zwei Semester mit Kursdaten")
+    files = list(course_files.values())
+    return files[-2], files[-1]
+
+def write_course_diff(old_file: Optional[str] = None, new_file: Optional[str] = None,
+                      semesters: Optional[List[str]] = None, crawls: Optional[str] = None,
+                      old_store_dir: Optional[str] = None) -> Optional[Dict]:
+    """Erstellt, speichert und zeigt den Änderungsbericht (Pipeline-Stage 'diff')."""
+    if old_file is None or new_file is None:
+        try:
+            old_file, new_file = select_snapshots(semesters, crawls)
+        except ValueError as e:
+            print(f"⚠️  Kein Vergleich möglich: {str(e)}")
+            return None
+    old_store = ResultStore(Path(old_store_dir)) if old_store_dir else None
+    report, rows = build_course_diff(old_file, new_file, old_store)
+    save_course_diff(report, rows)
+    print_course_diff(report)
+    print(f"\nBericht gespeichert in: {REPORT_FILE} und {CSV_FILE}")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Änderungen zwischen zwei Kurs-Snapshots und ihren SDG-Zuordnungen")
+    parser.add_argument('--old', help="Alte Kursdatei")
+    parser.add_argument('--new', help="Neue Kursdatei")
+    parser.add_argument('--semesters', nargs=2, metavar=('ALT', 'NEU'), help="Zwei Semester vergleichen")
+    parser.add_argument('--crawls', metavar='SEMESTER', help="Die letzten zwei Crawls eines Semesters vergleichen")
+    parser.add_argument('--old-store', help=f"Ergebnisspeicher des alten Analyse-Laufs (Standard: {STORE_DIR})")
+    run_instrumented('course_diff', lambda args: write_course_diff(args.old, args.new, args.semesters,
+                                                                   args.crawls, args.old_store), parser=parser)
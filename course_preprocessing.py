@@ -0,0 +1,208 @@
+"""
+Vorverarbeitung der Kurstexte, einmal nach dem Crawlen.
+
+Für jeden eindeutigen Kurstext (Titel, Untertitel, Inhalte) werden normalisierter Text,
+Wort-Tokens, Wortanzahl und die BERT-Token-IDs in data/preprocessed/ abgelegt. Die
+Keyword- und die semantische Analyse lesen diese Felder, statt sie neu zu berechnen.
+"""
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from course_dedup import config_signature, course_text, text_hash
+from course_record import CourseRecord, load_course_records
+from instrumentation import count, run_instrumented, timer
+from result_store import StringColumn, load_array
+from semester_registry import SemesterRegistry
+
+PREPROCESSED_DIR = Path('data/preprocessed')
+BERT_MODEL_NAME = "deepset/gbert-large"
+BERT_MAX_LENGTH = 512
+
+def normalize_text(text: str) -> str:
+    """Text für besseres Matching normalisieren."""
+    if not text:
+        return ""
+    # Konvertiere Text zu Kleinbuchstaben
+    text = text.lower()
+    # Ersetze Umlaute
+    text = text.replace('ä', 'ae').replace('ö', 'oe').replace('ü', 'ue').replace('ß', 'ss')
+    return text
+
+def tokenize_words(normalized_text: str) -> List[str]:
+    """Wort-Tokens des normalisierten Texts (wie im Keyword-Matching)."""
+    return re.findall(r'\b\w+\b', normalized_text)
+
+def latest_course_files(data_dir: str = 'data') -> Dict[str, str]:
+    """Neueste courses_*.json pro Semester-Verzeichnis (chronologisch)."""
+    registry = SemesterRegistry.load(data_dir)
+    return {semester.dir_name: course_file for semester, course_file in registry.course_files()}
+
+def preprocessing_config(tokenize: bool = True) -> Dict:
+    return {'model': BERT_MODEL_NAME if tokenize else None, 'max_length': BERT_MAX_LENGTH, 'version': 1}
+
+class PreprocessedCourses:
+    """
+    Memory-mapped Sicht auf die vorverarbeiteten Kurstexte.
+    Zeilen sind eindeutige Kurstexte; Kurse werden über ihre URL zugeordnet.
+    """
+
+    def __init__(self, store_dir: Path = PREPROCESSED_DIR):
+        store_dir = Path(store_dir)
+        with open(store_dir / 'meta.json', 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.text_hashes = self.meta['text_hashes']
+        self.rows = {key: row for row, key in enumerate(self.text_hashes)}
+        self.courses = self.meta['courses']
+        self.has_token_ids = self.meta['config']['model'] is not None
+
+        self.normalized = StringColumn.load(store_dir, 'normalized')
+        self.words = StringColumn.load(store_dir, 'words')
+        self.word_counts = load_array(store_dir / 'word_counts.npy')
+        self.token_ids = load_array(store_dir / 'token_ids.npy')
+        self.token_offsets = load_array(store_dir / 'token_offsets.npy')
+
+    @classmethod
+    def load(cls, store_dir: Path = PREPROCESSED_DIR, data_dir: str = 'data') -> Optional['PreprocessedCourses']:
+        """
+        Lädt die Vorverarbeitung oder gibt None zurück, wenn keine existiert oder
+        sich die Kursdateien seitdem geändert haben.
+        """
+        if not (Path(store_dir) / 'meta.json').exists():
+            return None
+        store = cls(store_dir)
+        sources = {path: os.path.getmtime(path) for path in latest_course_files(data_dir).values()}
+        if sources != store.meta['sources']:
+            print("⚠️ Vorverarbeitung veraltet, Texte werden direkt verarbeitet (course_preprocessing.py ausführen)")
+            return None
+        return store
+
+    def __len__(self):
+        return len(self.text_hashes)
+
+    def row(self, course: CourseRecord) -> Optional[int]:
+        """Zeile des Kurstexts eines Kurses (None, wenn der Kurs nicht vorverarbeitet wurde)."""
+        return self.courses.get(course.url or '')
+
+    def text_hash(self, row: int) -> str:
+        return self.text_hashes[row]
+
+    def normalized_text(self, row: int) -> str:
+        return self.normalized[row]
+
+    def word_tokens(self, row: int) -> List[str]:
+        # Tokens enthalten keine Leerzeichen, daher genügt split()
+        return self.words[row].split()
+
+    def word_count(self, row: int) -> int:
+        return int(self.word_counts[row])
+
+    def bert_token_ids(self, row: int) -> Optional[np.ndarray]:
+        if not self.has_token_ids:
+            return None
+        return np.asarray(self.token_ids[self.token_offsets[row]:self.token_offsets[row + 1]], dtype=np.int64)
+
+def preprocess_courses(data_dir: str = 'data', store_dir: Path = PREPROCESSED_DIR,
+                       tokenize: bool = True) -> PreprocessedCourses:
+    """
+    Verarbeitet alle eindeutigen Kurstexte der neuesten Kursdateien vor. Zeilen einer
+    vorherigen Vorverarbeitung mit gleicher Konfiguration werden übernommen, sodass nach
+    einem neuen Crawl nur geänderte Texte tokenisiert werden.
+    """
+    store_dir = Path(store_dir)
+    config = preprocessing_config(tokenize)
+    signature = config_signature(config)
+
+    previous = None
+    if (store_dir / 'meta.json').exists():
+        previous = PreprocessedCourses(store_dir)
+        if previous.meta.get('signature') != signature:
+            previous = None
+
+    tokenizer = None
+    if tokenize:
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(BERT_MODEL_NAME)
+
+    sources = {}
+    courses = {}
+    text_hashes = []
+    rows = {}
+    normalized_texts, word_strings, word_counts, token_lists = [], [], [], []
+    pool = {}
+
+    for semester_dir, course_file in latest_course_files(data_dir).items():
+        sources[course_file] = os.path.getmtime(course_file)
+        with timer('load'):
+            semester_courses = load_course_records(course_file, pool)
+
+        for course in semester_courses:
+            text = course_text(course)
+            key = text_hash(text)
+            if key not in rows:
+                rows[key] = len(text_hashes)
+                text_hashes.append(key)
+                old_row = previous.rows.get(key) if previous is not None else None
+                if old_row is not None:
+                    count('preprocess_reused')
+                    normalized_texts.append(previous.normalized_text(old_row))
+                    word_strings.append(previous.words[old_row])
+                    word_counts.append(previous.word_count(old_row))
+                    token_lists.append(previous.bert_token_ids(old_row) if tokenize else [])
+                else:
+                    count('preprocess_texts')
+                    with timer('normalize'):
+                        normalized = normalize_text(text)
+                        normalized_texts.append(normalized)
+                        word_strings.append(' '.join(tokenize_words(normalized)))
+                        word_counts.append(len(text.split()))
+                    if tokenizer is not None:
+                        with timer('tokenize'):
+                            token_lists.append(tokenizer(' '.join(text.split()), truncation=True,
+                                                         max_length=BERT_MAX_LENGTH)['input_ids'])
+                    else:
+                        token_lists.append([])
+            if course.url:
+                courses[course.url] = rows[key]
+
+    # Die alten Dateien sind per mmap geöffnet und werden gleich überschrieben
+    del previous
+
+    with timer('serialize'):
+        store_dir.mkdir(parents=True, exist_ok=True)
+        StringColumn.save(store_dir, 'normalized', normalized_texts)
+        StringColumn.save(store_dir, 'words', word_strings)
+        np.save(store_dir / 'word_counts.npy', np.array(word_counts, dtype=np.int32))
+        token_offsets = np.zeros(len(token_lists) + 1, dtype=np.int64)
+        token_offsets[1:] = np.cumsum([len(tokens) for tokens in token_lists])
+        all_tokens = np.concatenate([np.asarray(tokens, dtype=np.int64) for tokens in token_lists]) \
+            if token_lists else np.array([], dtype=np.int64)
+        # Das gbert-Vokabular passt in uint16
+        token_dtype = np.uint16 if all_tokens.size == 0 or all_tokens.max() < 2**16 else np.uint32
+        np.save(store_dir / 'token_ids.npy', all_tokens.astype(token_dtype))
+        np.save(store_dir / 'token_offsets.npy', token_offsets)
+
+        # meta.json zuletzt schreiben: sie markiert eine vollständige Vorverarbeitung
+        with open(store_dir / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                'config': config,
+                'signature': signature,
+                'sources': sources,
+                'text_hashes': text_hashes,
+                'courses': courses
+            }, f, ensure_ascii=False)
+
+    return PreprocessedCourses(store_dir)
+
+def main():
+    print("Starte Vorverarbeitung der Kurstexte...")
+    store = preprocess_courses()
+    print(f"✓ {len(store)} eindeutige Kurstexte für {len(store.courses)} Kurse vorverarbeitet")
+    print(f"Gespeichert in: {PREPROCESSED_DIR}")
+
+if __name__ == "__main__":
+    run_instrumented('course_preprocessing', main)
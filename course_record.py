@@ -0,0 +1,270 @@
+"""
+Kompakte Kursdatensätze für die Analysen.
+
+Statt eines dicts mit bis zu 14 Schlüsseln pro Kurs hält CourseRecord die Felder, die die
+Analysen lesen, in __slots__. Die großen, selten gelesenen Textfelder (Prüfungsinfos,
+Mindestanforderungen, Literatur und unbekannte Zusatzfelder) liegen zusammen als
+zlib-komprimierter Block vor und werden erst beim Zugriff dekodiert. Wiederkehrende
+Werte (Kurstyp, Semester, Lehrende, unveränderte Texte wiederkehrender Kurse) werden
+über einen Pool beim Laden geteilt.
+
+Lesend verhält sich ein CourseRecord wie das ursprüngliche dict (Mapping), geschrieben
+wird er über to_dict() bzw. json_default.
+
+    python course_record.py --courses 100000
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import tracemalloc
+import zlib
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional
+
+REPORT_FILE = 'data/course_record_report.json'
+COMPRESSION_LEVEL = 1  # Schnelles Komprimieren beim Laden; die Blöcke sind klein
+
+# Felder mit eigenem Slot; alle übrigen landen im komprimierten Block
+SLOT_FIELDS = ('url', 'number', 'type', 'title', 'subtitle', 'semester', 'semester_code',
+               'ects', 'sws', 'lecturers', 'objectives_and_content')
+# Felder, die mehrfach vorkommen und geteilt werden
+POOLED_FIELDS = ('number', 'type', 'title', 'subtitle', 'semester', 'semester_code', 'objectives_and_content')
+
+SLOT_SET = frozenset(SLOT_FIELDS)
+
+def _compress_details(details: tuple, pool: Dict) -> bytes:
+    """
+    Komprimiert die großen Felder; gleiche Inhalte (wiederkehrende Kurse) nur einmal.
+    Der Pool merkt sich nur einen Digest, nicht die unkomprimierten Texte.
+    """
+    digest = hashlib.blake2b(repr(details).encode('utf-8'), digest_size=16).digest()
+    blob = pool.get(digest)
+    if blob is None:
+        blob = zlib.compress(json.dumps(dict(details), ensure_ascii=False).encode('utf-8'), COMPRESSION_LEVEL)
+        pool[digest] = blob
+    return blob
+
+class CourseRecord(Mapping):
+    """Ein Kurs mit festen Slots und lazy dekodierten großen Textfeldern."""
+
+    __slots__ = SLOT_FIELDS + ('_keys', '_details')
+
+    @classmethod
+    def from_dict(cls, data: Dict, pool: Optional[Dict] = None) -> 'CourseRecord':
+        """Erzeugt einen Datensatz aus einem Kurs-dict; mit pool werden gleiche Werte geteilt."""
+        if pool is None:
+            pool = {}
+        record = cls.__new__(cls)
+        record.url = data.get('url')
+        for name in POOLED_FIELDS:
+            value = data.get(name)
+            setattr(record, name, pool.setdefault(value, value) if value is not None else None)
+        record.ects = data.get('ects')
+        record.sws = data.get('sws')
+        lecturers = data.get('lecturers')
+        if lecturers is not None:
+            lecturers = tuple(pool.setdefault(name, name) for name in lecturers)
+            lecturers = pool.setdefault(lecturers, lecturers)
+        record.lecturers = lecturers
+        # Vorhandene Schlüssel in ursprünglicher Reihenfolge (auch Felder mit Wert None)
+        keys = tuple(data)
+        record._keys = pool.setdefault(keys, keys)
+
+        details = tuple((name, value) for name, value in data.items() if name not in SLOT_SET)
+        record._details = _compress_details(details, pool) if details else None
+        return record
+
+    def details(self) -> Dict:
+        """Dekodiert die großen Textfelder (bei jedem Aufruf neu, nichts wird zwischengespeichert)."""
+        if self._details is None:
+            return {}
+        return json.loads(zlib.decompress(self._details).decode('utf-8'))
+
+    @property
+    def examination_info(self) -> Optional[str]:
+        return self.details().get('examination_info')
+
+    @property
+    def minimum_requirements(self) -> Optional[str]:
+        return self.details().get('minimum_requirements')
+
+    @property
+    def literature(self) -> Optional[str]:
+        return self.details().get('literature')
+
+    def __getitem__(self, key: str):
+        if key not in self._keys:
+            raise KeyError(key)
+        if key in SLOT_FIELDS:
+            value = getattr(self, key)
+            # Lehrende werden als Tupel gehalten, das dict-Format verwendet Listen
+            return list(value) if key == 'lecturers' and value is not None else value
+        return self.details()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self):
+        return f"CourseRecord(number={self.number!r}, title={self.title!r}, semester={self.semester!r})"
+
+    def to_dict(self) -> Dict:
+        """Das ursprüngliche Kurs-dict (für JSON-Ausgaben)."""
+        details = self.details()
+        return {key: details[key] if key in details else self[key] for key in self._keys}
+
+class KeywordHit(Mapping):
+    """
+    Kurs mit den gefundenen Keywords eines SDGs, ohne den Kurs zu kopieren.
+    fuzzy_keywords (nur wenn vorhanden) sind die nur unscharf gefundenen Keywords des SDGs;
+    werden unscharfe Treffer gezählt (analyze_sdgs.COUNT_FUZZY), stehen sie auch in found_keywords.
+    """
+
+    __slots__ = ('course', 'found_keywords', 'fuzzy_keywords')
+
+    def __init__(self, course: CourseRecord, found_keywords: List[str], fuzzy_keywords: Optional[List[str]] = None):
+        self.course = course
+        self.found_keywords = found_keywords
+        self.fuzzy_keywords = fuzzy_keywords or []
+
+    def _extra_keys(self) -> List[str]:
+        return ['found_keywords', 'fuzzy_keywords'] if self.fuzzy_keywords else ['found_keywords']
+
+    def __getitem__(self, key: str):
+        if key == 'found_keywords':
+            return self.found_keywords
+        if key == 'fuzzy_keywords' and self.fuzzy_keywords:
+            return self.fuzzy_keywords
+        return self.course[key]
+
+    def __iter__(self) -> Iterator[str]:
+        extra = self._extra_keys()
+        yield from (key for key in self.course if key not in extra)
+        yield from extra
+
+    def __len__(self) -> int:
+        return len(self.course) + sum(key not in self.course for key in self._extra_keys())
+
+    def to_dict(self) -> Dict:
+        data = {**self.course.to_dict(), 'found_keywords': self.found_keywords}
+        if self.fuzzy_keywords:
+            data['fuzzy_keywords'] = self.fuzzy_keywords
+        return data
+
+def json_default(obj):
+    """default-Funktion für json.dump: schreibt Datensätze im ursprünglichen dict-Format."""
+    if isinstance(obj, (CourseRecord, KeywordHit)):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def load_course_records(course_file: str, pool: Optional[Dict] = None) -> List[CourseRecord]:
+    """
+    Lädt eine courses_*.json als Liste von CourseRecords. Ein über mehrere Semester
+    geteilter pool sorgt dafür, dass wiederkehrende Kurse ihre Texte teilen.
+    """
+    with open(course_file, 'r', encoding='utf-8') as f:
+        courses = json.load(f)['courses']
+    if pool is None:
+        pool = {}
+    records = [CourseRecord.from_dict(course, pool) for course in courses]
+    return records
+
+def _retained_bytes(build) -> int:
+    """Speicher, den das Ergebnis von build() nach dem Aufruf belegt (tracemalloc)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return retained
+
+def memory_report(num_courses: int = 100000, seed: int = 0) -> Dict:
+    """
+    Vergleicht den Speicherbedarf von Kurs-dicts und CourseRecords auf einem synthetischen
+    Korpus, jeweils für die Kurse selbst und für die Keyword-Ergebnisse pro SDG
+    (bisher eine dict-Kopie pro Treffer, jetzt ein KeywordHit).
+    """
+    import synthetic_corpus
+    from analyze_sdgs import find_sdgs_in_text
+    from course_dedup import course_text
+    from course_preprocessing import latest_course_files
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        synthetic_corpus.generate_corpus(data_dir, num_courses, seed=seed)
+        course_files = list(latest_course_files(data_dir).values())
+
+        def load_dicts():
+            courses = []
+            for course_file in course_files:
+                with open(course_file, 'r', encoding='utf-8') as f:
+                    courses.extend(json.load(f)['courses'])
+            return courses
+
+        def load_records():
+            pool, records = {}, []
+            for course_file in course_files:
+                records.extend(load_course_records(course_file, pool))
+            return records
+
+        dicts_bytes = _retained_bytes(load_dicts)
+        records_bytes = _retained_bytes(load_records)
+
+        records = load_records()
+        dicts = load_dicts()
+        findings = [find_sdgs_in_text(course_text(record)) for record in records]
+
+        def dict_hits():
+            hits = []
+            for course, sdg_findings in zip(dicts, findings):
+                for found_keywords in sdg_findings.values():
+                    copy = course.copy()
+                    copy['found_keywords'] = list(found_keywords)
+                    hits.append(copy)
+            return hits
+
+        def record_hits():
+            return [KeywordHit(record, list(found_keywords))
+                    for record, sdg_findings in zip(records, findings)
+                    for found_keywords in sdg_findings.values()]
+
+        dict_hits_bytes = _retained_bytes(dict_hits)
+        record_hits_bytes = _retained_bytes(record_hits)
+        num_hits = sum(len(sdg_findings) for sdg_findings in findings)
+
+    return {
+        'courses': len(records),
+        'keyword_hits': num_hits,
+        'dict_mb': dicts_bytes / 1e6,
+        'record_mb': records_bytes / 1e6,
+        'course_reduction': 1 - records_bytes / dicts_bytes,
+        'dict_hits_mb': dict_hits_bytes / 1e6,
+        'record_hits_mb': record_hits_bytes / 1e6,
+        'hits_reduction': 1 - record_hits_bytes / dict_hits_bytes if dict_hits_bytes else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Speicherbedarf von Kurs-dicts und CourseRecords vergleichen")
+    parser.add_argument('--courses', type=int, default=100000, help="Anzahl synthetischer Kurse")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=REPORT_FILE)
+    args = parser.parse_args()
+
+    print(f"Messe Speicherbedarf für {args.courses} synthetische Kurse...")
+    report = memory_report(args.courses, args.seed)
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"Kurse:          {report['dict_mb']:8.1f} MB als dict, {report['record_mb']:8.1f} MB als CourseRecord "
+          f"(-{report['course_reduction']:.0%})")
+    print(f"Keyword-Treffer: {report['dict_hits_mb']:7.1f} MB als dict-Kopien, "
+          f"{report['record_hits_mb']:7.1f} MB als KeywordHit (-{report['hits_reduction']:.0%})")
+    print(f"Bericht gespeichert in: {args.output}")
+
+if __name__ == "__main__":
+    main()
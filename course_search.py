@@ -0,0 +1,248 @@
+"""
+Ähnlichkeitssuche über die gespeicherten Kurs-Embeddings der semantischen Analyse.
+
+Die Embeddings (data/canonical/semantic_embeddings.npy) werden in einem IVF-Index
+(invertierte Listen um k-Means-Zentroide, reines NumPy) abgelegt. Eine Anfrage vergleicht
+den Vektor zuerst mit den Zentroiden und durchsucht dann nur die n_probe nächsten Listen.
+Die Vektoren können als float32, float16 oder produktquantisiert gespeichert werden
+(embedding_codec.py); gesucht wird direkt auf dem gespeicherten Format.
+
+    python course_search.py --course "https://ufind.univie.ac.at/de/course.html?lv=...&semester=2024W"
+    python course_search.py --text "Klimawandel und Anpassung in Städten" -k 20
+    python course_search.py --build --codec pq
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from course_dedup import CanonicalCourseStore
+from embedding_codec import CODECS, EncodedEmbeddings
+from result_store import load_array
+from semester_registry import semester_sort_key
+
+INDEX_DIR = Path('data/course_index')
+DEFAULT_N_PROBE = 8
+EXACT_SEARCH_LIMIT = 2000  # Bis zu dieser Größe wird ohne Partitionierung exakt gesucht
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+def _kmeans(vectors: np.ndarray, n_clusters: int, n_iter: int = 10, seed: int = 0) -> np.ndarray:
+    """Sphärisches k-Means (Skalarprodukt auf normierten Vektoren)."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+    for _ in range(n_iter):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        empty = np.bincount(assignment, minlength=n_clusters) == 0
+        # Leere Cluster mit zufälligen Vektoren neu besetzen
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        centroids = _normalize_rows(sums)
+    return centroids
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+    return np.concatenate([
+        np.argmax(vectors[start:start + batch_size] @ centroids.T, axis=1)
+        for start in range(0, len(vectors), batch_size)
+    ]) if len(vectors) else np.array([], dtype=np.int64)
+
+def index_codec(index_dir: Path = INDEX_DIR) -> str:
+    """Speicherformat des bestehenden Index (float32, wenn es noch keinen gibt)."""
+    meta_file = Path(index_dir) / 'meta.json'
+    if not meta_file.exists():
+        return 'float32'
+    with open(meta_file, 'r', encoding='utf-8') as f:
+        return json.load(f).get('codec', 'float32')
+
+def build_course_index(store: Optional[CanonicalCourseStore] = None, index_dir: Path = INDEX_DIR,
+                       n_lists: Optional[int] = None, codec: Optional[str] = None, seed: int = 0) -> Path:
+    """
+    Baut den IVF-Index aus den Embeddings des semantischen Kursspeichers.
+    Indiziert wird pro Embedding-Zeile; Kurse mit identischem (oder fast identischem) Text
+    teilen sich eine Zeile. codec legt das Speicherformat der Vektoren fest; ohne codec
+    bleibt das Format des bestehenden Index erhalten.
+    """
+    if store is None:
+        store = CanonicalCourseStore.load('semantic')
+    if codec is None:
+        codec = index_codec(index_dir)
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+
+    vectors = _normalize_rows(np.vstack(store.embeddings).astype(np.float32)) if store.embeddings \
+        else np.zeros((0, 1), np.float32)
+    num_vectors = len(vectors)
+
+    # Kurse pro Embedding-Zeile: [URL, Kursnummer, Semester, Titel]
+    row_courses = [[] for _ in range(num_vectors)]
+    for url, course in store.courses.items():
+        row = store.texts.get(course['text_hash'], {}).get('embedding_row')
+        if row is not None:
+            row_courses[row].append([url, course.get('number') or '', course.get('semester') or '',
+                                     course.get('title') or ''])
+
+    if n_lists is None:
+        n_lists = 1 if num_vectors <= EXACT_SEARCH_LIMIT else int(np.sqrt(num_vectors))
+    n_lists = max(1, min(n_lists, num_vectors))
+    if n_lists > 1:
+        # Zentroide auf einer Stichprobe trainieren, dann alle Vektoren zuordnen
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(num_vectors, min(num_vectors, 40 * n_lists), replace=False)]
+        centroids = _kmeans(sample, n_lists, seed=seed)
+        assignment = _assign(vectors, centroids)
+    else:
+        centroids = _normalize_rows(vectors.mean(axis=0, keepdims=True)) if num_vectors else vectors[:0]
+        assignment = np.zeros(num_vectors, dtype=np.int64)
+
+    # Vektoren nach Liste sortiert ablegen, damit jede Liste ein zusammenhängender Block ist
+    order = np.argsort(assignment, kind='stable')
+    list_offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+    list_offsets[1:] = np.cumsum(np.bincount(assignment, minlength=len(centroids)))
+
+    np.save(index_dir / 'centroids.npy', centroids)
+    if codec == 'pq' and num_vectors == 0:
+        codec = 'float32'
+    pq_options = {'seed': seed} if codec == 'pq' else {}
+    EncodedEmbeddings.encode(vectors[order], codec, **pq_options).save(index_dir / 'vectors')
+    np.save(index_dir / 'rows.npy', order.astype(np.int32))
+    np.save(index_dir / 'list_offsets.npy', list_offsets)
+    # meta.json zuletzt schreiben: sie markiert einen vollständigen Index
+    with open(index_dir / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump({
+            'num_vectors': num_vectors,
+            'n_lists': len(centroids),
+            'codec': codec,
+            'row_courses': row_courses
+        }, f, ensure_ascii=False)
+    return index_dir
+
+class CourseIndex:
+    """Memory-mapped IVF-Index über die Kurs-Embeddings."""
+
+    def __init__(self, index_dir: Path = INDEX_DIR):
+        index_dir = Path(index_dir)
+        with open(index_dir / 'meta.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.row_courses = meta['row_courses']
+        self.centroids = np.load(index_dir / 'centroids.npy')
+        self.codec = meta.get('codec', 'float32')
+        self.vectors = EncodedEmbeddings.load(index_dir / 'vectors', self.codec)
+        self.rows = load_array(index_dir / 'rows.npy')
+        self.list_offsets = np.load(index_dir / 'list_offsets.npy')
+        # Position jeder Embedding-Zeile im sortierten Vektorblock
+        self.positions = np.empty(len(self.rows), dtype=np.int64)
+        self.positions[self.rows] = np.arange(len(self.rows))
+        self.url_rows = {course[0]: row for row, courses in enumerate(self.row_courses) for course in courses}
+
+    @classmethod
+    def load(cls, index_dir: Path = INDEX_DIR) -> Optional['CourseIndex']:
+        if not (Path(index_dir) / 'meta.json').exists():
+            return None
+        return cls(index_dir)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def vector(self, row: int) -> np.ndarray:
+        position = self.positions[row]
+        return self.vectors.decode(position, position + 1)[0]
+
+    def search_vector(self, query: np.ndarray, k: int = 10, n_probe: int = DEFAULT_N_PROBE,
+                      exclude_row: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k Embedding-Zeilen nach Kosinus-Ähnlichkeit.
+
+        Returns:
+            (Zeilen, Ähnlichkeiten), absteigend sortiert
+        """
+        if len(self.rows) == 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+        query = np.asarray(query, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        prepared = self.vectors.prepare_query(query)
+
+        n_probe = min(n_probe, len(self.centroids))
+        lists = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+        # Jede Liste ist ein zusammenhängender Block: Slices statt Fancy-Indexing
+        ranges = [(self.list_offsets[i], self.list_offsets[i + 1]) for i in lists]
+        positions = np.concatenate([np.arange(start, end) for start, end in ranges])
+        scores = np.concatenate([self.vectors.inner_products(prepared, start, end) for start, end in ranges])
+        if exclude_row is not None:
+            scores[positions == self.positions[exclude_row]] = -np.inf
+            k += 1
+
+        k = min(k, len(scores))
+        if k == 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        top = top[np.isfinite(scores[top])][:k - (exclude_row is not None)]
+        return self.rows[positions[top]].astype(np.int64), scores[top]
+
+    def results(self, rows: np.ndarray, scores: np.ndarray) -> List[Dict]:
+        """Ergebnisliste mit dem jüngsten Kurs pro Zeile und den weiteren Semestern mit demselben Text."""
+        results = []
+        for row, score in zip(rows, scores):
+            courses = sorted(self.row_courses[row], key=lambda course: semester_sort_key(course[2]))
+            if not courses:
+                continue
+            url, number, semester, title = courses[-1]
+            results.append({
+                'url': url,
+                'number': number,
+                'semester': semester,
+                'title': title,
+                'similarity': float(score),
+                'other_semesters': [course[2] for course in courses[:-1]]
+            })
+        return results
+
+    def similar_to_course(self, url: str, k: int = 10, n_probe: int = DEFAULT_N_PROBE) -> List[Dict]:
+        """Kurse mit ähnlichen Inhalten wie der Kurs mit der angegebenen URL."""
+        row = self.url_rows.get(url)
+        if row is None:
+            raise KeyError(f"Kurs nicht im Index: {url}")
+        return self.results(*self.search_vector(self.vector(row), k, n_probe, exclude_row=row))
+
+    def similar_to_text(self, text: str, analyzer, k: int = 10, n_probe: int = DEFAULT_N_PROBE) -> List[Dict]:
+        """Kurse mit ähnlichen Inhalten wie ein freier Text (Embedding mit dem SemanticSDGAnalyzer)."""
+        return self.results(*self.search_vector(analyzer._get_embedding(text), k, n_probe))
+
+def main():
+    parser = argparse.ArgumentParser(description="Ähnliche Kurse über die Kurs-Embeddings finden")
+    query = parser.add_mutually_exclusive_group()
+    query.add_argument('--course', help="URL des Kurses, zu dem ähnliche Kurse gesucht werden")
+    query.add_argument('--text', help="Freitext-Anfrage")
+    parser.add_argument('-k', type=int, default=10, help="Anzahl Ergebnisse")
+    parser.add_argument('--n-probe', type=int, default=DEFAULT_N_PROBE, help="Anzahl durchsuchter Listen")
+    parser.add_argument('--build', action='store_true', help="Index aus dem semantischen Kursspeicher neu bauen")
+    parser.add_argument('--codec', choices=CODECS,
+                        help="Speicherformat der Vektoren beim Neubau (Standard: wie der bestehende Index)")
+    args = parser.parse_args()
+
+    if args.build or CourseIndex.load() is None:
+        print("Baue Kurs-Index...")
+        build_course_index(codec=args.codec)
+    index = CourseIndex.load()
+    print(f"Kurs-Index: {len(index)} Embeddings ({index.codec}) in {len(index.centroids)} Listen")
+
+    if args.course:
+        results = index.similar_to_course(args.course, args.k, args.n_probe)
+    elif args.text:
+        from semantic_analysis import SemanticSDGAnalyzer
+        results = index.similar_to_text(args.text, SemanticSDGAnalyzer(), args.k, args.n_probe)
+    else:
+        return
+
+    for result in results:
+        print(f"{result['similarity']:.3f}  [{result['semester']}] {result['number']} {result['title']}")
+        print(f"       {result['url']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Crawl-Planung nach Änderungshäufigkeit.
+
+Pro Semester-Verzeichnis führt crawl_history.json für jede Kurs-URL Buch über Inhalts-Hash
+der geparsten Kursfelder, ersten und letzten erfolgreichen Abruf, letzte Änderung sowie die
+Anzahl Abrufe, erfolgreicher Prüfungen und erkannter Änderungen. Daraus wird pro URL eine
+Änderungsrate geschätzt (Poisson-Modell; Schätzer nach Cho & Garcia-Molina, der berücksichtigt,
+dass zwischen zwei Abrufen mehrere Änderungen als eine erscheinen) und die Wahrscheinlichkeit,
+dass sich die Seite seit dem letzten Abruf geändert hat:
+
+    n Intervalle mit X erkannten Änderungen, mittlere Intervalllänge I (Tage)
+    rate = -ln((n - X + 0.5) / (n + 0.5)) / I, zur mittleren Rate des Semesters hin gewichtet
+    P(geändert) = 1 - exp(-rate * Tage seit letztem Abruf)
+
+Ein Lauf mit Request-Budget ruft zuerst nie (erfolgreich) geladene Seiten ab, danach die
+Seiten mit der höchsten Änderungswahrscheinlichkeit, über alle Semester hinweg. Kurse, die
+nicht abgerufen werden, übernimmt die Extraktion aus der letzten Kursdatei. Ohne vorhandene
+Historie wird sie aus der letzten Kursdatei eines Semesters angelegt.
+
+    python crawl_scheduler.py --budget 500   # Plan anzeigen, ohne zu crawlen
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from semester_registry import SemesterRegistry, latest_course_file
+
+HISTORY_NAME = 'crawl_history.json'
+DEFAULT_RATE = 1 / 30.0  # Änderungen pro Tag, solange im Semester nichts beobachtet wurde
+PRIOR_WEIGHT = 1.0        # Gewicht der Semester-Rate (Prior) in Intervallen
+UNFETCHED_PRIORITY = 2.0  # Nie geladene Seiten vor allen anderen
+FAILED_PRIORITY = 1.0     # Fehlgeschlagene Abrufe wie sicher geänderte Seiten
+
+def content_hash(course: Dict) -> str:
+    """Hash der geparsten Kursfelder (unabhängig von Layout-Änderungen im HTML)."""
+    return hashlib.sha1(json.dumps(course, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def _days(start: str, end: datetime) -> float:
+    return max(0.0, (end - datetime.fromisoformat(start)).total_seconds() / 86400)
+
+class CrawlHistory:
+    """Abruf- und Änderungshistorie der Kurs-URLs eines Semesters."""
+
+    def __init__(self, semester_dir: str):
+        self.path = os.path.join(semester_dir, HISTORY_NAME)
+        self.entries: Dict[str, Dict] = {}
+        self._prior_rate: Optional[float] = None
+
+    @classmethod
+    def load(cls, semester_dir: str) -> 'CrawlHistory':
+        """Lädt die Historie; fehlt sie, wird sie aus der letzten Kursdatei angelegt."""
+        history = cls(semester_dir)
+        if os.path.exists(history.path):
+            with open(history.path, 'r', encoding='utf-8') as f:
+                history.entries = json.load(f)
+        else:
+            course_file = latest_course_file(semester_dir)
+            if course_file is not None:
+                history.bootstrap(course_file)
+        return history
+
+    def bootstrap(self, course_file: str):
+        """Legt Einträge für die Kurse einer Kursdatei an (Abrufzeit = Extraktionszeitpunkt)."""
+        with open(course_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        timestamp = data.get('extraction_timestamp')
+        fetched_at = datetime.strptime(timestamp, '%Y%m%d_%H%M%S') if timestamp \
+            else datetime.fromtimestamp(os.path.getmtime(course_file))
+        for course in data.get('courses', []):
+            if course.get('url'):
+                self.record(course['url'], course, fetched_at)
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def record(self, url: str, course: Optional[Dict], fetched_at: Optional[datetime] = None):
+        """Trägt einen Abruf ein; course ist None, wenn Laden oder Parsen fehlgeschlagen ist."""
+        now = (fetched_at or datetime.now()).isoformat(timespec='seconds')
+        self._prior_rate = None
+        entry = self.entries.setdefault(url, {'fetches': 0, 'checks': 0, 'changes': 0})
+        entry['fetches'] += 1
+        entry['last_fetch'] = now
+        if course is None:
+            entry['failed'] = True
+            return
+        entry.pop('failed', None)
+        entry['checks'] += 1
+        entry.setdefault('first_check', now)
+        entry['last_check'] = now
+        digest = content_hash(course)
+        if entry.get('hash') is None:
+            entry['last_change'] = now
+        elif entry['hash'] != digest:
+            entry['changes'] += 1
+            entry['last_change'] = now
+        entry['hash'] = digest
+
+    def prior_rate(self) -> float:
+        """Mittlere Änderungsrate aller mehrfach geprüften Seiten des Semesters (Prior für wenig beobachtete)."""
+        if self._prior_rate is None:
+            changes = days = 0.0
+            for entry in self.entries.values():
+                if entry.get('checks', 0) > 1:
+                    changes += entry['changes']
+                    days += _days(entry['first_check'], datetime.fromisoformat(entry['last_check']))
+            self._prior_rate = (changes + 1) / (days + 1 / DEFAULT_RATE) if days else DEFAULT_RATE
+        return self._prior_rate
+
+    def change_rate(self, url: str) -> float:
+        """Geschätzte Änderungen pro Tag."""
+        entry = self.entries[url]
+        prior = self.prior_rate()
+        intervals = entry['checks'] - 1
+        observed = _days(entry['first_check'], datetime.fromisoformat(entry['last_check']))
+        if intervals <= 0 or observed <= 0:
+            return prior
+        estimate = -math.log((intervals - entry['changes'] + 0.5) / (intervals + 0.5)) / (observed / intervals)
+        return (intervals * estimate + PRIOR_WEIGHT * prior) / (intervals + PRIOR_WEIGHT)
+
+    def priority(self, url: str, now: Optional[datetime] = None) -> float:
+        """Wahrscheinlichkeit, dass sich die Seite seit dem letzten Abruf geändert hat (bzw. Vorrang)."""
+        entry = self.entries.get(url)
+        if entry is None or entry.get('hash') is None:
+            return UNFETCHED_PRIORITY
+        if entry.get('failed'):
+            return FAILED_PRIORITY
+        now = now or datetime.now()
+        return 1 - math.exp(-self.change_rate(url) * _days(entry['last_check'], now))
+
+def plan_crawl(semesters: Dict[str, Tuple[CrawlHistory, List[str]]], budget: Optional[int] = None,
+               now: Optional[datetime] = None) -> Tuple[Dict[str, List[str]], Dict]:
+    """
+    Wählt über alle Semester die budget URLs mit der höchsten Priorität.
+
+    Args:
+        semesters: Semester -> (Historie, Kurs-Links)
+        budget: maximale Anzahl Abrufe (None: alle)
+
+    Returns:
+        (Semester -> abzurufende URLs in Prioritätsreihenfolge, Kennzahlen des Plans)
+    """
+    now = now or datetime.now()
+    candidates = []
+    for semester, (history, links) in semesters.items():
+        for url in dict.fromkeys(links):
+            candidates.append((history.priority(url, now), semester, url))
+    candidates.sort(key=lambda candidate: -candidate[0])
+    selected = candidates if budget is None else candidates[:budget]
+
+    plan = {semester: [] for semester in semesters}
+    for _, semester, url in selected:
+        plan[semester].append(url)
+
+    # Erwartete Änderungen: nie geladene und fehlgeschlagene Seiten zählen voll
+    expected = [min(priority, 1.0) for priority, _, _ in candidates]
+    covered = sum(min(priority, 1.0) for priority, _, _ in selected)
+    stats = {
+        'candidates': len(candidates),
+        'requests': len(selected),
+        'unfetched': sum(1 for priority, _, _ in selected if priority >= UNFETCHED_PRIORITY),
+        'expected_changes': sum(expected),
+        'expected_changes_covered': covered,
+        'freshness_share': covered / sum(expected) if sum(expected) else 1.0
+    }
+    return plan, stats
+
+def print_plan_stats(stats: Dict):
+    print(f"Crawl-Plan: {stats['requests']} von {stats['candidates']} Seiten "
+          f"({stats['unfetched']} noch nie geladen)")
+    print(f"  Erwartete Änderungen: {stats['expected_changes_covered']:.1f} von {stats['expected_changes']:.1f} "
+          f"erfasst ({stats['freshness_share']:.0%} mit {stats['requests'] / max(stats['candidates'], 1):.0%} "
+          f"der Abrufe)")
+
+def load_semester_plans(data_dir: str = 'data', selected: Optional[List] = None) -> Dict[str, Tuple[CrawlHistory, List[str]]]:
+    """Historie und Kurs-Links der ausgewählten (ohne Auswahl: aller) Semester mit Kurs-Links."""
+    registry = SemesterRegistry.load(data_dir)
+    semesters = {}
+    for semester in selected if selected is not None else registry.semesters(newest_first=True):
+        if not registry.has_links(semester):
+            continue
+        semester_dir = registry.semester_dir(semester)
+        with open(os.path.join(semester_dir, 'course_links.json'), 'r', encoding='utf-8') as f:
+            links = json.load(f)
+        semesters[semester.dir_name] = (CrawlHistory.load(semester_dir), links)
+    return semesters
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl-Plan nach Änderungswahrscheinlichkeit anzeigen")
+    parser.add_argument('--budget', type=int, help="Maximale Anzahl Abrufe pro Lauf")
+    parser.add_argument('--data-dir', default='data')
+    args = parser.parse_args()
+
+    plan, stats = plan_crawl(load_semester_plans(args.data_dir), args.budget)
+    print_plan_stats(stats)
+    for semester, urls in plan.items():
+        if urls:
+            print(f"  {semester}: {len(urls)} Abrufe")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Interaktives Dashboard für die Keyword- und die semantische SDG-Analyse.
+
+Start:
+    streamlit run dashboard.py
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from analysis_comparison import agreement_metrics, overlap_counts
+from result_store import SDG_IDS, ResultStore, refresh_result_store
+from sdg_analysis import get_sdg_descriptions
+
+@st.cache_resource(max_entries=1)
+def open_store(store_version):
+    """Öffnet den memory-mapped Ergebnisspeicher einmal pro Version und Server-Prozess."""
+    return ResultStore()
+
+def get_store():
+    """
+    Prüft bei jedem Rerun, ob die Analyseergebnisse neuer als der Speicher sind (und baut ihn
+    dann neu); ein neu gebauter Speicher hat eine neue Version und wird neu geöffnet.
+    """
+    return open_store(refresh_result_store())
+
+@st.cache_data
+def filter_hits(store_version, semesters, course_types, sdgs):
+    """
+    Filtert Keyword- und semantische Treffer nach Semester, Kurstyp und SDG.
+    store_version ist Teil des Cache-Schlüssels, damit ein neu gebauter Speicher
+    die gecachten Ergebnisse ungültig macht.
+    """
+    store = open_store(store_version)
+    course_mask = store.course_mask(list(semesters), list(course_types))
+    sdg_positions = [SDG_IDS.index(sdg) for sdg in sdgs]
+
+    keyword_mask = course_mask[store.keyword_course] & np.isin(store.keyword_sdg, sdg_positions)
+    semantic_mask = course_mask[store.semantic_course] & np.isin(store.semantic_sdg, sdg_positions)
+
+    return {
+        'num_courses': int(course_mask.sum()),
+        'keyword_course': np.asarray(store.keyword_course[keyword_mask]),
+        'keyword_sdg': np.asarray(store.keyword_sdg[keyword_mask]),
+        'semantic_course': np.asarray(store.semantic_course[semantic_mask]),
+        'semantic_sdg': np.asarray(store.semantic_sdg[semantic_mask]),
+        'semantic_similarity': np.asarray(store.semantic_similarity[semantic_mask])
+    }
+
+@st.cache_data
+def sdg_comparison_frame(store_version, semesters, course_types, sdgs):
+    """Anzahl Kurse pro SDG für beide Methoden sowie deren Übereinstimmung."""
+    hits = filter_hits(store_version, semesters, course_types, sdgs)
+    counts = overlap_counts(hits['keyword_course'], hits['keyword_sdg'],
+                            hits['semantic_course'], hits['semantic_sdg'],
+                            np.zeros(open_store(store_version).num_courses, dtype=np.int64), 1)
+    metrics = agreement_metrics(counts)
+    positions = [SDG_IDS.index(sdg) for sdg in sdgs]
+    return pd.DataFrame({
+        'SDG': list(sdgs),
+        'Keyword': (counts['both'] + counts['keyword_only'])[0, positions],
+        'Semantisch': (counts['both'] + counts['semantic_only'])[0, positions],
+        'Beide': counts['both'][0, positions],
+        'Jaccard': np.nan_to_num(metrics['jaccard'][0, positions])
+    })
+
+@st.cache_data
+def temporal_frame(store_version, semesters, course_types, sdgs):
+    """Anzahl Kurse pro Semester, SDG und Methode für den Zeitverlauf."""
+    store = open_store(store_version)
+    hits = filter_hits(store_version, semesters, course_types, sdgs)
+    frames = []
+    for method, course_col, sdg_col in (('Keyword', 'keyword_course', 'keyword_sdg'),
+                                        ('Semantisch', 'semantic_course', 'semantic_sdg')):
+        if len(hits[course_col]) == 0:
+            continue
+        frame = pd.DataFrame({
+            'Semester': np.asarray(store.course_semester[hits[course_col]]),
+            'SDG': hits[sdg_col]
+        })
+        frame = frame.groupby(['Semester', 'SDG']).size().reset_index(name='Kurse')
+        frame['Semester'] = [store.semesters[i] for i in frame['Semester']]
+        frame['SDG'] = [SDG_IDS[i] for i in frame['SDG']]
+        frame['Methode'] = method
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=['Semester', 'SDG', 'Kurse', 'Methode'])
+    return pd.concat(frames, ignore_index=True)
+
+@st.cache_data
+def course_table(store_version, semesters, course_types, sdgs):
+    """Kurse mit mindestens einem Treffer in den gewählten SDGs."""
+    store = open_store(store_version)
+    hits = filter_hits(store_version, semesters, course_types, sdgs)
+    course_indices = np.union1d(hits['keyword_course'], hits['semantic_course'])
+    frame = store.courses_frame(course_indices)
+    frame['Keyword-SDGs'] = pd.Series(hits['keyword_course']).value_counts().reindex(course_indices, fill_value=0).values
+    frame['Semantische SDGs'] = pd.Series(hits['semantic_course']).value_counts().reindex(course_indices, fill_value=0).values
+    return frame
+
+def course_details(store, course_index):
+    """Keyword- und semantische Treffer eines einzelnen Kurses."""
+    # Treffer sind nach Kurs sortiert: Bereich per binärer Suche bestimmen
+    keyword_rows = np.arange(*np.searchsorted(store.keyword_course, [course_index, course_index + 1]))
+    semantic_rows = np.arange(*np.searchsorted(store.semantic_course, [course_index, course_index + 1]))
+    keyword_frame = pd.DataFrame({
+        'SDG': [SDG_IDS[store.keyword_sdg[i]] for i in keyword_rows],
+        'Gefundene Schlagwörter': store.keyword_found.take(keyword_rows)
+    })
+    semantic_frame = pd.DataFrame({
+        'SDG': [SDG_IDS[store.semantic_sdg[i]] for i in semantic_rows],
+        'Ähnlichkeit': [float(store.semantic_similarity[i]) for i in semantic_rows],
+        'Hohe Konfidenz': [bool(store.semantic_high[i]) for i in semantic_rows]
+    })
+    return keyword_frame, semantic_frame
+
+def main():
+    st.set_page_config(page_title="SDG-Analyse Lehrveranstaltungen", layout="wide")
+    st.title("SDG-Bezüge in Lehrveranstaltungen der Universität Wien")
+
+    store = get_store()
+    sdg_descriptions = get_sdg_descriptions()
+
+    # Filter
+    st.sidebar.header("Filter")
+    semesters = tuple(st.sidebar.multiselect("Semester", store.semesters, default=store.semesters))
+    course_types = tuple(st.sidebar.multiselect("Kurstyp", store.course_types, default=store.course_types))
+    sdgs = tuple(st.sidebar.multiselect(
+        "SDGs", SDG_IDS, default=SDG_IDS,
+        format_func=lambda sdg: f"{sdg} - {sdg_descriptions[sdg]}"
+    ))
+
+    if not (semesters and course_types and sdgs):
+        st.info("Bitte mindestens ein Semester, einen Kurstyp und ein SDG auswählen.")
+        return
+
+    hits = filter_hits(store.version, semesters, course_types, sdgs)
+    comparison = sdg_comparison_frame(store.version, semesters, course_types, sdgs)
+
+    # Kennzahlen
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Kurse in Auswahl", hits['num_courses'])
+    col2.metric("Kurse mit Keyword-Bezug", len(np.unique(hits['keyword_course'])))
+    col3.metric("Kurse mit semantischem Bezug", len(np.unique(hits['semantic_course'])))
+
+    # Methodenvergleich
+    st.subheader("Vergleich Keyword- und semantische Analyse")
+    st.plotly_chart(px.bar(
+        comparison.melt(id_vars='SDG', value_vars=['Keyword', 'Semantisch', 'Beide'],
+                        var_name='Methode', value_name='Kurse'),
+        x='SDG', y='Kurse', color='Methode', barmode='group'
+    ), use_container_width=True)
+    st.dataframe(comparison, hide_index=True, use_container_width=True)
+
+    # Zeitliche Entwicklung
+    st.subheader("Zeitliche Entwicklung")
+    temporal = temporal_frame(store.version, semesters, course_types, sdgs)
+    if not temporal.empty:
+        st.plotly_chart(px.line(
+            temporal, x='Semester', y='Kurse', color='SDG', line_dash='Methode', markers=True,
+            category_orders={'Semester': [s for s in store.semesters if s in semesters]}
+        ), use_container_width=True)
+
+    # Drill-down auf einzelne Kurse
+    st.subheader("Kurse")
+    courses = course_table(store.version, semesters, course_types, sdgs)
+    st.dataframe(courses, hide_index=True, use_container_width=True)
+
+    if not courses.empty:
+        selected = st.selectbox(
+            "Kursdetails", courses.index,
+            format_func=lambda i: f"{courses.at[i, 'Kursnummer']} {courses.at[i, 'Kurstitel']} ({courses.at[i, 'Semester']})"
+        )
+        keyword_frame, semantic_frame = course_details(store, selected)
+        st.markdown(f"[Kurs auf ufind öffnen]({courses.at[selected, 'URL']})")
+        left, right = st.columns(2)
+        left.markdown("**Keyword-Analyse**")
+        left.dataframe(keyword_frame, hide_index=True, use_container_width=True)
+        right.markdown("**Semantische Analyse**")
+        right.dataframe(semantic_frame, hide_index=True, use_container_width=True)
+
+if __name__ == "__main__":
+    main()
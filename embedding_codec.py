@@ -0,0 +1,284 @@
+"""
+Komprimierte Speicherung von Embedding-Matrizen.
+
+Drei Formate für die gespeicherten gbert-large-Embeddings (1024 Dimensionen):
+
+- float32: unverändert (4096 Bytes pro Vektor)
+- float16: halbe Größe, praktisch ohne Genauigkeitsverlust für Kosinus-Ähnlichkeiten
+- pq:      Produktquantisierung, z.B. 64 Teilräume à 256 Zentroide = 64 Bytes pro Vektor.
+           Ähnlichkeiten werden direkt auf den Codes über Lookup-Tabellen berechnet
+           (asymmetrische Distanzberechnung), ohne die Vektoren zu dekodieren.
+
+Alle Formate werden als .npy gespeichert und per mmap geladen.
+
+    python embedding_codec.py                     # Bericht über die Embeddings der semantischen Analyse
+    python embedding_codec.py --synthetic 100000  # Bericht über synthetische Embeddings
+"""
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from result_store import load_array
+
+CODECS = ('float32', 'float16', 'pq')
+DEFAULT_SUBSPACES = 64
+DEFAULT_CENTROIDS = 256  # 8 Bit pro Teilraum
+REPORT_FILE = 'data/embedding_codec_report.json'
+
+def _kmeans_euclidean(vectors: np.ndarray, n_clusters: int, n_iter: int, rng: np.random.Generator) -> np.ndarray:
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=len(vectors) < n_clusters)].copy()
+    vector_norms = (vectors ** 2).sum(axis=1, keepdims=True)
+    for _ in range(n_iter):
+        distances = vector_norms - 2 * vectors @ centroids.T + (centroids ** 2).sum(axis=1)
+        assignment = distances.argmin(axis=1)
+        counts = np.bincount(assignment, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+        # Leere Zentroide mit zufälligen Vektoren neu besetzen
+        centroids[~filled] = vectors[rng.choice(len(vectors), int((~filled).sum()))]
+    return centroids
+
+class ProductQuantizer:
+    """
+    Zerlegt Vektoren in num_subspaces Teilvektoren und speichert pro Teilvektor nur den
+    Index des nächsten Zentroids (uint8). Quantisiert wird die Abweichung vom Mittelwert,
+    da BERT-Embeddings einen großen gemeinsamen Anteil haben.
+    """
+
+    def __init__(self, codebooks: np.ndarray, mean: np.ndarray):
+        self.codebooks = codebooks  # (Teilräume, Zentroide, Teilraum-Dimension)
+        self.mean = mean
+        self.num_subspaces, self.num_centroids, self.subspace_dim = codebooks.shape
+
+    @classmethod
+    def fit(cls, vectors: np.ndarray, num_subspaces: int = DEFAULT_SUBSPACES,
+            num_centroids: int = DEFAULT_CENTROIDS, sample_size: int = 10000,
+            n_iter: int = 15, seed: int = 0) -> 'ProductQuantizer':
+        dim = vectors.shape[1]
+        if dim % num_subspaces:
+            raise ValueError(f"Dimension {dim} ist nicht durch {num_subspaces} Teilräume teilbar")
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(len(vectors), min(sample_size, len(vectors)), replace=False)]
+        sample = np.asarray(sample, dtype=np.float32)
+        mean = sample.mean(axis=0)
+        sample = sample - mean
+        subspace_dim = dim // num_subspaces
+        codebooks = np.stack([
+            _kmeans_euclidean(sample[:, i * subspace_dim:(i + 1) * subspace_dim], num_centroids, n_iter, rng)
+            for i in range(num_subspaces)
+        ])
+        return cls(codebooks.astype(np.float32), mean.astype(np.float32))
+
+    def _subvectors(self, vectors: np.ndarray) -> np.ndarray:
+        return np.asarray(vectors, dtype=np.float32).reshape(len(vectors), self.num_subspaces, self.subspace_dim)
+
+    def encode(self, vectors: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+        codes = np.empty((len(vectors), self.num_subspaces), dtype=np.uint8)
+        centroid_norms = (self.codebooks ** 2).sum(axis=2)  # (Teilräume, Zentroide)
+        for start in range(0, len(vectors), batch_size):
+            sub = self._subvectors(np.asarray(vectors[start:start + batch_size], dtype=np.float32) - self.mean)
+            # Distanz bis auf den konstanten Term |x|²: |c|² - 2 x·c
+            distances = centroid_norms[None] - 2 * np.einsum('nsd,skd->nsk', sub, self.codebooks)
+            codes[start:start + batch_size] = distances.argmin(axis=2)
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        subspaces = np.arange(self.num_subspaces)
+        return self.codebooks[subspaces, codes.astype(np.int64)].reshape(len(codes), -1) + self.mean
+
+    def lookup_table(self, query: np.ndarray):
+        """
+        Skalarprodukte des Anfrage-Teilvektors mit allen Zentroiden pro Teilraum,
+        dazu der konstante Anteil Anfrage · Mittelwert.
+        """
+        table = np.einsum('sd,skd->sk', self._subvectors(query[None])[0], self.codebooks)
+        return table, float(query @ self.mean)
+
+    def inner_products(self, codes: np.ndarray, lookup) -> np.ndarray:
+        """Approximierte Skalarprodukte aller codierten Vektoren mit der Anfrage (ADC)."""
+        table, offset = lookup
+        scores = np.full(len(codes), offset, dtype=np.float32)
+        # Pro Teilraum ein eindimensionaler Tabellenzugriff über alle Codes
+        for subspace in range(self.num_subspaces):
+            scores += table[subspace][codes[:, subspace]]
+        return scores
+
+class EncodedEmbeddings:
+    """
+    Gespeicherte Embedding-Matrix in einem der Formate aus CODECS.
+    Dateien: <prefix>.npy (Vektoren bzw. PQ-Codes), bei pq zusätzlich <prefix>.codebooks.npy
+    und <prefix>.mean.npy. Das Format wird nicht aus den Dateien erraten, sondern vom
+    Aufrufer gespeichert (z. B. in der meta.json des Index) und an load übergeben.
+    """
+
+    def __init__(self, codec: str, data: np.ndarray, quantizer: Optional[ProductQuantizer] = None):
+        self.codec = codec
+        self.data = data
+        self.quantizer = quantizer
+
+    def __len__(self):
+        return len(self.data)
+
+    @classmethod
+    def encode(cls, vectors: np.ndarray, codec: str = 'float16',
+               quantizer: Optional[ProductQuantizer] = None, **pq_options) -> 'EncodedEmbeddings':
+        if codec not in CODECS:
+            raise ValueError(f"Unbekanntes Format: {codec} (erlaubt: {', '.join(CODECS)})")
+        if codec == 'pq':
+            if quantizer is None:
+                quantizer = ProductQuantizer.fit(vectors, **pq_options)
+            return cls(codec, quantizer.encode(vectors), quantizer)
+        return cls(codec, np.asarray(vectors, dtype=np.dtype(codec)))
+
+    def save(self, prefix: Path):
+        """Speichert die Dateien des Formats; Codebooks eines früheren pq-Formats werden entfernt."""
+        prefix = Path(prefix)
+        np.save(f"{prefix}.npy", self.data)
+        sidecars = {Path(f"{prefix}.codebooks.npy"): self.quantizer.codebooks if self.quantizer is not None else None,
+                    Path(f"{prefix}.mean.npy"): self.quantizer.mean if self.quantizer is not None else None}
+        for path, array in sidecars.items():
+            if array is not None:
+                np.save(path, array)
+            elif path.exists():
+                path.unlink()
+
+    @classmethod
+    def load(cls, prefix: Path, codec: str) -> 'EncodedEmbeddings':
+        """Lädt per mmap im gespeicherten Format codec."""
+        if codec not in CODECS:
+            raise ValueError(f"Unbekanntes Format: {codec} (erlaubt: {', '.join(CODECS)})")
+        prefix = Path(prefix)
+        data = load_array(Path(f"{prefix}.npy"))
+        if codec == 'pq':
+            quantizer = ProductQuantizer(np.load(f"{prefix}.codebooks.npy"), np.load(f"{prefix}.mean.npy"))
+            return cls(codec, data, quantizer)
+        if data.dtype != np.dtype(codec):
+            raise ValueError(f"{prefix}.npy hat den dtype {data.dtype}, erwartet {codec}")
+        return cls(codec, data)
+
+    @property
+    def nbytes(self) -> int:
+        codebook_bytes = self.quantizer.codebooks.nbytes + self.quantizer.mean.nbytes if self.quantizer is not None else 0
+        return int(self.data.nbytes + codebook_bytes)
+
+    def decode(self, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        block = self.data[start:end]
+        if self.quantizer is not None:
+            return self.quantizer.decode(np.asarray(block))
+        return np.asarray(block, dtype=np.float32)
+
+    def prepare_query(self, query: np.ndarray):
+        """Einmal pro Anfrage: bei pq die Lookup-Tabelle, sonst der float32-Vektor."""
+        query = np.asarray(query, dtype=np.float32)
+        return self.quantizer.lookup_table(query) if self.quantizer is not None else query
+
+    def inner_products(self, prepared_query, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        """Skalarprodukte der Zeilen start:end mit der Anfrage, direkt auf dem gespeicherten Format."""
+        block = self.data[start:end]
+        if self.quantizer is not None:
+            return self.quantizer.inner_products(block, prepared_query)
+        if block.dtype != np.float32:
+            block = block.astype(np.float32)
+        return block @ prepared_query
+
+def tradeoff_report(vectors: np.ndarray, num_queries: int = 200, k: int = 10,
+                    subspace_options: List[int] = (32, 64, 128), work_dir: Optional[Path] = None,
+                    seed: int = 0) -> List[Dict]:
+    """
+    Misst Größe, Ladezeit (mmap), Anfragezeit und Genauigkeit (Recall@k, Fehler der
+    Kosinus-Ähnlichkeit) der Formate gegenüber exakten float32-Ähnlichkeiten.
+    """
+    import tempfile
+    vectors = np.asarray(vectors, dtype=np.float32)
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    rng = np.random.default_rng(seed)
+    query_rows = rng.choice(len(vectors), min(num_queries, len(vectors)), replace=False)
+    exact = vectors[query_rows] @ vectors.T
+    exact_top = np.argsort(-exact, axis=1)[:, :k]
+    shortlist = min(10 * k, len(vectors) - 1)
+
+    variants = [('float32', {}), ('float16', {})] + [('pq', {'num_subspaces': m}) for m in subspace_options
+                                                      if vectors.shape[1] % m == 0]
+    work_dir = Path(work_dir or tempfile.mkdtemp())
+    rows = []
+    for codec, options in variants:
+        name = codec if codec != 'pq' else f"pq{options['num_subspaces']}"
+        start = time.perf_counter()
+        encoded = EncodedEmbeddings.encode(vectors, codec, **options)
+        encode_seconds = time.perf_counter() - start
+        encoded.save(work_dir / name)
+
+        start = time.perf_counter()
+        loaded = EncodedEmbeddings.load(work_dir / name, codec)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        recalls, shortlist_recalls, errors, query_times = [], [], [], []
+        for i, row in enumerate(query_rows):
+            start = time.perf_counter()
+            scores = loaded.inner_products(loaded.prepare_query(vectors[row]))
+            query_times.append(time.perf_counter() - start)
+            ranked = np.argpartition(-scores, shortlist)[:shortlist]
+            top = ranked[np.argsort(-scores[ranked])[:k]]
+            recalls.append(len(set(top) & set(exact_top[i])) / k)
+            # Anteil der exakten Top-k unter den besten 10*k (Kandidaten für ein exaktes Nachranking)
+            shortlist_recalls.append(len(set(ranked) & set(exact_top[i])) / k)
+            errors.append(np.abs(scores - exact[i]).mean())
+
+        rows.append({
+            'codec': name,
+            'bytes_per_vector': loaded.data.nbytes / len(vectors),
+            'total_mb': loaded.nbytes / 2**20,
+            'compression': vectors.nbytes / loaded.nbytes,
+            'encode_seconds': encode_seconds,
+            'mmap_load_ms': load_ms,
+            'full_scan_ms': float(np.median(query_times) * 1000),
+            f'recall_at_{k}': float(np.mean(recalls)),
+            f'recall_at_{k}_in_{shortlist}': float(np.mean(shortlist_recalls)),
+            'mean_abs_error': float(np.mean(errors))
+        })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Größe und Genauigkeit der Embedding-Formate vergleichen")
+    parser.add_argument('--embeddings', default='data/canonical/semantic_embeddings.npy',
+                        help="Embedding-Matrix (.npy) für den Bericht")
+    parser.add_argument('--synthetic', type=int, help="Stattdessen N synthetische 1024-dim Embeddings verwenden")
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--output', default=REPORT_FILE)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        # Gruppierte Vektoren, damit Nachbarschaften wie bei echten Kurstexten existieren
+        rng = np.random.default_rng(0)
+        centers = rng.standard_normal((max(1, args.synthetic // 200), 1024)).astype(np.float32)
+        vectors = centers[rng.integers(0, len(centers), args.synthetic)] \
+            + 0.5 * rng.standard_normal((args.synthetic, 1024)).astype(np.float32)
+    elif os.path.exists(args.embeddings):
+        vectors = np.load(args.embeddings)
+    else:
+        print(f"Keine Embeddings gefunden: {args.embeddings}")
+        return
+
+    print(f"Vergleiche Formate für {len(vectors)} Embeddings ({vectors.shape[1]} Dimensionen)...")
+    rows = tradeoff_report(vectors, num_queries=args.queries)
+    print(f"\n{'Format':<10}{'Bytes/Vektor':>14}{'MB':>10}{'Faktor':>8}{'Laden ms':>10}"
+          f"{'Scan ms':>10}{'Recall@10':>11}{'in Top-100':>12}{'Fehler':>10}")
+    for row in rows:
+        print(f"{row['codec']:<10}{row['bytes_per_vector']:>14.0f}{row['total_mb']:>10.1f}{row['compression']:>8.1f}"
+              f"{row['mmap_load_ms']:>10.2f}{row['full_scan_ms']:>10.2f}{row['recall_at_10']:>11.3f}"
+              f"{row.get('recall_at_10_in_100', float('nan')):>12.3f}{row['mean_abs_error']:>10.4f}")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'num_vectors': len(vectors), 'dim': int(vectors.shape[1]), 'codecs': rows}, f, indent=2)
+    print(f"\nBericht gespeichert in: {args.output}")
+
+if __name__ == "__main__":
+    main()
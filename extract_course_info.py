@@ -1,3 +1,4 @@
+import argparse
 import requests
 from bs4 import BeautifulSoup
 import json
@@ -6,8 +7,12 @@ from datetime import datetime
 import sys
 import os
 import glob
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Optional
-import re
+from crawl_scheduler import CrawlHistory, load_semester_plans, plan_crawl, print_plan_stats
+from instrumentation import count, run_instrumented, timer
+from page_archive import PageArchive, read_record
+from semester_registry import SemesterRegistry, latest_course_file, semester_from_url
 
 def load_semester_info(semester_dir: str) -> Dict:
     """
@@ -20,88 +25,102 @@ def load_semester_info(semester_dir: str) -> Dict:
     with open(info_file, 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def extract_course_info(url: str) -> Optional[Dict]:
+def parse_course_page(html: str, url: str) -> Dict:
+    """Extrahiert die Kursfelder aus dem HTML einer ufind-Kursseite."""
+    soup = BeautifulSoup(html, 'html.parser')
+    course_info = {'url': url}
+    
+    # Extrahiere Semester aus URL und mappe auf korrektes Format
+    semester = semester_from_url(url)
+    if semester is not None:
+        course_info['semester_code'] = semester.semester_id
+    
+    # Extract course number and type
+    title = soup.find('h1', class_='title')
+    if title:
+        number_span = title.find('span', class_='number')
+        type_span = title.find('abbr', class_='type')
+        what_span = title.find('span', class_='what')
+        when_span = title.find('span', class_='when')
+        
+        course_info['number'] = number_span.text.strip() if number_span else None
+        course_info['type'] = type_span.text.strip() if type_span else None
+        course_info['title'] = what_span.text.strip() if what_span else None
+        course_info['semester'] = when_span.text.strip() if when_span else None
+    
+    # Extract subtitle
+    subtitle = soup.find('h2', class_='subtitle')
+    if subtitle:
+        course_info['subtitle'] = subtitle.text.strip()
+    
+    # Extract ECTS and SWS
+    details = soup.find('div', class_='details')
+    if details:
+        ects_span = details.find('span', class_='ects')
+        sws_span = details.find('span', class_='sws')
+        course_info['ects'] = float(ects_span.text.strip()) if ects_span else None
+        course_info['sws'] = float(sws_span.text.strip()) if sws_span else None
+    
+    # Extract lecturers
+    lecturers = soup.find('ul', class_='lecturers')
+    if lecturers:
+        course_info['lecturers'] = [a.text.strip() for a in lecturers.find_all('a', class_='name')]
+    
+    # Extract course objectives and content
+    comment = soup.find('div', class_='comment text')
+    if comment:
+        course_info['objectives_and_content'] = comment.text.strip()
+    
+    # Extract examination info
+    performance = soup.find('div', class_='performance text')
+    if performance:
+        course_info['examination_info'] = performance.text.strip()
+    
+    # Extract minimum requirements
+    preconditions = soup.find('div', class_='preconditions text')
+    if preconditions:
+        course_info['minimum_requirements'] = preconditions.text.strip()
+    
+    # Extract literature
+    literature = soup.find('div', class_='literature text')
+    if literature:
+        course_info['literature'] = literature.text.strip()
+    
+    return course_info
+
+def extract_course_info(url: str, archive: Optional[PageArchive] = None) -> Optional[Dict]:
+    """Lädt und parst eine Kursseite; mit archive wird das HTML vor dem Parsen archiviert."""
     try:
         print(f"Verarbeite Kurs: {url}")
-        response = requests.get(url, timeout=10)
+        with timer('fetch'):
+            response = requests.get(url, timeout=10)
         response.encoding = 'utf-8'
+        count('pages_fetched')
+        count('bytes_fetched', len(response.content))
+        if archive is not None:
+            with timer('archive'):
+                archive.append(url, response.text, response.status_code)
         
         if response.status_code != 200:
+            count('fetch_errors')
             print(f"Fehler beim Laden von {url}: Status code {response.status_code}")
             return None
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        course_info = {'url': url}
-        
-        # Extrahiere Semester aus URL und mappe auf korrektes Format
-        semester_match = re.search(r'semester=(\d{4})([SW])', url)
-        if semester_match:
-            year = semester_match.group(1)
-            term = semester_match.group(2)
-            semester_code = f"{'WS' if term == 'W' else 'SS'}{year}"
-            course_info['semester_code'] = semester_code
-        
-        # Extract course number and type
-        title = soup.find('h1', class_='title')
-        if title:
-            number_span = title.find('span', class_='number')
-            type_span = title.find('abbr', class_='type')
-            what_span = title.find('span', class_='what')
-            when_span = title.find('span', class_='when')
-            
-            course_info['number'] = number_span.text.strip() if number_span else None
-            course_info['type'] = type_span.text.strip() if type_span else None
-            course_info['title'] = what_span.text.strip() if what_span else None
-            course_info['semester'] = when_span.text.strip() if when_span else None
-        
-        # Extract subtitle
-        subtitle = soup.find('h2', class_='subtitle')
-        if subtitle:
-            course_info['subtitle'] = subtitle.text.strip()
-        
-        # Extract ECTS and SWS
-        details = soup.find('div', class_='details')
-        if details:
-            ects_span = details.find('span', class_='ects')
-            sws_span = details.find('span', class_='sws')
-            course_info['ects'] = float(ects_span.text.strip()) if ects_span else None
-            course_info['sws'] = float(sws_span.text.strip()) if sws_span else None
-        
-        # Extract lecturers
-        lecturers = soup.find('ul', class_='lecturers')
-        if lecturers:
-            course_info['lecturers'] = [a.text.strip() for a in lecturers.find_all('a', class_='name')]
-        
-        # Extract course objectives and content
-        comment = soup.find('div', class_='comment text')
-        if comment:
-            course_info['objectives_and_content'] = comment.text.strip()
-        
-        # Extract examination info
-        performance = soup.find('div', class_='performance text')
-        if performance:
-            course_info['examination_info'] = performance.text.strip()
-        
-        # Extract minimum requirements
-        preconditions = soup.find('div', class_='preconditions text')
-        if preconditions:
-            course_info['minimum_requirements'] = preconditions.text.strip()
-        
-        # Extract literature
-        literature = soup.find('div', class_='literature text')
-        if literature:
-            course_info['literature'] = literature.text.strip()
-        
-        return course_info
+        with timer('parse'):
+            return parse_course_page(response.text, url)
     
     except requests.RequestException as e:
+        count('fetch_errors')
         print(f"Netzwerkfehler bei {url}: {str(e)}")
         return None
     except Exception as e:
+        count('parse_errors')
         print(f"Fehler bei der Verarbeitung von {url}: {str(e)}")
         return None
 
-def crawl_all_courses(links: List[str], delay: float = 1.0) -> List[Dict]:
+def crawl_all_courses(links: List[str], delay: float = 1.0, archive: Optional[PageArchive] = None,
+                      history: Optional[CrawlHistory] = None) -> List[Dict]:
+    """Lädt die Kursseiten der Links nacheinander; mit history wird jeder Abruf in der Crawl-Historie vermerkt."""
     courses = []
     total = len(links)
     
@@ -117,7 +136,9 @@ def crawl_all_courses(links: List[str], delay: float = 1.0) -> List[Dict]:
         sys.stdout.write(f"\rFortschritt: {progress:.1f}% ({i}/{total}) - Verbleibende Zeit: {remaining:.0f}s")
         sys.stdout.flush()
         
-        course_info = extract_course_info(url)
+        course_info = extract_course_info(url, archive)
+        if history is not None:
+            history.record(url, course_info)
         if course_info:
             courses.append(course_info)
         
@@ -126,9 +147,55 @@ def crawl_all_courses(links: List[str], delay: float = 1.0) -> List[Dict]:
     print("\nVerarbeitung abgeschlossen!")
     return courses
 
-def process_semester(semester_dir: str, delay: float = 1.0) -> Dict:
+def _parse_archived(archive_file: str, entries: List[Dict]) -> List[Optional[Dict]]:
+    """Parst einen Block archivierter Seiten (läuft im Worker-Prozess)."""
+    courses = []
+    with open(archive_file, 'rb') as f:
+        for entry in entries:
+            try:
+                _, html = read_record(f, entry['offset'])
+                courses.append(parse_course_page(html, entry['url']))
+            except Exception as e:
+                print(f"Fehler beim Parsen von {entry['url']}: {str(e)}")
+                courses.append(None)
+    return courses
+
+def replay_archive(archive: PageArchive, links: List[str], workers: Optional[int] = None,
+                   chunk_size: int = 200) -> List[Dict]:
+    """
+    Parst die archivierten Seiten der Links erneut, parallel auf allen Kernen und ohne
+    Netzwerkzugriff. Die Worker lesen die Seiten selbst über Offsets aus dem Archiv.
+    """
+    latest = archive.latest()
+    entries = [latest[url] for url in links if url in latest]
+    missing = len(links) - len(entries)
+    if missing:
+        print(f"⚠️ {missing} Kurs-Links sind nicht im Archiv und werden übersprungen")
+    print(f"Parse {len(entries)} archivierte Seiten...")
+
+    chunks = [entries[start:start + chunk_size] for start in range(0, len(entries), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    with timer('parse'):
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_parse_archived, [archive.archive_file] * len(chunks), chunks))
+        else:
+            results = [_parse_archived(archive.archive_file, chunk) for chunk in chunks]
+    courses = [course for chunk in results for course in chunk if course]
+    count('pages_replayed', len(entries))
+    count('parse_errors', len(entries) - len(courses))
+    return courses
+
+def process_semester(semester_dir: str, delay: float = 1.0, replay: bool = False,
+                     workers: Optional[int] = None, crawl_urls: Optional[List[str]] = None,
+                     history: Optional[CrawlHistory] = None) -> Dict:
     """
-    Verarbeitet ein Semester mit der korrigierten Struktur
+    Verarbeitet ein Semester mit der korrigierten Struktur. Mit replay werden die Kurse aus
+    dem Seitenarchiv statt von ufind gelesen.
+
+    Mit crawl_urls (Crawl-Plan) werden nur diese Seiten abgerufen; die übrigen Kurse werden
+    aus der letzten Kursdatei übernommen, ebenso eingeplante Kurse, deren Abruf fehlschlägt
+    (gezählt als failed_carried_over).
     """
     # Lade Semester-Informationen
     semester_info = load_semester_info(semester_dir)
@@ -142,7 +209,36 @@ def process_semester(semester_dir: str, delay: float = 1.0) -> Dict:
         course_links = json.load(f)
     
     # Verarbeite alle Kurse
-    all_courses = crawl_all_courses(course_links, delay)
+    archive = PageArchive(semester_dir)
+    carried_over = failed_carried_over = 0
+    if replay:
+        all_courses = replay_archive(archive, course_links, workers)
+    else:
+        history = history or CrawlHistory.load(semester_dir)
+        previous_file = latest_course_file(semester_dir)
+        try:
+            fetched = crawl_all_courses(course_links if crawl_urls is None else crawl_urls, delay, archive, history)
+        finally:
+            history.save()
+        all_courses = fetched
+        if crawl_urls is not None and previous_file is not None:
+            # Nicht eingeplante und fehlgeschlagene Kurse unverändert übernehmen, Reihenfolge wie in course_links.json
+            with open(previous_file, 'r', encoding='utf-8') as f:
+                previous = {course.get('url'): course for course in json.load(f)['courses']}
+            requested = set(crawl_urls)
+            fresh = {course['url']: course for course in fetched}
+            all_courses = []
+            for url in course_links:
+                if url in fresh:
+                    all_courses.append(fresh[url])
+                elif url in previous:
+                    all_courses.append(previous[url])
+                    if url in requested:
+                        failed_carried_over += 1
+                    else:
+                        carried_over += 1
+            if failed_carried_over:
+                print(f"⚠️ {failed_carried_over} eingeplante Abrufe fehlgeschlagen, Kurse aus {os.path.basename(previous_file)} übernommen")
     
     # Generiere Ausgabedatei mit korrektem Zeitstempel
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -152,11 +248,14 @@ def process_semester(semester_dir: str, delay: float = 1.0) -> Dict:
     result = {
         'semester_info': semester_info,
         'extraction_timestamp': timestamp,
+        'source': 'archive' if replay else 'ufind',
+        'carried_over': carried_over,
+        'failed_carried_over': failed_carried_over,
         'courses': all_courses
     }
     
     # Speichere Ergebnisse
-    with open(output_file, 'w', encoding='utf-8') as f:
+    with timer('serialize'), open(output_file, 'w', encoding='utf-8') as f:
         json.dump(result, f, ensure_ascii=False, indent=2)
     
     return {
@@ -165,10 +264,19 @@ def process_semester(semester_dir: str, delay: float = 1.0) -> Dict:
         'courses_saved': len(all_courses),
         'total_links': len(course_links),
         'output_file': output_file,
+        'carried_over': carried_over,
+        'failed_carried_over': failed_carried_over,
         'success_rate': (len(all_courses)/len(course_links))*100 if course_links else 0
     }
 
-if __name__ == '__main__':
+def main(only_new: bool = False, replay: bool = False, workers: Optional[int] = None,
+         budget: Optional[int] = None):
+    """
+    Extrahiert die Kurs-Informationen aller (oder nur der neuen) Semester-Verzeichnisse.
+    Mit replay werden die Kursdateien aus den Seitenarchiven neu erzeugt.
+    Mit budget werden höchstens so viele Seiten abgerufen, nach Änderungswahrscheinlichkeit
+    über alle Semester ausgewählt (crawl_scheduler.py).
+    """
     print("="*80)
     print("Starte Extraktion der Kurs-Informationen")
     print("="*80)
@@ -178,22 +286,49 @@ if __name__ == '__main__':
         print("Daten-Verzeichnis nicht gefunden. Bitte zuerst extract_course_links.py ausführen.")
         sys.exit(1)
     
-    # Finde alle Semester-Verzeichnisse mit der neuen Struktur
-    semester_dirs = [d for d in os.listdir(data_dir) 
-                    if os.path.isdir(os.path.join(data_dir, d)) 
-                    and d.startswith('semester_')]
+    # Semester mit Kurs-Links, neueste zuerst
+    registry = SemesterRegistry.load(data_dir)
+    semesters = [semester for semester in registry.semesters(newest_first=True) if registry.has_links(semester)]
     
-    if not semester_dirs:
+    if not semesters:
         print("Keine Semester-Verzeichnisse gefunden. Bitte zuerst extract_course_links.py ausführen.")
         sys.exit(1)
     
+    if replay:
+        semesters = [semester for semester in semesters if PageArchive(registry.semester_dir(semester)).exists()]
+        if not semesters:
+            print("Keine Seitenarchive gefunden. Bitte zuerst ohne --replay crawlen.")
+            return
+    elif only_new:
+        skipped = [semester for semester in semesters if registry.has_courses(semester)]
+        semesters = [semester for semester in semesters if semester not in skipped]
+        if skipped:
+            print(f"Überspringe Semester mit Kursdaten: {', '.join(semester.semester_id for semester in skipped)}")
+        if not semesters:
+            print("Keine neuen Semester.")
+            return
+    
+    # Crawl-Plan nach Änderungswahrscheinlichkeit innerhalb des Request-Budgets
+    plans = {}
+    crawl_plan = {}
+    if budget is not None and not replay:
+        plans = load_semester_plans(data_dir, semesters)
+        crawl_plan, plan_stats = plan_crawl(plans, budget)
+        print_plan_stats(plan_stats)
+
     # Verarbeite jedes Semester
     results = []
-    for semester_dir in semester_dirs:
-        full_dir = os.path.join(data_dir, semester_dir)
+    for semester in semesters:
+        semester_dir = semester.dir_name
+        full_dir = registry.semester_dir(semester)
+        if plans and not crawl_plan.get(semester_dir):
+            print(f"\n{semester_dir}: keine Abrufe eingeplant")
+            continue
         print(f"\nVerarbeite {semester_dir}...")
         try:
-            result = process_semester(full_dir)
+            result = process_semester(full_dir, replay=replay, workers=workers,
+                                      crawl_urls=crawl_plan.get(semester_dir),
+                                      history=plans[semester_dir][0] if plans else None)
             print(f"✅ {result['courses_saved']} Kurse gespeichert in {result['output_file']}")
             print(f"   Erfolgsrate: {result['success_rate']:.1f}%")
             results.append(result)
@@ -212,4 +347,15 @@ if __name__ == '__main__':
     
     print("\n" + "="*80)
     print("Extraktion der Kurs-Informationen abgeschlossen!")
-    print("="*80) 
\ No newline at end of file
+    print("="*80)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Kurs-Informationen der Semester aus ufind extrahieren")
+    parser.add_argument('--only-new', action='store_true', help="Nur Semester ohne gespeicherte Kursdaten")
+    parser.add_argument('--replay', action='store_true',
+                        help="Kursdateien ohne Netzwerkzugriff aus den Seitenarchiven neu erzeugen")
+    parser.add_argument('--workers', type=int, help="Anzahl Prozesse für --replay (Standard: alle Kerne)")
+    parser.add_argument('--budget', type=int,
+                        help="Höchstens so viele Seiten abrufen, wahrscheinlich geänderte und neue zuerst")
+    run_instrumented('extract_course_info', lambda args: main(args.only_new, args.replay, args.workers, args.budget),
+                     parser=parser)
@@ -4,33 +4,37 @@ import json
 import os
 from datetime import datetime
 import re
+import argparse
+from semester_registry import SemesterRegistry, parse_semester, semester_from_links
 
-def get_semester_info(url):
+# Anzahl der jüngsten Semester, die standardmäßig gecrawlt werden
+DEFAULT_SEMESTER_COUNT = 4
+
+# Startseiten für ein leeres Register; die Semester werden aus den Kurs-Links erkannt
+FALLBACK_URLS = [
+    'https://ufind.univie.ac.at/de/vvz_sub.html?path=314583',
+    'https://ufind.univie.ac.at/de/vvz_sub.html?path=306282',
+    'https://ufind.univie.ac.at/de/vvz_sub.html?path=297842',
+    'https://ufind.univie.ac.at/de/vvz_sub.html?path=290492'
+]
+
+def get_semester_info(url, links=None, registry=None):
     """
-    Extrahiert und mapped die korrekten Semester-Informationen
+    Ermittelt die Semester-Informationen einer Kursliste: über die bekannte path-ID im
+    Semester-Register oder über die semester=-Parameter der Kurs-Links.
     """
     match = re.search(r'path=(\d+)', url)
     if not match:
         raise ValueError(f"Keine Semester-ID in URL gefunden: {url}")
     
     path_id = match.group(1)
-    
-    # Korrigiertes Semester-Mapping mit richtigen Beschreibungen
-    semester_mapping = {
-        '314583': {'id': 'WS2024', 'name': 'Wintersemester 2024'},      
-        '306282': {'id': 'SS2024', 'name': 'Sommersemester 2024'},      
-        '297842': {'id': 'WS2023', 'name': 'Wintersemester 2023'},      
-        '290492': {'id': 'SS2023', 'name': 'Sommersemester 2023'}       
-    }
-    
-    if path_id not in semester_mapping:
+    semester = registry.by_path_id(path_id) if registry is not None else None
+    if semester is None and links:
+        semester = semester_from_links(links)
+    if semester is None:
         raise ValueError(f"Unbekannte Semester-ID: {path_id}")
     
-    return {
-        'path_id': path_id,
-        'semester_id': semester_mapping[path_id]['id'],
-        'semester_name': semester_mapping[path_id]['name']
-    }
+    return semester.info(path_id)
 
 def get_course_links(url):
     print(f"\nLade Kursliste von: {url}")
@@ -41,14 +45,20 @@ def get_course_links(url):
         raise Exception(f"Fehler beim Laden der URL: {response.status_code}")
     
     print("Webseite erfolgreich geladen")
-    soup = BeautifulSoup(response.text, 'html.parser')
+    return parse_course_links(response.text)
+
+def parse_course_links(html, verbose=True):
+    """Extrahiert alle Kurs-Links aus dem HTML einer ufind-Kursliste"""
+    soup = BeautifulSoup(html, 'html.parser')
     course_lists = soup.find_all(class_='lv-and-exam-list')
-    print(f"Gefundene Kurslisten: {len(course_lists)}")
+    if verbose:
+        print(f"Gefundene Kurslisten: {len(course_lists)}")
     
     course_links = []
     for i, course_list in enumerate(course_lists, 1):
         links = course_list.find_all('a')
-        print(f"Verarbeite Liste {i}/{len(course_lists)}: {len(links)} Links gefunden")
+        if verbose:
+            print(f"Verarbeite Liste {i}/{len(course_lists)}: {len(links)} Links gefunden")
         for link in links:
             href = link.get('href')
             if href:
@@ -56,14 +66,18 @@ def get_course_links(url):
                     href = 'https://ufind.univie.ac.at/de/' + href.lstrip('/')
                 course_links.append(href)
     
-    print(f"Insgesamt {len(course_links)} Kurs-Links extrahiert")
+    if verbose:
+        print(f"Insgesamt {len(course_links)} Kurs-Links extrahiert")
     return course_links
 
-def process_semester(url):
+def process_semester(url, registry=None):
     print(f"\nVerarbeite Semester von URL: {url}")
     
-    # Hole korrekte Semester-Informationen
-    semester_info = get_semester_info(url)
+    # Hole Kurs-Links; das Semester ergibt sich aus der path-ID oder den Links
+    links = get_course_links(url)
+    semester_info = get_semester_info(url, links, registry)
+    if registry is not None:
+        registry.register(parse_semester(semester_info['semester_id']), semester_info['path_id'])
     semester_dir = f"data/semester_{semester_info['semester_id']}"
     os.makedirs(semester_dir, exist_ok=True)
     print(f"Verzeichnis erstellt/gefunden: {semester_dir}")
@@ -73,8 +87,7 @@ def process_semester(url):
     with open(info_file, 'w', encoding='utf-8') as f:
         json.dump(semester_info, f, ensure_ascii=False, indent=2)
     
-    # Hole und speichere Kurs-Links
-    links = get_course_links(url)
+    # Speichere Kurs-Links
     links_file = os.path.join(semester_dir, 'course_links.json')
     
     print(f"\nSpeichere {len(links)} Links in: {links_file}")
@@ -84,7 +97,34 @@ def process_semester(url):
     
     return semester_info['semester_id'], len(links)
 
-if __name__ == '__main__':
+def semester_urls(registry, only_new=False, count=DEFAULT_SEMESTER_COUNT):
+    """
+    Kurslisten-URLs der count jüngsten bekannten Semester. Die Semesterliste von ufind wird
+    dazu eingelesen; ist sie nicht erreichbar, werden die bekannten Semester verwendet.
+    """
+    try:
+        new = registry.discover()
+        if new:
+            print(f"Neue Semester gefunden: {', '.join(semester.semester_name for semester in new)}")
+    except Exception as e:
+        print(f"⚠️ Semesterliste nicht verfügbar ({str(e)}), verwende bekannte Semester")
+    
+    urls = []
+    for semester in registry.semesters(newest_first=True)[:count]:
+        url = registry.listing_url(semester)
+        if url is None:
+            continue
+        if only_new and registry.has_links(semester):
+            print(f"Überspringe {semester.semester_name} (Links bereits vorhanden)")
+            continue
+        urls.append(url)
+    # Ohne bekannte Semester mit den bisherigen Startseiten beginnen
+    if not urls and not registry.semesters():
+        urls = list(FALLBACK_URLS)
+    return urls
+
+def main(only_new=False, urls=None, count=DEFAULT_SEMESTER_COUNT):
+    """Extrahiert die Kurs-Links aller bekannten (oder nur der neuen) Semester"""
     print("="*80)
     print("Starte Extraktion der Kurs-Links")
     print("="*80)
@@ -92,13 +132,9 @@ if __name__ == '__main__':
     os.makedirs("data", exist_ok=True)
     print("\nDaten-Verzeichnis bereit")
     
-    # Aktualisierte URLs mit korrekter Zuordnung
-    urls = [
-        'https://ufind.univie.ac.at/de/vvz_sub.html?path=314583',  # Wintersemester 2024
-        'https://ufind.univie.ac.at/de/vvz_sub.html?path=306282',  # Sommersemester 2024
-        'https://ufind.univie.ac.at/de/vvz_sub.html?path=297842',  # Wintersemester 2023
-        'https://ufind.univie.ac.at/de/vvz_sub.html?path=290492'   # Sommersemester 2023
-    ]
+    registry = SemesterRegistry.load()
+    if not urls:
+        urls = semester_urls(registry, only_new, count)
     print(f"\nZu verarbeitende Semester: {len(urls)}")
     
     results = []
@@ -106,7 +142,7 @@ if __name__ == '__main__':
         print(f"\nVerarbeite Semester {i}/{len(urls)}")
         print("-"*40)
         try:
-            semester_id, num_links = process_semester(url)
+            semester_id, num_links = process_semester(url, registry)
             results.append({
                 'url': url,
                 'semester_id': semester_id,
@@ -126,6 +162,8 @@ if __name__ == '__main__':
             print(f"\n❌ Fehler bei URL {url}:")
             print(f"   {str(e)}")
     
+    registry.save()
+    
     # Speichere Verarbeitungszusammenfassung
     summary_file = 'data/processing_summary.json'
     print(f"\nSpeichere Zusammenfassung in: {summary_file}")
@@ -134,4 +172,13 @@ if __name__ == '__main__':
     
     print("\n" + "="*80)
     print("Extraktion der Kurs-Links abgeschlossen!")
-    print("="*80) 
\ No newline at end of file
+    print("="*80)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Kurs-Links der Semester aus ufind extrahieren")
+    parser.add_argument('--only-new', action='store_true', help="Nur Semester ohne gespeicherte Kurs-Links")
+    parser.add_argument('--count', type=int, default=DEFAULT_SEMESTER_COUNT,
+                        help="Anzahl der jüngsten Semester")
+    parser.add_argument('urls', nargs='*', help="Kurslisten-URLs (vvz_sub.html?path=...), sonst alle bekannten Semester")
+    args = parser.parse_args()
+    main(args.only_new, args.urls, args.count)
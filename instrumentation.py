@@ -0,0 +1,172 @@
+import argparse
+import cProfile
+import functools
+import json
+import os
+import pstats
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+METRICS_DIR = 'data/metrics'
+PROFILE_DIR = 'data/profiles'
+
+_lock = threading.Lock()
+_timers = defaultdict(lambda: {'calls': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+_counters = defaultdict(int)
+
+def record_time(step: str, seconds: float):
+    """Verbucht eine gemessene Dauer für einen Schritt."""
+    with _lock:
+        entry = _timers[step]
+        entry['calls'] += 1
+        entry['total_seconds'] += seconds
+        if seconds > entry['max_seconds']:
+            entry['max_seconds'] = seconds
+
+@contextmanager
+def timer(step: str):
+    """Misst die Laufzeit des umschlossenen Blocks für den angegebenen Schritt."""
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_time(step, time.perf_counter() - start_time)
+
+def timed(step: str) -> Callable:
+    """Dekorator-Variante von timer()."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(step):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count(name: str, value: int = 1):
+    """Erhöht einen Zähler (z.B. geladene Seiten, analysierte Kurse)."""
+    with _lock:
+        _counters[name] += value
+
+def snapshot() -> Dict:
+    """Aktueller Stand aller Timer und Zähler."""
+    with _lock:
+        return {
+            'timers': {step: dict(entry) for step, entry in _timers.items()},
+            'counters': dict(_counters)
+        }
+
+def reset():
+    with _lock:
+        _timers.clear()
+        _counters.clear()
+
+def export_json(path: str):
+    """Schreibt alle Timer und Zähler als JSON."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    data = snapshot()
+    data['timestamp'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def export_prometheus(path: str):
+    """Schreibt alle Timer und Zähler im Prometheus-Textformat (für den textfile collector)."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    data = snapshot()
+    lines = [
+        '# HELP sdg_step_seconds_total Gesamtlaufzeit pro Pipeline-Schritt in Sekunden',
+        '# TYPE sdg_step_seconds_total counter'
+    ]
+    lines += [f'sdg_step_seconds_total{{step="{step}"}} {entry["total_seconds"]:.6f}'
+              for step, entry in sorted(data['timers'].items())]
+    lines += [
+        '# HELP sdg_step_calls_total Anzahl Aufrufe pro Pipeline-Schritt',
+        '# TYPE sdg_step_calls_total counter'
+    ]
+    lines += [f'sdg_step_calls_total{{step="{step}"}} {entry["calls"]}'
+              for step, entry in sorted(data['timers'].items())]
+    lines += [
+        '# HELP sdg_step_seconds_max Längster einzelner Aufruf pro Pipeline-Schritt in Sekunden',
+        '# TYPE sdg_step_seconds_max gauge'
+    ]
+    lines += [f'sdg_step_seconds_max{{step="{step}"}} {entry["max_seconds"]:.6f}'
+              for step, entry in sorted(data['timers'].items())]
+    lines += [
+        '# HELP sdg_events_total Zähler der Pipeline (Seiten, Kurse, Fehler, ...)',
+        '# TYPE sdg_events_total counter'
+    ]
+    lines += [f'sdg_events_total{{name="{name}"}} {value}'
+              for name, value in sorted(data['counters'].items())]
+
+    # Atomar ersetzen, damit der Collector nie eine halbe Datei liest
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    os.replace(tmp_path, path)
+
+def export_metrics(name: str, metrics_dir: str = METRICS_DIR):
+    """Exportiert die Metriken als <name>.json und <name>.prom."""
+    export_json(os.path.join(metrics_dir, f"{name}.json"))
+    export_prometheus(os.path.join(metrics_dir, f"{name}.prom"))
+
+@contextmanager
+def profile(name: str, enabled: bool = True, profile_dir: str = PROFILE_DIR):
+    """
+    Profiliert den umschlossenen Block mit cProfile.
+    Schreibt <name>_<timestamp>.prof (pstats/snakeviz/flameprof) und eine Textzusammenfassung.
+    """
+    if not enabled:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Ab Python 3.12 darf nur ein Profiler gleichzeitig aktiv sein (parallele Stages)
+        print(f"⚠️  Profiling für {name} nicht möglich: {str(e)}")
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        profiler.disable()
+        os.makedirs(profile_dir, exist_ok=True)
+        base = os.path.join(profile_dir, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        profiler.dump_stats(f"{base}.prof")
+        with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+            stats = pstats.Stats(profiler, stream=f)
+            stats.sort_stats('cumulative').print_stats(40)
+        print(f"Profil gespeichert: {base}.prof")
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Fügt --profile und --metrics-dir zu einem Argument-Parser hinzu."""
+    parser.add_argument('--profile', action='store_true',
+                        help=f"Stage mit cProfile ausführen (Ausgabe in {PROFILE_DIR}/)")
+    parser.add_argument('--metrics-dir', default=METRICS_DIR,
+                        help="Verzeichnis für die exportierten Metriken (JSON und Prometheus)")
+
+def run_instrumented(name: str, func: Callable, argv: Optional[List[str]] = None,
+                     parser: Optional[argparse.ArgumentParser] = None):
+    """
+    Einstiegspunkt für die Skripte: führt func optional unter cProfile aus und
+    exportiert anschließend alle Timer und Zähler.
+
+    Wird ein eigener Argument-Parser übergeben, erhält func die geparsten Argumente.
+    """
+    own_parser = parser is None
+    if own_parser:
+        parser = argparse.ArgumentParser(description=f"{name} mit Instrumentierung ausführen")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        with profile(name, enabled=args.profile):
+            return func() if own_parser else func(args)
+    finally:
+        export_metrics(name, args.metrics_dir)
+        print(f"Metriken gespeichert in: {args.metrics_dir}/{name}.json und {name}.prom")
@@ -0,0 +1,207 @@
+import json
+import os
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from course_record import CourseRecord
+
+INDEX_DIR = 'data/keyword_index'
+SNIPPET_CONTEXT = 60  # Zeichen links und rechts des ersten Treffers
+
+def _smallest_uint(values: np.ndarray) -> np.ndarray:
+    """Speichert (Delta-)Werte im kleinsten passenden unsigned-Typ."""
+    if values.size == 0 or values.max() < 2**16:
+        return values.astype(np.uint16)
+    return values.astype(np.uint32)
+
+def _delta_encode(values: List[int]) -> List[int]:
+    return [values[0]] + [b - a for a, b in zip(values, values[1:])] if values else []
+
+def _pack_strings(values: List[str]):
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(value) for value in encoded])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+class KeywordIndexBuilder:
+    """
+    Baut während der Keyword-Analyse einen invertierten Index auf:
+    Keyword -> Posting-Liste (Kurs-ID, Zeichenpositionen im normalisierten Text, Snippet).
+    """
+
+    def __init__(self):
+        self.docs = []                      # Kurs-ID -> [Semester, URL, Kursnummer, Titel]
+        self.postings = defaultdict(list)   # Keyword -> [(Kurs-ID, Positionen, Snippet)]
+        self.keyword_sdgs = defaultdict(set)
+
+    def add_document(self, course: CourseRecord, semester: str) -> int:
+        self.docs.append([semester, course.url or '', course.number or '', course.title or ''])
+        return len(self.docs) - 1
+
+    def add_hits(self, doc_id: int, normalized_text: str, findings: Dict[str, List[str]], lexicon,
+                 include_fuzzy: bool = False):
+        """
+        Verbucht die gefundenen Keywords eines Kurses mit ihren Positionen: den Anfängen der
+        Tokens, die das Keyword-Lexikon zum Keyword aufgelöst hat (siehe keyword_lexicon.py).
+        """
+        keywords = defaultdict(set)
+        for sdg, found_keywords in findings.items():
+            for keyword in found_keywords:
+                keywords[keyword].add(sdg)
+        positions = lexicon.keyword_positions(normalized_text, set(keywords), include_fuzzy)
+        for keyword, sdgs in keywords.items():
+            self.keyword_sdgs[keyword].update(sdgs)
+            if keyword not in positions:
+                continue
+            keyword_positions = sorted(positions[keyword])
+            self.postings[keyword].append((doc_id, keyword_positions,
+                                           self._snippet(normalized_text, keyword_positions[0])))
+
+    @staticmethod
+    def _snippet(text: str, position: int) -> str:
+        """Textausschnitt um den ersten Treffer, ohne angeschnittene Wörter an den Rändern."""
+        start = max(0, position - SNIPPET_CONTEXT)
+        end = min(len(text), position + SNIPPET_CONTEXT)
+        words = text[start:end].split()
+        if start > 0 and len(words) > 1:
+            words = words[1:]
+        if end < len(text) and len(words) > 1:
+            words = words[:-1]
+        return ' '.join(words)
+
+    def save(self, index_dir: str = INDEX_DIR):
+        """
+        Speichert den Index kompakt: pro Keyword delta-kodierte, sortierte Kurs-IDs,
+        pro Posting delta-kodierte Positionen (jeweils im kleinsten uint-Typ).
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        keywords = sorted(self.postings)
+
+        posting_offsets = [0]
+        doc_deltas = []
+        position_offsets = [0]
+        position_deltas = []
+        snippets = []
+        for keyword in keywords:
+            postings = sorted(self.postings[keyword], key=lambda posting: posting[0])
+            doc_deltas.extend(_delta_encode([doc_id for doc_id, _, _ in postings]))
+            posting_offsets.append(len(doc_deltas))
+            for _, positions, snippet in postings:
+                position_deltas.extend(_delta_encode(positions))
+                position_offsets.append(len(position_deltas))
+                snippets.append(snippet)
+
+        snippet_bytes, snippet_offsets = _pack_strings(snippets)
+        np.savez_compressed(
+            os.path.join(index_dir, 'postings.npz'),
+            posting_offsets=np.array(posting_offsets, dtype=np.int64),
+            doc_deltas=_smallest_uint(np.array(doc_deltas, dtype=np.int64)),
+            position_offsets=np.array(position_offsets, dtype=np.int64),
+            position_deltas=_smallest_uint(np.array(position_deltas, dtype=np.int64)),
+            snippet_bytes=snippet_bytes,
+            snippet_offsets=snippet_offsets
+        )
+        with open(os.path.join(index_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'keywords': keywords,
+                'keyword_sdgs': {keyword: sorted(self.keyword_sdgs[keyword]) for keyword in keywords},
+                'docs': self.docs
+            }, f, ensure_ascii=False)
+
+class KeywordIndex:
+    """Abfrage-API über den gespeicherten invertierten Keyword-Index."""
+
+    def __init__(self, index_dir: str = INDEX_DIR):
+        with open(os.path.join(index_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        self.keywords = meta['keywords']
+        self.keyword_sdgs = meta['keyword_sdgs']
+        self.docs = meta['docs']
+        self._keyword_ids = {keyword: i for i, keyword in enumerate(self.keywords)}
+
+        arrays = np.load(os.path.join(index_dir, 'postings.npz'))
+        self.posting_offsets = arrays['posting_offsets']
+        self.doc_deltas = arrays['doc_deltas']
+        self.position_offsets = arrays['position_offsets']
+        self.position_deltas = arrays['position_deltas']
+        self.snippet_bytes = arrays['snippet_bytes']
+        self.snippet_offsets = arrays['snippet_offsets']
+
+    @classmethod
+    def load(cls, index_dir: str = INDEX_DIR) -> Optional['KeywordIndex']:
+        """Lädt den Index oder gibt None zurück, wenn noch keiner erstellt wurde."""
+        if not os.path.exists(os.path.join(index_dir, 'meta.json')):
+            return None
+        return cls(index_dir)
+
+    def _posting_range(self, keyword: str):
+        keyword_id = self._keyword_ids.get(keyword)
+        if keyword_id is None:
+            return 0, 0
+        return int(self.posting_offsets[keyword_id]), int(self.posting_offsets[keyword_id + 1])
+
+    def course_ids(self, keyword: str) -> np.ndarray:
+        """Sortierte Kurs-IDs aller Kurse, die das Keyword enthalten."""
+        start, end = self._posting_range(keyword)
+        return np.cumsum(self.doc_deltas[start:end], dtype=np.int64)
+
+    def document_frequency(self, keyword: str) -> int:
+        start, end = self._posting_range(keyword)
+        return end - start
+
+    def course_ids_any(self, keywords: List[str]) -> np.ndarray:
+        """Kurse, die mindestens eines der Keywords enthalten."""
+        result = np.array([], dtype=np.int64)
+        for keyword in keywords:
+            result = np.union1d(result, self.course_ids(keyword))
+        return result
+
+    def course_ids_all(self, keywords: List[str]) -> np.ndarray:
+        """Kurse, die alle Keywords enthalten."""
+        if not keywords:
+            return np.array([], dtype=np.int64)
+        # Mit der kürzesten Posting-Liste beginnen
+        ordered = sorted(keywords, key=self.document_frequency)
+        result = self.course_ids(ordered[0])
+        for keyword in ordered[1:]:
+            result = np.intersect1d(result, self.course_ids(keyword), assume_unique=True)
+        return result
+
+    def postings(self, keyword: str) -> List[Dict]:
+        """Posting-Liste mit Kursinformationen, Positionen und Snippet."""
+        start, end = self._posting_range(keyword)
+        results = []
+        for posting, doc_id in zip(range(start, end), self.course_ids(keyword)):
+            p_start, p_end = self.position_offsets[posting], self.position_offsets[posting + 1]
+            s_start, s_end = self.snippet_offsets[posting], self.snippet_offsets[posting + 1]
+            semester, url, number, title = self.docs[doc_id]
+            results.append({
+                'course_id': int(doc_id),
+                'semester': semester,
+                'url': url,
+                'number': number,
+                'title': title,
+                'positions': np.cumsum(self.position_deltas[p_start:p_end], dtype=np.int64).tolist(),
+                'snippet': bytes(self.snippet_bytes[s_start:s_end]).decode('utf-8')
+            })
+        return results
+
+    def semester_counts(self, keyword: str) -> Counter:
+        """Anzahl Kurse mit dem Keyword pro Semester."""
+        return Counter(self.docs[doc_id][0] for doc_id in self.course_ids(keyword))
+
+if __name__ == "__main__":
+    import sys
+
+    index = KeywordIndex.load()
+    if index is None:
+        print("Kein Keyword-Index gefunden. Bitte zuerst analyze_sdgs.py ausführen.")
+        sys.exit(1)
+    for keyword in sys.argv[1:]:
+        postings = index.postings(keyword)
+        print(f"\n{keyword}: {len(postings)} Kurse ({', '.join(index.keyword_sdgs.get(keyword, []))})")
+        for posting in postings:
+            print(f"  [{posting['semester']}] {posting['number']} {posting['title']}")
+            print(f"      ...{posting['snippet']}...")
@@ -0,0 +1,455 @@
+"""
+Kompositum-fähiges Keyword-Lexikon.
+
+Deutsche Komposita enthalten die Keywords oft nur als Bestandteil: "klimawandel" steckt in
+"klimawandelanpassung", "wasser" in "grundwasserschutz". Statt jeden Kurstext nach
+Teilstrings zu durchsuchen, wird einmal für alle verschiedenen Wort-Tokens des Korpus
+(das Vokabular) bestimmt, welche Keywords sie enthalten. Pro Kurs bleibt das Matching
+danach ein Dictionary-Zugriff pro Token.
+
+Ein Token enthält ein Keyword, wenn
+- es dem Keyword entspricht, oder
+- das Keyword (mindestens MIN_COMPOUND_KEYWORD Zeichen) an einer Kompositionsfuge steht:
+  der Teil davor zerlegt sich in Wörter des Vokabulars (mit Fugenelement), der Teil danach
+  ist eine Flexionsendung oder zerlegt sich ebenfalls in Wörter des Vokabulars.
+
+Allgemeine Keywords (GENERIC_KEYWORDS) stecken in fast jedem Kursverzeichnis als
+Bestandteil von Verwaltungsbegriffen ("seminararbeit", "fachschule", "forschungsseminar");
+sie zählen nur als ganzes Wort, gegebenenfalls mit Flexionsendung ("arbeit", "forschungen").
+
+Die Kandidaten liefert ein Trie über die Keywords, der von jeder Position eines Tokens aus
+durchlaufen wird. Mehrwortige Keywords werden wie bisher als Phrase im Text gesucht.
+
+Die Zuordnung eines Tokens hängt nur von den Keywords und dem aktuellen Korpusvokabular ab,
+nicht von der Reihenfolge, in der Tokens hinzukamen: das Lexikon wird in
+data/keyword_lexicon.json gespeichert und bei jedem Lauf auf das Vokabular des Korpus gesetzt.
+Ändert sich das Vokabular, werden alle Tokens neu aufgelöst (neue Wörter können alte
+Komposita zerlegbar machen); ändert sich dabei die Zuordnung eines bekannten Tokens, wechselt
+die revision des Lexikons und gecachte Kursergebnisse werden verworfen.
+
+Tokens ohne exakten Treffer werden unscharf gesucht (Tippfehler, abweichende Flexion wie
+"klimwandel", "gleichstellng" oder "biodiversitat"): ein SymSpell-Index bildet alle Varianten der
+Keywords mit bis zu MAX_EDIT_DISTANCE gelöschten Zeichen auf die Keywords ab. Für ein Token
+(und das Token ohne Flexionsendung) werden ebenso die Löschvarianten gebildet und
+nachgeschlagen; nur die so gefundenen Kandidaten werden mit der Damerau-Levenshtein-Distanz
+geprüft. Der Aufwand pro Token hängt damit nur von seiner Länge ab, nicht von der Anzahl
+der Keywords, und fällt pro Token des Korpus einmal an (gespeichert im Lexikon).
+
+Keywords unter FUZZY_MIN_LENGTH Zeichen werden nur exakt gesucht, zwei Änderungen erst ab
+FUZZY_LONG_LENGTH Zeichen erlaubt, da sich sonst ein oder zwei Zeichen Abstand oft als anderes
+Wort lesen ("gemeine"/"gemeinde", "korporation"/"kooperation"); Kandidaten müssen außerdem mit
+demselben Buchstaben beginnen. Wie bei SymSpell entscheidet zuletzt die Häufigkeit im Korpus:
+ein Token gilt nur dann als Schreibvariante eines Keywords, wenn das Keyword in mindestens
+TYPO_FREQUENCY_RATIO-mal so vielen Kurstexten exakt vorkommt wie das Token. Ein eigenständiges
+Wort ("bindung" neben "bildung") ist dafür zu häufig, ein Tippfehler, der sich in einigen
+Fassungen eines wiederkehrenden Kurses hält, nicht. Die Kandidaten eines Tokens hängen nur vom
+Token ab und werden gemerkt, die Häufigkeitsprüfung erfolgt bei jedem Nachschlagen.
+Unscharfe Treffer werden als solche ausgewiesen (analyze_sdgs.py zählt sie, außer mit --exact-only).
+
+    python keyword_lexicon.py                   # Lexikon aus dem Korpus aufbauen
+    python keyword_lexicon.py --token grundwasserschutz
+"""
+import argparse
+import json
+import os
+import re
+import uuid
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Set, Tuple
+
+from course_preprocessing import normalize_text
+from sdg_keywords import SDG_KEYWORDS
+
+LEXICON_FILE = 'data/keyword_lexicon.json'
+MIN_COMPOUND_KEYWORD = 4  # Kürzere Keywords werden nur als ganzes Wort gefunden
+MIN_PART_LENGTH = 3       # Mindestlänge der übrigen Bestandteile eines Kompositums
+LINKING_ELEMENTS = ('', 's', 'es', 'n', 'en', 'e', 'er')  # Fugenelemente ("arbeit-s-markt")
+INFLECTIONS = {'', 'e', 'en', 'n', 's', 'es', 'er', 'ern', 'em', 'nen'}
+# Nur als ganzes Wort: als Kompositumsbestandteil meist Lehrveranstaltungs-Vokabular
+GENERIC_KEYWORDS = {'arbeit', 'schule', 'forschung', 'entwicklung', 'lernen', 'arten', 'produktion', 'verteilung'}
+FUZZY_MIN_LENGTH = 9      # Kürzere Keywords nur exakt
+FUZZY_LONG_LENGTH = 13    # Ab dieser Länge sind zwei statt einer Änderung erlaubt
+MAX_EDIT_DISTANCE = 2
+TYPO_FREQUENCY_RATIO = 20  # So viel häufiger muss das Keyword sein als seine Schreibvariante
+UNSEEN_CACHE_SIZE = 50000  # Gemerkte Auflösungen von Tokens außerhalb des Vokabulars (LRU)
+
+_END = ''  # Schlüssel der Keyword-IDs in einem Trie-Knoten
+
+def matcher_config() -> Dict:
+    """Regeln des Lexikons; eine Änderung verwirft das gespeicherte Lexikon und gecachte Treffer."""
+    return {'min_compound_keyword': MIN_COMPOUND_KEYWORD, 'min_part_length': MIN_PART_LENGTH,
+            'linking_elements': list(LINKING_ELEMENTS), 'inflections': sorted(INFLECTIONS),
+            'fuzzy_min_length': FUZZY_MIN_LENGTH, 'fuzzy_long_length': FUZZY_LONG_LENGTH,
+            'max_edit_distance': MAX_EDIT_DISTANCE, 'typo_frequency_ratio': TYPO_FREQUENCY_RATIO,
+            'generic_keywords': sorted(GENERIC_KEYWORDS), 'version': 5}
+
+def allowed_distance(keyword: str) -> int:
+    """Erlaubte Editierdistanz für ein Keyword (0: nur exakt)."""
+    if len(keyword) < FUZZY_MIN_LENGTH:
+        return 0
+    return MAX_EDIT_DISTANCE if len(keyword) >= FUZZY_LONG_LENGTH else 1
+
+def deletes(word: str, distance: int) -> Set[str]:
+    """word und alle Varianten mit bis zu distance gelöschten Zeichen."""
+    variants = frontier = {word}
+    for _ in range(distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        variants = variants | frontier
+    return variants
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein-Distanz (Vertauschung benachbarter Zeichen zählt einfach); über limit: limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if previous2 is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[len(b)], limit + 1)
+
+class KeywordLexicon:
+    """Zuordnung Token -> Keyword-IDs über einem Korpusvokabular."""
+
+    def __init__(self, sdg_keywords: Dict = SDG_KEYWORDS):
+        # Keyword-ID -> (SDG, Keyword); dasselbe Keyword kann mehreren SDGs zugeordnet sein
+        self.keywords: List[Tuple[str, str]] = []
+        self.phrases: List[Tuple[int, str]] = []  # (Keyword-ID, normalisierte Phrase)
+        self.trie: Dict = {}
+        self.fuzzy_index: Dict[str, List[int]] = {}  # Löschvariante -> Keyword-IDs
+        self.fuzzy_forms: Dict[int, str] = {}        # Keyword-ID -> normalisiertes Keyword (unscharf suchbar)
+        for sdg, info in sdg_keywords.items():
+            for keyword in info['keywords']:
+                keyword_id = len(self.keywords)
+                self.keywords.append((sdg, keyword))
+                normalized = normalize_text(keyword)
+                if len(normalized.split()) > 1:
+                    self.phrases.append((keyword_id, normalized))
+                    continue
+                node = self.trie
+                for char in normalized:
+                    node = node.setdefault(char, {})
+                node.setdefault(_END, []).append(keyword_id)
+                if allowed_distance(normalized) and re.fullmatch(r'\w+', normalized):
+                    self.fuzzy_forms[keyword_id] = normalized
+                    for variant in deletes(normalized, allowed_distance(normalized)):
+                        self.fuzzy_index.setdefault(variant, []).append(keyword_id)
+        self.sdg_order = {sdg: i for i, sdg in enumerate(sdg_keywords)}
+        self.signature = {'keywords': sdg_keywords, 'config': matcher_config()}
+        self.vocabulary: Set[str] = set()
+        self.text_counts: Dict[str, int] = {}  # Token -> Anzahl verschiedener Kurstexte im Korpus
+        self.tokens: Dict[str, Tuple[int, ...]] = {}  # aufgelöste Vokabular-Tokens (auch ohne Keyword)
+        self.fuzzy: Dict[str, Tuple[int, ...]] = {}   # Kandidaten unscharfer Treffer (Tokens ohne exakten Treffer)
+        # Tokens außerhalb des Vokabulars (z. B. Anfragen an den Dienst): begrenzt, ältere fallen heraus
+        self.unseen_tokens: 'OrderedDict[str, Tuple[int, ...]]' = OrderedDict()
+        self.unseen_fuzzy: 'OrderedDict[str, Tuple[int, ...]]' = OrderedDict()
+        self.keyword_counts: Dict[int, int] = {}      # Keyword-ID -> Kurstexte mit exaktem Treffer (pro Token gezählt)
+        self.revision = ''  # wechselt, wenn sich die Zuordnung bereits bekannter Tokens ändert
+
+    @classmethod
+    def load(cls, lexicon_file: str = LEXICON_FILE, sdg_keywords: Dict = SDG_KEYWORDS) -> 'KeywordLexicon':
+        """Lädt das gespeicherte Lexikon; bei geänderten Keywords oder Regeln beginnt es leer."""
+        lexicon = cls(sdg_keywords)
+        if os.path.exists(lexicon_file):
+            with open(lexicon_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('signature') == json.loads(json.dumps(lexicon.signature)):
+                lexicon.revision = data['revision']
+                lexicon.vocabulary = set(data['vocabulary'])
+                lexicon.text_counts = {token: data['text_counts'].get(token, 1) for token in lexicon.vocabulary}
+                matches = {token: tuple(ids) for token, ids in data['matches'].items()}
+                lexicon.tokens = {token: matches.get(token, ()) for token in lexicon.vocabulary}
+                fuzzy = {token: tuple(ids) for token, ids in data.get('fuzzy', {}).items()}
+                lexicon.fuzzy = {token: fuzzy.get(token, ()) for token in lexicon.vocabulary
+                                 if not lexicon.tokens[token]}
+                lexicon.keyword_counts = lexicon._count_keywords()
+        return lexicon
+
+    def save(self, lexicon_file: str = LEXICON_FILE):
+        os.makedirs(os.path.dirname(lexicon_file) or '.', exist_ok=True)
+        tmp_file = lexicon_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                'signature': self.signature,
+                'revision': self.revision,
+                'vocabulary': sorted(self.vocabulary),
+                # Nur Tokens in mehreren Kurstexten; alle übrigen kommen in einem vor
+                'text_counts': {token: n for token, n in sorted(self.text_counts.items())
+                                if n > 1 and token in self.vocabulary},
+                # Nur Tokens mit Keywords; alle übrigen Vokabular-Tokens haben keine
+                'matches': {token: list(ids) for token, ids in sorted(self.tokens.items())
+                            if ids and token in self.vocabulary},
+                'fuzzy': {token: list(ids) for token, ids in sorted(self.fuzzy.items())
+                          if ids and token in self.vocabulary}
+            }, f, ensure_ascii=False)
+        os.replace(tmp_file, lexicon_file)
+
+    def update_vocabulary(self, text_counts: Dict[str, int]) -> Dict[str, int]:
+        """
+        Setzt das Vokabular auf die Tokens des Korpus. Hat es sich geändert, werden alle Tokens
+        neu aufgelöst, da Zerlegungen vom ganzen Vokabular abhängen; Kandidaten unscharfer
+        Treffer hängen nur vom Token ab und werden nur für neue Tokens bestimmt.
+
+        Args:
+            text_counts: Token -> Anzahl verschiedener Kurstexte, in denen es vorkommt (corpus_vocabulary)
+
+        Returns:
+            Anzahl neuer, entfernter und anders zugeordneter Tokens
+        """
+        vocabulary = set(text_counts)
+        new_tokens = vocabulary - self.vocabulary
+        removed = self.vocabulary - vocabulary
+        old_tokens, old_counts = self.tokens, self.text_counts
+        old_fuzzy = {token: self.lookup_fuzzy(token) for token in self.vocabulary if self.fuzzy.get(token)}
+        self.text_counts = dict(text_counts)
+        if new_tokens or removed:
+            self.vocabulary = vocabulary
+            self.tokens = {token: self.resolve(token) for token in vocabulary}
+            self.unseen_tokens.clear()
+        candidates = {**self.unseen_fuzzy, **self.fuzzy}
+        self.fuzzy = {token: candidates[token] if token in candidates else self.resolve_fuzzy(token)
+                      for token in vocabulary if not self.tokens[token]}
+        self.keyword_counts = self._count_keywords()
+        changed = [token for token in vocabulary - new_tokens
+                   if (old_tokens.get(token), old_fuzzy.get(token, ()))
+                   != (self.tokens[token], self.lookup_fuzzy(token) if token in self.fuzzy else ())]
+        # Neu aufgebautes Lexikon: gecachte Ergebnisse stammen von einem anderen Lexikon
+        if changed or not old_counts:
+            self.revision = uuid.uuid4().hex
+        return {'new': len(new_tokens), 'removed': len(removed), 'changed': len(changed)}
+
+    def _count_keywords(self) -> Dict[int, int]:
+        """Häufigkeit der Keywords im Korpus: Kurstexte der Tokens mit exaktem Treffer."""
+        counts = {}
+        for token in self.vocabulary:
+            for keyword_id in self.tokens[token]:
+                counts[keyword_id] = counts.get(keyword_id, 0) + self.text_counts.get(token, 1)
+        return counts
+
+    def lookup(self, token: str) -> Tuple[int, ...]:
+        """
+        Keyword-IDs eines Tokens; unbekannte Tokens werden gegen das Vokabular aufgelöst und
+        in einem begrenzten LRU-Cache gemerkt.
+        """
+        ids = self.tokens.get(token)
+        if ids is None:
+            ids = _cached(self.unseen_tokens, token, self.resolve)
+        return ids
+
+    def lookup_fuzzy(self, token: str) -> Tuple[int, ...]:
+        """
+        Unscharf gefundene Keyword-IDs eines Tokens ohne exakten Treffer: die gemerkten
+        Kandidaten, deren Keyword mindestens TYPO_FREQUENCY_RATIO-mal so häufig ist wie das Token.
+        """
+        candidates = self.fuzzy.get(token)
+        if candidates is None:
+            candidates = _cached(self.unseen_fuzzy, token, self.resolve_fuzzy)
+        limit = TYPO_FREQUENCY_RATIO * self.text_counts.get(token, 0)
+        return tuple(keyword_id for keyword_id in candidates if self.keyword_counts.get(keyword_id, 0) >= limit)
+
+    def resolve_fuzzy(self, token: str) -> Tuple[int, ...]:
+        """Keywords mit kleiner Editierdistanz zum Token oder zum Token ohne Flexionsendung (Kandidaten)."""
+        if len(token) < FUZZY_MIN_LENGTH - 1:
+            return ()
+        stems = {token} | {token[:-len(ending)] for ending in INFLECTIONS
+                           if ending and token.endswith(ending) and len(token) - len(ending) >= FUZZY_MIN_LENGTH - 1}
+        found = set()
+        for stem in stems:
+            candidates = {keyword_id for variant in deletes(stem, MAX_EDIT_DISTANCE)
+                          for keyword_id in self.fuzzy_index.get(variant, ())}
+            for keyword_id in candidates - found:
+                keyword = self.fuzzy_forms[keyword_id]
+                limit = allowed_distance(keyword)
+                if keyword[0] == stem[0] and edit_distance(stem, keyword, limit) <= limit:
+                    found.add(keyword_id)
+        return tuple(sorted(found))
+
+    def resolve(self, token: str) -> Tuple[int, ...]:
+        """Bestimmt die Keywords, die das Token ist oder als Kompositumsbestandteil enthält."""
+        found = set()
+        for start in range(len(token)):
+            node = self.trie
+            for end in range(start, len(token)):
+                node = node.get(token[end])
+                if node is None:
+                    break
+                ids = node.get(_END)
+                if ids and self._is_match(token, start, end + 1):
+                    found.update(ids)
+        return tuple(sorted(found))
+
+    def _is_match(self, token: str, start: int, end: int) -> bool:
+        if start == 0 and end == len(token):
+            return True
+        if end - start < MIN_COMPOUND_KEYWORD:
+            return False
+        head, tail = token[:start], token[end:]
+        if token[start:end] in GENERIC_KEYWORDS:
+            return not head and tail in INFLECTIONS
+        if head and not any(head.endswith(link) and self._decomposes(head[:len(head) - len(link)])
+                            for link in LINKING_ELEMENTS):
+            return False
+        if tail in INFLECTIONS:
+            return True
+        return any(tail.startswith(link) and self._decomposes(tail[len(link):]) for link in LINKING_ELEMENTS)
+
+    def _decomposes(self, part: str) -> bool:
+        """Zerlegt part in Wörter des Vokabulars (je mindestens MIN_PART_LENGTH Zeichen, mit Fugenelementen)."""
+        if len(part) < MIN_PART_LENGTH:
+            return False
+        if part in self.vocabulary:
+            return True
+        reachable = [False] * (len(part) + 1)
+        reachable[0] = True
+        for i in range(len(part)):
+            if not reachable[i]:
+                continue
+            for j in range(i + MIN_PART_LENGTH, len(part) + 1):
+                if part[i:j] in self.vocabulary:
+                    for link in LINKING_ELEMENTS:
+                        if part.startswith(link, j) and j + len(link) <= len(part):
+                            reachable[j + len(link)] = True
+        return reachable[len(part)]
+
+    def match(self, normalized_text: str, words: Set[str]) -> Dict[str, Set[str]]:
+        """SDG -> exakt gefundene Keywords für einen normalisierten Text und seine Wort-Tokens."""
+        return self.match_flagged(normalized_text, words)[0]
+
+    def match_flagged(self, normalized_text: str, words: Set[str]) -> Tuple[Dict[str, Set[str]], Dict[str, Set[str]]]:
+        """
+        Wie match, zusätzlich die nur unscharf gefundenen Keywords.
+
+        Returns:
+            (SDG -> exakt gefundene Keywords, SDG -> nur unscharf gefundene Keywords)
+        """
+        exact, fuzzy = set(), set()
+        for word in words:
+            ids = self.lookup(word)
+            if ids:
+                exact.update(ids)
+            else:
+                fuzzy.update(self.lookup_fuzzy(word))
+        for keyword_id, phrase in self.phrases:
+            if phrase in normalized_text:
+                exact.add(keyword_id)
+        sdg_findings, sdg_fuzzy = {}, {}
+        for keyword_id in exact:
+            sdg, keyword = self.keywords[keyword_id]
+            sdg_findings.setdefault(sdg, set()).add(keyword)
+        # Ein Keyword, das über ein anderes Token auch exakt vorkommt, gilt als exakt
+        for keyword_id in fuzzy - exact:
+            sdg, keyword = self.keywords[keyword_id]
+            sdg_fuzzy.setdefault(sdg, set()).add(keyword)
+        # Reihenfolge der SDGs wie in SDG_KEYWORDS
+        order = lambda item: self.sdg_order[item[0]]
+        return dict(sorted(sdg_findings.items(), key=order)), dict(sorted(sdg_fuzzy.items(), key=order))
+
+    def keyword_positions(self, normalized_text: str, keywords: Set[str],
+                          include_fuzzy: bool = False) -> Dict[str, List[int]]:
+        """
+        Zeichenpositionen der Tokens, die das Lexikon zu einem der Keywords auflöst (bei
+        Komposita der Anfang des Tokens), und der Phrasen. Dieselbe Auflösung wie in match,
+        daher keine Positionen von Teilstrings, die kein Treffer sind ("arbeit" in "bearbeiten").
+        """
+        positions = {}
+        for word in re.finditer(r'\b\w+\b', normalized_text):
+            token = word.group()
+            ids = self.lookup(token)
+            if not ids and include_fuzzy:
+                ids = self.lookup_fuzzy(token)
+            for keyword in {self.keywords[keyword_id][1] for keyword_id in ids} & keywords:
+                positions.setdefault(keyword, []).append(word.start())
+        for keyword_id, phrase in self.phrases:
+            keyword = self.keywords[keyword_id][1]
+            if keyword in keywords and keyword not in positions:
+                position = normalized_text.find(phrase)
+                while position >= 0:
+                    positions.setdefault(keyword, []).append(position)
+                    position = normalized_text.find(phrase, position + 1)
+        return positions
+
+    def fuzzy_tokens(self) -> Dict[str, List[str]]:
+        """Vokabular-Tokens, die Keywords nur unscharf enthalten."""
+        fuzzy = {token: self.lookup_fuzzy(token) for token in sorted(self.vocabulary) if self.fuzzy.get(token)}
+        return {token: [self.keywords[i][1] for i in ids] for token, ids in fuzzy.items() if ids}
+
+    def compound_tokens(self) -> Dict[str, List[str]]:
+        """Vokabular-Tokens, die Keywords nur als Kompositumsbestandteil enthalten."""
+        keyword_forms = {normalize_text(keyword) for _, keyword in self.keywords}
+        return {token: [self.keywords[i][1] for i in ids] for token, ids in sorted(self.tokens.items())
+                if ids and token in self.vocabulary and token not in keyword_forms}
+
+def corpus_vocabulary(preprocessed=None, data_dir: str = 'data') -> Dict[str, int]:
+    """
+    Alle verschiedenen Wort-Tokens des Korpus mit der Anzahl verschiedener Kurstexte, in
+    denen sie vorkommen: aus der Vorverarbeitung oder, wenn diese fehlt, aus den neuesten
+    Kursdateien. Wiederkehrende Kurse mit demselben Text zählen einmal.
+    """
+    text_tokens = {}
+    if preprocessed is not None:
+        for row in range(len(preprocessed)):
+            text_tokens.setdefault(preprocessed.text_hash(row), set()).update(preprocessed.word_tokens(row))
+    else:
+        from course_dedup import course_text
+        from course_preprocessing import latest_course_files, tokenize_words
+        from course_record import load_course_records
+        pool = {}
+        for course_file in latest_course_files(data_dir).values():
+            for course in load_course_records(course_file, pool):
+                normalized = normalize_text(course_text(course))
+                text_tokens.setdefault(normalized, set()).update(tokenize_words(normalized))
+    return dict(Counter(token for tokens in text_tokens.values() for token in tokens))
+
+def _cached(cache: 'OrderedDict[str, Tuple[int, ...]]', token: str, resolve) -> Tuple[int, ...]:
+    """Auflösung aus einem LRU-Cache mit höchstens UNSEEN_CACHE_SIZE Einträgen."""
+    ids = cache.get(token)
+    if ids is not None:
+        cache.move_to_end(token)
+        return ids
+    ids = cache[token] = resolve(token)
+    if len(cache) > UNSEEN_CACHE_SIZE:
+        cache.popitem(last=False)
+    return ids
+
+@lru_cache(maxsize=1)
+def default_lexicon() -> KeywordLexicon:
+    """Gespeichertes Lexikon für Einzelaufrufe (z. B. find_sdgs_in_text ohne Korpus)."""
+    return KeywordLexicon.load()
+
+def main():
+    from course_preprocessing import PreprocessedCourses
+
+    parser = argparse.ArgumentParser(description="Kompositum-fähiges Keyword-Lexikon aufbauen und prüfen")
+    parser.add_argument('--token', help="Keywords eines einzelnen Tokens anzeigen")
+    args = parser.parse_args()
+
+    lexicon = KeywordLexicon.load()
+    changes = lexicon.update_vocabulary(corpus_vocabulary(PreprocessedCourses.load()))
+    lexicon.save()
+    print(f"Lexikon: {len(lexicon.vocabulary)} Tokens im Vokabular, {changes['new']} neu, "
+          f"{changes['removed']} entfernt, {changes['changed']} anders zugeordnet")
+
+    if args.token:
+        token = normalize_text(args.token)
+        exact = lexicon.lookup(token)
+        fuzzy = () if exact else lexicon.lookup_fuzzy(token)
+        print(f"{token}: {', '.join(lexicon.keywords[i][1] for i in exact) or '-'}"
+              + (f" (unscharf: {', '.join(lexicon.keywords[i][1] for i in fuzzy)})" if fuzzy else ''))
+        return
+    compounds = lexicon.compound_tokens()
+    print(f"{len(compounds)} Tokens enthalten Keywords als Kompositumsbestandteil, z. B.:")
+    for token, keywords in list(compounds.items())[:20]:
+        print(f"  {token}: {', '.join(keywords)}")
+    fuzzy = lexicon.fuzzy_tokens()
+    print(f"{len(fuzzy)} Tokens enthalten Keywords nur unscharf (Tippfehler, Flexion), z. B.:")
+    for token, keywords in list(fuzzy.items())[:20]:
+        print(f"  {token}: {', '.join(keywords)}")
+
+if __name__ == "__main__":
+    main()
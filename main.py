@@ -1,54 +1,106 @@
-import subprocess
+import argparse
+import importlib
 import sys
-import time
-from datetime import datetime
-import os
 
-def run_script(script_name, description):
+import instrumentation
+from pipeline import Stage, print_timing_report, run_pipeline
+
+def call(module_name, func_name='main', **kwargs):
     """
-    Führt ein Python-Skript aus und zeigt den Status an
+    Erzeugt eine Stage-Funktion, die das Modul erst bei Ausführung importiert
+    (torch/transformers werden so nur geladen, wenn die semantische Analyse läuft)
     """
-    print(f"\n{'='*80}")
-    print(f"Starte: {description}")
-    print(f"Skript: {script_name}")
-    print(f"Zeitpunkt: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print('='*80 + "\n")
-    
-    try:
-        # Führe das Skript mit Python aus der virtuellen Umgebung aus
-        venv_python = os.path.join('.venv', 'bin', 'python')
-        # Keine Ausgabeumleitung - zeige alles direkt im Terminal
-        process = subprocess.run([venv_python, script_name])
-        
-        if process.returncode == 0:
-            print(f"\n✅ {script_name} erfolgreich ausgeführt!")
-            return True
-        else:
-            print(f"\n❌ Fehler beim Ausführen von {script_name}")
-            return False
-            
-    except Exception as e:
-        print(f"\n❌ Fehler beim Ausführen von {script_name}: {str(e)}")
-        return False
+    def run():
+        return getattr(importlib.import_module(module_name), func_name)(**kwargs)
+    return run
 
-def main():
-    # Liste der auszuführenden Skripte mit Beschreibungen
-    scripts = [
-        ("extract_course_links.py", "Extrahiere Kurs-Links von der Univie-Website"),
-        ("extract_course_info.py", "Extrahiere detaillierte Kurs-Informationen"),
-        ("analyze_sdgs.py", "Analysiere SDG-Relevanz der Kurse")
+COURSE_LINKS = 'data/semester_*/course_links.json'
+COURSE_FILES = 'data/semester_*/courses_*.json'
+KEYWORD_ANALYSIS = 'data/keyword_analysis.json'
+SEMANTIC_ANALYSIS = 'data/semantic_analysis.json'
+PREPROCESSED = 'data/preprocessed/meta.json'
+
+def build_stages(only_new=False):
+    """
+    Definiert alle Stages der Pipeline mit ihren Ein- und Ausgaben.
+    Mit only_new crawlen links und info nur Semester, für die noch keine Daten vorliegen.
+    """
+    return [
+        Stage("links", "Extrahiere Kurs-Links von der Univie-Website",
+              call("extract_course_links", only_new=only_new),
+              outputs=[COURSE_LINKS], always_run=only_new),
+        Stage("info", "Extrahiere detaillierte Kurs-Informationen",
+              call("extract_course_info", only_new=only_new),
+              inputs=[COURSE_LINKS], outputs=[COURSE_FILES],
+              depends_on=["links"]),
+        Stage("preprocess", "Normalisiere und tokenisiere die Kurstexte",
+              call("course_preprocessing"),
+              inputs=[COURSE_FILES], outputs=[PREPROCESSED],
+              depends_on=["info"]),
+        Stage("keywords", "Analysiere SDG-Relevanz der Kurse (Keywords)",
+              call("analyze_sdgs"),
+              inputs=[COURSE_FILES, PREPROCESSED, 'sdg_keywords.py'], outputs=[KEYWORD_ANALYSIS],
+              depends_on=["preprocess"]),
+        Stage("semantic", "Analysiere SDG-Relevanz der Kurse (semantisch)",
+              call("analyze_semantic", "analyze_courses_semantic"),
+              inputs=[COURSE_FILES, PREPROCESSED, 'semantic_analysis.py'], outputs=[SEMANTIC_ANALYSIS, 'data/course_index/meta.json'],
+              depends_on=["preprocess"]),
+        Stage("sdg_plots", "Erstelle Grafiken und Kennzahlen der Keyword-Analyse",
+              call("sdg_analysis"),
+              inputs=[KEYWORD_ANALYSIS, 'data/keyword_index/meta.json'],
+              outputs=['plots/sdg_entwicklung.png', 'plots/semester_metrics.csv',
+                       'plots/kurse_schlagworte_alle_semester.csv', 'plots/schlagwort_haeufigkeit.csv'],
+              depends_on=["keywords"]),
+        Stage("semantic_plots", "Visualisiere die semantische Analyse",
+              call("visualize_semantic"),
+              inputs=[SEMANTIC_ANALYSIS], outputs=['plots/confidence_intervals.png'],
+              depends_on=["semantic"]),
+        Stage("result_store", "Baue den Ergebnisspeicher für das Dashboard",
+              call("result_store", "build_result_store"),
+              inputs=[KEYWORD_ANALYSIS, SEMANTIC_ANALYSIS], outputs=['data/result_store/meta.json'],
+              depends_on=["keywords", "semantic"]),
+        Stage("comparison", "Vergleiche Keyword- und semantische Analyse",
+              call("analysis_comparison"),
+              inputs=['data/result_store/meta.json'],
+              outputs=['plots/analysis_comparison_metrics.png', 'plots/methodenvergleich.csv',
+                       'plots/methodenvergleich_abweichungen.csv'],
+              depends_on=["result_store"]),
+        Stage("diff", "Vergleiche die beiden neuesten Semester (Kurse und SDG-Zuordnungen)",
+              call("course_diff", "write_course_diff"),
+              inputs=[COURSE_FILES, 'data/result_store/meta.json'],
+              outputs=['data/course_diff.json', 'plots/kursaenderungen.csv'],
+              depends_on=["result_store"]),
     ]
-    
+
+def main():
+    stages = build_stages()
+    parser = argparse.ArgumentParser(description="SDG-Analyse-Pipeline")
+    parser.add_argument('--force', action='store_true',
+                        help="Alle Stages ausführen, auch wenn ihre Ausgaben aktuell sind")
+    parser.add_argument('--stages', nargs='+', choices=[stage.name for stage in stages],
+                        help="Nur die angegebenen Stages ausführen")
+    parser.add_argument('--workers', type=int, default=2,
+                        help="Maximale Anzahl parallel laufender Stages")
+    parser.add_argument('--only-new', action='store_true',
+                        help="Nur neue Semester crawlen (siehe semester_registry.py)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    if args.only_new:
+        stages = build_stages(only_new=True)
+
     print("\n🚀 Starte Datenextraktion und Analyse...")
-    
-    for script_name, description in scripts:
-        if not run_script(script_name, description):
-            print(f"\n❌ Prozess abgebrochen aufgrund von Fehlern in {script_name}")
-            sys.exit(1)
-        print("\nWarte 2 Sekunden vor dem nächsten Schritt...")
-        time.sleep(2)
-    
+
+    report = run_pipeline(stages, force=args.force, selected=args.stages, max_workers=args.workers,
+                          profile_stages=args.profile)
+    print_timing_report(report)
+    instrumentation.export_metrics('pipeline', args.metrics_dir)
+
+    failed = [name for name, entry in report.items() if entry['status'] in ('fehlgeschlagen', 'abgebrochen')]
+    if failed:
+        print(f"\n❌ Prozess mit Fehlern beendet: {', '.join(failed)}")
+        sys.exit(1)
+
     print("\n✨ Datenextraktion und Analyse abgeschlossen!")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
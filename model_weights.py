@@ -0,0 +1,266 @@
+"""
+Gemeinsam genutzte Modellgewichte für mehrere Worker-Prozesse.
+
+AutoModel.from_pretrained lädt die Gewichte von gbert-large (ca. 1,3 GB) in jedem Prozess in
+eigenen Speicher. Stattdessen werden sie einmal ins safetensors-Format umgewandelt
+(data/models/<modell>/model.safetensors, dazu Konfiguration und Tokenizer) und von jedem
+Prozess nur eingeblendet (mmap): das Modellgerüst entsteht ohne Speicher auf dem
+meta-Device, jeder Parameter ist ein Tensor direkt auf dem eingeblendeten Dateibereich.
+Alle Prozesse lesen dieselben Seiten aus dem Page-Cache; zusätzlicher Speicher pro Worker
+sind nur noch Aktivierungen und Laufzeit, und der Start entfällt fast vollständig.
+
+Die Abbildung ist privat (copy-on-write): die Datei wird nie verändert, und ein
+versehentlicher Schreibzugriff kopiert nur die betroffene Seite, statt abzustürzen.
+
+Neuere transformers-Versionen (5.x) blenden die Gewichte auch in from_pretrained bereits ein;
+dort teilen sich die Prozesse die Seiten ohnehin, und es bleibt die kürzere Ladezeit
+(Gerüst auf dem meta-Device statt Initialisierung und Kopie, etwa halbiert).
+
+    python model_weights.py --convert                 # einmalig umwandeln
+    python model_weights.py --benchmark --workers 4   # RSS und Ladezeit vorher/nachher
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from batch_controller import current_rss
+from course_preprocessing import BERT_MODEL_NAME
+
+MODEL_DIR = 'data/models'
+WEIGHTS_NAME = 'model.safetensors'
+REPORT_FILE = 'data/model_load_report.json'
+LOAD_MODES = ('from_pretrained', 'mmap')
+
+def converted_dir(model_name: str = BERT_MODEL_NAME, model_dir: str = MODEL_DIR) -> str:
+    return os.path.join(model_dir, model_name.replace('/', '--'))
+
+def is_converted(model_name: str = BERT_MODEL_NAME, model_dir: str = MODEL_DIR) -> bool:
+    path = converted_dir(model_name, model_dir)
+    return all(os.path.exists(os.path.join(path, name)) for name in (WEIGHTS_NAME, 'config.json'))
+
+def convert_model(model_name: str = BERT_MODEL_NAME, model_dir: str = MODEL_DIR, model=None, tokenizer=None) -> str:
+    """
+    Speichert Gewichte (inkl. nicht persistenter Puffer wie position_ids), Konfiguration und
+    Tokenizer eines Modells. Ein bereits geladenes Modell kann übergeben werden.
+
+    Returns:
+        Verzeichnis des umgewandelten Modells
+    """
+    from safetensors.torch import save_file
+    from transformers import AutoModel, AutoTokenizer
+
+    model = model if model is not None else AutoModel.from_pretrained(model_name)
+    tokenizer = tokenizer if tokenizer is not None else AutoTokenizer.from_pretrained(model_name)
+    path = converted_dir(model_name, model_dir)
+    os.makedirs(path, exist_ok=True)
+
+    tensors = {name: tensor.detach().contiguous()
+               for name, tensor in list(model.named_parameters()) + list(model.named_buffers())}
+    # Erst vollständig schreiben, dann umbenennen: parallel startende Worker sehen nie eine halbe Datei
+    tmp_path = os.path.join(path, f"{WEIGHTS_NAME}.{os.getpid()}.tmp")
+    save_file(tensors, tmp_path, metadata={'format': 'pt', 'model': model_name})
+    model.config.save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    os.replace(tmp_path, os.path.join(path, WEIGHTS_NAME))
+    size = os.path.getsize(os.path.join(path, WEIGHTS_NAME))
+    print(f"✓ {model_name} umgewandelt: {path}/{WEIGHTS_NAME} ({size / 2**30:.2f} GB, {len(tensors)} Tensoren)")
+    return path
+
+def map_safetensors(path: str) -> Tuple[Dict, mmap.mmap]:
+    """
+    Blendet eine safetensors-Datei ein und liefert Tensoren ohne Kopie auf dem eingeblendeten Bereich.
+    Format: 8 Byte Headerlänge (little endian), JSON-Header, danach die Rohdaten.
+
+    Returns:
+        (Name -> Tensor, mmap-Objekt; muss so lange leben wie die Tensoren)
+    """
+    import torch
+
+    dtypes = {'F32': torch.float32, 'F16': torch.float16, 'BF16': torch.bfloat16, 'F64': torch.float64,
+              'I64': torch.int64, 'I32': torch.int32, 'I16': torch.int16, 'I8': torch.int8,
+              'U8': torch.uint8, 'BOOL': torch.bool}
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    header_size = struct.unpack('<Q', mapped[:8])[0]
+    header = json.loads(mapped[8:8 + header_size])
+    header.pop('__metadata__', None)
+    data_start = 8 + header_size
+
+    tensors = {}
+    for name, info in header.items():
+        start, end = info['data_offsets']
+        dtype = dtypes[info['dtype']]
+        elements = (end - start) // torch.empty((), dtype=dtype).element_size()
+        if elements == 0:
+            tensors[name] = torch.empty(info['shape'], dtype=dtype)
+            continue
+        tensors[name] = torch.frombuffer(mapped, dtype=dtype, count=elements,
+                                         offset=data_start + start).view(info['shape'])
+    return tensors, mapped
+
+def load_shared_model(model_name: str = BERT_MODEL_NAME, model_dir: str = MODEL_DIR):
+    """
+    Lädt Tokenizer und Modell aus der umgewandelten Form; die Gewichte bleiben eingeblendet.
+
+    Raises:
+        RuntimeError: wenn ein Parameter oder Puffer nicht in der Datei steht
+    """
+    import torch
+    from transformers import AutoConfig, AutoModel, AutoTokenizer
+
+    path = converted_dir(model_name, model_dir)
+    tokenizer = AutoTokenizer.from_pretrained(path)
+    config = AutoConfig.from_pretrained(path)
+    # Gerüst ohne Speicher und ohne zufällige Initialisierung (die bei gbert-large Sekunden kostet)
+    with torch.device('meta'):
+        model = AutoModel.from_config(config)
+
+    tensors, mapped = map_safetensors(os.path.join(path, WEIGHTS_NAME))
+    for name, tensor in tensors.items():
+        module_name, _, attribute = name.rpartition('.')
+        module = model.get_submodule(module_name)
+        if attribute in module._parameters:
+            module._parameters[attribute] = torch.nn.Parameter(tensor, requires_grad=False)
+        elif attribute in module._buffers:
+            module._buffers[attribute] = tensor
+    missing = [name for name, tensor in list(model.named_parameters()) + list(model.named_buffers())
+               if tensor.is_meta]
+    if missing:
+        raise RuntimeError(f"Umgewandeltes Modell unvollständig, es fehlen: {', '.join(missing[:5])}")
+    model._shared_weights = mapped
+    model.eval()
+    return tokenizer, model
+
+def load_model(model_name: str = BERT_MODEL_NAME, model_dir: str = MODEL_DIR, shared: bool = True):
+    """
+    Tokenizer und Modell für die Analyse. Mit shared=True werden die eingeblendeten Gewichte
+    verwendet; fehlt die Umwandlung, wird das Modell normal geladen und einmal umgewandelt,
+    damit alle folgenden Prozesse sie nutzen.
+    """
+    from transformers import AutoModel, AutoTokenizer
+
+    start = time.perf_counter()
+    if shared and is_converted(model_name, model_dir):
+        try:
+            tokenizer, model = load_shared_model(model_name, model_dir)
+            print(f"Modell eingeblendet ({time.perf_counter() - start:.1f} s, RSS {current_rss() / 2**30:.2f} GB)")
+            return tokenizer, model
+        except (RuntimeError, OSError, ValueError, KeyError, AttributeError) as e:
+            print(f"⚠️  Eingeblendetes Modell nicht nutzbar, lade normal: {str(e)}")
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name)
+    print(f"Modell geladen ({time.perf_counter() - start:.1f} s, RSS {current_rss() / 2**30:.2f} GB)")
+    if shared:
+        try:
+            convert_model(model_name, model_dir, model, tokenizer)
+        except (ImportError, OSError) as e:
+            print(f"⚠️  Umwandlung nach safetensors fehlgeschlagen: {str(e)}")
+    return tokenizer, model
+
+def memory_usage() -> Dict[str, int]:
+    """RSS, PSS und private/gemeinsame Seiten des Prozesses in Bytes (Linux, /proc/self/smaps_rollup)."""
+    usage = {'rss': current_rss()}
+    fields = {'Pss': 'pss', 'Shared_Clean': 'shared', 'Shared_Dirty': 'shared',
+              'Private_Clean': 'private', 'Private_Dirty': 'private'}
+    try:
+        with open('/proc/self/smaps_rollup', 'r') as f:
+            for line in f:
+                name, _, value = line.partition(':')
+                if name in fields:
+                    key = fields[name]
+                    usage[key] = usage.get(key, 0) + int(value.split()[0]) * 1024
+    except OSError:
+        pass
+    return usage
+
+def probe(mode: str, model_name: str = BERT_MODEL_NAME):
+    """Misst in einem eigenen Prozess Ladezeit und Speicher (nach einem Forward-Pass)."""
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    start = time.perf_counter()
+    if mode == 'mmap':
+        tokenizer, model = load_shared_model(model_name)
+    else:
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModel.from_pretrained(model_name)
+    load_seconds = time.perf_counter() - start
+    with torch.no_grad():
+        model(**tokenizer("Nachhaltige Entwicklung in der Lehre", return_tensors="pt"))
+    print(json.dumps(dict(memory_usage(), mode=mode, load_seconds=load_seconds)), flush=True)
+    # Weiterlaufen, bis alle Prozesse gemessen haben, damit sich die Seiten wirklich überschneiden
+    sys.stdin.read()
+
+def benchmark(workers: int = 4, model_name: str = BERT_MODEL_NAME) -> Dict:
+    """Startet pro Lademodus workers Prozesse gleichzeitig und vergleicht Ladezeit und Speicher."""
+    if not is_converted(model_name):
+        convert_model(model_name)
+    report = {'model': model_name, 'workers': workers, 'modes': {}}
+    for mode in LOAD_MODES:
+        processes = [subprocess.Popen([sys.executable, __file__, '--probe', mode, '--model', model_name],
+                                      stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+                     for _ in range(workers)]
+        results = []
+        for process in processes:
+            line = process.stdout.readline()
+            if line:
+                results.append(json.loads(line))
+        for process in processes:
+            process.stdin.close()
+            process.wait()
+        if not results:
+            print(f"❌ Keine Messung für {mode}")
+            continue
+        report['modes'][mode] = {
+            'processes': len(results),
+            'load_seconds_mean': sum(r['load_seconds'] for r in results) / len(results),
+            'load_seconds_max': max(r['load_seconds'] for r in results),
+            'rss_gb_per_process': sum(r['rss'] for r in results) / len(results) / 2**30,
+            'private_gb_per_process': sum(r.get('private', 0) for r in results) / len(results) / 2**30,
+            # Summe der PSS: tatsächlich belegter Speicher aller Prozesse zusammen
+            'total_pss_gb': sum(r.get('pss', r['rss']) for r in results) / 2**30
+        }
+
+    os.makedirs(os.path.dirname(REPORT_FILE), exist_ok=True)
+    with open(REPORT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print_report(report)
+    print(f"\nBericht gespeichert in: {REPORT_FILE}")
+    return report
+
+def print_report(report: Dict):
+    print(f"\nModell-Laden mit {report['workers']} gleichzeitigen Prozessen ({report['model']}):")
+    print(f"{'Modus':<16} {'Ladezeit':>10} {'RSS/Prozess':>12} {'privat/Prozess':>15} {'gesamt (PSS)':>13}")
+    for mode, stats in report['modes'].items():
+        print(f"{mode:<16} {stats['load_seconds_mean']:>9.2f}s {stats['rss_gb_per_process']:>10.2f}GB "
+              f"{stats['private_gb_per_process']:>13.2f}GB {stats['total_pss_gb']:>11.2f}GB")
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Modellgewichte umwandeln und gemeinsam eingeblendet laden")
+    parser.add_argument('--model', default=BERT_MODEL_NAME)
+    parser.add_argument('--convert', action='store_true', help="Modell nach safetensors umwandeln")
+    parser.add_argument('--benchmark', action='store_true', help="RSS und Ladezeit beider Lademodi vergleichen")
+    parser.add_argument('--workers', type=int, default=4, help="Gleichzeitige Prozesse im Benchmark")
+    parser.add_argument('--probe', choices=LOAD_MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        probe(args.probe, args.model)
+        return
+    if args.convert:
+        convert_model(args.model)
+    if args.benchmark:
+        benchmark(args.workers, args.model)
+    if not (args.convert or args.benchmark):
+        status = 'umgewandelt' if is_converted(args.model) else 'nicht umgewandelt'
+        print(f"{args.model}: {status} ({converted_dir(args.model)})")
+
+if __name__ == "__main__":
+    main()
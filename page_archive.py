@@ -0,0 +1,182 @@
+"""
+Komprimiertes Archiv der geladenen Kursseiten.
+
+Jede Seite wird beim Crawlen als eigener, unabhängig komprimierter Datensatz an
+pages.archive angehängt (ähnlich WARC: Kopf mit URL, Status und Zeitpunkt, danach der
+Inhalt). pages.index.jsonl verweist mit Offset und Länge auf jeden Datensatz, sodass
+einzelne Seiten ohne Dekomprimieren des ganzen Archivs gelesen werden können. Beide
+Dateien werden nur angehängt; der Index lässt sich jederzeit aus dem Archiv neu aufbauen.
+
+Komprimiert wird mit zstd, wenn das Paket zstandard installiert ist, sonst mit zlib.
+Der Codec steht in jedem Datensatz, Archive mit gemischten Codecs bleiben lesbar.
+
+    python page_archive.py data/semester_WS2024            # Statistik
+    python page_archive.py data/semester_WS2024 --reindex  # Index aus dem Archiv neu aufbauen
+"""
+import argparse
+import json
+import os
+import struct
+import zlib
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_NAME = 'pages.archive'
+INDEX_NAME = 'pages.index.jsonl'
+RECORD_MAGIC = b'SDGP'
+HEADER_STRUCT = struct.Struct('<4sII')  # Magic, Länge des Kopfs, Länge des Inhalts
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 6
+
+DEFAULT_CODEC = 'zstd' if zstandard is not None else 'zlib'
+
+def compress(data: bytes, codec: str = DEFAULT_CODEC) -> bytes:
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Datensatz ist mit zstd komprimiert, aber das Paket zstandard fehlt")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+class PageArchive:
+    """Append-only-Archiv der Kursseiten eines Semester-Verzeichnisses."""
+
+    def __init__(self, directory: str, codec: str = DEFAULT_CODEC):
+        self.directory = directory
+        self.archive_file = os.path.join(directory, ARCHIVE_NAME)
+        self.index_file = os.path.join(directory, INDEX_NAME)
+        self.codec = codec
+
+    def exists(self) -> bool:
+        return os.path.exists(self.archive_file)
+
+    def append(self, url: str, html: str, status: int = 200, fetched_at: Optional[str] = None) -> Dict:
+        """Hängt eine Seite an das Archiv an und gibt ihren Indexeintrag zurück."""
+        header = json.dumps({
+            'url': url,
+            'status': status,
+            'fetched_at': fetched_at or datetime.now().isoformat(timespec='seconds'),
+            'codec': self.codec
+        }, ensure_ascii=False).encode('utf-8')
+        raw = html.encode('utf-8')
+        payload = compress(raw, self.codec)
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.archive_file, 'ab') as f:
+            offset = f.tell()
+            f.write(HEADER_STRUCT.pack(RECORD_MAGIC, len(header), len(payload)))
+            f.write(header)
+            f.write(payload)
+        entry = {**json.loads(header), 'offset': offset,
+                 'length': HEADER_STRUCT.size + len(header) + len(payload), 'raw_size': len(raw)}
+        # Index erst nach dem Datensatz schreiben: ein Abbruch hinterlässt höchstens
+        # einen Datensatz ohne Indexeintrag, den reindex() wiederfindet
+        with open(self.index_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        return entry
+
+    def index(self) -> List[Dict]:
+        """Alle Indexeinträge in Archivreihenfolge."""
+        if not os.path.exists(self.index_file):
+            return []
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def latest(self, ok_only: bool = True) -> Dict[str, Dict]:
+        """Jüngster Eintrag pro URL (mit ok_only nur erfolgreich geladene Seiten)."""
+        entries = {}
+        for entry in self.index():
+            if not ok_only or entry['status'] == 200:
+                entries[entry['url']] = entry
+        return entries
+
+    def read(self, entry: Dict) -> str:
+        """Liest den Inhalt eines Datensatzes über Offset und Länge aus dem Index."""
+        with open(self.archive_file, 'rb') as f:
+            return read_record(f, entry['offset'])[1]
+
+    def records(self) -> Iterator[Tuple[Dict, str]]:
+        """Liest das Archiv sequentiell (unabhängig vom Index)."""
+        if not self.exists():
+            return
+        with open(self.archive_file, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            offset = 0
+            while offset + HEADER_STRUCT.size <= size:
+                header, html, length = read_record(f, offset, with_length=True)
+                yield {**header, 'offset': offset, 'length': length, 'raw_size': len(html.encode('utf-8'))}, html
+                offset += length
+
+    def reindex(self) -> int:
+        """Baut den Index aus dem Archiv neu auf (z. B. nach einem Abbruch). Gibt die Anzahl Datensätze zurück."""
+        entries = []
+        try:
+            for entry, _ in self.records():
+                entries.append(entry)
+        except (ValueError, struct.error, zlib.error) as e:
+            # Unvollständiger letzter Datensatz: alles davor bleibt gültig
+            print(f"⚠️ Archiv ab Datensatz {len(entries) + 1} unlesbar: {e}")
+        tmp_file = self.index_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        os.replace(tmp_file, self.index_file)
+        return len(entries)
+
+    def stats(self) -> Dict:
+        entries = self.index()
+        compressed = os.path.getsize(self.archive_file) if self.exists() else 0
+        raw = sum(entry.get('raw_size', 0) for entry in entries)
+        return {
+            'records': len(entries),
+            'urls': len({entry['url'] for entry in entries}),
+            'failed': sum(1 for entry in entries if entry['status'] != 200),
+            'raw_bytes': raw,
+            'archive_bytes': compressed,
+            'ratio': raw / compressed if compressed else 0.0,
+            'codecs': sorted({entry['codec'] for entry in entries})
+        }
+
+def read_record(f, offset: int, with_length: bool = False):
+    """Liest den Datensatz ab offset aus einer geöffneten Archivdatei: (Kopf, HTML[, Länge])."""
+    f.seek(offset)
+    magic, header_length, payload_length = HEADER_STRUCT.unpack(f.read(HEADER_STRUCT.size))
+    if magic != RECORD_MAGIC:
+        raise ValueError(f"Kein Archiv-Datensatz bei Offset {offset}")
+    header = json.loads(f.read(header_length).decode('utf-8'))
+    payload = f.read(payload_length)
+    if len(payload) != payload_length:
+        raise ValueError(f"Datensatz bei Offset {offset} ist unvollständig")
+    html = decompress(payload, header['codec']).decode('utf-8')
+    if with_length:
+        return header, html, HEADER_STRUCT.size + header_length + payload_length
+    return header, html
+
+def main():
+    parser = argparse.ArgumentParser(description="Archiv der geladenen Kursseiten prüfen")
+    parser.add_argument('semester_dir', help="Semester-Verzeichnis, z. B. data/semester_WS2024")
+    parser.add_argument('--reindex', action='store_true', help="Index aus dem Archiv neu aufbauen")
+    args = parser.parse_args()
+
+    archive = PageArchive(args.semester_dir)
+    if not archive.exists():
+        print(f"Kein Archiv in {args.semester_dir}")
+        return
+    if args.reindex:
+        print(f"Index neu aufgebaut: {archive.reindex()} Datensätze")
+    stats = archive.stats()
+    print(f"{stats['records']} Datensätze, {stats['urls']} URLs, {stats['failed']} fehlerhafte Abrufe")
+    print(f"{stats['raw_bytes'] / 1e6:.1f} MB HTML in {stats['archive_bytes'] / 1e6:.1f} MB "
+          f"({stats['ratio']:.1f}x, {', '.join(stats['codecs'])})")
+
+if __name__ == "__main__":
+    main()
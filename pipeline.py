@@ -0,0 +1,148 @@
+import glob
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from instrumentation import profile, timer
+
+REPORT_FILE = 'data/pipeline_report.json'
+
+@dataclass
+class Stage:
+    """
+    Ein Schritt der Pipeline mit deklarierten Ein- und Ausgaben (Glob-Muster).
+    Ein Stage wird übersprungen, wenn alle Ausgaben existieren und neuer als alle Eingaben sind.
+    """
+    name: str
+    description: str
+    func: Callable[[], object]
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    depends_on: List[str] = field(default_factory=list)
+    always_run: bool = False  # z.B. um neue Semester zu entdecken, auch wenn Ausgaben existieren
+
+def _expand(patterns: List[str]) -> List[str]:
+    return [path for pattern in patterns for path in glob.glob(pattern)]
+
+def is_up_to_date(stage: Stage) -> bool:
+    """Prüft, ob alle Ausgaben eines Stages existieren und neuer als seine Eingaben sind."""
+    if stage.always_run or not stage.outputs:
+        return False
+    # Jedes Ausgabemuster muss mindestens eine Datei liefern
+    output_files = []
+    for pattern in stage.outputs:
+        matches = glob.glob(pattern)
+        if not matches:
+            return False
+        output_files.extend(matches)
+    input_files = _expand(stage.inputs)
+    if not input_files:
+        return True
+    return min(os.path.getmtime(f) for f in output_files) >= max(os.path.getmtime(f) for f in input_files)
+
+def _run_stage(stage: Stage, profile_enabled: bool = False) -> float:
+    print(f"\n{'='*80}")
+    print(f"Starte: {stage.description}")
+    print(f"Stage: {stage.name}")
+    print(f"Zeitpunkt: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print('='*80 + "\n")
+    start_time = time.perf_counter()
+    with profile(stage.name, enabled=profile_enabled), timer(f"stage_{stage.name}"):
+        stage.func()
+    return time.perf_counter() - start_time
+
+def run_pipeline(stages: List[Stage], force: bool = False, selected: Optional[List[str]] = None,
+                 max_workers: int = 2, report_file: str = REPORT_FILE,
+                 profile_stages: bool = False) -> Dict[str, Dict]:
+    """
+    Führt die Stages in Abhängigkeitsreihenfolge im selben Prozess aus.
+    Unabhängige Zweige (z.B. Keyword- und semantische Analyse) laufen parallel.
+
+    Args:
+        force: Alle Stages ausführen, auch wenn ihre Ausgaben aktuell sind
+        selected: Optional. Nur diese Stages ausführen (Abhängigkeiten gelten als erledigt)
+        profile_stages: Jeden ausgeführten Stage mit cProfile profilieren
+
+    Returns:
+        Dictionary mit Stage-Name -> {'status', 'duration'}
+    """
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        unknown = [dep for dep in stage.depends_on if dep not in by_name]
+        if unknown:
+            raise ValueError(f"Unbekannte Abhängigkeit(en) für {stage.name}: {unknown}")
+
+    report = {}
+    if selected is not None:
+        for stage in stages:
+            if stage.name not in selected:
+                report[stage.name] = {'status': 'nicht ausgewählt', 'duration': 0.0}
+
+    pipeline_start = time.perf_counter()
+    pending = {stage.name for stage in stages if stage.name not in report}
+    running = {}
+    succeeded = {'nicht ausgewählt', 'aktuell', 'erfolgreich'}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            # Stages starten, deren Abhängigkeiten abgeschlossen sind
+            progressed = False
+            for name in sorted(pending):
+                stage = by_name[name]
+                if any(dep not in report for dep in stage.depends_on):
+                    continue
+                pending.discard(name)
+                progressed = True
+                failed_deps = [dep for dep in stage.depends_on if report[dep]['status'] not in succeeded]
+                if failed_deps:
+                    print(f"\n⏭️  {name} übersprungen: Abhängigkeit fehlgeschlagen ({', '.join(failed_deps)})")
+                    report[name] = {'status': 'abgebrochen', 'duration': 0.0}
+                elif not force and is_up_to_date(stage):
+                    print(f"\n⏭️  {name} ist aktuell (Ausgaben neuer als Eingaben)")
+                    report[name] = {'status': 'aktuell', 'duration': 0.0}
+                else:
+                    running[executor.submit(_run_stage, stage, profile_stages)] = (name, time.perf_counter())
+
+            if not running:
+                if pending and not progressed:
+                    raise ValueError(f"Zyklische Abhängigkeiten zwischen: {sorted(pending)}")
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, start_time = running.pop(future)
+                try:
+                    duration = future.result()
+                    print(f"\n✅ {name} erfolgreich ausgeführt ({duration:.1f}s)")
+                    report[name] = {'status': 'erfolgreich', 'duration': duration}
+                except (Exception, SystemExit) as e:
+                    duration = time.perf_counter() - start_time
+                    print(f"\n❌ Fehler in {name}: {str(e)}")
+                    report[name] = {'status': 'fehlgeschlagen', 'duration': duration, 'error': str(e)}
+
+    # Ergebnisse in Stage-Reihenfolge
+    report = {stage.name: report[stage.name] for stage in stages}
+    os.makedirs(os.path.dirname(report_file), exist_ok=True)
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'wall_time': time.perf_counter() - pipeline_start,
+            'stages': report
+        }, f, ensure_ascii=False, indent=2)
+
+    return report
+
+def print_timing_report(report: Dict[str, Dict]):
+    """Gibt die Laufzeit pro Stage als Tabelle aus."""
+    print("\n" + "="*80)
+    print("Laufzeiten pro Stage")
+    print("="*80)
+    for name, entry in report.items():
+        print(f"{name:<20} {entry['status']:<18} {entry['duration']:>10.1f}s")
+    total = sum(entry['duration'] for entry in report.values())
+    print("-"*80)
+    print(f"{'Gesamt (Summe)':<39} {total:>10.1f}s")
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+try:
+    import fcntl
+except ImportError:  # Windows: nur die Sperre zwischen Threads
+    fcntl = None
+
+# Manifest mit den Fingerprints der zuletzt gerenderten Grafiken
+RENDER_CACHE_FILE = '.render_cache.json'
+DEFAULT_DPI = 300
+
+# Die Plot-Stufen der Pipeline laufen als Threads und teilen sich das Manifest in plots/
+_manifest_lock = threading.Lock()
+
+@dataclass
+class PlotJob:
+    """
+    Beschreibt eine unabhängig renderbare Grafik.
+
+    renderer muss eine Funktion auf Modulebene sein (für den Prozess-Pool),
+    die aus den aggregierten Daten eine Figure erzeugt oder None zurückgibt.
+    """
+    name: str
+    renderer: Callable
+    data: object
+    params: Dict = field(default_factory=dict)
+
+def new_figure(figsize) -> Figure:
+    """Erstellt eine Figure mit Agg-Canvas ohne den pyplot-Zustandsautomaten."""
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+def _json_default(obj):
+    # NumPy-Arrays über ihren Speicherinhalt hashen statt als Liste zu serialisieren
+    if hasattr(obj, 'tobytes') and hasattr(obj, 'shape'):
+        return {
+            'shape': list(obj.shape),
+            'dtype': str(obj.dtype),
+            'sha256': hashlib.sha256(obj.tobytes()).hexdigest()
+        }
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    return str(obj)
+
+def fingerprint(job: PlotJob, dpi: int = DEFAULT_DPI) -> str:
+    """Berechnet den Fingerprint aus Renderer, Daten und Plot-Parametern."""
+    payload = json.dumps({
+        'renderer': f"{job.renderer.__module__}.{job.renderer.__qualname__}",
+        'data': job.data,
+        'params': job.params,
+        'dpi': dpi
+    }, sort_keys=True, ensure_ascii=False, default=_json_default)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def _load_manifest(output_dir: Path) -> Dict[str, str]:
+    manifest_file = output_dir / RENDER_CACHE_FILE
+    if not manifest_file.exists():
+        return {}
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def _save_manifest(output_dir: Path, manifest: Dict[str, str]):
+    tmp_file = output_dir / (RENDER_CACHE_FILE + '.tmp')
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_file, output_dir / RENDER_CACHE_FILE)
+
+@contextmanager
+def _manifest_locked(output_dir: Path):
+    """Sperrt das Manifest gegen parallele Threads und (mit fcntl) parallele Prozesse."""
+    with _manifest_lock, open(output_dir / (RENDER_CACHE_FILE + '.lock'), 'w') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+def _update_manifest(output_dir: Path, updates: Dict[str, Optional[str]]):
+    """
+    Trägt die Fingerprints eines Render-Durchlaufs ins aktuelle Manifest ein (None entfernt
+    den Eintrag). Geladen, zusammengeführt und ersetzt wird unter der Sperre, damit die
+    Einträge gleichzeitig laufender Durchläufe erhalten bleiben.
+    """
+    with _manifest_locked(output_dir):
+        manifest = _load_manifest(output_dir)
+        for name, job_fingerprint in updates.items():
+            if job_fingerprint is None:
+                manifest.pop(name, None)
+            else:
+                manifest[name] = job_fingerprint
+        _save_manifest(output_dir, manifest)
+
+def _render_job(job: PlotJob, output_file: str, dpi: int) -> bool:
+    """Rendert eine Grafik und speichert sie als PNG (läuft im Worker-Prozess)."""
+    fig = job.renderer(job.data, **job.params)
+    if fig is None:
+        return False
+    fig.savefig(output_file, dpi=dpi, bbox_inches='tight')
+    return True
+
+def _pool_context():
+    """Startmethode der Render-Prozesse: forkserver, wo verfügbar, sonst spawn."""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+def render_plots(jobs: List[PlotJob], output_dir: str = 'plots', dpi: int = DEFAULT_DPI,
+                 max_workers: Optional[int] = None, force: bool = False) -> Dict[str, str]:
+    """
+    Rendert alle Grafiken, deren Fingerprint sich geändert hat, parallel im Prozess-Pool.
+
+    Returns:
+        Dictionary mit Dateiname -> Status ('gerendert', 'cache', 'leer')
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(exist_ok=True)
+    manifest = _load_manifest(output_path)
+
+    status = {}
+    pending = []
+    for job in jobs:
+        output_file = output_path / f"{job.name}.png"
+        job_fingerprint = fingerprint(job, dpi)
+        if not force and output_file.exists() and manifest.get(job.name) == job_fingerprint:
+            status[job.name] = 'cache'
+        else:
+            pending.append((job, str(output_file), job_fingerprint))
+
+    if max_workers is None:
+        max_workers = min(len(pending), os.cpu_count() or 1)
+
+    if len(pending) > 1 and max_workers > 1:
+        # Kein fork: der Elternprozess hält Threads und Locks (Manifest, Matplotlib)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=_pool_context()) as executor:
+            futures = [
+                executor.submit(_render_job, job, output_file, dpi)
+                for job, output_file, _ in pending
+            ]
+            results = [future.result() for future in futures]
+    else:
+        results = [_render_job(job, output_file, dpi) for job, output_file, _ in pending]
+
+    updates = {}
+    for (job, _, job_fingerprint), rendered in zip(pending, results):
+        updates[job.name] = job_fingerprint if rendered else None
+        status[job.name] = 'gerendert' if rendered else 'leer'
+
+    if updates:
+        _update_manifest(output_path, updates)
+    return status
@@ -0,0 +1,249 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from semester_registry import semester_sort_key
+
+SDG_IDS = [f"SDG {i}" for i in range(1, 18)]
+STORE_DIR = Path('data/result_store')
+KEYWORD_FILE = Path('data/keyword_analysis.json')
+SEMANTIC_FILE = Path('data/semantic_analysis.json')
+
+def _save_array(path: Path, array: np.ndarray):
+    """
+    Schreibt ein .npy-Array in eine neue Datei und ersetzt die alte: ein noch geöffneter
+    Speicher (z. B. im Dashboard) behält per mmap die bisherige Datei.
+    """
+    tmp_path = Path(f"{path}.tmp.npy")
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
+
+def load_array(path: Path) -> np.ndarray:
+    """Lädt ein .npy-Array per mmap (leere Arrays lassen sich nicht mappen)."""
+    try:
+        return np.load(path, mmap_mode='r')
+    except ValueError:
+        return np.load(path)
+
+class StringColumn:
+    """
+    Spalte variabler Zeichenketten: UTF-8-Bytes hintereinander plus Offsets.
+    Beide Arrays werden per mmap geladen, dekodiert wird erst beim Zugriff.
+    """
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return bytes(self.data[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+    def take(self, indices) -> List[str]:
+        return [self[i] for i in indices]
+
+    @staticmethod
+    def save(store_dir: Path, name: str, values: List[str]):
+        encoded = [(value or '').encode('utf-8') for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(value) for value in encoded])
+        data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        _save_array(store_dir / f"{name}.bytes.npy", data)
+        _save_array(store_dir / f"{name}.offsets.npy", offsets)
+
+    @classmethod
+    def load(cls, store_dir: Path, name: str) -> 'StringColumn':
+        return cls(load_array(store_dir / f"{name}.bytes.npy"),
+                   load_array(store_dir / f"{name}.offsets.npy"))
+
+def _collect_keyword_courses(keyword_data: Dict):
+    """Sammelt alle Kurse (mit und ohne SDG-Bezug) und die Keyword-Treffer pro Kurs."""
+    courses = {}
+    hits = []
+    for semester, analysis in keyword_data.get('semester_analyses', {}).items():
+        for sdg, sdg_data in analysis.get('sdg_distribution', {}).items():
+            for course in sdg_data.get('courses', []):
+                key = course.get('url') or f"{semester}:{course.get('number')}"
+                courses.setdefault(key, (semester, course))
+                hits.append((key, sdg, course.get('found_keywords', [])))
+        for course in analysis.get('courses_without_sdgs', []):
+            key = course.get('url') or f"{semester}:{course.get('number')}"
+            courses.setdefault(key, (semester, course))
+    return courses, hits
+
+def build_result_store(keyword_file: Path = KEYWORD_FILE, semantic_file: Path = SEMANTIC_FILE,
+                       store_dir: Path = STORE_DIR) -> Path:
+    """
+    Überführt keyword_analysis.json und semantic_analysis.json in einen spaltenorientierten
+    Speicher aus .npy-Dateien (eine Zeile pro Kurs, Treffer als Index-Arrays).
+    """
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+
+    keyword_data = {}
+    if Path(keyword_file).exists():
+        with open(keyword_file, 'r', encoding='utf-8') as f:
+            keyword_data = json.load(f)
+    semantic_data = {}
+    if Path(semantic_file).exists():
+        with open(semantic_file, 'r', encoding='utf-8') as f:
+            semantic_data = json.load(f)
+
+    courses, keyword_hits = _collect_keyword_courses(keyword_data)
+
+    # Kurse, die nur in der semantischen Analyse vorkommen, ergänzen
+    semantic_rows = []
+    for semester, semester_data in semantic_data.get('semantic_analysis', {}).items():
+        for result in semester_data.get('courses', []):
+            info = result['course_info']
+            key = info.get('url') or f"{semester}:{info.get('title')}"
+            courses.setdefault(key, (semester, info))
+            semantic_rows.append((key, result['semantic_matches']))
+
+    keys = list(courses.keys())
+    course_index = {key: i for i, key in enumerate(keys)}
+    semesters = sorted({semester for semester, _ in courses.values()}, key=semester_sort_key)
+    semester_index = {semester: i for i, semester in enumerate(semesters)}
+    course_types = sorted({(course.get('type') or '') for _, course in courses.values()})
+    type_index = {course_type: i for i, course_type in enumerate(course_types)}
+    sdg_index = {sdg: i for i, sdg in enumerate(SDG_IDS)}
+
+    # Kurstabelle
+    _save_array(store_dir / 'course_semester.npy',
+            np.array([semester_index[courses[key][0]] for key in keys], dtype=np.int16))
+    _save_array(store_dir / 'course_type.npy',
+            np.array([type_index[courses[key][1].get('type') or ''] for key in keys], dtype=np.int16))
+    _save_array(store_dir / 'course_ects.npy',
+            np.array([courses[key][1].get('ects') or np.nan for key in keys], dtype=np.float32))
+    StringColumn.save(store_dir, 'course_url', [courses[key][1].get('url', '') for key in keys])
+    StringColumn.save(store_dir, 'course_number', [courses[key][1].get('number') or '' for key in keys])
+    StringColumn.save(store_dir, 'course_title', [courses[key][1].get('title') or '' for key in keys])
+
+    # Keyword-Treffer, sortiert nach Kurs
+    keyword_hits = sorted(
+        ((course_index[key], sdg_index[sdg], keywords) for key, sdg, keywords in keyword_hits if sdg in sdg_index),
+        key=lambda hit: (hit[0], hit[1])
+    )
+    _save_array(store_dir / 'keyword_course.npy', np.array([hit[0] for hit in keyword_hits], dtype=np.int32))
+    _save_array(store_dir / 'keyword_sdg.npy', np.array([hit[1] for hit in keyword_hits], dtype=np.int8))
+    StringColumn.save(store_dir, 'keyword_found', [', '.join(sorted(hit[2])) for hit in keyword_hits])
+
+    # Semantische Treffer, sortiert nach Kurs
+    semantic_hits = sorted(
+        (course_index[key], sdg_index[sdg], match['similarity'], match.get('confidence') == 'high')
+        for key, matches in semantic_rows
+        for sdg, match in matches.items()
+        if sdg in sdg_index
+    )
+    _save_array(store_dir / 'semantic_course.npy', np.array([hit[0] for hit in semantic_hits], dtype=np.int32))
+    _save_array(store_dir / 'semantic_sdg.npy', np.array([hit[1] for hit in semantic_hits], dtype=np.int8))
+    _save_array(store_dir / 'semantic_similarity.npy', np.array([hit[2] for hit in semantic_hits], dtype=np.float32))
+    _save_array(store_dir / 'semantic_high.npy', np.array([hit[3] for hit in semantic_hits], dtype=bool))
+
+    meta = {
+        'semesters': semesters,
+        'course_types': course_types,
+        'sdgs': SDG_IDS,
+        'num_courses': len(keys),
+        # Von der jeweiligen Methode analysierte Semester (auch ohne Treffer)
+        'analyzed_semesters': {
+            'keyword': list(keyword_data.get('semester_analyses', {})),
+            'semantic': list(semantic_data.get('semantic_analysis', {}))
+        },
+        'sources': {
+            'keyword': str(keyword_file),
+            'semantic': str(semantic_file)
+        }
+    }
+    # meta.json zuletzt schreiben: ihr Zeitstempel markiert einen vollständigen Speicher
+    with open(store_dir / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+    return store_dir
+
+class ResultStore:
+    """Memory-mapped Sicht auf die Ergebnisse der Keyword- und der semantischen Analyse."""
+
+    def __init__(self, store_dir: Path = STORE_DIR):
+        store_dir = Path(store_dir)
+        with open(store_dir / 'meta.json', 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.semesters = self.meta['semesters']
+        self.course_types = self.meta['course_types']
+        self.version = os.path.getmtime(store_dir / 'meta.json')
+
+        load = lambda name: load_array(store_dir / f"{name}.npy")
+        self.course_semester = load('course_semester')
+        self.course_type = load('course_type')
+        self.course_ects = load('course_ects')
+        self.course_url = StringColumn.load(store_dir, 'course_url')
+        self.course_number = StringColumn.load(store_dir, 'course_number')
+        self.course_title = StringColumn.load(store_dir, 'course_title')
+
+        self.keyword_course = load('keyword_course')
+        self.keyword_sdg = load('keyword_sdg')
+        self.keyword_found = StringColumn.load(store_dir, 'keyword_found')
+
+        self.semantic_course = load('semantic_course')
+        self.semantic_sdg = load('semantic_sdg')
+        self.semantic_similarity = load('semantic_similarity')
+        self.semantic_high = load('semantic_high')
+
+    @property
+    def num_courses(self) -> int:
+        return len(self.course_semester)
+
+    def course_mask(self, semesters: Optional[List[str]] = None,
+                    course_types: Optional[List[str]] = None) -> np.ndarray:
+        """Boolesche Maske über alle Kurse für die gewählten Semester und Kurstypen."""
+        mask = np.ones(self.num_courses, dtype=bool)
+        if semesters is not None:
+            selected = [self.semesters.index(semester) for semester in semesters if semester in self.semesters]
+            mask &= np.isin(self.course_semester, selected)
+        if course_types is not None:
+            selected = [self.course_types.index(t) for t in course_types if t in self.course_types]
+            mask &= np.isin(self.course_type, selected)
+        return mask
+
+    def courses_frame(self, course_indices: np.ndarray) -> pd.DataFrame:
+        """Kurstabelle für die angegebenen Kurs-Indizes (Zeichenketten werden nur hier dekodiert)."""
+        return pd.DataFrame({
+            'Semester': [self.semesters[i] for i in self.course_semester[course_indices]],
+            'Kursnummer': self.course_number.take(course_indices),
+            'Kurstitel': self.course_title.take(course_indices),
+            'Kurstyp': [self.course_types[i] for i in self.course_type[course_indices]],
+            'ECTS': self.course_ects[course_indices],
+            'URL': self.course_url.take(course_indices)
+        }, index=course_indices)
+
+def refresh_result_store(store_dir: Path = STORE_DIR, keyword_file: Path = KEYWORD_FILE,
+                         semantic_file: Path = SEMANTIC_FILE) -> float:
+    """
+    Baut den Ergebnisspeicher neu, wenn die Quelldateien neuer sind, ohne ihn zu öffnen.
+
+    Returns:
+        Version des Speichers (Änderungszeit der meta.json, wie ResultStore.version)
+    """
+    meta_file = Path(store_dir) / 'meta.json'
+    source_times = [os.path.getmtime(path) for path in (keyword_file, semantic_file) if Path(path).exists()]
+    if not meta_file.exists() or (source_times and max(source_times) > os.path.getmtime(meta_file)):
+        print(f"Baue Ergebnisspeicher in {store_dir} neu auf...")
+        build_result_store(keyword_file, semantic_file, store_dir)
+    return os.path.getmtime(meta_file)
+
+def ensure_result_store(store_dir: Path = STORE_DIR, keyword_file: Path = KEYWORD_FILE,
+                        semantic_file: Path = SEMANTIC_FILE) -> ResultStore:
+    """Lädt den Ergebnisspeicher und baut ihn neu, wenn die Quelldateien neuer sind."""
+    refresh_result_store(store_dir, keyword_file, semantic_file)
+    return ResultStore(store_dir)
+
+if __name__ == "__main__":
+    build_result_store()
+    store = ResultStore()
+    print(f"Ergebnisspeicher erstellt: {store.num_courses} Kurse, "
+          f"{len(store.keyword_course)} Keyword-Treffer, {len(store.semantic_course)} semantische Treffer")
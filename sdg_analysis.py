@@ -3,7 +3,12 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from pathlib import Path
 from collections import Counter
-import os
+from collections.abc import Mapping
+from course_record import load_course_records
+from instrumentation import run_instrumented, timer
+from keyword_index import KeywordIndex
+from semester_registry import SemesterRegistry, latest_course_file, parse_semester, semester_sort_key
+from plot_rendering import PlotJob, new_figure, render_plots
 
 def get_sdg_descriptions():
     """Liefert die SDG-Beschreibungen"""
@@ -30,64 +35,69 @@ def get_sdg_descriptions():
 def load_keyword_data():
     """Lädt die Keyword-Analyse Daten"""
     try:
-        with open("data/keyword_analysis.json", "r", encoding="utf-8") as f:
+        with timer('load'), open("data/keyword_analysis.json", "r", encoding="utf-8") as f:
             return json.load(f)
     except Exception as e:
         print(f"Fehler beim Laden der Daten: {str(e)}")
         return None
 
-def create_sdg_temporal_plot(keyword_data):
-    """Erstellt die zeitliche Entwicklung der SDGs"""
+def aggregate_sdg_temporal_counts(keyword_data):
+    """Aggregiert die Anzahl der Kurse pro SDG und Semester für den Zeitverlauf"""
     if not keyword_data:
         return None
     
-    # Definiere die korrekte chronologische Reihenfolge der Semester
-    semester_order = [
-        'Sommersemester 2023',
-        'Wintersemester 2023',
-        'Sommersemester 2024',
-        'Wintersemester 2024'
-    ]
-    
-    # Stelle sicher, dass nur verfügbare Semester verwendet werden
-    semesters = [sem for sem in semester_order if sem in keyword_data['semester_analyses']]
+    # Alle analysierten Semester in chronologischer Reihenfolge
+    semesters = sorted(keyword_data['semester_analyses'], key=semester_sort_key)
     sdg_descriptions = get_sdg_descriptions()
     
-    # Erstelle ein Dictionary für die Daten
-    data = {semester: {} for semester in semesters}
+    # Hole die Anzahl der Kurse pro SDG (0 wenn nicht vorhanden)
+    counts = {
+        sdg: [
+            len(keyword_data['semester_analyses'][semester]
+                .get('sdg_distribution', {}).get(sdg, {}).get('courses', []))
+            for semester in semesters
+        ]
+        for sdg in sdg_descriptions.keys()
+    }
     
-    # Fülle die Daten
-    for semester, analysis in keyword_data['semester_analyses'].items():
-        if semester in semesters:  # Nur Daten für die definierten Semester verwenden
-            for sdg in sdg_descriptions.keys():
-                # Hole die Anzahl der Kurse für dieses SDG (0 wenn nicht vorhanden)
-                courses = len(analysis.get('sdg_distribution', {}).get(sdg, {}).get('courses', []))
-                data[semester][sdg] = courses
+    return {'semesters': semesters, 'counts': counts}
+
+def render_sdg_temporal_plot(aggregate):
+    """Zeichnet die zeitliche Entwicklung der SDGs aus den aggregierten Zählungen"""
+    if not aggregate or not aggregate['semesters']:
+        return None
     
-    # Erstelle die Matplotlib-Figur
-    plt.figure(figsize=(15, 10))
+    semesters = aggregate['semesters']
+    sdg_descriptions = get_sdg_descriptions()
+    
+    fig = new_figure(figsize=(15, 10))
+    ax = fig.add_subplot()
     
     # Füge eine Linie für jedes SDG hinzu
     for sdg, description in sdg_descriptions.items():
-        y_values = [data[sem][sdg] for sem in semesters]
-        plt.plot(range(len(semesters)), y_values, marker='o', label=f"{sdg} - {description}")
+        ax.plot(range(len(semesters)), aggregate['counts'][sdg], marker='o', label=f"{sdg} - {description}")
     
     # Layout anpassen
-    plt.title('Zeitliche Entwicklung der SDG-Bezüge in Kursen', pad=20, size=14)
-    plt.xlabel('Semester')
-    plt.ylabel('Anzahl Kurse')
+    ax.set_title('Zeitliche Entwicklung der SDG-Bezüge in Kursen', pad=20, size=14)
+    ax.set_xlabel('Semester')
+    ax.set_ylabel('Anzahl Kurse')
     
     # X-Achsen-Labels anpassen
-    plt.xticks(range(len(semesters)), semesters, rotation=45)
+    ax.set_xticks(range(len(semesters)))
+    ax.set_xticklabels(semesters, rotation=45)
     
     # Legende außerhalb des Plots
-    plt.legend(bbox_to_anchor=(1.05, 1), loc='upper left', borderaxespad=0.)
+    ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left', borderaxespad=0.)
     
     # Layout optimieren
-    plt.grid(True, linestyle='--', alpha=0.7)
-    plt.tight_layout()
+    ax.grid(True, linestyle='--', alpha=0.7)
+    fig.tight_layout()
     
-    return plt.gcf()
+    return fig
+
+def create_sdg_temporal_plot(keyword_data):
+    """Erstellt die zeitliche Entwicklung der SDGs"""
+    return render_sdg_temporal_plot(aggregate_sdg_temporal_counts(keyword_data))
 
 def save_plot(fig, filename):
     """Speichert die Grafik als PNG"""
@@ -140,8 +150,8 @@ def create_metrics_table(keyword_data):
     
     return df
 
-def create_sdg_distribution_plot(keyword_data, target_semester):
-    """Erstellt ein Balkendiagramm der SDG-Verteilung für ein bestimmtes Semester"""
+def aggregate_sdg_distribution(keyword_data, target_semester):
+    """Aggregiert die Anzahl der Kurse pro SDG für ein bestimmtes Semester"""
     if not keyword_data or target_semester not in keyword_data['semester_analyses']:
         return None
     
@@ -161,34 +171,64 @@ def create_sdg_distribution_plot(keyword_data, target_semester):
     
     # Sortiere die Daten nach Anzahl (absteigend)
     sorted_data = sorted(zip(sdg_counts, sdg_labels), reverse=True)
-    sdg_counts, sdg_labels = zip(*sorted_data)
     
-    # Erstelle die Matplotlib-Figur
-    plt.figure(figsize=(15, 8))
+    return {
+        'semester': target_semester,
+        'counts': [count for count, _ in sorted_data],
+        'labels': [label for _, label in sorted_data]
+    }
+
+def render_sdg_distribution_plot(aggregate):
+    """Zeichnet das Balkendiagramm der SDG-Verteilung aus den aggregierten Zählungen"""
+    if not aggregate or not aggregate['counts']:
+        return None
+    
+    sdg_counts = aggregate['counts']
+    sdg_labels = aggregate['labels']
+    
+    fig = new_figure(figsize=(15, 8))
+    ax = fig.add_subplot()
     
     # Erstelle das Balkendiagramm
-    bars = plt.bar(range(len(sdg_counts)), sdg_counts)
+    bars = ax.bar(range(len(sdg_counts)), sdg_counts)
     
     # Layout anpassen
-    plt.title(f'Verteilung der SDG-Bezüge in Kursen ({target_semester})', pad=20, size=14)
-    plt.xlabel('Sustainable Development Goals (SDGs)')
-    plt.ylabel('Anzahl Kurse')
+    ax.set_title(f"Verteilung der SDG-Bezüge in Kursen ({aggregate['semester']})", pad=20, size=14)
+    ax.set_xlabel('Sustainable Development Goals (SDGs)')
+    ax.set_ylabel('Anzahl Kurse')
     
     # X-Achsen-Labels anpassen
-    plt.xticks(range(len(sdg_counts)), sdg_labels, rotation=45, ha='right')
+    ax.set_xticks(range(len(sdg_counts)))
+    ax.set_xticklabels(sdg_labels, rotation=45, ha='right')
     
     # Füge Werte über den Balken hinzu
     for bar in bars:
         height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height,
+        ax.text(bar.get_x() + bar.get_width()/2., height,
                 f'{int(height)}',
                 ha='center', va='bottom')
     
     # Layout optimieren
-    plt.grid(True, axis='y', linestyle='--', alpha=0.7)
-    plt.tight_layout()
+    ax.grid(True, axis='y', linestyle='--', alpha=0.7)
+    fig.tight_layout()
     
-    return plt.gcf()
+    return fig
+
+def create_sdg_distribution_plot(keyword_data, target_semester):
+    """Erstellt ein Balkendiagramm der SDG-Verteilung für ein bestimmtes Semester"""
+    return render_sdg_distribution_plot(aggregate_sdg_distribution(keyword_data, target_semester))
+
+def build_plot_jobs(keyword_data):
+    """Erstellt die Render-Aufträge für den Zeitverlauf und die Verteilung jedes Semesters"""
+    jobs = [PlotJob("sdg_entwicklung", render_sdg_temporal_plot,
+                    aggregate_sdg_temporal_counts(keyword_data))]
+    
+    for semester, analysis in keyword_data['semester_analyses'].items():
+        semester_id = analysis.get('semester_info', {}).get('semester_id', semester.replace(' ', '_'))
+        jobs.append(PlotJob(f"sdg_verteilung_{semester_id.lower()}", render_sdg_distribution_plot,
+                            aggregate_sdg_distribution(keyword_data, semester)))
+    
+    return jobs
 
 def create_course_keyword_table(keyword_data):
     """Erstellt eine Tabelle mit Kursen und gefundenen Schlagwörtern für alle Semester"""
@@ -199,27 +239,21 @@ def create_course_keyword_table(keyword_data):
     
     # Erstelle eine Liste aller Kurse und ihrer Schlagwörter
     courses_data = []
+    registry = SemesterRegistry.load()
+    pool = {}
     
     # Gehe durch alle Semester
     for semester, semester_data in keyword_data['semester_analyses'].items():
         print(f"\nVerarbeite {semester}...")
         
         # Hole alle Kurse des Semesters aus der neuesten courses_*.json Datei
-        semester_code = semester.split()[-1]
-        if semester.startswith('Wintersemester'):
-            semester_dir = f"data/semester_WS{semester_code}"
-        else:
-            semester_dir = f"data/semester_SS{semester_code}"
-            
-        course_files = [f for f in os.listdir(semester_dir) 
-                       if f.startswith('courses_') and f.endswith('.json')]
-        if not course_files:
+        parsed = parse_semester(semester)
+        course_file = latest_course_file(registry.semester_dir(parsed)) if parsed is not None else None
+        if course_file is None:
             print(f"Keine Kursdaten gefunden für {semester}")
             continue
-            
-        latest_course_file = max(course_files)
-        with open(os.path.join(semester_dir, latest_course_file), 'r', encoding='utf-8') as f:
-            all_courses = json.load(f)['courses']
+        
+        all_courses = load_course_records(course_file, pool)
         
         print(f"Gesamtzahl Kurse: {len(all_courses)}")
         
@@ -230,7 +264,7 @@ def create_course_keyword_table(keyword_data):
         # Sammle SDGs und Keywords für jeden Kurs mit SDG-Bezügen
         for sdg, sdg_data in semester_data.get('sdg_distribution', {}).items():
             for course in sdg_data.get('courses', []):
-                if not isinstance(course, dict) or 'number' not in course:
+                if not isinstance(course, Mapping) or 'number' not in course:
                     continue
                     
                 course_number = course['number']
@@ -247,9 +281,9 @@ def create_course_keyword_table(keyword_data):
             
             # Prüfe auf fehlende oder leere Felder
             missing_fields = []
-            if not course.get('title', '').strip():
+            if not (course.title or '').strip():
                 missing_fields.append('Titel')
-            if not course.get('objectives_and_content', '').strip():
+            if not (course.objectives_and_content or '').strip():
                 missing_fields.append('Inhalt')
             
             # Bestimme Status und Grund
@@ -288,7 +322,7 @@ def create_course_keyword_table(keyword_data):
     
     # Sortiere nach Semester und Kursnummer
     try:
-        semester_order = ['Wintersemester 2023', 'Sommersemester 2024', 'Wintersemester 2024']
+        semester_order = sorted(df['Semester'].unique(), key=semester_sort_key)
         df['Semester'] = pd.Categorical(df['Semester'], categories=semester_order, ordered=True)
         df = df.sort_values(['Semester', 'Kursnummer'])
     except Exception as e:
@@ -307,36 +341,64 @@ def create_course_keyword_table(keyword_data):
     
     return df
 
+def create_keyword_frequency_table(keyword_index):
+    """Erstellt eine Tabelle mit der Anzahl Kurse pro Schlagwort und Semester aus dem Keyword-Index"""
+    if keyword_index is None:
+        return None
+    
+    semesters = sorted({doc[0] for doc in keyword_index.docs}, key=semester_sort_key)
+    rows = []
+    for keyword in keyword_index.keywords:
+        semester_counts = keyword_index.semester_counts(keyword)
+        row = {
+            'Schlagwort': keyword,
+            'SDGs': ', '.join(keyword_index.keyword_sdgs.get(keyword, [])),
+            'Kurse gesamt': keyword_index.document_frequency(keyword)
+        }
+        row.update({semester: semester_counts.get(semester, 0) for semester in semesters})
+        rows.append(row)
+    
+    df = pd.DataFrame(rows).sort_values('Kurse gesamt', ascending=False)
+    Path("plots").mkdir(exist_ok=True)
+    df.to_csv('plots/schlagwort_haeufigkeit.csv', index=False, encoding='utf-8')
+    return df
+
 def main():
     # Lade Daten
     keyword_data = load_keyword_data()
     if not keyword_data:
         return
     
-    # Erstelle und speichere Plot
-    fig = create_sdg_temporal_plot(keyword_data)
-    if fig:
-        save_plot(fig, "sdg_entwicklung")
-        print("Grafik wurde gespeichert als:")
-        print("- plots/sdg_entwicklung.png")
-    
-    # Erstelle und speichere SDG-Verteilung für WS 2024
-    fig_dist = create_sdg_distribution_plot(keyword_data, "Wintersemester 2024")
-    if fig_dist:
-        save_plot(fig_dist, "sdg_verteilung_ws2024")
-        print("\nSDG-Verteilung wurde gespeichert als:")
-        print("- plots/sdg_verteilung_ws2024.png")
+    # Erstelle und speichere Zeitverlauf und SDG-Verteilungen pro Semester
+    # (parallel, unveränderte Grafiken werden aus dem Cache übernommen)
+    with timer('plot_render'):
+        render_status = render_plots(build_plot_jobs(keyword_data))
+    print("Grafiken:")
+    for name, status in render_status.items():
+        if status != 'leer':
+            print(f"- plots/{name}.png ({status})")
     
     # Erstelle und zeige Kennzahlen
-    metrics_df = create_metrics_table(keyword_data)
+    with timer('table_build'):
+        metrics_df = create_metrics_table(keyword_data)
     if metrics_df is not None:
         print("\nKennzahlen pro Semester:")
         print(metrics_df.to_string(index=False))
         print("\nDie Kennzahlen wurden gespeichert als:")
         print("- plots/semester_metrics.csv")
     
+    # Erstelle Schlagwort-Häufigkeiten aus dem invertierten Keyword-Index
+    with timer('table_build'):
+        keyword_frequency_df = create_keyword_frequency_table(KeywordIndex.load())
+    if keyword_frequency_df is not None:
+        print("\nHäufigste Schlagwörter:")
+        print(keyword_frequency_df.head(10).to_string(index=False))
+        print("\nDie Schlagwort-Häufigkeiten wurden gespeichert als:")
+        print("- plots/schlagwort_haeufigkeit.csv")
+    
     # Erstelle und zeige Kurs-Schlagwort-Tabelle für alle Semester
-    course_keyword_df = create_course_keyword_table(keyword_data)
+    with timer('table_build'):
+        course_keyword_df = create_course_keyword_table(keyword_data)
     if course_keyword_df is not None:
         print("\nKurse und Schlagwörter (Auszug der ersten 20 Zeilen):")
         print(course_keyword_df.head(20).to_string(index=False))
@@ -345,4 +407,4 @@ def main():
         print("- plots/kurse_schlagworte_alle_semester.csv")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    run_instrumented('sdg_analysis', main) 
\ No newline at end of file
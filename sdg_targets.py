@@ -0,0 +1,290 @@
+"""
+Die 169 Unterziele (Targets) der 17 SDGs und die Prototyp-Matrix für die semantische Analyse.
+
+Jedes SDG wird durch mehrere Prototyp-Embeddings vertreten: die Beschreibung des Ziels und
+je eines pro Unterziel. Alle Prototypen liegen nach SDG gruppiert in einer Matrix; die
+Ähnlichkeiten eines Texts zu allen Prototypen ergeben sich aus einer Matrixmultiplikation,
+die Bewertung pro SDG aus einer segmentierten Reduktion (Maximum oder Mittelwert) über die
+Prototypen des Ziels. Die Texte sind gekürzte Fassungen der offiziellen deutschen Übersetzung.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+SDG_TARGETS: Dict[str, List[Tuple[str, str]]] = {
+    'SDG 1': [
+        ('1.1', "Bis 2030 die extreme Armut, gegenwärtig definiert als weniger als 1,25 Dollar pro Tag, für alle Menschen überall auf der Welt beseitigen."),
+        ('1.2', "Bis 2030 den Anteil der Männer, Frauen und Kinder aller Altersgruppen, die in Armut in all ihren Dimensionen leben, mindestens um die Hälfte senken."),
+        ('1.3', "Den nationalen Gegebenheiten entsprechende Sozialschutzsysteme und -maßnahmen für alle umsetzen, einschließlich eines Basisschutzes, und eine breite Versorgung der Armen und Schwachen erreichen."),
+        ('1.4', "Sicherstellen, dass alle Männer und Frauen, insbesondere die Armen und Schwachen, die gleichen Rechte auf wirtschaftliche Ressourcen, Zugang zu grundlegenden Diensten, Grundeigentum, Erbschaften, natürlichen Ressourcen, Technologien und Finanzdienstleistungen einschließlich Mikrofinanzierung haben."),
+        ('1.5', "Die Widerstandsfähigkeit der Armen und der Menschen in prekären Situationen erhöhen und ihre Exposition und Anfälligkeit gegenüber klimabedingten Extremereignissen und anderen wirtschaftlichen, sozialen und ökologischen Schocks und Katastrophen verringern."),
+        ('1.a', "Eine erhebliche Mobilisierung von Ressourcen aus vielfältigen Quellen gewährleisten, einschließlich durch verbesserte Entwicklungszusammenarbeit, um den Entwicklungsländern Mittel für Programme zur Beendigung der Armut bereitzustellen."),
+        ('1.b', "Auf nationaler, regionaler und internationaler Ebene solide politische Rahmen auf der Grundlage armutsorientierter und geschlechtersensibler Entwicklungsstrategien schaffen, um beschleunigte Investitionen in Maßnahmen zur Beseitigung der Armut zu unterstützen."),
+    ],
+    'SDG 2': [
+        ('2.1', "Bis 2030 den Hunger beenden und sicherstellen, dass alle Menschen, insbesondere die Armen und Menschen in prekären Situationen, einschließlich Kleinkindern, ganzjährig Zugang zu sicheren, nährstoffreichen und ausreichenden Nahrungsmitteln haben."),
+        ('2.2', "Bis 2030 alle Formen der Fehlernährung beenden, Wachstumshemmung und Auszehrung bei Kindern unter fünf Jahren bekämpfen und den Ernährungsbedürfnissen von heranwachsenden Mädchen, schwangeren und stillenden Frauen und älteren Menschen Rechnung tragen."),
+        ('2.3', "Bis 2030 die landwirtschaftliche Produktivität und die Einkommen von kleinen Nahrungsmittelproduzenten, insbesondere von Frauen, Indigenen, bäuerlichen Familienbetrieben, Weidetierhaltern und Fischern, verdoppeln, durch sicheren und gleichberechtigten Zugang zu Grund und Boden, Wissen, Finanzdienstleistungen und Märkten."),
+        ('2.4', "Bis 2030 die Nachhaltigkeit der Systeme der Nahrungsmittelproduktion sicherstellen und resiliente landwirtschaftliche Methoden anwenden, die die Produktivität steigern, zur Erhaltung der Ökosysteme beitragen, die Anpassungsfähigkeit an Klimaänderungen, Dürren und Überschwemmungen erhöhen und die Flächen- und Bodenqualität schrittweise verbessern."),
+        ('2.5', "Bis 2020 die genetische Vielfalt von Saatgut, Kulturpflanzen sowie Nutz- und Haustieren und ihren wildlebenden Artverwandten bewahren, unter anderem durch gut verwaltete und diversifizierte Saatgut- und Pflanzenbanken, und den gerechten Vorteilsausgleich aus der Nutzung genetischer Ressourcen und des traditionellen Wissens fördern."),
+        ('2.a', "Die Investitionen in die ländliche Infrastruktur, die Agrarforschung und landwirtschaftliche Beratungsdienste, die Technologieentwicklung sowie Genbanken für Pflanzen und Nutztiere erhöhen, um die landwirtschaftliche Produktionskapazität in den Entwicklungsländern zu verbessern."),
+        ('2.b', "Handelsbeschränkungen und -verzerrungen auf den globalen Agrarmärkten korrigieren und verhindern, unter anderem durch die parallele Abschaffung aller Formen von Agrarexportsubventionen."),
+        ('2.c', "Maßnahmen zur Gewährleistung des reibungslosen Funktionierens der Märkte für Nahrungsmittelrohstoffe ergreifen und den rechtzeitigen Zugang zu Marktinformationen, auch über Nahrungsmittelreserven, erleichtern, um extreme Schwankungen der Nahrungsmittelpreise zu begrenzen."),
+    ],
+    'SDG 3': [
+        ('3.1', "Bis 2030 die weltweite Müttersterblichkeit auf unter 70 je 100.000 Lebendgeburten senken."),
+        ('3.2', "Bis 2030 den vermeidbaren Todesfällen bei Neugeborenen und Kindern unter fünf Jahren ein Ende setzen."),
+        ('3.3', "Bis 2030 die Aids-, Tuberkulose- und Malariaepidemien und die vernachlässigten Tropenkrankheiten beseitigen und Hepatitis, durch Wasser übertragene Krankheiten und andere übertragbare Krankheiten bekämpfen."),
+        ('3.4', "Bis 2030 die Frühsterblichkeit aufgrund von nichtübertragbaren Krankheiten durch Prävention und Behandlung um ein Drittel senken und die psychische Gesundheit und das Wohlergehen fördern."),
+        ('3.5', "Die Prävention und Behandlung des Substanzmissbrauchs, namentlich des Suchtstoffmissbrauchs und des schädlichen Gebrauchs von Alkohol, verstärken."),
+        ('3.6', "Bis 2020 die Zahl der Todesfälle und Verletzungen infolge von Verkehrsunfällen weltweit halbieren."),
+        ('3.7', "Bis 2030 den allgemeinen Zugang zu sexual- und reproduktionsmedizinischer Versorgung, einschließlich Familienplanung, Information und Aufklärung, und die Einbeziehung der reproduktiven Gesundheit in nationale Strategien und Programme gewährleisten."),
+        ('3.8', "Die allgemeine Gesundheitsversorgung, einschließlich der Absicherung gegen finanzielle Risiken, den Zugang zu hochwertigen grundlegenden Gesundheitsdiensten und zu sicheren, wirksamen, hochwertigen und bezahlbaren unentbehrlichen Arzneimitteln und Impfstoffen für alle erreichen."),
+        ('3.9', "Bis 2030 die Zahl der Todesfälle und Erkrankungen aufgrund gefährlicher Chemikalien und der Verschmutzung und Verunreinigung von Luft, Wasser und Boden erheblich verringern."),
+        ('3.a', "Die Durchführung des Rahmenübereinkommens der Weltgesundheitsorganisation zur Eindämmung des Tabakgebrauchs in allen Ländern nach Bedarf stärken."),
+        ('3.b', "Forschung und Entwicklung zu Impfstoffen und Medikamenten für übertragbare und nichtübertragbare Krankheiten, von denen hauptsächlich Entwicklungsländer betroffen sind, unterstützen und den Zugang zu bezahlbaren unentbehrlichen Arzneimitteln und Impfstoffen gewährleisten."),
+        ('3.c', "Die Gesundheitsfinanzierung und die Rekrutierung, Aus- und Weiterbildung und Bindung von Gesundheitsfachkräften in den Entwicklungsländern, insbesondere in den am wenigsten entwickelten Ländern und den kleinen Inselentwicklungsländern, deutlich erhöhen."),
+        ('3.d', "Die Kapazitäten aller Länder, insbesondere der Entwicklungsländer, in den Bereichen Frühwarnung, Risikominderung und Management nationaler und globaler Gesundheitsrisiken stärken."),
+    ],
+    'SDG 4': [
+        ('4.1', "Bis 2030 sicherstellen, dass alle Mädchen und Jungen gleichberechtigt eine kostenlose und hochwertige Grund- und Sekundarschulbildung abschließen, die zu brauchbaren und effektiven Lernergebnissen führt."),
+        ('4.2', "Bis 2030 sicherstellen, dass alle Mädchen und Jungen Zugang zu hochwertiger frühkindlicher Erziehung, Betreuung und Vorschulbildung erhalten, damit sie auf die Grundschule vorbereitet sind."),
+        ('4.3', "Bis 2030 den gleichberechtigten Zugang aller Frauen und Männer zu einer erschwinglichen und hochwertigen fachlichen, beruflichen und tertiären Bildung einschließlich universitärer Bildung gewährleisten."),
+        ('4.4', "Bis 2030 die Zahl der Jugendlichen und Erwachsenen wesentlich erhöhen, die über die entsprechenden Qualifikationen einschließlich fachlicher und beruflicher Qualifikationen für eine Beschäftigung, eine menschenwürdige Arbeit und Unternehmertum verfügen."),
+        ('4.5', "Bis 2030 geschlechtsspezifische Disparitäten in der Bildung beseitigen und den gleichberechtigten Zugang der Schwachen in der Gesellschaft, namentlich von Menschen mit Behinderungen, Angehörigen indigener Völker und Kindern in prekären Situationen, zu allen Bildungs- und Ausbildungsebenen gewährleisten."),
+        ('4.6', "Bis 2030 sicherstellen, dass alle Jugendlichen und ein erheblicher Anteil der männlichen und weiblichen Erwachsenen lesen, schreiben und rechnen lernen."),
+        ('4.7', "Bis 2030 sicherstellen, dass alle Lernenden die notwendigen Kenntnisse und Qualifikationen zur Förderung nachhaltiger Entwicklung erwerben, unter anderem durch Bildung für nachhaltige Entwicklung, Menschenrechte, Geschlechtergleichstellung, eine Kultur des Friedens und der Gewaltlosigkeit, Weltbürgerschaft und die Wertschätzung kultureller Vielfalt."),
+        ('4.a', "Bildungseinrichtungen bauen und ausbauen, die kinder-, behinderten- und geschlechtergerecht sind und eine sichere, gewaltfreie, inklusive und effektive Lernumgebung für alle bieten."),
+        ('4.b', "Bis 2020 weltweit die Zahl der verfügbaren Stipendien für Entwicklungsländer wesentlich erhöhen, damit ihre Studierenden ein Hochschulstudium aufnehmen können, einschließlich Berufsbildung, Informations- und Kommunikationstechnik, technischer, ingenieur- und wissenschaftlicher Studiengänge."),
+        ('4.c', "Bis 2030 das Angebot an qualifizierten Lehrkräften unter anderem durch internationale Zusammenarbeit im Bereich der Lehrerausbildung in den Entwicklungsländern wesentlich erhöhen."),
+    ],
+    'SDG 5': [
+        ('5.1', "Alle Formen der Diskriminierung von Frauen und Mädchen überall auf der Welt beenden."),
+        ('5.2', "Alle Formen von Gewalt gegen alle Frauen und Mädchen im öffentlichen und im privaten Bereich einschließlich des Menschenhandels und sexueller und anderer Formen der Ausbeutung beseitigen."),
+        ('5.3', "Alle schädlichen Praktiken wie Kinderheirat, Frühverheiratung und Zwangsheirat sowie die Genitalverstümmelung bei Frauen und Mädchen beseitigen."),
+        ('5.4', "Unbezahlte Pflege- und Hausarbeit durch öffentliche Dienstleistungen, Infrastrukturen und Sozialschutzmaßnahmen sowie die Förderung geteilter Verantwortung innerhalb des Haushalts und der Familie anerkennen und wertschätzen."),
+        ('5.5', "Die volle und wirksame Teilhabe von Frauen und ihre Chancengleichheit bei der Übernahme von Führungsrollen auf allen Ebenen der Entscheidungsfindung im politischen, wirtschaftlichen und öffentlichen Leben sicherstellen."),
+        ('5.6', "Den allgemeinen Zugang zu sexueller und reproduktiver Gesundheit und reproduktiven Rechten gewährleisten."),
+        ('5.a', "Reformen durchführen, um Frauen die gleichen Rechte auf wirtschaftliche Ressourcen sowie Zugang zu Grundeigentum, Finanzdienstleistungen, Erbschaften und natürlichen Ressourcen zu verschaffen."),
+        ('5.b', "Die Nutzung von Grundlagentechnologien, insbesondere der Informations- und Kommunikationstechnologien, verbessern, um die Selbstbestimmung der Frauen zu fördern."),
+        ('5.c', "Eine solide Politik und durchsetzbare Rechtsvorschriften zur Förderung der Gleichstellung der Geschlechter und der Selbstbestimmung aller Frauen und Mädchen auf allen Ebenen beschließen und verstärken."),
+    ],
+    'SDG 6': [
+        ('6.1', "Bis 2030 den allgemeinen und gerechten Zugang zu einwandfreiem und bezahlbarem Trinkwasser für alle erreichen."),
+        ('6.2', "Bis 2030 den Zugang zu einer angemessenen und gerechten Sanitärversorgung und Hygiene für alle erreichen und der Notdurftverrichtung im Freien ein Ende setzen."),
+        ('6.3', "Bis 2030 die Wasserqualität durch Verringerung der Verschmutzung, Beendigung des Einbringens und Minimierung der Freisetzung gefährlicher Chemikalien und Stoffe, Halbierung des Anteils unbehandelten Abwassers und Steigerung der Wiederaufbereitung verbessern."),
+        ('6.4', "Bis 2030 die Effizienz der Wassernutzung in allen Sektoren wesentlich steigern und eine nachhaltige Entnahme und Bereitstellung von Süßwasser gewährleisten, um der Wasserknappheit zu begegnen."),
+        ('6.5', "Bis 2030 auf allen Ebenen eine integrierte Bewirtschaftung der Wasserressourcen umsetzen, gegebenenfalls auch mittels grenzüberschreitender Zusammenarbeit."),
+        ('6.6', "Bis 2020 wasserverbundene Ökosysteme schützen und wiederherstellen, darunter Berge, Wälder, Feuchtgebiete, Flüsse, Grundwasserleiter und Seen."),
+        ('6.a', "Die internationale Zusammenarbeit und die Unterstützung der Entwicklungsländer beim Kapazitätsaufbau für Aktivitäten und Programme im Bereich der Wasser- und Sanitärversorgung ausbauen, einschließlich Wassersammlung, Entsalzung, effizienter Wassernutzung, Abwasserbehandlung und Wiederaufbereitungstechnologien."),
+        ('6.b', "Die Mitwirkung lokaler Gemeinwesen an der Verbesserung der Wasserbewirtschaftung und der Sanitärversorgung unterstützen und verstärken."),
+    ],
+    'SDG 7': [
+        ('7.1', "Bis 2030 den allgemeinen Zugang zu bezahlbaren, verlässlichen und modernen Energiedienstleistungen sichern."),
+        ('7.2', "Bis 2030 den Anteil erneuerbarer Energie am globalen Energiemix deutlich erhöhen."),
+        ('7.3', "Bis 2030 die weltweite Steigerungsrate der Energieeffizienz verdoppeln."),
+        ('7.a', "Die internationale Zusammenarbeit verstärken, um den Zugang zur Forschung und Technologie im Bereich saubere Energie, namentlich erneuerbare Energie, Energieeffizienz sowie fortschrittliche und saubere Technologien für fossile Brennstoffe, zu erleichtern und Investitionen in die Energieinfrastruktur zu fördern."),
+        ('7.b', "Bis 2030 die Infrastruktur ausbauen und die Technologie modernisieren, um in den Entwicklungsländern moderne und nachhaltige Energiedienstleistungen für alle bereitzustellen."),
+    ],
+    'SDG 8': [
+        ('8.1', "Ein Pro-Kopf-Wirtschaftswachstum entsprechend den nationalen Gegebenheiten und insbesondere ein jährliches Wachstum des Bruttoinlandsprodukts von mindestens 7 Prozent in den am wenigsten entwickelten Ländern aufrechterhalten."),
+        ('8.2', "Eine höhere wirtschaftliche Produktivität durch Diversifizierung, technologische Modernisierung und Innovation erreichen, einschließlich durch Konzentration auf mit hoher Wertschöpfung verbundene und arbeitsintensive Sektoren."),
+        ('8.3', "Eine entwicklungsorientierte Politik fördern, die produktive Tätigkeiten, die Schaffung menschenwürdiger Arbeitsplätze, Unternehmertum, Kreativität und Innovation unterstützt, und die Formalisierung und das Wachstum von Kleinst-, Klein- und Mittelunternehmen begünstigen."),
+        ('8.4', "Bis 2030 die weltweite Ressourceneffizienz in Konsum und Produktion Schritt für Schritt verbessern und die Entkopplung von Wirtschaftswachstum und Umweltzerstörung anstreben."),
+        ('8.5', "Bis 2030 produktive Vollbeschäftigung und menschenwürdige Arbeit für alle Frauen und Männer, einschließlich junger Menschen und Menschen mit Behinderungen, sowie gleiches Entgelt für gleichwertige Arbeit erreichen."),
+        ('8.6', "Bis 2020 den Anteil junger Menschen, die ohne Beschäftigung sind und keine Schul- oder Berufsausbildung durchlaufen, erheblich verringern."),
+        ('8.7', "Sofortige und wirksame Maßnahmen ergreifen, um Zwangsarbeit abzuschaffen, moderne Sklaverei und Menschenhandel zu beenden und das Verbot und die Beseitigung der schlimmsten Formen der Kinderarbeit einschließlich der Einziehung und des Einsatzes von Kindersoldaten sicherstellen."),
+        ('8.8', "Die Arbeitsrechte schützen und sichere Arbeitsumgebungen für alle Arbeitnehmer, einschließlich der Wanderarbeitnehmer, insbesondere der Wanderarbeitnehmerinnen, und der Menschen in prekären Beschäftigungsverhältnissen, fördern."),
+        ('8.9', "Bis 2030 Politiken zur Förderung eines nachhaltigen Tourismus erarbeiten und umsetzen, der Arbeitsplätze schafft und die lokale Kultur und lokale Produkte fördert."),
+        ('8.10', "Die Kapazitäten der nationalen Finanzinstitutionen stärken, um den Zugang zu Bank-, Versicherungs- und Finanzdienstleistungen für alle zu begünstigen und zu erweitern."),
+        ('8.a', "Die im Rahmen der Initiative Hilfe für Handel bereitgestellte Unterstützung für die Entwicklungsländer, insbesondere die am wenigsten entwickelten Länder, erhöhen."),
+        ('8.b', "Bis 2020 eine globale Strategie für Jugendbeschäftigung erarbeiten und auf den Weg bringen und den Globalen Beschäftigungspakt der Internationalen Arbeitsorganisation umsetzen."),
+    ],
+    'SDG 9': [
+        ('9.1', "Eine hochwertige, verlässliche, nachhaltige und widerstandsfähige Infrastruktur aufbauen, einschließlich regionaler und grenzüberschreitender Infrastruktur, um die wirtschaftliche Entwicklung und das menschliche Wohlergehen zu unterstützen."),
+        ('9.2', "Eine breitenwirksame und nachhaltige Industrialisierung fördern und bis 2030 den Anteil der Industrie an der Beschäftigung und am Bruttoinlandsprodukt entsprechend den nationalen Gegebenheiten erheblich steigern."),
+        ('9.3', "Insbesondere in den Entwicklungsländern den Zugang kleiner Industrie- und anderer Unternehmen zu Finanzdienstleistungen, einschließlich bezahlbaren Krediten, und ihre Einbindung in Wertschöpfungsketten und Märkte erhöhen."),
+        ('9.4', "Bis 2030 die Infrastruktur modernisieren und die Industrien nachrüsten, um sie nachhaltig zu machen, mit effizienterem Ressourceneinsatz und unter vermehrter Nutzung sauberer und umweltverträglicher Technologien und Industrieprozesse."),
+        ('9.5', "Die wissenschaftliche Forschung verbessern und die technologischen Kapazitäten der Industriesektoren in allen Ländern ausbauen und zu diesem Zweck bis 2030 unter anderem Innovationen fördern und die Anzahl der im Bereich Forschung und Entwicklung tätigen Personen sowie die Ausgaben für Forschung und Entwicklung beträchtlich erhöhen."),
+        ('9.a', "Die Entwicklung einer nachhaltigen und widerstandsfähigen Infrastruktur in den Entwicklungsländern durch eine verstärkte finanzielle, technologische und technische Unterstützung erleichtern."),
+        ('9.b', "Die einheimische Technologieentwicklung, Forschung und Innovation in den Entwicklungsländern unterstützen, einschließlich durch Sicherstellung eines förderlichen politischen Umfelds für industrielle Diversifizierung und Wertschöpfung im Rohstoffbereich."),
+        ('9.c', "Den Zugang zur Informations- und Kommunikationstechnologie erheblich erweitern sowie anstreben, in den am wenigsten entwickelten Ländern einen allgemeinen und erschwinglichen Zugang zum Internet bereitzustellen."),
+    ],
+    'SDG 10': [
+        ('10.1', "Bis 2030 nach und nach ein über dem nationalen Durchschnitt liegendes Einkommenswachstum der ärmsten 40 Prozent der Bevölkerung erreichen und aufrechterhalten."),
+        ('10.2', "Bis 2030 alle Menschen unabhängig von Alter, Geschlecht, Behinderung, Rasse, Ethnizität, Herkunft, Religion oder wirtschaftlichem oder sonstigem Status zu Selbstbestimmung befähigen und ihre soziale, wirtschaftliche und politische Inklusion fördern."),
+        ('10.3', "Chancengleichheit gewährleisten und Ungleichheit der Ergebnisse reduzieren, namentlich durch die Abschaffung diskriminierender Gesetze, Politiken und Praktiken und die Förderung geeigneter gesetzgeberischer, politischer und sonstiger Maßnahmen."),
+        ('10.4', "Politische Maßnahmen beschließen, insbesondere fiskalische, lohnpolitische und den Sozialschutz betreffende Maßnahmen, und schrittweise größere Gleichheit erzielen."),
+        ('10.5', "Die Regulierung und Überwachung der globalen Finanzmärkte und -institutionen verbessern und die Anwendung der einschlägigen Vorschriften verstärken."),
+        ('10.6', "Eine bessere Vertretung und verstärkte Mitsprache der Entwicklungsländer bei der Entscheidungsfindung in den globalen internationalen Wirtschafts- und Finanzinstitutionen sicherstellen."),
+        ('10.7', "Eine geordnete, sichere, reguläre und verantwortungsvolle Migration und Mobilität von Menschen erleichtern, unter anderem durch die Anwendung einer planvollen und gut gesteuerten Migrationspolitik."),
+        ('10.a', "Den Grundsatz der besonderen und differenzierten Behandlung der Entwicklungsländer, insbesondere der am wenigsten entwickelten Länder, im Einklang mit den Übereinkünften der Welthandelsorganisation anwenden."),
+        ('10.b', "Öffentliche Entwicklungshilfe und Finanzströme einschließlich ausländischer Direktinvestitionen in die Staaten fördern, in denen der Bedarf am größten ist."),
+        ('10.c', "Bis 2030 die Transaktionskosten für Heimatüberweisungen von Migranten auf weniger als 3 Prozent senken und Überweisungskorridore mit Kosten von über 5 Prozent beseitigen."),
+    ],
+    'SDG 11': [
+        ('11.1', "Bis 2030 den Zugang zu angemessenem, sicherem und bezahlbarem Wohnraum und zur Grundversorgung für alle sicherstellen und Slums sanieren."),
+        ('11.2', "Bis 2030 den Zugang zu sicheren, bezahlbaren, zugänglichen und nachhaltigen Verkehrssystemen für alle ermöglichen und die Sicherheit im Straßenverkehr verbessern, insbesondere durch den Ausbau des öffentlichen Verkehrs."),
+        ('11.3', "Bis 2030 die Verstädterung inklusiver und nachhaltiger gestalten und die Kapazitäten für eine partizipatorische, integrierte und nachhaltige Siedlungsplanung und -steuerung in allen Ländern verstärken."),
+        ('11.4', "Die Anstrengungen zum Schutz und zur Wahrung des Weltkultur- und -naturerbes verstärken."),
+        ('11.5', "Bis 2030 die Zahl der durch Katastrophen, einschließlich Wasserkatastrophen, bedingten Todesfälle und der davon betroffenen Menschen deutlich reduzieren und die dadurch verursachten unmittelbaren wirtschaftlichen Verluste erheblich verringern."),
+        ('11.6', "Bis 2030 die von den Städten ausgehende Umweltbelastung pro Kopf senken, unter anderem mit besonderer Aufmerksamkeit auf der Luftqualität und der kommunalen und sonstigen Abfallbehandlung."),
+        ('11.7', "Bis 2030 den allgemeinen Zugang zu sicheren, inklusiven und zugänglichen Grünflächen und öffentlichen Räumen gewährleisten, insbesondere für Frauen und Kinder, ältere Menschen und Menschen mit Behinderungen."),
+        ('11.a', "Durch eine verstärkte nationale und regionale Entwicklungsplanung positive wirtschaftliche, soziale und ökologische Verbindungen zwischen städtischen, stadtnahen und ländlichen Gebieten unterstützen."),
+        ('11.b', "Bis 2020 die Zahl der Städte und Siedlungen, die integrierte Politiken und Pläne zur Förderung der Inklusion, der Ressourceneffizienz, der Abmilderung des Klimawandels, der Klimaanpassung und der Widerstandsfähigkeit gegenüber Katastrophen beschließen und umsetzen, wesentlich erhöhen."),
+        ('11.c', "Die am wenigsten entwickelten Länder unter anderem durch finanzielle und technische Hilfe beim Bau nachhaltiger und widerstandsfähiger Gebäude unter Nutzung einheimischer Materialien unterstützen."),
+    ],
+    'SDG 12': [
+        ('12.1', "Den Zehnjahres-Programmrahmen für nachhaltige Konsum- und Produktionsmuster umsetzen, wobei alle Länder Maßnahmen ergreifen und die entwickelten Länder die Führung übernehmen."),
+        ('12.2', "Bis 2030 die nachhaltige Bewirtschaftung und effiziente Nutzung der natürlichen Ressourcen erreichen."),
+        ('12.3', "Bis 2030 die weltweite Nahrungsmittelverschwendung pro Kopf auf Einzelhandels- und Verbraucherebene halbieren und die entlang der Produktions- und Lieferkette entstehenden Nahrungsmittelverluste einschließlich Nachernteverlusten verringern."),
+        ('12.4', "Bis 2020 einen umweltverträglichen Umgang mit Chemikalien und allen Abfällen während ihres gesamten Lebenszyklus erreichen und ihre Freisetzung in Luft, Wasser und Boden erheblich verringern, um ihre nachteiligen Auswirkungen auf die menschliche Gesundheit und die Umwelt auf ein Mindestmaß zu beschränken."),
+        ('12.5', "Bis 2030 das Abfallaufkommen durch Vermeidung, Verminderung, Wiederverwertung und Wiederverwendung deutlich verringern."),
+        ('12.6', "Die Unternehmen, insbesondere große und transnationale Unternehmen, dazu ermutigen, nachhaltige Verfahren einzuführen und in ihre Berichterstattung Nachhaltigkeitsinformationen aufzunehmen."),
+        ('12.7', "In der öffentlichen Beschaffung nachhaltige Verfahren fördern, im Einklang mit den nationalen Politiken und Prioritäten."),
+        ('12.8', "Bis 2030 sicherstellen, dass die Menschen überall über einschlägige Informationen und das Bewusstsein für nachhaltige Entwicklung und eine Lebensweise in Harmonie mit der Natur verfügen."),
+        ('12.a', "Die Entwicklungsländer bei der Stärkung ihrer wissenschaftlichen und technologischen Kapazitäten im Hinblick auf den Übergang zu nachhaltigeren Konsum- und Produktionsmustern unterstützen."),
+        ('12.b', "Instrumente zur Beobachtung der Auswirkungen eines nachhaltigen Tourismus, der Arbeitsplätze schafft und die lokale Kultur und lokale Produkte fördert, auf die nachhaltige Entwicklung entwickeln und anwenden."),
+        ('12.c', "Die ineffiziente Subventionierung fossiler Brennstoffe, die zu verschwenderischem Verbrauch verleitet, durch Beseitigung von Marktverzerrungen rationalisieren, unter anderem durch eine Umstrukturierung der Besteuerung und die allmähliche Abschaffung schädlicher Subventionen."),
+    ],
+    'SDG 13': [
+        ('13.1', "Die Widerstandskraft und die Anpassungsfähigkeit gegenüber klimabedingten Gefahren und Naturkatastrophen in allen Ländern stärken."),
+        ('13.2', "Klimaschutzmaßnahmen in die nationalen Politiken, Strategien und Planungen einbeziehen."),
+        ('13.3', "Die Aufklärung und Sensibilisierung sowie die personellen und institutionellen Kapazitäten im Bereich der Abschwächung des Klimawandels, der Klimaanpassung, der Reduzierung der Klimaauswirkungen sowie der Frühwarnung verbessern."),
+        ('13.a', "Die Verpflichtung erfüllen, gemeinsam jährlich 100 Milliarden Dollar aus allen Quellen aufzubringen, um den Bedürfnissen der Entwicklungsländer im Kontext sinnvoller Klimaschutzmaßnahmen zu entsprechen, und den Grünen Klimafonds vollständig operationalisieren."),
+        ('13.b', "Mechanismen zum Ausbau effektiver Planungs- und Managementkapazitäten im Bereich des Klimawandels in den am wenigsten entwickelten Ländern und kleinen Inselentwicklungsländern fördern, unter anderem mit gezielter Ausrichtung auf Frauen, junge Menschen sowie lokale und marginalisierte Gemeinwesen."),
+    ],
+    'SDG 14': [
+        ('14.1', "Bis 2025 alle Arten der Meeresverschmutzung, insbesondere durch vom Lande ausgehende Tätigkeiten und namentlich Meeresmüll und Nährstoffbelastung, verhüten und erheblich verringern."),
+        ('14.2', "Bis 2020 die Meeres- und Küstenökosysteme nachhaltig bewirtschaften und schützen, ihre Resilienz stärken und Maßnahmen zu ihrer Wiederherstellung ergreifen, damit die Meere wieder gesund und produktiv werden."),
+        ('14.3', "Die Versauerung der Ozeane auf ein Mindestmaß reduzieren und ihre Auswirkungen bekämpfen, unter anderem durch eine verstärkte wissenschaftliche Zusammenarbeit auf allen Ebenen."),
+        ('14.4', "Bis 2020 die Fangtätigkeit wirksam regeln und die Überfischung, die illegale, ungemeldete und unregulierte Fischerei und zerstörerische Fangpraktiken beenden und wissenschaftlich fundierte Bewirtschaftungspläne umsetzen, um die Fischbestände in kürzester Zeit wiederaufzufüllen."),
+        ('14.5', "Bis 2020 mindestens 10 Prozent der Küsten- und Meeresgebiete im Einklang mit dem nationalen Recht und dem Völkerrecht und auf der Grundlage der besten verfügbaren wissenschaftlichen Informationen erhalten."),
+        ('14.6', "Bis 2020 bestimmte Formen der Fischereisubventionen untersagen, die zu Überkapazitäten und Überfischung beitragen, und Subventionen abschaffen, die zur illegalen, ungemeldeten und unregulierten Fischerei beitragen."),
+        ('14.7', "Bis 2030 die sich aus der nachhaltigen Nutzung der Meeresressourcen ergebenden wirtschaftlichen Vorteile für die kleinen Inselentwicklungsländer und die am wenigsten entwickelten Länder erhöhen, namentlich durch nachhaltiges Management der Fischerei, der Aquakultur und des Tourismus."),
+        ('14.a', "Die wissenschaftlichen Kenntnisse vertiefen, die Forschungskapazitäten ausbauen und Meerestechnologien weitergeben, um die Gesundheit der Ozeane zu verbessern und den Beitrag der biologischen Vielfalt der Meere zur Entwicklung der Entwicklungsländer zu verstärken."),
+        ('14.b', "Den Zugang der handwerklichen Kleinfischer zu den Meeresressourcen und Märkten gewährleisten."),
+        ('14.c', "Die Erhaltung und nachhaltige Nutzung der Ozeane und ihrer Ressourcen verbessern und zu diesem Zweck das Völkerrecht umsetzen, wie es im Seerechtsübereinkommen der Vereinten Nationen niedergelegt ist."),
+    ],
+    'SDG 15': [
+        ('15.1', "Bis 2020 im Einklang mit den Verpflichtungen aus internationalen Übereinkünften die Erhaltung, Wiederherstellung und nachhaltige Nutzung der Land- und Binnensüßwasser-Ökosysteme und ihrer Dienstleistungen, insbesondere der Wälder, der Feuchtgebiete, der Berge und der Trockengebiete, gewährleisten."),
+        ('15.2', "Bis 2020 die nachhaltige Bewirtschaftung aller Waldarten fördern, die Entwaldung beenden, geschädigte Wälder wiederherstellen und die Aufforstung und Wiederaufforstung weltweit beträchtlich erhöhen."),
+        ('15.3', "Bis 2030 die Wüstenbildung bekämpfen, die geschädigten Flächen und Böden einschließlich der von Wüstenbildung, Dürre und Überschwemmungen betroffenen Flächen sanieren und eine Welt anstreben, in der die Landverödung neutralisiert wird."),
+        ('15.4', "Bis 2030 die Erhaltung der Bergökosysteme einschließlich ihrer biologischen Vielfalt sicherstellen, um ihre Fähigkeit zur Erbringung wesentlichen Nutzens für die nachhaltige Entwicklung zu stärken."),
+        ('15.5', "Umgehende und bedeutende Maßnahmen ergreifen, um die Verschlechterung der natürlichen Lebensräume zu verringern, dem Verlust der biologischen Vielfalt ein Ende zu setzen und bis 2020 die bedrohten Arten zu schützen und ihr Aussterben zu verhindern."),
+        ('15.6', "Die ausgewogene und gerechte Aufteilung der sich aus der Nutzung der genetischen Ressourcen ergebenden Vorteile und den angemessenen Zugang zu diesen Ressourcen fördern."),
+        ('15.7', "Dringend Maßnahmen ergreifen, um der Wilderei und dem Handel mit geschützten Pflanzen- und Tierarten ein Ende zu setzen und dem Problem des Angebots illegaler Produkte aus wildlebenden Pflanzen und Tieren und der Nachfrage danach zu begegnen."),
+        ('15.8', "Bis 2020 Maßnahmen einführen, um das Einbringen invasiver gebietsfremder Arten zu verhindern, ihre Auswirkungen auf die Land- und Wasserökosysteme deutlich zu reduzieren und die prioritären Arten zu kontrollieren oder zu beseitigen."),
+        ('15.9', "Bis 2020 die Ökosystem- und Biodiversitätswerte in die nationalen und lokalen Planungen, Entwicklungsprozesse, Armutsbekämpfungsstrategien und Gesamtrechnungssysteme einbeziehen."),
+        ('15.a', "Finanzielle Mittel aus allen Quellen für die Erhaltung und nachhaltige Nutzung der biologischen Vielfalt und der Ökosysteme aufbringen und deutlich erhöhen."),
+        ('15.b', "Erhebliche Mittel aus allen Quellen und auf allen Ebenen für die Finanzierung einer nachhaltigen Bewirtschaftung der Wälder aufbringen und den Entwicklungsländern geeignete Anreize zum Ausbau dieser Bewirtschaftung, namentlich zum Zweck der Walderhaltung und Wiederaufforstung, bieten."),
+        ('15.c', "Die weltweite Unterstützung von Maßnahmen zur Bekämpfung der Wilderei und des Handels mit geschützten Arten verstärken, unter anderem durch die Stärkung der Fähigkeit lokaler Gemeinwesen, Möglichkeiten einer nachhaltigen Existenzsicherung zu nutzen."),
+    ],
+    'SDG 16': [
+        ('16.1', "Alle Formen der Gewalt und die gewaltbedingte Sterblichkeit überall deutlich verringern."),
+        ('16.2', "Missbrauch und Ausbeutung von Kindern, den Kinderhandel, Folter und alle Formen von Gewalt gegen Kinder beenden."),
+        ('16.3', "Die Rechtsstaatlichkeit auf nationaler und internationaler Ebene fördern und den gleichberechtigten Zugang aller zur Justiz gewährleisten."),
+        ('16.4', "Bis 2030 illegale Finanz- und Waffenströme deutlich verringern, die Wiedererlangung und Rückgabe gestohlener Vermögenswerte verstärken und alle Formen der organisierten Kriminalität bekämpfen."),
+        ('16.5', "Korruption und Bestechung in allen ihren Formen erheblich reduzieren."),
+        ('16.6', "Leistungsfähige, rechenschaftspflichtige und transparente Institutionen auf allen Ebenen aufbauen."),
+        ('16.7', "Dafür sorgen, dass die Entscheidungsfindung auf allen Ebenen bedarfsorientiert, inklusiv, partizipatorisch und repräsentativ ist."),
+        ('16.8', "Die Teilhabe der Entwicklungsländer an den globalen Lenkungsinstitutionen erweitern und verstärken."),
+        ('16.9', "Bis 2030 insbesondere durch die Registrierung der Geburten dafür sorgen, dass alle Menschen eine rechtliche Identität haben."),
+        ('16.10', "Den öffentlichen Zugang zu Informationen gewährleisten und die Grundfreiheiten schützen, im Einklang mit den nationalen Rechtsvorschriften und völkerrechtlichen Übereinkünften."),
+        ('16.a', "Die zuständigen nationalen Institutionen, namentlich durch internationale Zusammenarbeit, beim Kapazitätsaufbau zur Verhütung von Gewalt und zur Bekämpfung von Terrorismus und Kriminalität unterstützen."),
+        ('16.b', "Nichtdiskriminierende Rechtsvorschriften und Politiken zugunsten einer nachhaltigen Entwicklung fördern und durchsetzen."),
+    ],
+    'SDG 17': [
+        ('17.1', "Die Mobilisierung einheimischer Ressourcen verstärken, einschließlich durch internationale Unterstützung der Entwicklungsländer, um die nationalen Kapazitäten zur Erhebung von Steuern und anderen Abgaben zu verbessern."),
+        ('17.2', "Sicherstellen, dass die entwickelten Länder ihre Zusagen im Bereich der öffentlichen Entwicklungshilfe voll einhalten, einschließlich der Zusage, 0,7 Prozent ihres Bruttonationaleinkommens für öffentliche Entwicklungshilfe bereitzustellen."),
+        ('17.3', "Zusätzliche finanzielle Mittel aus verschiedenen Quellen für die Entwicklungsländer mobilisieren."),
+        ('17.4', "Den Entwicklungsländern dabei behilflich sein, durch eine koordinierte Politik zur Förderung der Schuldenfinanzierung, der Entschuldung und der Umschuldung die langfristige Tragfähigkeit der Verschuldung zu erreichen."),
+        ('17.5', "Investitionsförderungssysteme für die am wenigsten entwickelten Länder beschließen und umsetzen."),
+        ('17.6', "Die regionale und internationale Nord-Süd- und Süd-Süd-Zusammenarbeit und Dreieckskooperation im Bereich Wissenschaft, Technologie und Innovation und den Zugang dazu verbessern und den Austausch von Wissen verstärken."),
+        ('17.7', "Die Entwicklung, den Transfer, die Verbreitung und die Diffusion von umweltverträglichen Technologien an die Entwicklungsländer zu gegenseitig vereinbarten günstigen Bedingungen fördern."),
+        ('17.8', "Die Technologiebank und den Mechanismus zum Kapazitätsaufbau für Wissenschaft, Technologie und Innovation für die am wenigsten entwickelten Länder vollständig operationalisieren und die Nutzung von Grundlagentechnologien, insbesondere der Informations- und Kommunikationstechnologien, verbessern."),
+        ('17.9', "Die internationale Unterstützung für die Durchführung eines effektiven und gezielten Kapazitätsaufbaus in den Entwicklungsländern verstärken, um die nationalen Pläne zur Umsetzung aller Ziele für nachhaltige Entwicklung zu unterstützen."),
+        ('17.10', "Ein universales, regelgestütztes, offenes, nichtdiskriminierendes und gerechtes multilaterales Handelssystem unter dem Dach der Welthandelsorganisation fördern."),
+        ('17.11', "Die Exporte der Entwicklungsländer deutlich erhöhen, insbesondere mit Blick darauf, den Anteil der am wenigsten entwickelten Länder an den weltweiten Exporten bis 2020 zu verdoppeln."),
+        ('17.12', "Die rasche Umsetzung des zoll- und kontingentfreien Marktzugangs auf dauerhafter Grundlage für alle am wenigsten entwickelten Länder erreichen, im Einklang mit den Beschlüssen der Welthandelsorganisation."),
+        ('17.13', "Die globale makroökonomische Stabilität verbessern, namentlich durch Politikkoordinierung und Politikkohärenz."),
+        ('17.14', "Die Politikkohärenz zugunsten nachhaltiger Entwicklung verbessern."),
+        ('17.15', "Den politischen Spielraum und die Führungsrolle jedes Landes bei der Festlegung und Umsetzung von Politiken zur Armutsbeseitigung und für nachhaltige Entwicklung respektieren."),
+        ('17.16', "Die Globale Partnerschaft für nachhaltige Entwicklung ausbauen, ergänzt durch Multi-Akteur-Partnerschaften zur Mobilisierung und zum Austausch von Wissen, Fachkenntnissen, Technologie und finanziellen Ressourcen."),
+        ('17.17', "Die Bildung wirksamer öffentlicher, öffentlich-privater und zivilgesellschaftlicher Partnerschaften aufbauend auf den Erfahrungen und Mittelbeschaffungsstrategien bestehender Partnerschaften unterstützen und fördern."),
+        ('17.18', "Bis 2020 die Unterstützung des Kapazitätsaufbaus für die Entwicklungsländer erhöhen, um die Verfügbarkeit hochwertiger, aktueller und verlässlicher Daten, aufgeschlüsselt nach Einkommen, Geschlecht, Alter, Migrationsstatus, Behinderung und geografischer Lage, deutlich zu verbessern."),
+        ('17.19', "Bis 2030 auf den bestehenden Initiativen aufbauen, um Fortschrittsmaße für nachhaltige Entwicklung zu erarbeiten, die das Bruttoinlandsprodukt ergänzen, und den Aufbau der statistischen Kapazitäten in den Entwicklungsländern unterstützen."),
+    ],
+}
+
+PROTOTYPE_REDUCTIONS = ('max', 'mean')
+
+def prototype_texts(sdg_descriptions: Dict[str, str],
+                    sdg_targets: Dict[str, List[Tuple[str, str]]] = SDG_TARGETS) -> List[Tuple[str, str, str]]:
+    """
+    Prototyp-Texte nach SDG gruppiert: zuerst die Zielbeschreibung, dann die Unterziele.
+
+    Returns:
+        Liste von (SDG, Target-ID oder None für die Zielbeschreibung, Text)
+    """
+    prototypes = []
+    for sdg, description in sdg_descriptions.items():
+        prototypes.append((sdg, None, ' '.join(description.split())))
+        prototypes.extend((sdg, target_id, text) for target_id, text in sdg_targets.get(sdg, []))
+    return prototypes
+
+class SDGPrototypes:
+    """
+    Nach SDG gruppierte, normierte Prototyp-Embeddings als eine Matrix.
+    score() bewertet beliebig viele Vektoren mit einer Matrixmultiplikation und einer
+    segmentierten Reduktion pro SDG.
+    """
+
+    def __init__(self, sdgs: List[str], target_ids: List[Optional[str]], embeddings: np.ndarray,
+                 reduction: str = 'max'):
+        if reduction not in PROTOTYPE_REDUCTIONS:
+            raise ValueError(f"Unbekannte Reduktion: {reduction}")
+        self.reduction = reduction
+        self.target_ids = list(target_ids)
+        # Prototypen müssen nach SDG zusammenhängend vorliegen (wie von prototype_texts geliefert)
+        self.goals = list(dict.fromkeys(sdgs))
+        self.counts = np.array([sdgs.count(sdg) for sdg in self.goals], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts)[:-1]]).astype(np.int64)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        self.matrix = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    def __len__(self):
+        return len(self.target_ids)
+
+    def score(self, vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bewertet Vektoren gegen alle SDGs.
+
+        Returns:
+            (Bewertung [n, 17], Index des ähnlichsten Prototyps pro SDG [n, 17])
+        """
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        similarities = (vectors / norms) @ self.matrix.T
+
+        maxima = np.maximum.reduceat(similarities, self.offsets, axis=1)
+        # Ähnlichster Prototyp pro Segment: kleinster Index, der das Maximum erreicht
+        positions = np.arange(len(self), dtype=np.int64)
+        at_max = similarities >= np.repeat(maxima, self.counts, axis=1)
+        best = np.minimum.reduceat(np.where(at_max, positions, len(self)), self.offsets, axis=1)
+        if self.reduction == 'mean':
+            return np.add.reduceat(similarities, self.offsets, axis=1) / self.counts, best
+        return maxima, best
+
+    def best_target(self, position: int) -> Optional[str]:
+        """Target-ID des Prototyps (None, wenn die Zielbeschreibung am ähnlichsten ist)."""
+        return self.target_ids[position]
+
+def target_text(target_id: str) -> Optional[str]:
+    """Text eines Unterziels, z. B. target_text('13.2')."""
+    for targets in SDG_TARGETS.values():
+        for known_id, text in targets:
+            if known_id == target_id:
+                return text
+    return None
@@ -1,15 +1,46 @@
-import torch
-from transformers import AutoTokenizer, AutoModel
-from typing import Dict, List, Set
+import os
+import re
+import time
+from typing import Dict, List, Optional, Set, Tuple
 import numpy as np
-from scipy.spatial.distance import cosine
+from batch_controller import AdaptiveBatchController
+from course_dedup import config_signature, course_text
+from course_preprocessing import BERT_MAX_LENGTH, BERT_MODEL_NAME
+from course_record import CourseRecord
+from instrumentation import count, timer
+from model_weights import load_model
+from sdg_targets import SDGPrototypes, prototype_texts
+
+MIN_SENTENCE_WORDS = 5  # Kürzere Sätze (Aufzählungspunkte, Überschriften) werden angehängt
+MAX_SENTENCES = 64      # Obergrenze pro Kurs für die satzweise Bewertung
+PROTOTYPE_CACHE = 'data/sdg_prototypes.npz'  # Embeddings der SDG-Prototypen pro Modell
+
+def split_sentences(text: str) -> List[str]:
+    """Teilt einen Kurstext in Sätze; sehr kurze Sätze werden mit dem folgenden zusammengefasst."""
+    sentences = []
+    pending = ''
+    for part in re.split(r'(?<=[.!?;:])\s+|\n+', text):
+        part = ' '.join(part.split())
+        if not part:
+            continue
+        pending = f"{pending} {part}" if pending else part
+        if len(pending.split()) >= MIN_SENTENCE_WORDS:
+            sentences.append(pending)
+            pending = ''
+    if pending:
+        if sentences:
+            sentences[-1] = f"{sentences[-1]} {pending}"
+        else:
+            sentences.append(pending)
+    return sentences[:MAX_SENTENCES]
 
 class SemanticSDGAnalyzer:
     def __init__(self):
         # Wir verwenden ein deutsches BERT-Modell
-        self.model_name = "deepset/gbert-large"
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.model = AutoModel.from_pretrained(self.model_name)
+        self.model_name = BERT_MODEL_NAME
+        # Gewichte aus data/models/ eingeblendet, von allen Worker-Prozessen gemeinsam genutzt (model_weights.py)
+        with timer('model_load'):
+            self.tokenizer, self.model = load_model(self.model_name)
         
         # Ausführliche SDG Beschreibungen für semantischen Vergleich
         self.sdg_descriptions = {
@@ -89,41 +120,142 @@ class SemanticSDGAnalyzer:
             'min_word_count': 50,  # Minimale Wortanzahl für volle Analyse
         }
         
-        # Vorberechnete Embeddings für SDG-Beschreibungen
+        # Pro SDG die Zielbeschreibung und die Unterziele als Prototypen;
+        # 'max' bewertet mit dem ähnlichsten Prototyp, 'mean' mit dem Mittel über alle
+        self.prototype_reduction = 'max'
+
+        # Batches nach Token-Budget, angepasst an Speicher und Durchsatz (batch_controller.py).
+        # Ein Vorwärtsdurchlauf blendet vorher alle Gewichte ein, damit der Basis-RSS sie enthält
+        self._get_embedding("Initialisierung")
+        self.batch_controller = AdaptiveBatchController()
+
+        # Vorberechnete Embeddings für SDG-Beschreibungen und Unterziele
         print("Initialisiere semantische Analyse...")
-        self.sdg_embeddings = self._prepare_sdg_embeddings()
+        self.prototypes = self._prepare_sdg_prototypes()
         print("Semantische Analyse bereit.")
     
-    def _get_embedding(self, text: str) -> np.ndarray:
-        """Berechnet das semantische Embedding für einen Text."""
-        # Textvorverarbeitung
-        text = ' '.join(text.split())  # Normalisiere Whitespace
-        
-        # Tokenisierung mit Padding und Truncation
-        inputs = self.tokenizer(
-            text,
-            return_tensors="pt",
-            padding=True,
-            truncation=True,
-            max_length=512
-        )
+    def _get_embedding(self, text: str, token_ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Berechnet das semantische Embedding für einen Text.
+        Mit vorberechneten Token-IDs (course_preprocessing) entfällt die Tokenisierung.
+        """
+        # Erst hier: Auswertung mit vorberechneten Embeddings (benchmark.py, Tests) braucht kein torch
+        import torch
+
+        if token_ids is not None:
+            input_ids = torch.as_tensor(token_ids, dtype=torch.long).unsqueeze(0)
+            inputs = {'input_ids': input_ids, 'attention_mask': torch.ones_like(input_ids)}
+        else:
+            # Textvorverarbeitung
+            text = ' '.join(text.split())  # Normalisiere Whitespace
+            
+            # Tokenisierung mit Padding und Truncation
+            with timer('tokenize'):
+                inputs = self.tokenizer(
+                    text,
+                    return_tensors="pt",
+                    padding=True,
+                    truncation=True,
+                    max_length=BERT_MAX_LENGTH
+                )
+        count('tokens_encoded', int(inputs['input_ids'].numel()))
         
         # Berechne Embeddings
-        with torch.no_grad():
+        with timer('forward_pass'), torch.no_grad():
             outputs = self.model(**inputs)
             
         # Verwende den [CLS] Token als Satz-Embedding
         embedding = outputs.last_hidden_state[:, 0, :].numpy()
         return embedding[0]
     
-    def _prepare_sdg_embeddings(self) -> Dict[str, np.ndarray]:
-        """Berechnet Embeddings für alle SDG-Beschreibungen."""
-        embeddings = {}
-        for sdg, description in self.sdg_descriptions.items():
-            print(f"Berechne Embedding für {sdg}...")
-            embeddings[sdg] = self._get_embedding(description)
+    def _get_embeddings(self, texts: List[str], token_ids: Optional[List[Optional[np.ndarray]]] = None) -> np.ndarray:
+        """
+        Berechnet die [CLS]-Embeddings mehrerer Texte (eine Zeile pro Text, in Eingabereihenfolge).
+        Die Batches bildet die adaptive Batch-Steuerung nach Token-Budget; vorberechnete
+        Token-IDs (course_preprocessing, None für fehlende) ersparen die Tokenisierung.
+        """
+        import torch
+
+        token_ids = list(token_ids) if token_ids is not None else [None] * len(texts)
+        missing = [i for i, ids in enumerate(token_ids) if ids is None]
+        if missing:
+            with timer('tokenize'):
+                encoded = self.tokenizer([' '.join(texts[i].split()) for i in missing],
+                                         truncation=True, max_length=BERT_MAX_LENGTH)['input_ids']
+            for i, ids in zip(missing, encoded):
+                token_ids[i] = ids
+        lengths = [len(ids) for ids in token_ids]
+
+        embeddings = np.zeros((len(token_ids), self.model.config.hidden_size), dtype=np.float32)
+        for batch in self.batch_controller.batches(lengths):
+            # Auf den längsten Text des Batches auffüllen
+            longest = max(lengths[i] for i in batch)
+            input_ids = torch.full((len(batch), longest), self.tokenizer.pad_token_id, dtype=torch.long)
+            attention_mask = torch.zeros_like(input_ids)
+            for row, i in enumerate(batch):
+                input_ids[row, :lengths[i]] = torch.as_tensor(token_ids[i], dtype=torch.long)
+                attention_mask[row, :lengths[i]] = 1
+            tokens = int(attention_mask.sum())
+            count('tokens_encoded', tokens)
+            start = time.perf_counter()
+            with timer('forward_pass'), torch.no_grad():
+                outputs = self.model(input_ids=input_ids, attention_mask=attention_mask)
+            embeddings[batch] = outputs.last_hidden_state[:, 0, :].numpy()
+            self.batch_controller.record(len(batch), tokens, int(input_ids.numel()), time.perf_counter() - start)
         return embeddings
     
+    def prototype_config(self) -> Dict:
+        """Prototyp-Texte und Reduktion; Teil der Konfigurationssignatur der Analyse."""
+        return {'texts': prototype_texts(self.sdg_descriptions), 'reduction': self.prototype_reduction}
+
+    def _prepare_sdg_prototypes(self, cache_file: str = PROTOTYPE_CACHE) -> SDGPrototypes:
+        """
+        Berechnet die Embeddings aller Prototypen (17 Zielbeschreibungen und 169 Unterziele).
+        Sie werden pro Modell und Prototyp-Texten in cache_file zwischengespeichert.
+        """
+        prototypes = prototype_texts(self.sdg_descriptions)
+        signature = config_signature({'model': self.model_name, 'texts': prototypes})
+        embeddings = None
+        if os.path.exists(cache_file):
+            with np.load(cache_file) as cached:
+                if str(cached['signature']) == signature:
+                    embeddings = cached['embeddings']
+        if embeddings is None:
+            print(f"Berechne Embeddings für {len(prototypes)} SDG-Prototypen...")
+            embeddings = self._get_embeddings([text for _, _, text in prototypes])
+            os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+            np.savez(cache_file, signature=np.array(signature), embeddings=embeddings)
+        return SDGPrototypes([sdg for sdg, _, _ in prototypes], [target for _, target, _ in prototypes],
+                             embeddings, self.prototype_reduction)
+
+    def _score_prototypes(self, embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Bewertung [n, 17] und ähnlichster Prototyp pro SDG für eine oder mehrere Embeddings."""
+        with timer('similarity'):
+            return self.prototypes.score(embeddings)
+
+    def _threshold(self, text: str, threshold: Optional[float], word_count: Optional[int]) -> float:
+        """Schwelle für einen Text: kurze Texte (unter min_word_count Wörtern) erhalten eine niedrigere."""
+        if threshold is None:
+            threshold = self.threshold_config['base_threshold']
+        if word_count is None:
+            word_count = len(text.split())
+        if word_count < self.threshold_config['min_word_count']:
+            threshold = threshold * (word_count / self.threshold_config['min_word_count'])
+        return threshold
+
+    def _relevant_sdgs(self, scores: np.ndarray, best: np.ndarray, threshold: float) -> Dict[str, Dict]:
+        """Treffer über der Schwelle mit Konfidenz und ähnlichstem Unterziel (eine Zeile von _score_prototypes)."""
+        relevant_sdgs = {}
+        for sdg, similarity, prototype in zip(self.prototypes.goals, scores, best):
+            similarity = float(similarity)
+            if similarity >= threshold:
+                relevant_sdgs[sdg] = {
+                    'similarity': similarity,
+                    'confidence': 'high' if similarity >= self.threshold_config['high_confidence'] else 'medium',
+                    'target': self.prototypes.best_target(prototype)
+                }
+        return relevant_sdgs
+
     def analyze_text(self, text: str, threshold: float = None) -> Dict[str, float]:
         """
         Analysiert einen Text auf semantische Ähnlichkeit zu SDGs.
@@ -135,46 +267,84 @@ class SemanticSDGAnalyzer:
         Returns:
             Dictionary mit SDGs und ihrer semantischen Ähnlichkeit
         """
+        return self.analyze_text_with_embedding(text, threshold)[0]
+    
+    def analyze_text_with_embedding(self, text: str, threshold: float = None, word_count: Optional[int] = None,
+                                    token_ids: Optional[np.ndarray] = None) -> Tuple[Dict[str, float], Optional[np.ndarray]]:
+        """
+        Wie analyze_text, gibt zusätzlich das Embedding des Texts zurück (None bei leerem Text).
+        Wortanzahl und Token-IDs können aus der Vorverarbeitung übergeben werden.
+        """
         if not text.strip():
-            return {}
-            
-        # Verwende Standard-Threshold wenn keiner angegeben
-        if threshold is None:
-            threshold = self.threshold_config['base_threshold']
-        
-        # Passe Threshold basierend auf Textlänge an
-        word_count = len(text.split())
-        if word_count < self.threshold_config['min_word_count']:
-            threshold = threshold * (word_count / self.threshold_config['min_word_count'])
+            return {}, None
+        threshold = self._threshold(text, threshold, word_count)
         
         # Berechne Embedding für den Input-Text
-        text_embedding = self._get_embedding(text)
+        text_embedding = self._get_embedding(text, token_ids)
         
-        # Berechne Ähnlichkeiten zu allen SDGs
-        similarities = {
-            sdg: 1 - cosine(text_embedding, sdg_embedding)
-            for sdg, sdg_embedding in self.sdg_embeddings.items()
-        }
+        # Ähnlichkeiten zu allen Prototypen, Bewertung pro SDG
+        scores, best = self._score_prototypes(text_embedding)
+        count('texts_analyzed')
         
-        # Klassifiziere Konfidenz und filtere nach Threshold
-        relevant_sdgs = {}
-        for sdg, similarity in similarities.items():
-            if similarity >= threshold:
-                relevant_sdgs[sdg] = {
-                    'similarity': similarity,
-                    'confidence': 'high' if similarity >= self.threshold_config['high_confidence'] else 'medium'
-                }
+        return self._relevant_sdgs(scores[0], best[0], threshold), text_embedding
+
+    def analyze_texts_with_embeddings(self, texts: List[str], word_counts: Optional[List[Optional[int]]] = None,
+                                      token_ids: Optional[List[Optional[np.ndarray]]] = None,
+                                      threshold: float = None) -> List[Tuple[Dict[str, Dict], Optional[np.ndarray]]]:
+        """
+        Wie analyze_text_with_embedding für viele Texte: die Embeddings entstehen in adaptiven
+        Batches, die Bewertung aller Texte in einer Matrixmultiplikation.
+        """
+        results = [({}, None)] * len(texts)
+        indices = [i for i, text in enumerate(texts) if text.strip()]
+        if not indices:
+            return results
+        embeddings = self._get_embeddings([texts[i] for i in indices],
+                                          [token_ids[i] for i in indices] if token_ids is not None else None)
+        scores, best = self._score_prototypes(embeddings)
+        count('texts_analyzed', len(indices))
+        for row, i in enumerate(indices):
+            threshold_i = self._threshold(texts[i], threshold, word_counts[i] if word_counts is not None else None)
+            results[i] = (self._relevant_sdgs(scores[row], best[row], threshold_i), embeddings[row])
+        return results
+
+    def analyze_text_sentences(self, text: str, threshold: float = None,
+                               word_count: Optional[int] = None) -> Tuple[Dict[str, Dict], Optional[np.ndarray]]:
+        """
+        Satzweise Analyse: jeder Satz wird einzeln eingebettet, pro SDG zählt der ähnlichste Satz.
+        Findet Bezüge, die im Embedding des ganzen Texts untergehen.
         
-        return relevant_sdgs
+        Returns:
+            (Treffer mit bestem Satz pro SDG, mittleres Satz-Embedding als Kurs-Embedding)
+        """
+        sentences = split_sentences(text)
+        if not sentences:
+            return {}, None
+        
+        threshold = self._threshold(text, threshold, word_count)
+        
+        sentence_embeddings = self._get_embeddings(sentences)
+        
+        # Bewertung aller Sätze gegen alle Prototypen in einer Matrixmultiplikation;
+        # pro SDG zählt der Satz mit der höchsten Bewertung
+        scores, best = self._score_prototypes(sentence_embeddings)
+        best_sentences = scores.argmax(axis=0)
+        columns = np.arange(scores.shape[1])
+        best_similarities = scores[best_sentences, columns]
+        best_prototypes = best[best_sentences, columns]
+        count('texts_analyzed')
+        
+        relevant_sdgs = self._relevant_sdgs(best_similarities, best_prototypes, threshold)
+        for sdg, sentence in zip(self.prototypes.goals, best_sentences):
+            if sdg in relevant_sdgs:
+                relevant_sdgs[sdg]['sentence'] = sentences[sentence]
+        
+        return relevant_sdgs, sentence_embeddings.mean(axis=0)
 
-def analyze_course_semantic(course: Dict, analyzer: SemanticSDGAnalyzer) -> Dict[str, float]:
+def analyze_course_semantic(course: CourseRecord, analyzer: SemanticSDGAnalyzer) -> Dict[str, float]:
     """Analysiert einen Kurs mit semantischer Analyse."""
     # Kombiniere relevante Textfelder
-    relevant_text = " ".join([
-        course.get('title', ''),
-        course.get('subtitle', ''),
-        course.get('objectives_and_content', '')
-    ])
+    relevant_text = course_text(course)
     
     # Führe semantische Analyse durch
     analysis_results = analyzer.analyze_text(relevant_text)
@@ -0,0 +1,227 @@
+"""
+Kaskadierte semantische Analyse.
+
+Die meisten Kurse haben offensichtlich keinen SDG-Bezug, bezahlen in der vollen Analyse
+aber trotzdem einen gbert-large-Forward-Pass pro Satz. Die Kaskade prüft jeden Kurs zuerst
+mit zwei günstigen Stufen:
+
+1. Keyword-Matcher (analyze_sdgs): Keyword-Treffer erhöhen den Screening-Score.
+2. Lexikalisches Profil: Ähnlichkeit der Wortstämme zu gewichteten Profilen aus
+   SDG-Beschreibungen und Keywords.
+
+Nur Kurse, deren Screening-Score den Schwellenwert erreicht, werden satzweise mit
+gbert-large bewertet. Keyword-Treffer allein reichen nicht, weil allgemeine Keywords
+("forschung", "entwicklung") in sehr vielen Kurstexten vorkommen. Der Schwellenwert wird
+auf einer Kalibrierungsstichprobe so gewählt, dass der Anteil der in der vollen Analyse
+gefundenen Kurse (Recall) mindestens recall_target beträgt.
+"""
+import json
+import math
+import random
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from course_preprocessing import normalize_text, tokenize_words
+from instrumentation import count, timer
+from sdg_keywords import SDG_KEYWORDS
+
+REPORT_FILE = 'data/cascade_report.json'
+STEM_LENGTH = 6      # Wortstamm = die ersten Zeichen des normalisierten Worts
+MIN_WORD_LENGTH = 4  # Kürzere Wörter (Artikel, Präpositionen) tragen nichts zum Profil bei
+KEYWORD_WEIGHT = 2.0
+KEYWORD_BONUS = 0.05  # Aufschlag auf den Screening-Score bei Keyword-Treffern
+RECALL_CONFIDENCE_Z = 1.2816  # Einseitige 90%-Schranke für den Recall der Stichprobe
+
+def _stems(words: List[str]) -> List[str]:
+    return [word[:STEM_LENGTH] for word in words if len(word) >= MIN_WORD_LENGTH]
+
+class LexicalScreen:
+    """
+    Günstige zweite Stufe: Kosinus-Ähnlichkeit zwischen den Wortstämmen eines Kurses und
+    einem gewichteten Stammprofil pro SDG (Beschreibung + Keywords).
+    """
+
+    def __init__(self, sdg_descriptions: Dict[str, str], sdg_keywords: Dict = SDG_KEYWORDS):
+        self.sdgs = list(sdg_descriptions.keys())
+        profiles = []
+        for sdg in self.sdgs:
+            profile = Counter(_stems(tokenize_words(normalize_text(sdg_descriptions[sdg]))))
+            for keyword in sdg_keywords.get(sdg, {}).get('keywords', []):
+                for stem in _stems(tokenize_words(normalize_text(keyword))):
+                    profile[stem] += KEYWORD_WEIGHT
+            profiles.append(profile)
+
+        # Stämme, die in vielen SDG-Profilen vorkommen ("nachhaltig", "entwicklung"), abwerten
+        document_frequency = Counter(stem for profile in profiles for stem in profile)
+        self.vocabulary = {stem: i for i, stem in enumerate(sorted(document_frequency))}
+        self.matrix = np.zeros((len(self.sdgs), len(self.vocabulary)), dtype=np.float32)
+        for i, profile in enumerate(profiles):
+            for stem, weight in profile.items():
+                idf = math.log(1 + len(profiles) / document_frequency[stem])
+                self.matrix[i, self.vocabulary[stem]] = weight * idf
+        self.matrix /= np.linalg.norm(self.matrix, axis=1, keepdims=True)
+
+    def score(self, words: List[str]) -> float:
+        """Höchste Profil-Ähnlichkeit des Kurses über alle SDGs (0 ohne gemeinsame Stämme)."""
+        stems = Counter(_stems(words))
+        matched = {stem: n for stem, n in stems.items() if stem in self.vocabulary}
+        if not matched:
+            return 0.0
+        columns = np.fromiter((self.vocabulary[stem] for stem in matched), dtype=np.int64, count=len(matched))
+        weights = np.fromiter(matched.values(), dtype=np.float32, count=len(matched))
+        # Norm über alle Stämme des Kurses: lange Texte mit wenigen Treffern werden abgewertet
+        norm = math.sqrt(sum(n * n for n in stems.values()))
+        return float((self.matrix[:, columns] @ weights).max() / norm)
+
+def screening_score(screen: LexicalScreen, words: List[str], keyword_hit: bool) -> float:
+    return screen.score(words) + (KEYWORD_BONUS if keyword_hit else 0.0)
+
+def recall_lower_bound(caught: int, total: int, z: float = RECALL_CONFIDENCE_Z) -> float:
+    """Untere Wilson-Schranke des Recalls aus einer Stichprobe."""
+    if total == 0:
+        return 0.0
+    p = caught / total
+    center = p + z * z / (2 * total)
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total))
+    return (center - margin) / (1 + z * z / total)
+
+def recall_cutoff(scores: List[float], positives: List[bool], recall_target: float) -> float:
+    """
+    Größter Schwellenwert, bei dem die untere Schranke des Recalls auf der Stichprobe noch
+    mindestens recall_target beträgt. Ist das nicht erreichbar, bleiben alle positiven
+    Kurse der Stichprobe Kandidaten.
+    """
+    positive_scores = sorted(score for score, positive in zip(scores, positives) if positive)
+    if not positive_scores:
+        return 0.0
+    total = len(positive_scores)
+    misses = 0
+    while misses + 1 < total and recall_lower_bound(total - misses - 1, total) >= recall_target:
+        misses += 1
+    return positive_scores[misses]
+
+class SemanticCascade:
+    """Kaskade aus Keyword-Matcher, lexikalischem Profil und satzweiser gbert-large-Bewertung."""
+
+    def __init__(self, analyzer, recall_target: float = 0.95, calibration_size: int = 500, seed: int = 0):
+        self.analyzer = analyzer
+        self.recall_target = recall_target
+        self.calibration_size = calibration_size
+        self.seed = seed
+        self.screen = LexicalScreen(analyzer.sdg_descriptions)
+        self.cutoff = 0.0
+        self.calibration = {}
+        self.stats = {
+            'courses': 0, 'keyword_candidates': 0, 'lexical_candidates': 0, 'skipped': 0,
+            'words_total': 0, 'words_scored': 0, 'full_seconds': 0.0
+        }
+
+    def config(self) -> Dict:
+        return {'recall_target': self.recall_target, 'calibration_size': self.calibration_size,
+                'seed': self.seed, 'stem_length': STEM_LENGTH, 'keyword_weight': KEYWORD_WEIGHT,
+                'keyword_bonus': KEYWORD_BONUS}
+
+    def _full(self, text: str, word_count: int) -> Tuple[Dict, Optional[np.ndarray]]:
+        """Satzweise gbert-large-Bewertung (die teure Stufe)."""
+        start = time.perf_counter()
+        result = self.analyzer.analyze_text_sentences(text, word_count=word_count)
+        self.stats['full_seconds'] += time.perf_counter() - start
+        self.stats['words_scored'] += word_count
+        return result
+
+    def calibrate(self, samples: List[Tuple[str, List[str], bool]]) -> Dict[int, Tuple[Dict, Optional[np.ndarray]]]:
+        """
+        Bewertet eine Stichprobe vollständig und wählt den Schwellenwert des Screening-Scores.
+        Für die Recall-Schätzung wird zusätzlich ein Schwellenwert auf der ersten Hälfte der
+        Stichprobe bestimmt und auf der zweiten gemessen (konservativ, da weniger Daten).
+
+        Args:
+            samples: (Text, Wort-Tokens, Keyword-Treffer) pro eindeutigem Kurstext
+
+        Returns:
+            Vollständige Ergebnisse der Stichprobe (Index in samples -> (Treffer, Embedding))
+        """
+        rng = random.Random(self.seed)
+        chosen = rng.sample(range(len(samples)), min(self.calibration_size, len(samples)))
+        print(f"Kalibriere Kaskade auf {len(chosen)} Kurstexten...")
+
+        results, scores, positives = {}, [], []
+        for i in chosen:
+            text, words, keyword_hit = samples[i]
+            word_count = len(text.split())
+            self.stats['courses'] += 1
+            self.stats['words_total'] += word_count
+            results[i] = self._full(text, word_count)
+            scores.append(screening_score(self.screen, words, keyword_hit))
+            positives.append(bool(results[i][0]))
+
+        self.cutoff = recall_cutoff(scores, positives, self.recall_target)
+
+        # Recall-Schätzung: Schwellenwert auf einer Hälfte bestimmen, auf der anderen messen
+        half = len(chosen) // 2
+        half_cutoff = recall_cutoff(scores[:half], positives[:half], self.recall_target)
+        passed = [score >= half_cutoff for score in scores[half:]]
+        holdout_positives = positives[half:]
+        caught = sum(1 for candidate, positive in zip(passed, holdout_positives) if candidate and positive)
+        self.calibration = {
+            'sample_size': len(chosen),
+            'positives': sum(positives),
+            'cutoff': self.cutoff,
+            'holdout_recall': caught / sum(holdout_positives) if any(holdout_positives) else None,
+            'holdout_candidate_share': sum(passed) / len(passed) if passed else None
+        }
+        if not any(positives):
+            print("⚠️ Keine SDG-Treffer in der Kalibrierungsstichprobe, alle Kurse werden vollständig bewertet")
+        print(f"Schwellenwert: {self.cutoff:.4f}, Recall (Holdout): {self.calibration['holdout_recall']}")
+        return results
+
+    def analyze(self, text: str, words: List[str], keyword_hit: bool,
+                word_count: Optional[int] = None) -> Tuple[Dict, Optional[np.ndarray]]:
+        """Bewertet einen Kurs vollständig, wenn er eine der günstigen Stufen passiert, sonst keine Treffer."""
+        if word_count is None:
+            word_count = len(text.split())
+        self.stats['courses'] += 1
+        self.stats['words_total'] += word_count
+
+        with timer('cascade_screen'):
+            candidate = screening_score(self.screen, words, keyword_hit) >= self.cutoff
+        if candidate:
+            self.stats['keyword_candidates' if keyword_hit else 'lexical_candidates'] += 1
+        else:
+            self.stats['skipped'] += 1
+            count('cascade_skipped')
+            return {}, None
+        return self._full(text, word_count)
+
+    def report(self) -> Dict:
+        stats = self.stats
+        return {
+            'recall_target': self.recall_target,
+            'calibration': self.calibration,
+            'courses': stats['courses'],
+            'candidates': {'keyword': stats['keyword_candidates'], 'lexical': stats['lexical_candidates']},
+            'skipped': stats['skipped'],
+            'skipped_share': stats['skipped'] / stats['courses'] if stats['courses'] else 0.0,
+            # Der Aufwand der satzweisen Bewertung wächst mit der Textlänge
+            'compute_saved_share': 1 - stats['words_scored'] / stats['words_total'] if stats['words_total'] else 0.0,
+            'full_scoring_seconds': stats['full_seconds']
+        }
+
+    def save_report(self, report_file: str = REPORT_FILE) -> Dict:
+        report = self.report()
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        print("\nKaskaden-Bericht:")
+        print(f"  Kurstexte: {report['courses']}, davon übersprungen: {report['skipped']} "
+              f"({report['skipped_share']:.1%})")
+        print(f"  Kandidaten: {report['candidates']['keyword']} mit Keyword-Treffern, "
+              f"{report['candidates']['lexical']} nur lexikalisch")
+        if report['calibration'].get('holdout_recall') is not None:
+            print(f"  Recall gegenüber voller Analyse (Holdout): {report['calibration']['holdout_recall']:.1%}")
+        print(f"  Eingesparter gbert-Aufwand (Wortanteil): {report['compute_saved_share']:.1%}")
+        print(f"  Bericht gespeichert in: {report_file}")
+        return report
@@ -0,0 +1,230 @@
+"""
+Semester-Register: erkennt Semester automatisch statt über fest eingetragene Zuordnungen.
+
+Ein Semester wird aus den Kurs-URLs (semester=2024W), aus Semesternamen
+("Wintersemester 2024", "WS 2024", "2024W") oder aus der Semesterliste des ufind-
+Vorlesungsverzeichnisses erkannt. Die Zuordnung ufind-path-ID -> Semester wird in
+data/semesters.json gespeichert, damit spätere Läufe gezielt nur neue Semester
+bearbeiten können. Alle Stages sortieren Semester über semester_sort_key.
+
+    python semester_registry.py            # bekannte Semester chronologisch auflisten
+    python semester_registry.py --discover # Semesterliste von ufind einlesen
+"""
+import argparse
+import json
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+REGISTRY_NAME = 'semesters.json'  # im Daten-Verzeichnis
+VVZ_URL = 'https://ufind.univie.ac.at/de/vvz.html'
+VVZ_SUB_URL = 'https://ufind.univie.ac.at/de/vvz_sub.html?path={path_id}'
+
+_TERM_NAMES = {'W': 'Wintersemester', 'S': 'Sommersemester'}
+_URL_PATTERN = re.compile(r'semester=(\d{4})([SW])\b')
+_NAME_PATTERNS = [
+    re.compile(r'^(?:semester_)?(WS|SS)\s*(\d{4})$', re.IGNORECASE),                  # WS2024, semester_SS2023
+    re.compile(r'^(\d{4})\s*([WS])$', re.IGNORECASE),                                 # 2024W
+    re.compile(r'^(Wintersemester|Sommersemester|WiSe|SoSe)\s*(\d{4})', re.IGNORECASE),
+]
+
+@dataclass(frozen=True)
+class Semester:
+    """Ein Semester, eindeutig über Jahr und Semesterhälfte ('W' oder 'S')."""
+    year: int
+    term: str
+
+    @property
+    def semester_id(self) -> str:
+        return f"{'WS' if self.term == 'W' else 'SS'}{self.year}"
+
+    @property
+    def semester_name(self) -> str:
+        return f"{_TERM_NAMES[self.term]} {self.year}"
+
+    @property
+    def ufind_code(self) -> str:
+        """Wert des semester=-Parameters in ufind-URLs."""
+        return f"{self.year}{self.term}"
+
+    @property
+    def dir_name(self) -> str:
+        return f"semester_{self.semester_id}"
+
+    @property
+    def sort_key(self) -> Tuple[int, int]:
+        # Das Wintersemester beginnt im Herbst nach dem Sommersemester desselben Jahres
+        return (self.year, 1 if self.term == 'W' else 0)
+
+    def info(self, path_id: Optional[str] = None) -> Dict:
+        """Inhalt der semester_info.json."""
+        return {'path_id': path_id, 'semester_id': self.semester_id, 'semester_name': self.semester_name}
+
+def parse_semester(value: str) -> Optional[Semester]:
+    """Erkennt ein Semester in Namen, IDs, Verzeichnisnamen oder ufind-Codes (sonst None)."""
+    value = (value or '').strip()
+    for pattern in _NAME_PATTERNS:
+        match = pattern.match(value)
+        if not match:
+            continue
+        first, second = match.groups()
+        if first.isdigit():
+            return Semester(int(first), second.upper())
+        term = 'W' if first.lower() in ('ws', 'wintersemester', 'wise') else 'S'
+        return Semester(int(second), term)
+    return None
+
+def semester_from_url(url: str) -> Optional[Semester]:
+    """Semester aus dem semester=-Parameter einer Kurs-URL."""
+    match = _URL_PATTERN.search(url or '')
+    return Semester(int(match.group(1)), match.group(2)) if match else None
+
+def semester_from_links(links: Iterable[str]) -> Optional[Semester]:
+    """Häufigstes Semester der semester=-Parameter einer Kursliste."""
+    counts = Counter(semester for semester in map(semester_from_url, links) if semester is not None)
+    return counts.most_common(1)[0][0] if counts else None
+
+def semester_sort_key(semester_name: str) -> Tuple[int, int]:
+    """Chronologischer Sortierschlüssel für 'Sommersemester 2023', 'WS2023', '2024W', ..."""
+    semester = parse_semester(semester_name)
+    return semester.sort_key if semester is not None else (0, 0)
+
+def parse_semester_listing(html: str) -> Dict[str, Semester]:
+    """
+    Liest die Semesterauswahl des Vorlesungsverzeichnisses: Links auf vvz_sub.html?path=...,
+    deren Text einen Semesternamen enthält.
+
+    Returns:
+        path-ID -> Semester
+    """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    semesters = {}
+    for link in soup.find_all('a', href=True):
+        match = re.search(r'path=(\d+)', link['href'])
+        if not match:
+            continue
+        semester = parse_semester(link.get_text(' ', strip=True))
+        if semester is not None:
+            semesters.setdefault(match.group(1), semester)
+    return semesters
+
+def latest_course_file(semester_dir: str) -> Optional[str]:
+    """Neueste courses_*.json eines Semester-Verzeichnisses (None, wenn noch keine existiert)."""
+    if not os.path.isdir(semester_dir):
+        return None
+    course_files = [f for f in os.listdir(semester_dir) if f.startswith('courses_') and f.endswith('.json')]
+    return os.path.join(semester_dir, max(course_files)) if course_files else None
+
+class SemesterRegistry:
+    """
+    Bekannte Semester mit ihrer ufind-path-ID. Gespeichert in data/semesters.json,
+    ergänzt um alle vorhandenen data/semester_*-Verzeichnisse.
+    """
+
+    def __init__(self, data_dir: str = 'data'):
+        self.data_dir = data_dir
+        self.registry_file = os.path.join(data_dir, REGISTRY_NAME)
+        self.path_ids = {}  # Semester -> path-ID (oder None)
+
+    @classmethod
+    def load(cls, data_dir: str = 'data') -> 'SemesterRegistry':
+        registry = cls(data_dir)
+        if os.path.exists(registry.registry_file):
+            with open(registry.registry_file, 'r', encoding='utf-8') as f:
+                for entry in json.load(f):
+                    semester = parse_semester(entry['semester_id'])
+                    if semester is not None:
+                        registry.path_ids[semester] = entry.get('path_id')
+        if os.path.isdir(data_dir):
+            for name in os.listdir(data_dir):
+                semester = parse_semester(name)
+                if semester is not None and os.path.isdir(os.path.join(data_dir, name)):
+                    registry.register(semester, registry._dir_path_id(name))
+        return registry
+
+    def _dir_path_id(self, name: str) -> Optional[str]:
+        info_file = os.path.join(self.data_dir, name, 'semester_info.json')
+        if not os.path.exists(info_file):
+            return None
+        with open(info_file, 'r', encoding='utf-8') as f:
+            return json.load(f).get('path_id')
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.registry_file) or '.', exist_ok=True)
+        with open(self.registry_file, 'w', encoding='utf-8') as f:
+            json.dump([{**semester.info(self.path_ids[semester]), 'ufind_code': semester.ufind_code}
+                       for semester in self.semesters()], f, ensure_ascii=False, indent=2)
+
+    def register(self, semester: Semester, path_id: Optional[str] = None) -> Semester:
+        if path_id is not None or semester not in self.path_ids:
+            self.path_ids[semester] = path_id
+        return semester
+
+    def by_path_id(self, path_id: str) -> Optional[Semester]:
+        for semester, known_id in self.path_ids.items():
+            if known_id == path_id:
+                return semester
+        return None
+
+    def semesters(self, newest_first: bool = False) -> List[Semester]:
+        return sorted(self.path_ids, key=lambda semester: semester.sort_key, reverse=newest_first)
+
+    def semester_dir(self, semester: Semester) -> str:
+        return os.path.join(self.data_dir, semester.dir_name)
+
+    def listing_url(self, semester: Semester) -> Optional[str]:
+        path_id = self.path_ids.get(semester)
+        return VVZ_SUB_URL.format(path_id=path_id) if path_id else None
+
+    def has_links(self, semester: Semester) -> bool:
+        return os.path.exists(os.path.join(self.semester_dir(semester), 'course_links.json'))
+
+    def has_courses(self, semester: Semester) -> bool:
+        return latest_course_file(self.semester_dir(semester)) is not None
+
+    def course_files(self, newest_first: bool = False) -> List[Tuple[Semester, str]]:
+        """(Semester, neueste Kursdatei) aller Semester mit Kursdaten, chronologisch sortiert."""
+        files = []
+        for semester in self.semesters(newest_first):
+            course_file = latest_course_file(self.semester_dir(semester))
+            if course_file is not None:
+                files.append((semester, course_file))
+        return files
+
+    def discover(self, html: Optional[str] = None) -> List[Semester]:
+        """
+        Ergänzt das Register um die Semester der ufind-Semesterliste
+        (html wird geladen, wenn nicht übergeben). Gibt die neu gefundenen Semester zurück.
+        """
+        if html is None:
+            import requests
+            response = requests.get(VVZ_URL, timeout=10)
+            response.encoding = 'utf-8'
+            response.raise_for_status()
+            html = response.text
+        new = []
+        for path_id, semester in parse_semester_listing(html).items():
+            if self.path_ids.get(semester) is None:
+                new.append(semester)
+            self.register(semester, path_id)
+        return sorted(new, key=lambda semester: semester.sort_key)
+
+def main():
+    parser = argparse.ArgumentParser(description="Bekannte Semester auflisten und ergänzen")
+    parser.add_argument('--discover', action='store_true', help="Semesterliste von ufind einlesen")
+    args = parser.parse_args()
+
+    registry = SemesterRegistry.load()
+    if args.discover:
+        new = registry.discover()
+        print(f"Neue Semester: {', '.join(semester.semester_name for semester in new) or 'keine'}")
+        registry.save()
+    for semester in registry.semesters():
+        status = 'Kursdaten' if registry.has_courses(semester) else 'Links' if registry.has_links(semester) else 'neu'
+        print(f"{semester.semester_id:8} {semester.semester_name:22} path={registry.path_ids[semester] or '-':8} {status}")
+
+if __name__ == "__main__":
+    main()
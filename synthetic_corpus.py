@@ -0,0 +1,211 @@
+"""
+Generator für synthetische ufind-Kursseiten und courses_*.json-Dateien.
+
+Erzeugt reproduzierbare Korpora beliebiger Größe (z.B. 1k bis 500k Kurse) mit einer
+Mischung aus deutschen und englischen Kursen, wiederkehrenden Kursen über Semester
+hinweg und SDG-Schlagwörtern in einem Teil der Kurstexte.
+
+    python synthetic_corpus.py --courses 10000 --out bench_data
+"""
+import argparse
+import html
+import json
+import os
+import random
+from datetime import datetime
+from typing import Dict, Iterator, List
+
+from sdg_keywords import SDG_KEYWORDS
+
+SEMESTERS = [
+    {'path_id': '290492', 'semester_id': 'SS2023', 'semester_name': 'Sommersemester 2023'},
+    {'path_id': '297842', 'semester_id': 'WS2023', 'semester_name': 'Wintersemester 2023'},
+    {'path_id': '306282', 'semester_id': 'SS2024', 'semester_name': 'Sommersemester 2024'},
+    {'path_id': '314583', 'semester_id': 'WS2024', 'semester_name': 'Wintersemester 2024'},
+]
+
+COURSE_TYPES = ['VO', 'SE', 'UE', 'PS', 'VU', 'PR', 'KO', 'LP']
+
+WORDS_DE = (
+    "die der das und in zu den von mit für auf ist im eine werden sich als auch an "
+    "Studierende Grundlagen Methoden Theorie Praxis Analyse Forschung Seminar Vorlesung "
+    "Übung Themen Fragestellungen Literatur Diskussion Arbeit Modelle Ansätze Konzepte "
+    "Entwicklung Gesellschaft Wissenschaft Kompetenzen Verständnis Perspektiven Prozesse "
+    "Strukturen Anwendung Beispiele Fallstudien Texte Präsentation Gruppenarbeit Ziel "
+    "Inhalte Überblick Einführung vertiefende empirische qualitative quantitative kritische"
+).split()
+
+WORDS_EN = (
+    "the of and to in for with on is are be as by this that students course "
+    "introduction methods theory practice analysis research seminar lecture exercise "
+    "topics questions literature discussion models approaches concepts society science "
+    "skills understanding perspectives processes structures application examples case "
+    "studies texts presentation group work goals content overview empirical qualitative "
+    "quantitative critical advanced fundamentals"
+).split()
+
+TITLE_TOPICS_DE = ['Einführung in', 'Grundlagen der', 'Vertiefung', 'Seminar zu', 'Methoden der',
+                   'Aktuelle Fragen der', 'Praxis der', 'Theorien der']
+TITLE_TOPICS_EN = ['Introduction to', 'Foundations of', 'Advanced', 'Seminar on', 'Methods in',
+                   'Current Issues in', 'Practice of', 'Theories of']
+FIELDS_DE = ['Soziologie', 'Politikwissenschaft', 'Ökonomie', 'Biologie', 'Chemie', 'Informatik',
+             'Geschichte', 'Philosophie', 'Rechtswissenschaften', 'Geographie', 'Physik', 'Pädagogik']
+FIELDS_EN = ['Sociology', 'Political Science', 'Economics', 'Biology', 'Chemistry', 'Computer Science',
+             'History', 'Philosophy', 'Law', 'Geography', 'Physics', 'Education']
+
+ALL_KEYWORDS = [keyword for info in SDG_KEYWORDS.values() for keyword in info['keywords']]
+
+def _sentence(rng: random.Random, words: List[str], length: int, keyword_rate: float) -> str:
+    tokens = []
+    for _ in range(length):
+        if rng.random() < keyword_rate:
+            tokens.append(rng.choice(ALL_KEYWORDS))
+        else:
+            tokens.append(rng.choice(words))
+    return ' '.join(tokens).capitalize() + '.'
+
+def generate_course_base(number: int, rng: random.Random, english_share: float = 0.3,
+                         keyword_share: float = 0.4) -> Dict:
+    """Erzeugt die semesterunabhängigen Felder eines (wiederkehrenden) Kurses."""
+    english = rng.random() < english_share
+    words = WORDS_EN if english else WORDS_DE
+    topics = TITLE_TOPICS_EN if english else TITLE_TOPICS_DE
+    fields = FIELDS_EN if english else FIELDS_DE
+    keyword_rate = 0.02 if rng.random() < keyword_share else 0.0
+
+    num_sentences = rng.randint(3, 25)
+    return {
+        'number': f"{number:06d}",
+        'type': rng.choice(COURSE_TYPES),
+        'title': f"{rng.choice(topics)} {rng.choice(fields)}",
+        'subtitle': _sentence(rng, words, rng.randint(3, 8), keyword_rate) if rng.random() < 0.3 else None,
+        'ects': float(rng.choice([2, 3, 4, 5, 6, 8, 10])),
+        'sws': float(rng.choice([1, 2, 3, 4])),
+        'lecturers': [f"Lehrende {rng.randint(1, 5000)}" for _ in range(rng.randint(1, 3))],
+        'objectives_and_content': ' '.join(
+            _sentence(rng, words, rng.randint(6, 20), keyword_rate) for _ in range(num_sentences)
+        ),
+        'examination_info': _sentence(rng, words, rng.randint(8, 20), 0.0),
+        'minimum_requirements': _sentence(rng, words, rng.randint(5, 15), 0.0),
+        'literature': ' '.join(_sentence(rng, words, 8, 0.0) for _ in range(rng.randint(1, 6)))
+    }
+
+def course_url(number: str, semester_id: str) -> str:
+    year = semester_id[2:]
+    term = 'W' if semester_id.startswith('WS') else 'S'
+    return f"https://ufind.univie.ac.at/de/course.html?lv={number}&semester={year}{term}"
+
+def generate_semester_courses(bases: List[Dict], semester: Dict, rng: random.Random,
+                              edit_share: float = 0.1) -> Iterator[Dict]:
+    """Erzeugt die Kurse eines Semesters; ein Teil der Kurstexte wird leicht verändert."""
+    for base in bases:
+        course = dict(base)
+        course['url'] = course_url(base['number'], semester['semester_id'])
+        course['semester_code'] = semester['semester_id']
+        course['semester'] = semester['semester_name'].replace('Wintersemester', 'WS').replace('Sommersemester', 'SS')
+        if rng.random() < edit_share:
+            course['objectives_and_content'] += ' ' + _sentence(rng, WORDS_DE, 10, 0.02)
+        if course['subtitle'] is None:
+            del course['subtitle']
+        yield course
+
+def render_course_page(course: Dict) -> str:
+    """Rendert eine Kursseite mit den Selektoren, die parse_course_page erwartet."""
+    e = lambda value: html.escape(str(value))
+    parts = [
+        '<html><head><meta charset="utf-8"><title>u:find</title></head><body>',
+        '<div class="course">',
+        '<h1 class="title">'
+        f'<span class="number">{e(course["number"])}</span> '
+        f'<abbr class="type">{e(course["type"])}</abbr> '
+        f'<span class="what">{e(course["title"])}</span> '
+        f'<span class="when">{e(course.get("semester", ""))}</span></h1>'
+    ]
+    if course.get('subtitle'):
+        parts.append(f'<h2 class="subtitle">{e(course["subtitle"])}</h2>')
+    parts.append(f'<div class="details"><span class="ects">{course["ects"]}</span> '
+                 f'<span class="sws">{course["sws"]}</span></div>')
+    parts.append('<ul class="lecturers">' + ''.join(
+        f'<li><a class="name" href="#">{e(name)}</a></li>' for name in course['lecturers']
+    ) + '</ul>')
+    for css_class, key in (('comment text', 'objectives_and_content'),
+                           ('performance text', 'examination_info'),
+                           ('preconditions text', 'minimum_requirements'),
+                           ('literature text', 'literature')):
+        if course.get(key):
+            parts.append(f'<div class="{css_class}"><p>{e(course[key])}</p></div>')
+    parts.append('</div></body></html>')
+    return '\n'.join(parts)
+
+def render_listing_page(urls: List[str], per_list: int = 50) -> str:
+    """Rendert eine Kursliste (vvz_sub.html) mit mehreren lv-and-exam-list-Blöcken."""
+    parts = ['<html><body>']
+    for start in range(0, len(urls), per_list):
+        parts.append('<ul class="lv-and-exam-list">')
+        for url in urls[start:start + per_list]:
+            relative = url.replace('https://ufind.univie.ac.at/de/', '')
+            parts.append(f'<li><a href="{html.escape(relative)}">Kurs</a></li>')
+        parts.append('</ul>')
+    parts.append('</body></html>')
+    return '\n'.join(parts)
+
+def generate_corpus(out_dir: str, num_courses: int, num_semesters: int = 4, english_share: float = 0.3,
+                    recurring_share: float = 0.8, seed: int = 0) -> Dict:
+    """
+    Schreibt ein Korpus im Layout von data/ (semester_*/semester_info.json,
+    course_links.json, courses_*.json). num_courses ist die Gesamtzahl über alle Semester.
+
+    Returns:
+        Zusammenfassung mit Anzahl Kurse pro Semester
+    """
+    rng = random.Random(seed)
+    semesters = SEMESTERS[-num_semesters:] if num_semesters <= len(SEMESTERS) else SEMESTERS
+    per_semester = max(1, num_courses // len(semesters))
+
+    # Wiederkehrende Kurse gibt es in jedem Semester, der Rest ist semesterspezifisch
+    num_recurring = int(per_semester * recurring_share)
+    recurring = [generate_course_base(i, rng, english_share) for i in range(num_recurring)]
+    next_number = num_recurring
+
+    summary = {}
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    for semester in semesters:
+        semester_dir = os.path.join(out_dir, f"semester_{semester['semester_id']}")
+        os.makedirs(semester_dir, exist_ok=True)
+
+        unique = [generate_course_base(next_number + i, rng, english_share)
+                  for i in range(per_semester - num_recurring)]
+        next_number += len(unique)
+        courses = list(generate_semester_courses(recurring + unique, semester, rng))
+
+        with open(os.path.join(semester_dir, 'semester_info.json'), 'w', encoding='utf-8') as f:
+            json.dump(semester, f, ensure_ascii=False, indent=2)
+        with open(os.path.join(semester_dir, 'course_links.json'), 'w', encoding='utf-8') as f:
+            json.dump([course['url'] for course in courses], f, ensure_ascii=False, indent=2)
+        with open(os.path.join(semester_dir, f'courses_{timestamp}.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'semester_info': semester,
+                'extraction_timestamp': timestamp,
+                'courses': courses
+            }, f, ensure_ascii=False)
+
+        summary[semester['semester_id']] = len(courses)
+
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetisches ufind-Korpus erzeugen")
+    parser.add_argument('--courses', type=int, default=1000, help="Gesamtzahl Kurse über alle Semester")
+    parser.add_argument('--semesters', type=int, default=4)
+    parser.add_argument('--english-share', type=float, default=0.3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='bench_data')
+    args = parser.parse_args()
+
+    summary = generate_corpus(args.out, args.courses, args.semesters, args.english_share, seed=args.seed)
+    for semester_id, num in summary.items():
+        print(f"{semester_id}: {num} Kurse")
+    print(f"Korpus gespeichert in: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import numpy as np
+
+from analysis_comparison import overlap_counts
+from result_store import SDG_IDS
+
+def naive_counts(keyword, semantic, course_group, num_groups, course_mask):
+    counts = {name: np.zeros((num_groups, len(SDG_IDS)), dtype=np.int64)
+              for name in ('both', 'keyword_only', 'semantic_only', 'neither')}
+    for course, group in enumerate(course_group):
+        if not course_mask[course]:
+            continue
+        for sdg in range(len(SDG_IDS)):
+            k, s = (course, sdg) in keyword, (course, sdg) in semantic
+            name = 'both' if k and s else 'keyword_only' if k else 'semantic_only' if s else 'neither'
+            counts[name][group, sdg] += 1
+    return counts
+
+def test_overlap_counts_match_per_course_comparison():
+    rng = np.random.default_rng(0)
+    num_courses, num_groups = 60, 3
+    course_group = rng.integers(0, num_groups, num_courses)
+    course_mask = rng.random(num_courses) < 0.8
+    keyword = {(int(c), int(s)) for c, s in zip(rng.integers(0, num_courses, 80), rng.integers(0, 17, 80))}
+    semantic = {(int(c), int(s)) for c, s in zip(rng.integers(0, num_courses, 80), rng.integers(0, 17, 80))}
+    keyword_course, keyword_sdg = (np.array(column) for column in zip(*sorted(keyword)))
+    semantic_course, semantic_sdg = (np.array(column) for column in zip(*sorted(semantic)))
+
+    counts = overlap_counts(keyword_course, keyword_sdg, semantic_course, semantic_sdg,
+                            course_group, num_groups, course_mask)
+    expected = naive_counts(keyword, semantic, course_group, num_groups, course_mask)
+    for name, matrix in expected.items():
+        np.testing.assert_array_equal(counts[name], matrix, err_msg=name)
+
+def test_overlap_counts_without_hits():
+    counts = overlap_counts(np.array([], dtype=np.int32), np.array([], dtype=np.int8),
+                            np.array([], dtype=np.int32), np.array([], dtype=np.int8),
+                            np.array([0, 0, 1]), 2)
+    assert counts['both'].sum() == 0
+    assert counts['neither'][:, 0].tolist() == [2, 1]
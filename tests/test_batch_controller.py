@@ -0,0 +1,50 @@
+from batch_controller import MEMORY_HIGH_WATER, AdaptiveBatchController
+
+GB = 2**30
+
+def controller(**kwargs):
+    kwargs.setdefault('memory_limit_bytes', 8 * GB)
+    kwargs.setdefault('baseline_rss', 6 * GB)
+    return AdaptiveBatchController(verbose=False, **kwargs)
+
+def test_batches_respect_token_budget_and_sort_by_length():
+    batching = controller(token_budget=1024)
+    lengths = [300, 10, 500, 20, 200, 400]
+    batches = list(batching.batches(lengths))
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    assert batches[0] == [1, 3, 4]
+    for batch in batches:
+        assert len(batch) * max(lengths[i] for i in batch) <= 1024 or len(batch) == 1
+
+def test_baseline_rss_is_not_counted_as_memory_pressure():
+    # 6 GB Modell von 8 GB Limit: 0.5 GB Zuwachs ist kein Speicherdruck
+    batching = controller(token_budget=4096)
+    batching.record(8, 4000, 4096, 1.0, rss=6 * GB + GB // 2)
+    assert batching.stats['shrinks'] == 0
+    assert batching.token_budget > 4096
+
+def test_estimated_bytes_per_token_cap_the_budget_before_the_next_batch():
+    batching = controller(token_budget=4096)
+    # 256 KB pro aufgefülltem Token: 2 GB verfügbar tragen rund 6800 Tokens
+    batching.record(8, 4000, 4096, 1.0, rss=6 * GB + 4096 * 2**18)
+    cap = int(MEMORY_HIGH_WATER * 2 * GB / 2**18)
+    assert batching.memory_budget() == cap
+    assert batching.token_budget <= cap
+    batching.token_budget = 65536
+    batch = next(batching.batches([100] * 1000))
+    assert len(batch) * 100 <= cap
+
+def test_memory_pressure_halves_budget_and_limits_regrowth():
+    batching = controller(token_budget=8192)
+    batching.record(16, 8000, 8192, 1.0, rss=6 * GB + int(1.9 * GB))
+    assert batching.stats['shrinks'] == 1
+    assert batching.token_budget <= 4096
+    assert batching.ceiling < 8192
+
+def test_settles_when_growth_brings_no_gain():
+    batching = controller(token_budget=1024, baseline_rss=GB)
+    for _ in range(10):
+        budget = batching.token_budget
+        batching.record(4, budget, budget, budget / 1000.0, rss=GB)
+    assert batching.settled
+    assert batching.summary()['token_budget'] == batching.token_budget
@@ -0,0 +1,54 @@
+import asyncio
+
+from classification_service import MicroBatcher, ServiceMetrics
+
+def run_batcher(classify_batch, texts, **kwargs):
+    """Schickt alle Texte gleichzeitig an einen MicroBatcher; liefert (Antworten, Metriken)."""
+    metrics = ServiceMetrics()
+    batcher = MicroBatcher(classify_batch, metrics, **kwargs)
+
+    async def scenario():
+        worker = asyncio.ensure_future(batcher.run())
+        await asyncio.sleep(0)
+        try:
+            return await asyncio.gather(*(batcher.classify(text) for text in texts), return_exceptions=True)
+        finally:
+            worker.cancel()
+
+    try:
+        return asyncio.run(scenario()), metrics
+    finally:
+        batcher.executor.shutdown()
+
+def test_concurrent_requests_share_a_batch():
+    batches = []
+
+    def classify_batch(texts):
+        batches.append(list(texts))
+        return [text.upper() for text in texts]
+
+    results, metrics = run_batcher(classify_batch, ['a', 'b', 'c'], window_ms=50)
+    assert results == ['A', 'B', 'C']
+    assert batches == [['a', 'b', 'c']]
+    assert metrics.summary()['max_batch_size'] == 3
+
+def test_batches_respect_max_batch_size():
+    batches = []
+
+    def classify_batch(texts):
+        batches.append(len(texts))
+        return list(texts)
+
+    texts = [str(i) for i in range(5)]
+    results, metrics = run_batcher(classify_batch, texts, window_ms=50, max_batch_size=2)
+    assert results == texts
+    assert batches == [2, 2, 1]
+    assert metrics.batches == 3
+
+def test_batch_error_reaches_every_request():
+    def classify_batch(texts):
+        raise RuntimeError("Modell nicht verfügbar")
+
+    results, metrics = run_batcher(classify_batch, ['a', 'b'], window_ms=50)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert metrics.batches == 0
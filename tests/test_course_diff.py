@@ -0,0 +1,43 @@
+import json
+
+from course_diff import SnapshotIndex, diff_snapshots, merge_sorted
+
+def test_merge_sorted_pairs_entries_by_id():
+    old = [('a', 1), ('c', 3), ('d', 4)]
+    new = [('b', 2), ('c', 30), ('e', 5)]
+    assert list(merge_sorted(old, new)) == [
+        ('a', ('a', 1), None),
+        ('b', None, ('b', 2)),
+        ('c', ('c', 3), ('c', 30)),
+        ('d', ('d', 4), None),
+        ('e', None, ('e', 5)),
+    ]
+
+def test_merge_sorted_with_empty_side():
+    assert list(merge_sorted([], [('a', 1)])) == [('a', None, ('a', 1))]
+    assert list(merge_sorted([('a', 1)], [])) == [('a', ('a', 1), None)]
+
+def write_snapshot(path, courses):
+    path.write_text(json.dumps({'semester_info': {'semester_name': 'Wintersemester 2024'}, 'courses': courses}),
+                    encoding='utf-8')
+    return SnapshotIndex.build(str(path))
+
+def test_diff_snapshots_classifies_changes(tmp_path):
+    old = write_snapshot(tmp_path / 'old.json', [
+        {'number': '100', 'title': 'Klimapolitik', 'ects': 5, 'objectives_and_content': 'Klimawandel'},
+        {'number': '200', 'title': 'Statistik', 'ects': 5},
+        {'number': '300', 'title': 'Ökonomie', 'literature': 'Buch'},
+        {'number': '400', 'title': 'Entfällt'},
+    ])
+    new = write_snapshot(tmp_path / 'new.json', [
+        {'number': '100', 'title': 'Klimapolitik', 'ects': 5, 'objectives_and_content': 'Klimawandel und Energie'},
+        {'number': '200', 'title': 'Statistik', 'ects': 6},
+        {'number': '300', 'title': 'Ökonomie', 'literature': 'Buch'},
+        {'number': '500', 'title': 'Neu'},
+    ])
+    summary, rows = diff_snapshots(old, new)
+    assert summary['courses'] == {'added': 1, 'removed': 1, 'syllabus_changed': 1,
+                                  'metadata_changed': 1, 'unchanged': 1}
+    assert summary['fields_changed'] == {'ects': 1, 'objectives_and_content': 1}
+    assert [(row['change'], row['course_id']) for row in rows] == [
+        ('Syllabus geändert', '100'), ('Metadaten geändert', '200'), ('entfernt', '400'), ('neu', '500')]
@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from course_search import CourseIndex, build_course_index, index_codec
+
+def fake_store(num_courses=40, dim=16):
+    vectors = np.random.default_rng(0).standard_normal((num_courses, dim)).astype(np.float32)
+    texts = {f"hash{i}": {'embedding_row': i} for i in range(num_courses)}
+    courses = {f"https://ufind/{i}": {'text_hash': f"hash{i}", 'number': str(i), 'semester': '2024W',
+                                      'title': f"Kurs {i}"} for i in range(num_courses)}
+    return SimpleNamespace(embeddings=list(vectors), texts=texts, courses=courses)
+
+def test_rebuild_keeps_codec_of_existing_index(tmp_path):
+    assert index_codec(tmp_path) == 'float32'
+    build_course_index(fake_store(), tmp_path, codec='float16')
+    build_course_index(fake_store(), tmp_path)
+    assert index_codec(tmp_path) == 'float16'
+    assert CourseIndex(tmp_path).vectors.codec == 'float16'
+
+def test_explicit_codec_replaces_previous(tmp_path):
+    build_course_index(fake_store(), tmp_path, codec='float16')
+    build_course_index(fake_store(), tmp_path, codec='float32')
+    index = CourseIndex(tmp_path)
+    assert index.codec == 'float32'
+    assert index.similar_to_course('https://ufind/3', k=3)
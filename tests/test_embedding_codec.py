@@ -0,0 +1,34 @@
+import os
+
+import numpy as np
+import pytest
+
+from embedding_codec import EncodedEmbeddings
+
+@pytest.fixture
+def vectors():
+    return np.random.default_rng(0).standard_normal((300, 16)).astype(np.float32)
+
+def test_save_removes_stale_pq_sidecars(tmp_path, vectors):
+    prefix = tmp_path / 'vectors'
+    EncodedEmbeddings.encode(vectors, 'pq', num_subspaces=4, num_centroids=16).save(prefix)
+    assert os.path.exists(f"{prefix}.codebooks.npy")
+
+    EncodedEmbeddings.encode(vectors, 'float16').save(prefix)
+    assert not os.path.exists(f"{prefix}.codebooks.npy")
+    assert not os.path.exists(f"{prefix}.mean.npy")
+    loaded = EncodedEmbeddings.load(prefix, 'float16')
+    assert loaded.codec == 'float16' and loaded.quantizer is None
+
+@pytest.mark.parametrize('codec', ['float32', 'float16', 'pq'])
+def test_load_uses_recorded_codec(tmp_path, vectors, codec):
+    options = {'num_subspaces': 4, 'num_centroids': 16} if codec == 'pq' else {}
+    EncodedEmbeddings.encode(vectors, codec, **options).save(tmp_path / 'vectors')
+    loaded = EncodedEmbeddings.load(tmp_path / 'vectors', codec)
+    assert loaded.codec == codec
+    assert loaded.decode().shape == vectors.shape
+
+def test_load_rejects_mismatching_codec(tmp_path, vectors):
+    EncodedEmbeddings.encode(vectors, 'float32').save(tmp_path / 'vectors')
+    with pytest.raises(ValueError):
+        EncodedEmbeddings.load(tmp_path / 'vectors', 'float16')
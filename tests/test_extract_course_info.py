@@ -0,0 +1,36 @@
+import json
+import os
+
+import extract_course_info
+from extract_course_info import process_semester
+
+LINKS = ['https://ufind.univie.ac.at/de/course.html?lv=100001&semester=2024W',
+         'https://ufind.univie.ac.at/de/course.html?lv=100002&semester=2024W',
+         'https://ufind.univie.ac.at/de/course.html?lv=100003&semester=2024W']
+
+def write_semester(semester_dir):
+    with open(os.path.join(semester_dir, 'semester_info.json'), 'w', encoding='utf-8') as f:
+        json.dump({'semester_id': '2024W', 'semester_name': 'Wintersemester 2024'}, f)
+    with open(os.path.join(semester_dir, 'course_links.json'), 'w', encoding='utf-8') as f:
+        json.dump(LINKS, f)
+    previous = [{'url': url, 'number': str(i), 'title': f"Alt {i}"} for i, url in enumerate(LINKS)]
+    with open(os.path.join(semester_dir, 'courses_20240101_000000.json'), 'w', encoding='utf-8') as f:
+        json.dump({'extraction_timestamp': '20240101_000000', 'courses': previous}, f)
+
+def test_failed_planned_fetch_keeps_previous_course(tmp_path, monkeypatch):
+    write_semester(tmp_path)
+
+    def fetch(url, archive=None):
+        # Zweiter Kurs: Abruf schlägt fehl
+        return None if url == LINKS[1] else {'url': url, 'number': 'neu', 'title': 'Neu'}
+
+    monkeypatch.setattr(extract_course_info, 'extract_course_info', fetch)
+    result = process_semester(str(tmp_path), delay=0, crawl_urls=LINKS[:2])
+
+    assert result['courses_saved'] == 3
+    assert result['carried_over'] == 1
+    assert result['failed_carried_over'] == 1
+    with open(result['output_file'], 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    assert [course['title'] for course in data['courses']] == ['Neu', 'Alt 1', 'Alt 2']
+    assert data['failed_carried_over'] == 1
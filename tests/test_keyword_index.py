@@ -0,0 +1,33 @@
+from keyword_index import KeywordIndex, KeywordIndexBuilder
+from keyword_lexicon import KeywordLexicon
+
+TEXT = "wir bearbeiten die seminararbeit zu grundwasserschutz, wasser und klimawandel im globalen sueden"
+
+def build(tmp_path, findings):
+    lexicon = KeywordLexicon()
+    lexicon.update_vocabulary({'grund': 3, 'schutz': 3, 'seminar': 3})
+    builder = KeywordIndexBuilder()
+    builder.docs.append(['2024W', 'https://ufind/1', '1', 'Kurs'])
+    doc_id = 0
+    builder.add_hits(doc_id, TEXT, findings, lexicon)
+    builder.save(str(tmp_path))
+    return KeywordIndex(str(tmp_path))
+
+def test_positions_are_resolved_tokens(tmp_path):
+    index = build(tmp_path, {'SDG 6': ['wasser'], 'SDG 13': ['klimawandel']})
+    assert index.postings('wasser')[0]['positions'] == [TEXT.index('grundwasserschutz'), TEXT.index(' wasser ') + 1]
+    assert index.postings('klimawandel')[0]['positions'] == [TEXT.index('klimawandel')]
+
+def test_rejected_substrings_get_no_posting(tmp_path):
+    # "arbeit" steckt in "bearbeiten" und "seminararbeit", ist dort aber kein Treffer
+    index = build(tmp_path, {'SDG 8': ['arbeit'], 'SDG 6': ['wasser']})
+    assert index.postings('arbeit') == []
+    assert index.document_frequency('wasser') == 1
+
+def test_phrase_positions():
+    lexicon = KeywordLexicon()
+    phrase_id, phrase = lexicon.phrases[0]
+    keyword = lexicon.keywords[phrase_id][1]
+    text = f"einleitung {phrase} und nochmals {phrase}"
+    positions = lexicon.keyword_positions(text, {keyword})
+    assert positions[keyword] == [text.index(phrase), text.rindex(phrase)]
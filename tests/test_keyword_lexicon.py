@@ -0,0 +1,141 @@
+import json
+
+import pytest
+
+from analyze_sdgs import analyze_semester_data, find_sdgs_in_text, find_sdgs_in_text_flagged
+import keyword_lexicon
+from keyword_lexicon import KeywordLexicon
+
+@pytest.fixture
+def lexicon():
+    return KeywordLexicon()
+
+def keywords(lexicon, ids):
+    return {lexicon.keywords[i][1] for i in ids}
+
+@pytest.mark.parametrize('token, keyword', [
+    ('klimwandel', 'klimawandel'),
+    ('gleichstellng', 'gleichstellung'),
+    ('diskriminerung', 'diskriminierung'),
+    ('biodiversitat', 'biodiversität'),
+])
+def test_typos_are_fuzzy_matched(lexicon, token, keyword):
+    assert keyword in keywords(lexicon, lexicon.lookup_fuzzy(token))
+
+@pytest.mark.parametrize('token', [
+    'bindung', 'bindungen',        # bildung
+    'gemeine',                     # gemeinde
+    'korporation', 'kooperativ',   # kooperation
+    'leaning',                     # learning
+    'justine',                     # justice
+    'institutional',               # institution
+])
+def test_ordinary_words_are_not_fuzzy_matched(lexicon, token):
+    assert lexicon.lookup_fuzzy(token) == ()
+    assert find_sdgs_in_text_flagged(f"Seminar {token}", lexicon) == ({}, {})
+
+def test_frequent_corpus_word_is_not_a_typo(lexicon):
+    # Etwa so häufig wie das Keyword: ein eigenes Wort, keine Schreibvariante
+    lexicon.update_vocabulary({'klimawandel': 30, 'klimwandel': 5})
+    assert lexicon.lookup_fuzzy('klimwandel') == ()
+
+def test_recurring_typo_stays_resolvable(lexicon):
+    # Tippfehler in mehreren Fassungen eines wiederkehrenden Kurses
+    lexicon.update_vocabulary({'klimawandel': 200, 'klimwandel': 4, 'gleichstellng': 2, 'gleichstellung': 80})
+    assert keywords(lexicon, lexicon.lookup_fuzzy('klimwandel')) == {'klimawandel'}
+    assert keywords(lexicon, lexicon.lookup_fuzzy('gleichstellng')) == {'gleichstellung'}
+
+def test_fuzzy_hits_are_counted_and_flagged(lexicon):
+    text = "Folgen von klimwandel und Gleichstellung"
+    exact, fuzzy = find_sdgs_in_text_flagged(text, lexicon)
+    assert 'SDG 13' not in exact
+    assert fuzzy == {'SDG 13': {'klimawandel'}}
+    assert exact['SDG 5'] == {'gleichstellung'}
+    assert find_sdgs_in_text(text, lexicon)['SDG 13'] == {'klimawandel'}
+    assert find_sdgs_in_text(text, lexicon, include_fuzzy=False) == exact
+
+def write_semester(path, texts):
+    info = {'semester_id': 'SS2024', 'semester_name': 'Sommersemester 2024'}
+    courses = [{'number': str(i), 'title': 'Seminar', 'objectives_and_content': text} for i, text in enumerate(texts)]
+    (path / 'semester_info.json').write_text(json.dumps(info), encoding='utf-8')
+    (path / 'courses_20240301_000000.json').write_text(json.dumps({'courses': courses}), encoding='utf-8')
+
+def test_semester_counts_fuzzy_hits_unless_exact_only(lexicon, tmp_path):
+    write_semester(tmp_path, ["Folgen von klimwandel", "Gleichstellung im Beruf"])
+    counted = analyze_semester_data(str(tmp_path), lexicon=lexicon)
+    hit = counted['sdg_distribution']['SDG 13']['courses'][0]
+    assert hit.found_keywords == ['klimawandel'] and hit.fuzzy_keywords == ['klimawandel']
+    assert counted['fuzzy_only_courses'] == {}
+
+    exact = analyze_semester_data(str(tmp_path), lexicon=lexicon, count_fuzzy=False)
+    assert 'SDG 13' not in exact['sdg_distribution']
+    assert [hit.fuzzy_keywords for hit in exact['fuzzy_only_courses']['SDG 13']] == [['klimawandel']]
+
+def test_exact_hit_is_not_reported_as_fuzzy(lexicon):
+    exact, fuzzy = find_sdgs_in_text_flagged("klimawandel und klimwandel", lexicon)
+    assert exact['SDG 13'] == {'klimawandel'}
+    assert fuzzy == {}
+
+def resolutions(lexicon):
+    return ({token: keywords(lexicon, lexicon.lookup(token)) for token in lexicon.vocabulary},
+            {token: keywords(lexicon, lexicon.lookup_fuzzy(token)) for token in lexicon.fuzzy if token in lexicon.vocabulary})
+
+def test_resolution_does_not_depend_on_order():
+    corpus = {'stadtwasser': 1, 'stadt': 3, 'klimawandel': 40, 'klimwandel': 1, 'seminar': 4}
+
+    incremental = KeywordLexicon()
+    incremental.update_vocabulary({'stadtwasser': 1, 'klimwandel': 2})
+    assert incremental.lookup('stadtwasser') == ()
+    assert incremental.lookup_fuzzy('klimwandel') == ()
+    revision = incremental.revision
+    incremental.update_vocabulary(corpus)
+
+    fresh = KeywordLexicon()
+    fresh.update_vocabulary(corpus)
+
+    assert resolutions(incremental) == resolutions(fresh)
+    assert keywords(fresh, fresh.lookup('stadtwasser')) == {'wasser'}
+    assert keywords(fresh, fresh.lookup_fuzzy('klimwandel')) == {'klimawandel'}
+    # Geänderte Zuordnung bekannter Tokens verwirft gecachte Kursergebnisse
+    assert incremental.revision != revision
+
+def test_lookups_before_update_are_not_kept(lexicon):
+    assert lexicon.lookup('stadtwasser') == ()
+    lexicon.update_vocabulary({'stadt': 2, 'seminar': 2})
+    assert keywords(lexicon, lexicon.lookup('stadtwasser')) == {'wasser'}
+
+def test_unseen_tokens_are_cached_with_a_bound(lexicon, monkeypatch):
+    monkeypatch.setattr(keyword_lexicon, 'UNSEEN_CACHE_SIZE', 3)
+    lexicon.update_vocabulary({'stadt': 2, 'seminar': 2})
+    for i in range(10):
+        assert lexicon.lookup(f'anfrage{i}') == ()
+        assert lexicon.lookup_fuzzy(f'unbekanntes{i}') == ()
+    assert keywords(lexicon, lexicon.lookup('stadtwasser')) == {'wasser'}
+    assert len(lexicon.unseen_tokens) == 3 and len(lexicon.unseen_fuzzy) == 3
+    assert 'stadtwasser' in lexicon.unseen_tokens
+    # Vokabular bleibt unverändert
+    assert lexicon.vocabulary == {'stadt', 'seminar'} and set(lexicon.tokens) == lexicon.vocabulary
+
+def test_unchanged_vocabulary_keeps_revision(lexicon, tmp_path):
+    corpus = {'stadtwasser': 1, 'stadt': 3}
+    lexicon.update_vocabulary(corpus)
+    lexicon.save(str(tmp_path / 'lexicon.json'))
+    loaded = KeywordLexicon.load(str(tmp_path / 'lexicon.json'))
+    assert loaded.update_vocabulary(corpus) == {'new': 0, 'removed': 0, 'changed': 0}
+    assert loaded.revision == lexicon.revision
+
+@pytest.mark.parametrize('token', ['seminararbeit', 'hausarbeit', 'gruppenarbeit', 'fachschule',
+                                   'forschungsseminar', 'bearbeiten'])
+def test_generic_keywords_do_not_match_in_compounds(token):
+    lexicon = KeywordLexicon()
+    lexicon.update_vocabulary({token: 1, 'seminar': 5, 'haus': 5, 'gruppen': 5, 'fach': 5, 'be': 5})
+    assert lexicon.lookup(token) == ()
+
+@pytest.mark.parametrize('token, keyword', [('arbeit', 'arbeit'), ('forschungen', 'forschung'),
+                                            ('schulen', 'schule'), ('zusammenarbeit', 'zusammenarbeit')])
+def test_generic_keywords_match_as_whole_words(lexicon, token, keyword):
+    assert keyword in keywords(lexicon, lexicon.lookup(token))
+
+def test_specific_keywords_still_match_in_compounds(lexicon):
+    lexicon.update_vocabulary({'grundwasserschutz': 1, 'grund': 3, 'schutz': 3})
+    assert 'wasser' in keywords(lexicon, lexicon.lookup('grundwasserschutz'))
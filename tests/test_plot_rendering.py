@@ -0,0 +1,33 @@
+import json
+
+from plot_rendering import RENDER_CACHE_FILE, PlotJob, new_figure, render_plots
+
+def render_bar(data, title=''):
+    fig = new_figure((2, 2))
+    fig.add_subplot().bar(range(len(data)), data)
+    return fig
+
+def render_with_concurrent_stage(data, output_dir=''):
+    # Eine zweite Stufe schreibt ins Manifest, während diese noch rendert
+    render_plots([PlotJob('andere_stufe', render_bar, [3, 1])], output_dir, dpi=20, max_workers=1)
+    return render_bar(data)
+
+def manifest(output_dir):
+    with open(output_dir / RENDER_CACHE_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def test_concurrent_renders_keep_each_others_manifest_entries(tmp_path):
+    job = PlotJob('diese_stufe', render_with_concurrent_stage, [1, 2], {'output_dir': str(tmp_path)})
+    render_plots([job], str(tmp_path), dpi=20, max_workers=1)
+    assert set(manifest(tmp_path)) == {'diese_stufe', 'andere_stufe'}
+
+def test_unchanged_plots_come_from_cache(tmp_path):
+    jobs = [PlotJob('balken', render_bar, [1, 2])]
+    assert render_plots(jobs, str(tmp_path), dpi=20, max_workers=1) == {'balken': 'gerendert'}
+    assert render_plots(jobs, str(tmp_path), dpi=20, max_workers=1) == {'balken': 'cache'}
+
+def test_parallel_render_in_worker_processes(tmp_path):
+    jobs = [PlotJob(f'balken_{i}', render_bar, [i, 1]) for i in range(3)]
+    status = render_plots(jobs, str(tmp_path), dpi=20, max_workers=2)
+    assert status == {job.name: 'gerendert' for job in jobs}
+    assert all((tmp_path / f'{job.name}.png').exists() for job in jobs)
@@ -0,0 +1,27 @@
+import json
+import os
+
+from result_store import ResultStore, refresh_result_store
+
+def write_keyword_analysis(path, titles):
+    courses = [{'url': f"https://ufind/{i}", 'number': str(i), 'title': title, 'found_keywords': ['wasser']}
+               for i, title in enumerate(titles)]
+    analysis = {'sdg_distribution': {'SDG 6': {'count': len(courses), 'courses': courses}},
+                'courses_without_sdgs': []}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'semester_analyses': {'2024W': analysis}}, f)
+
+def test_refresh_rebuilds_when_sources_are_newer(tmp_path):
+    keyword_file, store_dir = tmp_path / 'keyword_analysis.json', tmp_path / 'store'
+    write_keyword_analysis(keyword_file, ['Alt'])
+    version = refresh_result_store(store_dir, keyword_file, tmp_path / 'fehlt.json')
+    old_store = ResultStore(store_dir)
+    assert refresh_result_store(store_dir, keyword_file, tmp_path / 'fehlt.json') == version
+
+    write_keyword_analysis(keyword_file, ['Neu', 'Zweiter'])
+    os.utime(keyword_file, (version + 10, version + 10))
+    new_version = refresh_result_store(store_dir, keyword_file, tmp_path / 'fehlt.json')
+    assert new_version != version
+    assert ResultStore(store_dir).course_title.take([0, 1]) == ['Neu', 'Zweiter']
+    # Ein noch geöffneter Speicher liest weiter die alten Dateien
+    assert old_store.course_title.take([0]) == ['Alt']
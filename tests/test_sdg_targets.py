@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from sdg_targets import SDG_TARGETS, SDGPrototypes, prototype_texts
+
+def naive_score(prototypes, vectors):
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    similarities = unit @ prototypes.matrix.T
+    scores, best = [], []
+    for offset, count in zip(prototypes.offsets, prototypes.counts):
+        segment = similarities[:, offset:offset + count]
+        scores.append(segment.max(axis=1) if prototypes.reduction == 'max' else segment.mean(axis=1))
+        best.append(offset + segment.argmax(axis=1))
+    return np.stack(scores, axis=1), np.stack(best, axis=1)
+
+@pytest.mark.parametrize('reduction', ['max', 'mean'])
+def test_score_matches_per_sdg_loop(reduction):
+    rng = np.random.default_rng(0)
+    sdgs = ['SDG 1'] * 3 + ['SDG 2'] * 1 + ['SDG 3'] * 4
+    prototypes = SDGPrototypes(sdgs, [None, '1.1', '1.2', None, None, '3.1', '3.2', '3.3'],
+                               rng.normal(size=(8, 16)), reduction)
+    vectors = rng.normal(size=(5, 16))
+    scores, best = prototypes.score(vectors)
+    expected_scores, expected_best = naive_score(prototypes, vectors)
+    np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+    np.testing.assert_array_equal(best, expected_best)
+
+def test_ties_pick_the_first_prototype_of_the_sdg():
+    embeddings = np.array([[1.0, 0.0], [0.0, 1.0], [0.0, 1.0], [1.0, 0.0]])
+    prototypes = SDGPrototypes(['SDG 1', 'SDG 2', 'SDG 2', 'SDG 2'], [None, None, '2.1', '2.2'], embeddings)
+    scores, best = prototypes.score(np.array([0.0, 2.0]))
+    np.testing.assert_allclose(scores, [[0.0, 1.0]], atol=1e-6)
+    assert best.tolist() == [[0, 1]]
+    assert prototypes.best_target(int(best[0, 1])) is None
+
+def test_zero_vector_scores_zero():
+    prototypes = SDGPrototypes(['SDG 1', 'SDG 2'], [None, None], np.eye(2))
+    scores, _ = prototypes.score(np.zeros(2))
+    assert scores.tolist() == [[0.0, 0.0]]
+
+def test_prototype_texts_group_targets_after_description():
+    prototypes = prototype_texts({'SDG 13': 'Klimaschutz  jetzt'})
+    assert prototypes[0] == ('SDG 13', None, 'Klimaschutz jetzt')
+    assert [target_id for _, target_id, _ in prototypes[1:]] == [target_id for target_id, _ in SDG_TARGETS['SDG 13']]
+
+def test_unknown_reduction_is_rejected():
+    with pytest.raises(ValueError):
+        SDGPrototypes(['SDG 1'], [None], np.ones((1, 2)), 'median')
@@ -0,0 +1,8 @@
+import subprocess
+import sys
+from pathlib import Path
+
+def test_import_does_not_load_torch():
+    # Auswertung mit vorberechneten Embeddings (benchmark.py) läuft ohne torch
+    code = "import sys, semantic_analysis; sys.exit('torch' in sys.modules)"
+    subprocess.run([sys.executable, '-c', code], cwd=Path(__file__).resolve().parents[1], check=True)
@@ -0,0 +1,32 @@
+import pytest
+
+from semantic_cascade import recall_cutoff, recall_lower_bound
+
+def test_lower_bound_is_below_observed_recall():
+    assert recall_lower_bound(0, 0) == 0.0
+    assert 0.0 < recall_lower_bound(95, 100) < 0.95
+    assert recall_lower_bound(950, 1000) > recall_lower_bound(95, 100)
+
+def test_cutoff_keeps_lower_bound_above_target():
+    scores = [i / 1000 for i in range(1000)]
+    positives = [True] * 1000
+    cutoff = recall_cutoff(scores, positives, 0.9)
+    caught = sum(score >= cutoff for score in scores)
+    assert recall_lower_bound(caught, 1000) >= 0.9
+    # Eine Stufe höher wäre die Schranke verletzt
+    assert recall_lower_bound(caught - 1, 1000) < 0.9
+
+def test_negatives_do_not_move_the_cutoff():
+    scores = [0.1, 0.2, 0.9, 0.3, 0.8]
+    positives = [True, True, False, True, False]
+    assert recall_cutoff(scores, positives, 0.5) == recall_cutoff([0.1, 0.2, 0.3], [True] * 3, 0.5)
+
+@pytest.mark.parametrize('scores, positives', [
+    ([0.5, 0.7], [True, True]),       # zu kleine Stichprobe: alle positiven bleiben Kandidaten
+    ([0.2, 0.9], [False, True]),
+])
+def test_small_samples_keep_all_positives(scores, positives):
+    assert recall_cutoff(scores, positives, 0.95) == min(s for s, p in zip(scores, positives) if p)
+
+def test_no_positives_means_no_cutoff():
+    assert recall_cutoff([0.4, 0.6], [False, False], 0.95) == 0.0
@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from work_queue import WorkQueue
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'queue.sqlite'), lease_seconds=60, max_attempts=2)
+    yield queue
+    queue.close()
+
+def expire_leases(queue):
+    queue.connection.execute("UPDATE tasks SET lease_until = ? WHERE status = 'leased'", (time.time() - 1,))
+
+def test_reset_marks_queue_as_filling(queue):
+    assert queue.reset('a')
+    queue.set_meta('state', 'ready')
+    # Gleiche Konfiguration: Aufgaben bleiben, der Koordinator füllt aber erneut
+    assert not queue.reset('a')
+    assert queue.get_meta('state') == 'filling'
+    assert not queue.is_finished()
+
+def test_reset_with_new_signature_clears_tasks(queue):
+    queue.reset('a')
+    queue.enqueue([('t1', {'x': 1})])
+    assert queue.reset('b')
+    assert queue.counts()['pending'] == 0
+    assert queue.get_meta('state') == 'filling'
+
+def test_expired_lease_is_requeued(queue):
+    queue.reset('a')
+    queue.enqueue([('t1', {'x': 1})])
+    assert queue.claim('w1') == [('t1', {'x': 1})]
+    assert queue.claim('w2') == []
+    expire_leases(queue)
+    assert queue.claim('w2') == [('t1', {'x': 1})]
+    # Die abgelaufene Lease gehört nicht mehr w1
+    assert queue.heartbeat('w1', ['t1']) == 0
+    assert queue.heartbeat('w2', ['t1']) == 1
+
+def test_task_fails_after_max_attempts(queue):
+    queue.reset('a')
+    queue.enqueue([('t1', {})])
+    queue.claim('w1')
+    queue.fail('t1', 'w1', 'Fehler 1')
+    assert queue.counts()['pending'] == 1
+    queue.claim('w1')
+    expire_leases(queue)
+    assert queue.claim('w1') == []
+    assert queue.counts()['failed'] == 1
+    assert queue.failures() == [('t1', 'Lease abgelaufen')]
+
+def test_complete_is_idempotent(queue):
+    queue.reset('a')
+    queue.enqueue([('t1', {})])
+    queue.set_meta('state', 'ready')
+    queue.claim('w1')
+    expire_leases(queue)
+    queue.claim('w2')
+    # Beide Worker liefern ab: pro Schlüssel bleibt das erste Ergebnis
+    queue.complete('t1', 'w2', [('k1', {'v': 2}, b'2')])
+    queue.complete('t1', 'w1', [('k1', {'v': 1}, b'1'), ('k2', {'v': 1}, None)])
+    assert [(key, value, data) for _, key, value, data in queue.results()] == \
+        [('k1', {'v': 2}, b'2'), ('k2', {'v': 1}, None)]
+    assert queue.counts()['done'] == 1
+    assert queue.is_finished()
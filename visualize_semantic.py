@@ -1,9 +1,9 @@
 import json
 import pandas as pd
-import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
 import numpy as np
+from plot_rendering import PlotJob, new_figure, render_plots
 
 def load_data():
     """Lädt die semantische Analyse"""
@@ -11,24 +11,134 @@ def load_data():
         semantic_data = json.load(f)
     return semantic_data
 
-def create_confidence_plot(semantic_data):
-    """Erstellt eine Visualisierung der Konfidenzintervalle und Ähnlichkeitsverteilung"""
-    # Sammle alle Ähnlichkeitswerte
+SDG_IDS = [f"SDG {i}" for i in range(1, 18)]
+
+def extract_similarity_array(semantic_data):
+    """
+    Extrahiert alle semantischen Treffer in einem Durchlauf.
+    
+    Returns:
+        Tuple (course_idx, sdg_idx, similarities) als NumPy-Arrays gleicher Länge
+    """
+    sdg_positions = {sdg: i for i, sdg in enumerate(SDG_IDS)}
+    course_idx = []
+    sdg_idx = []
     similarities = []
+    
+    course_counter = 0
     for semester in semantic_data['semantic_analysis'].values():
         for course in semester['courses']:
-            similarities.extend([
-                match['similarity'] 
-                for match in course['semantic_matches'].values()
-            ])
+            for sdg, match in course['semantic_matches'].items():
+                position = sdg_positions.get(sdg)
+                if position is None:
+                    continue
+                course_idx.append(course_counter)
+                sdg_idx.append(position)
+                similarities.append(match['similarity'])
+            course_counter += 1
+    
+    return (
+        np.array(course_idx, dtype=np.int64),
+        np.array(sdg_idx, dtype=np.int64),
+        np.array(similarities, dtype=np.float64)
+    )
+
+def _bootstrap_intervals(sdg_idx, similarities, counts, n_bootstrap, seed=0, chunk_size=100):
+    """
+    Bootstrap-Konfidenzintervalle (2.5%/97.5%) des Mittelwerts pro SDG.
+    
+    Die Resamples werden für alle SDGs gemeinsam gezogen: jeder Treffer wird durch
+    einen zufälligen Treffer derselben Gruppe ersetzt und die Gruppensummen per
+    np.add.reduceat gebildet. Die Resamples werden blockweise verarbeitet.
+    """
+    n_sdgs = len(counts)
+    lower = np.full(n_sdgs, np.nan)
+    upper = np.full(n_sdgs, np.nan)
+    present = np.flatnonzero(counts)
+    if present.size == 0:
+        return lower, upper
+    
+    # Treffer nach SDG gruppieren
+    order = np.argsort(sdg_idx, kind='stable')
+    grouped = similarities[order]
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    group_starts = offsets[present]
+    slot_starts = np.repeat(offsets[:-1], counts)
+    slot_sizes = np.repeat(counts, counts)
+    
+    rng = np.random.default_rng(seed)
+    boot_means = np.empty((n_bootstrap, present.size))
+    for start in range(0, n_bootstrap, chunk_size):
+        stop = min(start + chunk_size, n_bootstrap)
+        draws = rng.random((stop - start, grouped.size))
+        samples = grouped[slot_starts + (draws * slot_sizes).astype(np.int64)]
+        boot_means[start:stop] = np.add.reduceat(samples, group_starts, axis=1) / counts[present]
+    
+    lower[present], upper[present] = np.percentile(boot_means, [2.5, 97.5], axis=0)
+    return lower, upper
+
+def compute_sdg_statistics(sdg_idx, similarities, n_sdgs=len(SDG_IDS), n_bootstrap=0, seed=0):
+    """
+    Berechnet Anzahl, Mittelwert, Standardabweichung und 95%-Konfidenzintervall pro SDG
+    mit gruppierten Reduktionen. SDGs ohne Treffer erhalten NaN statt einer Warnung.
+    
+    Args:
+        n_bootstrap: Anzahl Bootstrap-Resamples; 0 verwendet die Normalapproximation
+    """
+    counts = np.bincount(sdg_idx, minlength=n_sdgs)
+    sums = np.bincount(sdg_idx, weights=similarities, minlength=n_sdgs)
+    squared_sums = np.bincount(sdg_idx, weights=similarities ** 2, minlength=n_sdgs)
+    present = counts > 0
+    
+    means = np.full(n_sdgs, np.nan)
+    stds = np.full(n_sdgs, np.nan)
+    means[present] = sums[present] / counts[present]
+    variances = squared_sums[present] / counts[present] - means[present] ** 2
+    stds[present] = np.sqrt(np.clip(variances, 0, None))
+    
+    if n_bootstrap > 0:
+        lower, upper = _bootstrap_intervals(sdg_idx, similarities, counts, n_bootstrap, seed)
+    else:
+        ci = np.full(n_sdgs, np.nan)
+        ci[present] = 1.96 * stds[present] / np.sqrt(counts[present])  # 95% Konfidenzintervall
+        lower, upper = means - ci, means + ci
+    
+    return {
+        'counts': counts,
+        'means': means,
+        'stds': stds,
+        'ci_lower': lower,
+        'ci_upper': upper
+    }
+
+def aggregate_confidence_data(semantic_data, n_bootstrap=0):
+    """Sammelt die Ähnlichkeitswerte und Konfidenzintervalle für den Konfidenz-Plot"""
+    _, sdg_idx, similarities = extract_similarity_array(semantic_data)
+    stats = compute_sdg_statistics(sdg_idx, similarities, n_bootstrap=n_bootstrap)
+    
+    # Nur SDGs mit mindestens einem Treffer darstellen
+    present = stats['counts'] > 0
+    means = stats['means'][present]
     
-    similarities = np.array(similarities)
+    return {
+        'similarities': similarities,
+        'sdgs': [sdg for sdg, has_matches in zip(SDG_IDS, present) if has_matches],
+        'means': means,
+        'errors': np.vstack([means - stats['ci_lower'][present], stats['ci_upper'][present] - means]),
+        'n_bootstrap': n_bootstrap
+    }
+
+def render_confidence_plot(aggregate):
+    """Zeichnet Ähnlichkeitsverteilung und Konfidenzintervalle aus den aggregierten Daten"""
+    similarities = np.array(aggregate['similarities'])
     
     # Erstelle Figure mit zwei Subplots
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(15, 12))
+    fig = new_figure(figsize=(15, 12))
+    ax1, ax2 = fig.subplots(2, 1)
     
     # Plot 1: Verteilung der Ähnlichkeitswerte
-    sns.histplot(similarities, bins=50, kde=True, ax=ax1)
+    if similarities.size > 1:
+        sns.histplot(similarities, bins=50, kde=True, ax=ax1)
     ax1.axvline(x=0.8, color='r', linestyle='--', label='Hohe Ähnlichkeit (0.8)')
     ax1.axvline(x=0.7, color='orange', linestyle='--', label='Mittlere Ähnlichkeit (0.7)')
     ax1.set_title('Verteilung der semantischen Ähnlichkeitswerte')
@@ -37,38 +147,25 @@ def create_confidence_plot(semantic_data):
     ax1.legend()
     
     # Plot 2: Konfidenzintervalle pro SDG
-    sdgs = [f"SDG {i}" for i in range(1, 18)]
-    means = []
-    errors = []
-    
-    for sdg in sdgs:
-        sdg_similarities = []
-        for semester in semantic_data['semantic_analysis'].values():
-            for course in semester['courses']:
-                if sdg in course['semantic_matches']:
-                    sdg_similarities.append(course['semantic_matches'][sdg]['similarity'])
-        
-        mean = np.mean(sdg_similarities)
-        std = np.std(sdg_similarities)
-        ci = 1.96 * std / np.sqrt(len(sdg_similarities))  # 95% Konfidenzintervall
-        
-        means.append(mean)
-        errors.append(ci)
-    
-    ax2.errorbar(sdgs, means, yerr=errors, fmt='o', capsize=5)
-    ax2.set_title('Mittlere Ähnlichkeit und 95% Konfidenzintervalle pro SDG')
+    ax2.errorbar(aggregate['sdgs'], aggregate['means'], yerr=aggregate['errors'], fmt='o', capsize=5)
+    method = f"Bootstrap, {aggregate['n_bootstrap']} Resamples" if aggregate['n_bootstrap'] else 'Normalapproximation'
+    ax2.set_title(f'Mittlere Ähnlichkeit und 95% Konfidenzintervalle pro SDG ({method})')
     ax2.set_xlabel('SDG')
     ax2.set_ylabel('Mittlere Ähnlichkeit')
     ax2.grid(True, alpha=0.3)
-    plt.xticks(rotation=45)
+    ax2.tick_params(axis='x', rotation=45)
     
     # Layout optimieren
-    plt.tight_layout()
+    fig.tight_layout()
     
-    # Speichere die Grafik
-    Path("plots").mkdir(exist_ok=True)
-    plt.savefig('plots/confidence_intervals.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    return fig
+
+def create_confidence_plot(semantic_data, n_bootstrap=0):
+    """Erstellt eine Visualisierung der Konfidenzintervalle und Ähnlichkeitsverteilung"""
+    # Speichere die Grafik (wird übersprungen, wenn sich die Daten nicht geändert haben)
+    return render_plots([
+        PlotJob('confidence_intervals', render_confidence_plot, aggregate_confidence_data(semantic_data, n_bootstrap))
+    ])
 
 def main():
     # Lade Daten
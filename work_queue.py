@@ -0,0 +1,331 @@
+"""
+Gemeinsame Arbeitswarteschlange für verteilte Analysen (SQLite-Datei auf gemeinsamem Speicher).
+
+Ein Koordinator legt Aufgaben an (z. B. Batches eindeutiger Kurstexte); beliebig viele
+zustandslose Worker holen sich Aufgaben mit einer Lease, verlängern sie per Heartbeat und
+liefern pro Schlüssel ein Ergebnis ab. Läuft eine Lease ab, weil der Worker abgestürzt oder
+sein Rechner nicht mehr erreichbar ist, gibt der nächste claim() die Aufgabe wieder frei.
+Nach MAX_ATTEMPTS Versuchen gilt eine Aufgabe als fehlgeschlagen.
+
+Ergebnisse sind über ihren Schlüssel eindeutig: doppelt bearbeitete Aufgaben (Lease
+abgelaufen, Worker lebte doch noch) liefern keine doppelten Ergebnisse, und der Koordinator
+kann die Ergebnisse jederzeit, auch nach einem Neustart, erneut zusammenführen.
+
+Leases vergleichen Zeitstempel verschiedener Rechner; die Uhren sollten synchron laufen
+(NTP), die Lease-Dauer deckt kleine Abweichungen ab. SQLite bleibt im Rollback-Journal-Modus,
+da WAL auf Netzlaufwerken nicht zuverlässig funktioniert.
+
+    python work_queue.py data/work_queue/semantic.sqlite             # Status
+    python work_queue.py data/work_queue/semantic.sqlite --requeue   # Abgelaufene Leases freigeben
+"""
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+STATUSES = ('pending', 'leased', 'done', 'failed')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status);
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    task_id TEXT NOT NULL,
+    worker TEXT,
+    value TEXT,
+    data BLOB
+);
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    host TEXT,
+    pid INTEGER,
+    started REAL,
+    heartbeat REAL,
+    tasks_done INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Ergebnis eines Schlüssels: (Schlüssel, JSON-serialisierbarer Wert, optionale Binärdaten)
+Result = Tuple[str, object, Optional[bytes]]
+
+def worker_name() -> str:
+    """Eindeutiger Worker-Name aus Rechnername und Prozess-ID."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+class WorkQueue:
+    """Aufgaben, Leases und Ergebnisse in einer SQLite-Datei."""
+
+    def __init__(self, path: str, lease_seconds: float = DEFAULT_LEASE_SECONDS, max_attempts: int = MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Autocommit; Schreibtransaktionen werden explizit mit BEGIN IMMEDIATE geöffnet,
+        # damit sich zwei Worker nie dieselbe Aufgabe holen
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    @contextmanager
+    def _transaction(self):
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield self.connection
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.connection.execute('COMMIT')
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.connection.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        self.connection.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+    def reset(self, signature: str) -> bool:
+        """
+        Öffnet die Warteschlange für einen Koordinator-Lauf: leert Aufgaben und Ergebnisse,
+        wenn sie zu einer anderen Konfiguration gehören, und setzt in derselben Transaktion
+        state='filling', damit kein Worker eine halb gefüllte Warteschlange für fertig hält.
+
+        Returns:
+            True, wenn die Warteschlange geleert wurde
+        """
+        with self._transaction() as db:
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('state', 'filling')")
+            row = db.execute("SELECT value FROM meta WHERE key = 'signature'").fetchone()
+            if row and row[0] == signature:
+                return False
+            db.execute('DELETE FROM tasks')
+            db.execute('DELETE FROM results')
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('signature', ?)", (signature,))
+        return True
+
+    def enqueue(self, tasks: Iterable[Tuple[str, object]]) -> int:
+        """Legt Aufgaben (task_id, Payload) an; bekannte task_ids bleiben unverändert. Gibt die Anzahl neuer Aufgaben zurück."""
+        with self._transaction() as db:
+            before = db.total_changes
+            db.executemany('INSERT OR IGNORE INTO tasks (task_id, payload) VALUES (?, ?)',
+                           ((task_id, json.dumps(payload, ensure_ascii=False)) for task_id, payload in tasks))
+            return db.total_changes - before
+
+    def register_worker(self, worker_id: str):
+        now = time.time()
+        self.connection.execute(
+            'INSERT OR REPLACE INTO workers (worker_id, host, pid, started, heartbeat) VALUES (?, ?, ?, ?, ?)',
+            (worker_id, socket.gethostname(), os.getpid(), now, now))
+
+    def _requeue_expired(self, db, now: float) -> int:
+        cursor = db.execute(
+            """UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                                worker = NULL, lease_until = NULL, error = 'Lease abgelaufen'
+               WHERE status = 'leased' AND lease_until < ?""",
+            (self.max_attempts, now))
+        return cursor.rowcount
+
+    def requeue_expired(self) -> int:
+        """Gibt Aufgaben mit abgelaufener Lease wieder frei (bzw. markiert sie als fehlgeschlagen)."""
+        with self._transaction() as db:
+            return self._requeue_expired(db, time.time())
+
+    def claim(self, worker_id: str, limit: int = 1) -> List[Tuple[str, object]]:
+        """Holt bis zu limit offene Aufgaben mit Lease. Jeder claim zählt als Versuch."""
+        now = time.time()
+        with self._transaction() as db:
+            self._requeue_expired(db, now)
+            rows = db.execute("SELECT task_id, payload FROM tasks WHERE status = 'pending' ORDER BY rowid LIMIT ?",
+                              (limit,)).fetchall()
+            db.executemany(
+                """UPDATE tasks SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1
+                   WHERE task_id = ?""",
+                ((worker_id, now + self.lease_seconds, task_id) for task_id, _ in rows))
+        return [(task_id, json.loads(payload)) for task_id, payload in rows]
+
+    def heartbeat(self, worker_id: str, task_ids: List[str]) -> int:
+        """Verlängert die Leases der Aufgaben des Workers. Gibt die Anzahl noch gehaltener Leases zurück."""
+        now = time.time()
+        with self._transaction() as db:
+            db.execute('UPDATE workers SET heartbeat = ? WHERE worker_id = ?', (now, worker_id))
+            held = 0
+            for task_id in task_ids:
+                held += db.execute(
+                    "UPDATE tasks SET lease_until = ? WHERE task_id = ? AND worker = ? AND status = 'leased'",
+                    (now + self.lease_seconds, task_id, worker_id)).rowcount
+        return held
+
+    def complete(self, task_id: str, worker_id: str, results: Iterable[Result]):
+        """
+        Speichert die Ergebnisse einer Aufgabe und markiert sie als erledigt. Auch ein Worker,
+        dessen Lease inzwischen abgelaufen ist, darf abliefern; vorhandene Ergebnisse bleiben.
+        """
+        with self._transaction() as db:
+            db.executemany(
+                'INSERT OR IGNORE INTO results (key, task_id, worker, value, data) VALUES (?, ?, ?, ?, ?)',
+                ((key, task_id, worker_id, json.dumps(value, ensure_ascii=False), data)
+                 for key, value, data in results))
+            db.execute("UPDATE tasks SET status = 'done', worker = ?, lease_until = NULL, error = NULL "
+                       "WHERE task_id = ?", (worker_id, task_id))
+            db.execute('UPDATE workers SET tasks_done = tasks_done + 1, heartbeat = ? WHERE worker_id = ?',
+                       (time.time(), worker_id))
+
+    def fail(self, task_id: str, worker_id: str, error: str):
+        """Meldet einen Fehler; die Aufgabe wird erneut vergeben, bis MAX_ATTEMPTS erreicht ist."""
+        with self._transaction() as db:
+            db.execute(
+                """UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                                    worker = NULL, lease_until = NULL, error = ?
+                   WHERE task_id = ? AND worker = ? AND status = 'leased'""",
+                (self.max_attempts, error, task_id, worker_id))
+
+    def release(self, task_id: str, worker_id: str):
+        """Gibt eine Aufgabe ohne Fehler zurück (z. B. beim Beenden eines Workers); zählt nicht als Versuch."""
+        with self._transaction() as db:
+            db.execute(
+                """UPDATE tasks SET status = 'pending', worker = NULL, lease_until = NULL, attempts = attempts - 1
+                   WHERE task_id = ? AND worker = ? AND status = 'leased'""",
+                (task_id, worker_id))
+
+    def results(self, after: int = 0) -> Iterator[Tuple[int, str, object, Optional[bytes]]]:
+        """Ergebnisse (rowid, Schlüssel, Wert, Binärdaten) nach der rowid after, in Eingangsreihenfolge."""
+        for rowid, key, value, data in self.connection.execute(
+                'SELECT rowid, key, value, data FROM results WHERE rowid > ? ORDER BY rowid', (after,)):
+            yield rowid, key, json.loads(value), data
+
+    def counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update(self.connection.execute('SELECT status, COUNT(*) FROM tasks GROUP BY status').fetchall())
+        return counts
+
+    def failures(self) -> List[Tuple[str, str]]:
+        return self.connection.execute("SELECT task_id, error FROM tasks WHERE status = 'failed'").fetchall()
+
+    def active_workers(self) -> List[str]:
+        """Worker, deren letzter Heartbeat innerhalb einer Lease-Dauer liegt."""
+        since = time.time() - self.lease_seconds
+        return [row[0] for row in self.connection.execute(
+            'SELECT worker_id FROM workers WHERE heartbeat >= ? ORDER BY worker_id', (since,))]
+
+    def is_finished(self) -> bool:
+        """Keine offenen oder vergebenen Aufgaben mehr und der Koordinator hat alle Aufgaben angelegt."""
+        counts = self.counts()
+        return self.get_meta('state') == 'ready' and counts['pending'] == 0 and counts['leased'] == 0
+
+class Heartbeat(threading.Thread):
+    """Verlängert im Hintergrund die Leases der Aufgaben, die ein Worker gerade bearbeitet."""
+
+    def __init__(self, path: str, worker_id: str, lease_seconds: float):
+        super().__init__(daemon=True)
+        self.path = path
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.interval = lease_seconds / 4
+        self.task_ids: List[str] = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        # SQLite-Verbindungen dürfen nicht zwischen Threads geteilt werden
+        queue = WorkQueue(self.path, self.lease_seconds)
+        try:
+            while not self._stop_event.wait(self.interval):
+                queue.heartbeat(self.worker_id, list(self.task_ids))
+        finally:
+            queue.close()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+def run_worker(queue: WorkQueue, process: Callable[[object], Iterable[Result]], signature: Optional[str] = None,
+               worker_id: Optional[str] = None, poll_seconds: float = 5.0) -> int:
+    """
+    Arbeitsschleife eines zustandslosen Workers: holt Aufgaben, bearbeitet sie mit process
+    und liefert die Ergebnisse ab, bis der Koordinator alle Aufgaben angelegt hat und keine
+    mehr offen sind. Mit signature bricht der Worker ab, wenn die Warteschlange zu einer
+    anderen Konfiguration gehört (z. B. anderes Modell).
+
+    Returns:
+        Anzahl bearbeiteter Aufgaben
+    """
+    worker_id = worker_id or worker_name()
+    while queue.get_meta('state') is None:
+        print(f"⏳ {worker_id}: Warte auf den Koordinator...")
+        time.sleep(poll_seconds)
+    if signature is not None and queue.get_meta('signature') != signature:
+        print(f"❌ {worker_id}: Konfiguration der Warteschlange passt nicht zu diesem Worker")
+        return 0
+
+    queue.register_worker(worker_id)
+    heartbeat = Heartbeat(queue.path, worker_id, queue.lease_seconds)
+    heartbeat.start()
+    done = 0
+    try:
+        while True:
+            claimed = queue.claim(worker_id)
+            if not claimed:
+                if queue.is_finished():
+                    break
+                time.sleep(poll_seconds)
+                continue
+            task_id, payload = claimed[0]
+            heartbeat.task_ids = [task_id]
+            try:
+                results = list(process(payload))
+            except KeyboardInterrupt:
+                queue.release(task_id, worker_id)
+                raise
+            except Exception as e:
+                print(f"⚠️ {worker_id}: Aufgabe {task_id[:12]} fehlgeschlagen: {str(e)}")
+                queue.fail(task_id, worker_id, repr(e))
+                continue
+            finally:
+                heartbeat.task_ids = []
+            queue.complete(task_id, worker_id, results)
+            done += 1
+            print(f"✓ {worker_id}: Aufgabe {task_id[:12]} erledigt ({len(results)} Ergebnisse)")
+    finally:
+        heartbeat.stop()
+    return done
+
+def main():
+    parser = argparse.ArgumentParser(description="Status einer Arbeitswarteschlange anzeigen")
+    parser.add_argument('queue_file', help="SQLite-Datei der Warteschlange")
+    parser.add_argument('--requeue', action='store_true', help="Aufgaben mit abgelaufener Lease freigeben")
+    parser.add_argument('--lease-seconds', type=float, default=DEFAULT_LEASE_SECONDS)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.queue_file):
+        print(f"Keine Warteschlange: {args.queue_file}")
+        return
+    queue = WorkQueue(args.queue_file, args.lease_seconds)
+    if args.requeue:
+        print(f"{queue.requeue_expired()} Aufgaben wieder freigegeben")
+    counts = queue.counts()
+    print(f"Aufgaben: {counts['pending']} offen, {counts['leased']} in Arbeit, "
+          f"{counts['done']} erledigt, {counts['failed']} fehlgeschlagen")
+    workers = queue.active_workers()
+    print(f"Aktive Worker ({len(workers)}): {', '.join(workers) or '-'}")
+    for task_id, error in queue.failures():
+        print(f"  ❌ {task_id[:12]}: {error}")
+    queue.close()
+
+if __name__ == "__main__":
+    main()